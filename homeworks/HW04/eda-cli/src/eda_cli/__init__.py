@@ -4,9 +4,19 @@ eda_cli – мини-утилита для EDA CSV-файлов.
 Используется:
 - на Семинаре 03 как CLI-приложение;
 - на Семинаре 04 как библиотека для обёрток (HTTP-сервис и т.п.).
+
+Подмодули core и viz импортируются лениво (при первом обращении), чтобы
+лёгкий клиент демона (eda_cli.client) не загружал pandas и matplotlib.
 """
 
-from . import core, viz
+import importlib
+from typing import Any
 
 __all__ = ["core", "viz"]
 __version__ = "0.1.0"
+
+
+def __getattr__(name: str) -> Any:
+    if name in __all__:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
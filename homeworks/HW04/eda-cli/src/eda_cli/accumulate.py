@@ -0,0 +1,356 @@
+"""
+Потоковое построение DatasetSummary по чанкам.
+
+SummaryAccumulator принимает DataFrame-чанки (например, из pd.read_csv(chunksize=...))
+и хранит только сливаемые частичные агрегаты: счётчики, min/max, mean/M2 (формула Чана),
+хэши уникальных значений и KLL-скетчи. Аккумуляторы разных чанков, партиций
+или воркеров сливаются через merge, итог — finalize() -> DatasetSummary.
+
+Число уникальных — KMV-скетч (k minimum values): хранятся не больше DISTINCT_CAPACITY
+наименьших 64-битных хэшей колонки. Пока уникальных меньше — счёт точный,
+дальше — оценка (DISTINCT_CAPACITY - 1) / (наибольший хранимый хэш / 2**64)
+с относительной ошибкой около 1 / sqrt(DISTINCT_CAPACITY).
+"""
+
+from __future__ import annotations
+
+import base64
+import math
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+from pandas.api import types as ptypes
+
+from .core import (
+    QUANTILE_FIELDS,
+    STAT_FIELDS,
+    DatasetSummary,
+    _example_values,
+    numeric_values,
+)
+from .sketch import DEFAULT_K, QUANTILES, KLLSketch
+
+# сколько хэшей копим в «хвосте», прежде чем схлопнуть их через np.unique
+_HASH_COMPACT_MIN = 1 << 20
+# сколько наименьших хэшей хранит колонка (8 МБ); больше уникальных — приближённый счёт
+DISTINCT_CAPACITY = 1 << 20
+# сколько самых частых значений строковой колонки хранить (для top-k и сравнения сводок)
+TOP_VALUES_CAPACITY = 1024
+
+
+class ColumnAccumulator:
+    """Частичные агрегаты одной колонки."""
+
+    __slots__ = (
+        "dtypes",
+        "all_numeric",
+        "non_null",
+        "count",
+        "mean",
+        "m2",
+        "min",
+        "max",
+        "_hashes",
+        "_pending",
+        "_pending_size",
+        "examples",
+        "sketch",
+        "top_values",
+        "zeros",
+    )
+
+    def __init__(self, sketch_k: int = DEFAULT_K) -> None:
+        self.dtypes: List[str] = []
+        self.all_numeric = True
+        self.non_null = 0
+        # числовые агрегаты (только по числовым чанкам)
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self._hashes = np.empty(0, dtype=np.uint64)
+        self._pending: List[np.ndarray] = []
+        self._pending_size = 0
+        self.examples: List[str] = []
+        self.sketch = KLLSketch(k=sketch_k)
+        self.top_values: Dict[str, int] = {}
+        self.zeros = 0
+
+    def _add_dtype(self, dtype: str) -> None:
+        if dtype not in self.dtypes:
+            self.dtypes.append(dtype)
+
+    def _add_hashes(self, hashes: np.ndarray) -> None:
+        if self._hashes.size >= DISTINCT_CAPACITY:
+            # скетч заполнен: хэши больше наибольшего хранимого в него уже не попадут
+            hashes = hashes[hashes < self._hashes[-1]]
+        self._pending.append(hashes)
+        self._pending_size += hashes.size
+        if self._pending_size >= max(_HASH_COMPACT_MIN, self._hashes.size):
+            self._compact_hashes()
+
+    def _compact_hashes(self) -> None:
+        if self._pending:
+            self._hashes = np.unique(np.concatenate([self._hashes, *self._pending]))[:DISTINCT_CAPACITY]
+            self._pending, self._pending_size = [], 0
+
+    def _add_top_values(self, values: Iterable[str], counts: Iterable[int]) -> None:
+        top = self.top_values
+        for value, count in zip(values, counts):
+            top[value] = top.get(value, 0) + int(count)
+        if len(top) > 2 * TOP_VALUES_CAPACITY:
+            # оставляем самые частые: для редких значений счётчики становятся приблизительными
+            keep = sorted(top.items(), key=lambda kv: kv[1], reverse=True)[:TOP_VALUES_CAPACITY]
+            self.top_values = dict(keep)
+
+    def _add_moments(self, count: int, mean: float, m2: float) -> None:
+        # параллельное объединение среднего и суммы квадратов отклонений (Chan et al.)
+        if count == 0:
+            return
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+
+    def update(self, s: pd.Series, example_values_per_column: int) -> None:
+        self._add_dtype(str(s.dtype))
+        self.all_numeric &= bool(ptypes.is_numeric_dtype(s))
+        if ptypes.is_numeric_dtype(s):
+            values = numeric_values(s)
+            self.non_null += int(values.size)
+            if values.size:
+                mean = float(values.mean())
+                self._add_moments(int(values.size), mean, float(((values - mean) ** 2).sum()))
+                self.min = min(self.min, float(values.min()))
+                self.max = max(self.max, float(values.max()))
+                self.sketch.update(values)
+                self.zeros += int(np.count_nonzero(values == 0))
+                # +0.0 приводит -0.0 к 0.0, чтобы не считать их разными значениями; биты числа
+                # перемешиваются хэшем, иначе «наименьшие хэши» были бы просто наименьшими числами
+                self._add_hashes(np.unique(pd.util.hash_array((values + 0.0).view(np.uint64))))
+        else:
+            non_null = s.dropna()
+            self.non_null += int(non_null.size)
+            if non_null.size:
+                counts = non_null.value_counts(sort=False)
+                uniques = np.asarray(counts.index, dtype=object)
+                self._add_hashes(np.unique(pd.util.hash_array(uniques)))
+                self._add_top_values(counts.index.astype(str), counts.to_numpy())
+        if len(self.examples) < example_values_per_column and self.non_null:
+            for value in _example_values(s, example_values_per_column):
+                if value not in self.examples:
+                    self.examples.append(value)
+                    if len(self.examples) == example_values_per_column:
+                        break
+
+    def merge(self, other: "ColumnAccumulator", example_values_per_column: int) -> None:
+        for dtype in other.dtypes:
+            self._add_dtype(dtype)
+        self.all_numeric &= other.all_numeric
+        self.non_null += other.non_null
+        self._add_moments(other.count, other.mean, other.m2)
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        other._compact_hashes()
+        self._add_hashes(other._hashes)
+        for value in other.examples:
+            if len(self.examples) >= example_values_per_column:
+                break
+            if value not in self.examples:
+                self.examples.append(value)
+        self.sketch.merge(other.sketch)
+        self._add_top_values(other.top_values.keys(), other.top_values.values())
+        self.zeros += other.zeros
+
+    @property
+    def unique(self) -> int:
+        """Число уникальных: точное до DISTINCT_CAPACITY, дальше — KMV-оценка."""
+        self._compact_hashes()
+        if self._hashes.size < DISTINCT_CAPACITY:
+            return int(self._hashes.size)
+        return int(round((DISTINCT_CAPACITY - 1) * 2.0**64 / float(self._hashes[-1])))
+
+    @property
+    def is_numeric(self) -> bool:
+        return bool(self.dtypes) and self.all_numeric
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-совместимое состояние (хэши уникальных — base64 от uint64 little-endian)."""
+        self._compact_hashes()
+        return {
+            "dtypes": list(self.dtypes),
+            "all_numeric": self.all_numeric,
+            "non_null": self.non_null,
+            "count": self.count,
+            "mean": self.mean,
+            "m2": self.m2,
+            "min": None if math.isinf(self.min) else self.min,
+            "max": None if math.isinf(self.max) else self.max,
+            "hashes": base64.b64encode(self._hashes.astype("<u8").tobytes()).decode("ascii"),
+            "examples": list(self.examples),
+            "sketch": self.sketch.to_dict(),
+            "top_values": dict(self.top_values),
+            "zeros": self.zeros,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ColumnAccumulator":
+        col = cls()
+        col.dtypes = list(data["dtypes"])
+        col.all_numeric = bool(data["all_numeric"])
+        col.non_null = int(data["non_null"])
+        col.count = int(data["count"])
+        col.mean = float(data["mean"])
+        col.m2 = float(data["m2"])
+        col.min = math.inf if data["min"] is None else float(data["min"])
+        col.max = -math.inf if data["max"] is None else float(data["max"])
+        col._hashes = np.frombuffer(base64.b64decode(data["hashes"]), dtype="<u8").astype(np.uint64)
+        col.examples = list(data["examples"])
+        col.sketch = KLLSketch.from_dict(data["sketch"])
+        col.top_values = {str(k): int(v) for k, v in data["top_values"].items()}
+        col.zeros = int(data["zeros"])
+        return col
+
+    def top(self, top_k: int) -> Dict[str, int]:
+        """top_k самых частых значений (только по строковым чанкам)."""
+        return dict(sorted(self.top_values.items(), key=lambda kv: kv[1], reverse=True)[:top_k])
+
+    def final_dtype(self) -> str:
+        """Итоговый тип: общий тип, если чанки разошлись только в числовых типах, иначе object."""
+        if len(self.dtypes) == 1:
+            return self.dtypes[0]
+        if not self.is_numeric:
+            return "object"
+        try:
+            return str(np.result_type(*[np.dtype(d) for d in self.dtypes]))
+        except TypeError:  # nullable-типы pandas (Int64 и т.п.)
+            return "float64"
+
+
+class SummaryAccumulator:
+    """
+    Сливаемый построитель DatasetSummary.
+
+    acc = SummaryAccumulator()
+    for chunk in pd.read_csv(path, chunksize=100_000):
+        acc.update(chunk)
+    summary = acc.finalize()
+
+    Ограничения по сравнению с summarize_dataset на всём фрейме:
+    - unique считается по 64-битным хэшам (коллизии пренебрежимо редки);
+    - если колонка в разных чанках получила разные типы (число и строка),
+      она считается строковой, а unique — приблизительным.
+    """
+
+    def __init__(self, example_values_per_column: int = 3, sketch_k: int = DEFAULT_K) -> None:
+        self.example_values_per_column = example_values_per_column
+        self.sketch_k = sketch_k
+        self.n_rows = 0
+        self.names: Optional[List] = None
+        self.columns: List[ColumnAccumulator] = []
+
+    def _ensure_columns(self, names: List) -> None:
+        if self.names is None:
+            self.names = list(names)
+            self.columns = [ColumnAccumulator(self.sketch_k) for _ in self.names]
+        elif list(names) != self.names:
+            raise ValueError("Набор колонок чанка не совпадает с предыдущими чанками")
+
+    def update(self, chunk: pd.DataFrame) -> "SummaryAccumulator":
+        self._ensure_columns(list(chunk.columns))
+        self.n_rows += len(chunk)
+        for i, col in enumerate(self.columns):
+            col.update(chunk.iloc[:, i], self.example_values_per_column)
+        return self
+
+    def update_many(self, chunks: Iterable[pd.DataFrame]) -> "SummaryAccumulator":
+        for chunk in chunks:
+            self.update(chunk)
+        return self
+
+    def merge(self, other: "SummaryAccumulator") -> "SummaryAccumulator":
+        """Сливает аккумулятор следующей по порядку части данных (порядок важен только для примеров)."""
+        if other.names is None:
+            return self
+        self._ensure_columns(other.names)
+        self.n_rows += other.n_rows
+        for mine, theirs in zip(self.columns, other.columns):
+            mine.merge(theirs, self.example_values_per_column)
+        return self
+
+    def finalize(self) -> DatasetSummary:
+        names = self.names or []
+        n_rows, n_cols = self.n_rows, len(names)
+        dtypes = [col.final_dtype() for col in self.columns]
+        non_null = np.array([col.non_null for col in self.columns], dtype=np.int64)
+        missing = n_rows - non_null
+        is_numeric = np.array([col.is_numeric for col in self.columns], dtype=bool)
+        has_stats = is_numeric & (non_null > 0)
+
+        stats = {stat: np.full(n_cols, np.nan) for stat in STAT_FIELDS}
+        qs = list(QUANTILES.values())
+        for i in np.flatnonzero(has_stats):
+            col = self.columns[i]
+            stats["min"][i] = col.min
+            stats["max"][i] = col.max
+            stats["mean"][i] = col.mean
+            stats["std"][i] = math.sqrt(col.m2 / (col.count - 1)) if col.count > 1 else np.nan
+            for field, value in zip(QUANTILE_FIELDS, col.sketch.quantiles(qs)):
+                stats[field][i] = value
+
+        return DatasetSummary.from_arrays(
+            n_rows,
+            n_cols,
+            names=names,
+            dtypes=dtypes,
+            non_null=non_null,
+            missing=missing,
+            missing_share=missing / n_rows if n_rows > 0 else np.zeros(n_cols),
+            unique=[col.unique for col in self.columns],
+            example_values=[list(col.examples) for col in self.columns],
+            is_numeric=is_numeric,
+            has_stats=has_stats,
+            stats=stats,
+            sketches=[col.sketch if ok else None for col, ok in zip(self.columns, has_stats)],
+        )
+
+    def zero_counts(self) -> Dict[Any, int]:
+        """Число нулей в числовых колонках (для флага has_many_zero_values без исходных данных)."""
+        return {name: col.zeros for name, col in zip(self.names or [], self.columns) if col.is_numeric}
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Состояние для передачи между процессами/хостами (см. distributed)."""
+        return {
+            "example_values_per_column": self.example_values_per_column,
+            "sketch_k": self.sketch_k,
+            "n_rows": self.n_rows,
+            "names": self.names,
+            "columns": [col.to_dict() for col in self.columns],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SummaryAccumulator":
+        acc = cls(example_values_per_column=int(data["example_values_per_column"]), sketch_k=int(data["sketch_k"]))
+        acc.n_rows = int(data["n_rows"])
+        acc.names = None if data["names"] is None else list(data["names"])
+        acc.columns = [ColumnAccumulator.from_dict(col) for col in data["columns"]]
+        return acc
+
+    def top_values(self, top_k: int = 20) -> Dict[str, Dict[str, int]]:
+        """{колонка: {значение: количество}} для нечисловых колонок."""
+        return {
+            name: col.top(top_k) for name, col in zip(self.names or [], self.columns) if not col.is_numeric
+        }
+
+
+def summarize_chunks(
+    chunks: Iterable[pd.DataFrame],
+    example_values_per_column: int = 3,
+    sketch_k: int = DEFAULT_K,
+) -> DatasetSummary:
+    """DatasetSummary по потоку чанков без склейки их в один DataFrame."""
+    acc = SummaryAccumulator(example_values_per_column=example_values_per_column, sketch_k=sketch_k)
+    return acc.update_many(chunks).finalize()
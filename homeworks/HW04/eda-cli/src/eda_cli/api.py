@@ -2,19 +2,68 @@
 from __future__ import annotations
 
 import io
+import json
+import os
+import tarfile
 import time
 import uuid
-from typing import Any, Dict
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import IO, Any, Dict, Iterator, List, Optional, Tuple
 
 import pandas as pd
-from fastapi import FastAPI, File, HTTPException, UploadFile, Query
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, File, Form, HTTPException, Request, UploadFile, Query
+from fastapi.responses import FileResponse, Response, StreamingResponse
 from pydantic import BaseModel
 
 # импортируем ядро из вашего eda-cli (HW03)
-from .core import compute_quality_flags, missing_table, summarize_dataset
+from . import formats
+from .compression import DEFAULT_MAX_DECOMPRESSED, DecompressionLimitError, open_decompressed, sniff_compression
+from .core import missing_table, summarize_dataset, top_categories
+from .drift import (
+    DEFAULT_BINS,
+    KS_THRESHOLD,
+    MISSING_THRESHOLD,
+    PSI_THRESHOLD,
+    SummarySnapshot,
+    compare_snapshots,
+    snapshot_dataframe,
+)
+from .duplicates import parse_key_spec
+from .infer import DEFAULT_THRESHOLD as TYPE_THRESHOLD, convert_types, infer_types
+from .jobs import JOB_KINDS, JobManager, hash_file
+from .missingness import DEFAULT_TOP_PATTERNS, MissingnessProfiler
+from .outliers import DEFAULT_METHOD as OUTLIER_METHOD
+from .responses import CompressionMiddleware, DecompressionMiddleware, FastJSONResponse, dumps
+from .rules import Rule, RuleError, evaluate_rules, parse_rules_text
+from .session import Profile
+from .sketch import DEFAULT_K
+from .target import profile_target
+from .text import profile_text
+from .timeseries import profile_datetimes
 
-app = FastAPI(title="eda-cli quality API", version="0.1")
+app = FastAPI(title="eda-cli quality API", version="0.1", default_response_class=FastJSONResponse)
+# zstd/gzip по Accept-Encoding (zstd — если установлен zstandard)
+app.add_middleware(CompressionMiddleware, minimum_size=1024)
+# Лимит распакованных данных (тело с Content-Encoding и сжатые загрузки), байт: защита от «бомб».
+MAX_DECOMPRESSED = int(os.environ.get("EDA_CLI_MAX_DECOMPRESSED", str(DEFAULT_MAX_DECOMPRESSED)))
+# тела запросов с Content-Encoding: gzip/zstd распаковываются на лету
+app.add_middleware(DecompressionMiddleware, max_size=MAX_DECOMPRESSED)
+
+# Менеджер фоновых задач. Каталог, TTL и число воркеров настраиваются через переменные окружения.
+job_manager = JobManager(
+    work_dir=os.environ.get("EDA_CLI_JOBS_DIR"),
+    max_workers=int(os.environ.get("EDA_CLI_JOB_WORKERS", "2")),
+    ttl_seconds=float(os.environ.get("EDA_CLI_JOB_TTL", "3600")),
+    max_decompressed=MAX_DECOMPRESSED,
+)
+
+# Пул для /quality-flags-batch: маленькие датасеты анализируются параллельно.
+batch_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("EDA_CLI_BATCH_WORKERS", str(min(8, os.cpu_count() or 1)))),
+    thread_name_prefix="eda-batch",
+)
 
 class HealthResponse(BaseModel):
     status: str
@@ -78,31 +127,45 @@ def quality(req: QualityRequest) -> Dict[str, Any]:
     }
 
 
+def _quality_flags_or_400(
+    profile: Profile,
+    min_missing_share: float,
+    key: List[str],
+    rules: Optional[List[Rule]] = None,
+):
+    try:
+        rules_result = evaluate_rules(profile.df, rules) if rules else None
+        return profile.quality_flags(
+            min_missing_share,
+            key_columns=[parse_key_spec(k) for k in key],
+            rules_result=rules_result,
+        )
+    except (KeyError, RuleError) as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
 @app.post("/quality-from-csv")
 async def quality_from_csv(
     file: UploadFile = File(...),
     min_missing_share: float = Query(0.1, description="Порог доли пропусков для пометки проблемной колонки"),
+    key: List[str] = Query([], description="Уникальный ключ: колонка или список через запятую (можно повторять)"),
 ):
     """
     Аналог семинарного /quality-from-csv: принимает CSV (multipart/form-data),
-    читает его в DataFrame, вызывает summarize_dataset -> missing_table -> compute_quality_flags
+    читает его в DataFrame, считает сводку, пропуски и флаги качества (session.Profile)
     и возвращает качество + флаги + служебную информацию.
     """
     start = time.perf_counter()
     request_id = str(uuid.uuid4())
     # читаем CSV
-    try:
-        content = await file.read()
-        df = pd.read_csv(io.BytesIO(content))
-    except Exception as exc:
-        raise HTTPException(status_code=400, detail=f"Не удалось прочитать CSV: {exc}")
+    df = await _read_upload_csv(file)
 
     if df is None:
         raise HTTPException(status_code=400, detail="CSV не содержит данных")
 
-    summary = summarize_dataset(df)
-    missing = missing_table(df)
-    flags = compute_quality_flags(summary, missing, min_missing_share, df=df)
+    profile = Profile(df)
+    summary = profile.summary
+    flags = _quality_flags_or_400(profile, min_missing_share, key)
     latency_ms = (time.perf_counter() - start) * 1000.0
     ok_for_model = flags.get("quality_score", 0.0) >= 0.5
 
@@ -115,17 +178,27 @@ async def quality_from_csv(
         "flags": flags,
         "latency_ms": latency_ms,
     }
-    return JSONResponse(resp)
+    return FastJSONResponse(resp)
 
 
 @app.post("/quality-flags-from-csv")
 async def quality_flags_from_csv(
     file: UploadFile = File(...),
     min_missing_share: float = Query(0.1, description="Порог доли пропусков для пометки проблемной колонки"),
+    key: List[str] = Query([], description="Уникальный ключ: колонка или список через запятую (можно повторять)"),
+    rules: Optional[UploadFile] = File(None, description="Файл правил качества (YAML/JSON)"),
+    infer: bool = Query(
+        False, alias="infer_types", description="Приводить object-колонки с числами/датами к нужному типу"
+    ),
+    type_threshold: float = Query(TYPE_THRESHOLD, ge=0.0, le=1.0, description="Порог доли приводимых значений"),
 ):
     """
     НОВЫЙ ЭНДПОИНТ (HW04, вариант A).
     Возвращает подробный набор флагов качества (включая эвристики из HW03).
+    Необязательное поле rules — файл декларативных правил (см. eda_cli.rules),
+    результаты правил попадают во flags["rules"] и снижают quality_score.
+    При infer_types=true флаги считаются после вывода типов, а решения по
+    колонкам возвращаются в поле inferred_types.
     Формат ответа:
     {
       "flags": { ... },
@@ -137,28 +210,557 @@ async def quality_flags_from_csv(
     }
     """
     start = time.perf_counter()
-    try:
-        content = await file.read()
-        df = pd.read_csv(io.BytesIO(content))
-    except Exception as exc:
-        raise HTTPException(status_code=400, detail=f"Не удалось прочитать CSV: {exc}")
+    df = await _read_upload_csv(file)
 
     if df is None or df.shape[0] == 0:
         raise HTTPException(status_code=400, detail="CSV пуст или не содержит строк")
 
-    summary = summarize_dataset(df)
-    missing = missing_table(df)
-    flags = compute_quality_flags(summary, missing, min_missing_share, df=df)
+    rule_list = None
+    if rules is not None:
+        try:
+            rule_list = parse_rules_text((await rules.read()).decode("utf-8"))
+        except (RuleError, UnicodeDecodeError) as exc:
+            raise HTTPException(status_code=400, detail=f"Некорректный файл правил: {exc}")
+
+    inferences = []
+    if infer:
+        df, inferences = convert_types(df, threshold=type_threshold)
+
+    profile = Profile(df)
+    summary = profile.summary
+    flags = _quality_flags_or_400(profile, min_missing_share, key, rules=rule_list)
     latency_ms = (time.perf_counter() - start) * 1000.0
     ok_for_model = flags.get("quality_score", 0.0) >= 0.5
 
-    return JSONResponse(
+    payload = {
+        "flags": flags,
+        "quality_score": flags.get("quality_score"),
+        "ok_for_model": ok_for_model,
+        "n_rows": summary.n_rows,
+        "n_cols": summary.n_cols,
+        "latency_ms": latency_ms,
+    }
+    if infer:
+        payload["inferred_types"] = [info.to_dict() for info in inferences]
+    return FastJSONResponse(payload)
+
+
+async def _read_upload_csv(file: UploadFile) -> pd.DataFrame:
+    """
+    CSV из загрузки; сжатые файлы (.csv.gz, .csv.bz2, .csv.zst) распаковываются
+    потоково прямо из временного файла загрузки, без чтения всех байт в память.
+    """
+    try:
+        await file.seek(0)
+        return pd.read_csv(open_decompressed(file.file, max_output=MAX_DECOMPRESSED))
+    except DecompressionLimitError as exc:
+        raise HTTPException(status_code=413, detail=str(exc))
+    except Exception as exc:
+        raise HTTPException(status_code=400, detail=f"Не удалось прочитать CSV: {exc}")
+
+
+def _negotiate_or_406(request: Request) -> str:
+    """Формат ответа по Accept; Arrow/Parquet доступны только при установленном pyarrow."""
+    fmt = formats.negotiate_format(request.headers.get("accept"))
+    if fmt is None or (fmt != "json" and not formats.arrow_available()):
+        supported = [formats.JSON_MEDIA_TYPE]
+        if formats.arrow_available():
+            supported += [formats.ARROW_STREAM_MEDIA_TYPE, formats.PARQUET_MEDIA_TYPE]
+        raise HTTPException(status_code=406, detail=f"Поддерживаемые типы ответа: {supported}")
+    return fmt
+
+
+def _table_response(fmt: str, table_fn) -> Response:
+    """Arrow IPC / Parquet ответ из pyarrow.Table, построенной table_fn()."""
+    return Response(content=formats.render_table(table_fn(), fmt), media_type=formats.FORMAT_MEDIA_TYPES[fmt])
+
+
+@app.post("/summary-from-csv")
+async def summary_from_csv(
+    request: Request,
+    file: UploadFile = File(...),
+    layout: str = Query(
+        "records",
+        description="records — список колонок; columnar — массив на каждое поле; snapshot — сводка для /compare",
+    ),
+    example_values_per_column: int = Query(3, ge=0, description="Сколько примеров значений на колонку"),
+    sketch_k: int = Query(DEFAULT_K, ge=8, description="Точность квантильных скетчей p1..p99"),
+):
+    """
+    Полный DatasetSummary по CSV: статистика по каждой колонке.
+    Для широких датасетов удобнее layout=columnar — он компактнее и быстрее сериализуется.
+    layout=snapshot возвращает сводку со скетчами и top-значениями, которую можно сохранить
+    и позже передать в /compare.
+    По заголовку Accept можно получить таблицу в Arrow IPC stream или Parquet.
+    """
+    if layout not in ("records", "columnar", "snapshot"):
+        raise HTTPException(status_code=400, detail="layout должен быть records, columnar или snapshot")
+    fmt = _negotiate_or_406(request)
+    start = time.perf_counter()
+    df = await _read_upload_csv(file)
+
+    summary = summarize_dataset(df, example_values_per_column=example_values_per_column, sketch_k=sketch_k)
+    if fmt != "json":
+        return _table_response(fmt, lambda: formats.summary_to_arrow(summary))
+    if layout == "snapshot":
+        return FastJSONResponse(snapshot_dataframe(df, summary=summary, source=file.filename or "").to_dict())
+    payload = summary.to_columnar() if layout == "columnar" else summary.to_dict()
+    payload["layout"] = layout
+    payload["latency_ms"] = (time.perf_counter() - start) * 1000.0
+    return FastJSONResponse(payload)
+
+
+@app.post("/missing-from-csv")
+async def missing_from_csv(request: Request, file: UploadFile = File(...)):
+    """Таблица пропусков по колонкам (missing_table): JSON, Arrow IPC stream или Parquet."""
+    fmt = _negotiate_or_406(request)
+    missing = missing_table(await _read_upload_csv(file))
+    if fmt != "json":
+        return _table_response(fmt, lambda: formats.missing_to_arrow(missing))
+    return FastJSONResponse(
         {
-            "flags": flags,
-            "quality_score": flags.get("quality_score"),
-            "ok_for_model": ok_for_model,
-            "n_rows": summary.n_rows,
-            "n_cols": summary.n_cols,
-            "latency_ms": latency_ms,
+            "columns": {
+                "column": missing.index.astype(str).tolist(),
+                "missing_count": missing["missing_count"].to_numpy(),
+                "missing_share": missing["missing_share"].to_numpy(),
+            }
         }
     )
+
+
+@app.post("/top-categories-from-csv")
+async def top_categories_from_csv(
+    request: Request,
+    file: UploadFile = File(...),
+    max_columns: int = Query(5, ge=1, description="Максимум категориальных колонок"),
+    top_k: int = Query(5, ge=1, description="Сколько топ-значений на колонку"),
+):
+    """
+    Top-k значений категориальных колонок.
+    JSON: {колонка: {value: [...], count: [...], share: [...]}};
+    Arrow/Parquet: одна длинная таблица (column, value, count, share).
+    """
+    fmt = _negotiate_or_406(request)
+    top_cats = top_categories(await _read_upload_csv(file), max_columns=max_columns, top_k=top_k)
+    if fmt != "json":
+        return _table_response(fmt, lambda: formats.top_categories_to_arrow(top_cats))
+    return FastJSONResponse(
+        {
+            "top_categories": {
+                name: {
+                    "value": table["value"].tolist(),
+                    "count": table["count"].to_numpy(),
+                    "share": table["share"].to_numpy(),
+                }
+                for name, table in top_cats.items()
+            }
+        }
+    )
+
+
+@app.post("/text-profile-from-csv")
+async def text_profile_from_csv(file: UploadFile = File(...)):
+    """Профиль строковых колонок: длины, пустые строки, классы символов, форматы (см. eda_cli.text)."""
+    start = time.perf_counter()
+    profiles = profile_text(await _read_upload_csv(file))
+    return FastJSONResponse({"columns": profiles, "latency_ms": (time.perf_counter() - start) * 1000.0})
+
+
+@app.post("/target-from-csv")
+async def target_from_csv(
+    file: UploadFile = File(...),
+    target: str = Query(..., description="Целевая колонка"),
+    positive: Optional[str] = Query(None, description="Значение положительного класса"),
+    top_k: int = Query(10, ge=1, description="Сколько категорий возвращать на признак"),
+):
+    """Связь признаков с целевой: AUC/корреляция, среднее целевой по категориям, подозрения на утечку."""
+    start = time.perf_counter()
+    df, _ = convert_types(await _read_upload_csv(file))
+    try:
+        result = profile_target(df, target, positive=positive, top_k=top_k)
+    except (KeyError, ValueError) as exc:
+        raise HTTPException(status_code=400, detail=str(exc).strip("'\""))
+    result["latency_ms"] = (time.perf_counter() - start) * 1000.0
+    return FastJSONResponse(result)
+
+
+@app.post("/outliers-from-csv")
+async def outliers_from_csv(
+    file: UploadFile = File(...),
+    method: str = Query(OUTLIER_METHOD, description="Границы выбросов: iqr или mad"),
+    k: Optional[float] = Query(None, gt=0, description="Множитель ширины границ (по умолчанию 1.5 для iqr, 3.5 для mad)"),
+    isolation: bool = Query(False, description="Многомерная оценка строк изоляционным лесом"),
+):
+    """Выбросы в числовых колонках по робастным границам и (по желанию) аномальные строки."""
+    start = time.perf_counter()
+    df, _ = convert_types(await _read_upload_csv(file))
+    profile = Profile(df)
+    try:
+        columns = profile.outliers(method, k)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    payload: Dict[str, Any] = {"columns": columns}
+    if isolation:
+        payload["isolation"] = profile.isolation
+    payload["latency_ms"] = (time.perf_counter() - start) * 1000.0
+    return FastJSONResponse(payload)
+
+
+@app.post("/missingness-from-csv")
+async def missingness_from_csv(
+    file: UploadFile = File(...),
+    top: int = Query(DEFAULT_TOP_PATTERNS, ge=1, description="Сколько шаблонов пропусков и пар колонок вернуть"),
+):
+    """Совместные пропуски: частые шаблоны пропусков и пары колонок, пропадающих вместе."""
+    start = time.perf_counter()
+    df = await _read_upload_csv(file)
+    payload = MissingnessProfiler().update(df).result(top_patterns=top, top_pairs=top)
+    payload["latency_ms"] = (time.perf_counter() - start) * 1000.0
+    return FastJSONResponse(payload)
+
+
+@app.post("/timeseries-from-csv")
+async def timeseries_from_csv(
+    file: UploadFile = File(...),
+    column: List[str] = Query([], description="Временная колонка (можно повторять); по умолчанию — выведенные"),
+    period: Optional[str] = Query(None, description="Период счётчиков строк (h, D, W, MS)"),
+):
+    """Профиль временных колонок: диапазон, шаг, разрывы, дубликаты меток, строки по периодам."""
+    start = time.perf_counter()
+    df = await _read_upload_csv(file)
+    if not column:
+        df, _ = convert_types(df)
+    try:
+        profiles = profile_datetimes(df, columns=column or None, period=period)
+    except (KeyError, ValueError) as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return FastJSONResponse({"columns": profiles, "latency_ms": (time.perf_counter() - start) * 1000.0})
+
+
+@app.post("/infer-types-from-csv")
+async def infer_types_from_csv(
+    file: UploadFile = File(...),
+    threshold: float = Query(TYPE_THRESHOLD, ge=0.0, le=1.0, description="Порог доли приводимых значений"),
+    sample_size: int = Query(10_000, ge=1, description="Сколько непустых значений колонки проверять"),
+):
+    """Вывод типов для object-колонок: доли приводимых к числу/дате значений и решение по каждой колонке."""
+    df = await _read_upload_csv(file)
+    inferences = infer_types(df, threshold=threshold, sample_size=sample_size)
+    return FastJSONResponse({"columns": [info.to_dict() for info in inferences]})
+
+
+async def _read_upload_snapshot(file: UploadFile, sketch_k: int) -> SummarySnapshot:
+    """Сохранённая сводка (JSON, см. drift.SummarySnapshot) или CSV, по которому она строится."""
+    content = await file.read()
+    name = file.filename or ""
+    if name.lower().endswith(".json") or content.lstrip()[:1] == b"{":
+        try:
+            return SummarySnapshot.from_dict(json.loads(content))
+        except (ValueError, KeyError, TypeError) as exc:
+            raise HTTPException(status_code=400, detail=f"Не удалось прочитать сводку {name}: {exc}")
+    try:
+        df = pd.read_csv(open_decompressed(io.BytesIO(content), max_output=MAX_DECOMPRESSED))
+    except DecompressionLimitError as exc:
+        raise HTTPException(status_code=413, detail=f"{name}: {exc}")
+    except Exception as exc:
+        raise HTTPException(status_code=400, detail=f"Не удалось прочитать CSV {name}: {exc}")
+    return snapshot_dataframe(df, sketch_k=sketch_k, source=name)
+
+
+@app.post("/compare")
+async def compare(
+    reference: UploadFile = File(..., description="Эталон: сохранённая сводка (JSON) или CSV"),
+    current: UploadFile = File(..., description="Текущие данные: сохранённая сводка (JSON) или CSV"),
+    bins: int = Query(DEFAULT_BINS, ge=2, description="Число квантильных бинов для PSI"),
+    psi_threshold: float = Query(PSI_THRESHOLD, description="Порог PSI для пометки дрейфа"),
+    ks_threshold: float = Query(KS_THRESHOLD, description="Порог KS-статистики для пометки дрейфа"),
+    missing_threshold: float = Query(MISSING_THRESHOLD, description="Порог изменения доли пропусков"),
+    sketch_k: int = Query(DEFAULT_K, ge=8, description="Точность скетчей при построении сводки по CSV"),
+):
+    """
+    Дрейф между двумя датасетами по колонкам (PSI/KS, пропуски, уникальные, top-k).
+    Сводки из /summary-from-csv?layout=snapshot или summary.json отчёта
+    сравниваются за миллисекунды, без исходных данных.
+    """
+    start = time.perf_counter()
+    result = compare_snapshots(
+        await _read_upload_snapshot(reference, sketch_k),
+        await _read_upload_snapshot(current, sketch_k),
+        bins=bins,
+        psi_threshold=psi_threshold,
+        ks_threshold=ks_threshold,
+        missing_threshold=missing_threshold,
+    )
+    result["latency_ms"] = (time.perf_counter() - start) * 1000.0
+    return FastJSONResponse(result)
+
+
+def _resolve_local_path(path: str) -> Path:
+    """
+    Проверяет локальный путь для задачи: разрешены только файлы внутри EDA_CLI_DATA_ROOT.
+    Если переменная не задана, локальные пути запрещены (только загрузка файла).
+    """
+    data_root = os.environ.get("EDA_CLI_DATA_ROOT")
+    if not data_root:
+        raise HTTPException(status_code=403, detail="Локальные пути отключены: задайте EDA_CLI_DATA_ROOT")
+    p = Path(path).expanduser().resolve()
+    if not p.is_relative_to(Path(data_root).expanduser().resolve()):
+        raise HTTPException(status_code=403, detail=f"Путь вне EDA_CLI_DATA_ROOT: {path}")
+    if not p.is_file():
+        raise HTTPException(status_code=404, detail=f"Файл '{path}' не найден")
+    return p
+
+
+@app.post("/jobs", status_code=202)
+def create_job(
+    file: Optional[UploadFile] = File(None),
+    path: Optional[str] = Form(None, description="Локальный путь к CSV на сервере (вместо загрузки файла)"),
+    kind: str = Query("quality", description="Тип задачи: quality или report"),
+    min_missing_share: float = Query(0.1, description="Порог доли пропусков для пометки проблемной колонки"),
+    max_hist_columns: int = Query(6, description="Только для report: максимум гистограмм"),
+    top_k_categories: int = Query(10, description="Только для report: количество топ-категорий"),
+    title: str = Query("EDA-отчёт", description="Только для report: заголовок отчёта"),
+) -> Dict[str, Any]:
+    """
+    Асинхронный анализ больших CSV: ставит задачу в фоновую очередь и сразу
+    возвращает её id. Источник — загруженный файл (multipart) или локальный путь.
+    Задачи с тем же содержимым файла и параметрами не пересчитываются.
+    """
+    if kind not in JOB_KINDS:
+        raise HTTPException(status_code=400, detail=f"kind должен быть одним из {list(JOB_KINDS)}")
+    if (file is None) == (path is None):
+        raise HTTPException(status_code=400, detail="Нужно передать ровно одно из: file или path")
+
+    params: Dict[str, Any] = {"min_missing_share": min_missing_share}
+    if kind == "report":
+        params.update(max_hist_columns=max_hist_columns, top_k_categories=top_k_categories, title=title)
+
+    if file is not None:
+        source, content_hash = job_manager.store_upload(file.file)
+        if kind == "report":
+            params["source_name"] = file.filename or "upload.csv"
+        job = job_manager.submit(kind, source, content_hash, params, owns_source=True)
+    else:
+        source = _resolve_local_path(path)
+        if kind == "report":
+            params["source_name"] = source.name
+        job = job_manager.submit(kind, source, hash_file(source), params)
+    return job.to_dict()
+
+
+def _get_job_or_404(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Задача {job_id} не найдена или уже удалена по TTL")
+    return job
+
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str) -> Dict[str, Any]:
+    """Статус задачи: стадия, число прочитанных строк, ошибка (если была)."""
+    return _get_job_or_404(job_id).to_dict()
+
+
+@app.get("/jobs/{job_id}/result")
+def get_job_result(job_id: str):
+    """Результат завершённой задачи (для report — ещё и список артефактов)."""
+    job = _get_job_or_404(job_id)
+    if job.status == "failed":
+        raise HTTPException(status_code=500, detail=job.error)
+    if job.status != "done":
+        raise HTTPException(status_code=409, detail=f"Задача ещё не завершена (стадия: {job.stage})")
+    return FastJSONResponse({"job_id": job.id, "kind": job.kind, **(job.result or {})})
+
+
+@app.get("/jobs/{job_id}/artifacts/{name:path}")
+def get_job_artifact(job_id: str, name: str):
+    """Отдаёт файл отчёта (report.md, summary.csv, *.png, ...) из задачи типа report."""
+    job = _get_job_or_404(job_id)
+    if job.kind != "report" or job.status != "done":
+        raise HTTPException(status_code=409, detail="Артефакты доступны только у завершённых задач report")
+    report_dir = (job_manager.job_dir(job.id) / "report").resolve()
+    artifact = (report_dir / name).resolve()
+    if not artifact.is_relative_to(report_dir) or not artifact.is_file():
+        raise HTTPException(status_code=404, detail=f"Артефакт '{name}' не найден")
+    return FileResponse(artifact)
+
+
+BatchItem = Tuple[str, Any]  # (имя, bytes с CSV | список записей)
+BATCH_MAX_FILES = int(os.environ.get("EDA_CLI_BATCH_MAX_FILES", "10000"))
+# Лимиты распаковки архивов одного запроса (защита от zip-бомб): размер одного файла и суммарный объём, байт.
+BATCH_MAX_MEMBER_BYTES = int(os.environ.get("EDA_CLI_BATCH_MAX_MEMBER_BYTES", str(256 << 20)))
+BATCH_MAX_TOTAL_BYTES = int(os.environ.get("EDA_CLI_BATCH_MAX_TOTAL_BYTES", str(1 << 30)))
+
+
+class _BatchBudget:
+    """Счётчик файлов и байт пакета: проверяет заявленный размер до чтения и фактический — при чтении."""
+
+    def __init__(self) -> None:
+        self.files = 0
+        self.total = 0
+
+    def _too_large(self, detail: str) -> HTTPException:
+        return HTTPException(status_code=413, detail=detail)
+
+    def reserve(self, name: str, size: int) -> int:
+        """Учитывает ещё один файл; возвращает, сколько байт из него можно прочитать."""
+        self.files += 1
+        if self.files > BATCH_MAX_FILES:
+            raise self._too_large(f"В пакете больше {BATCH_MAX_FILES} файлов")
+        if size > BATCH_MAX_MEMBER_BYTES:
+            raise self._too_large(f"{name}: {size} байт — больше лимита {BATCH_MAX_MEMBER_BYTES} на файл")
+        if self.total + size > BATCH_MAX_TOTAL_BYTES:
+            raise self._too_large(f"Суммарный объём пакета больше {BATCH_MAX_TOTAL_BYTES} байт")
+        return min(BATCH_MAX_MEMBER_BYTES, BATCH_MAX_TOTAL_BYTES - self.total)
+
+    def read(self, name: str, fileobj: IO[bytes], declared: int) -> bytes:
+        """Читает файл из архива, не доверяя заявленному размеру: не больше остатка лимитов."""
+        allowed = self.reserve(name, declared)
+        data = fileobj.read(allowed + 1)
+        if len(data) > allowed:
+            raise self._too_large(f"{name}: распакованный размер больше допустимых {allowed} байт")
+        return self._take(name, data, allowed)
+
+    def add(self, name: str, content: bytes) -> bytes:
+        return self._take(name, content, self.reserve(name, len(content)))
+
+    def _take(self, name: str, data: bytes, allowed: int) -> bytes:
+        """Сжатый CSV (.csv.gz и т. п.) распаковывается сразу: в лимиты идёт распакованный объём."""
+        if sniff_compression(data[:4]) is not None:
+            limit = min(allowed, MAX_DECOMPRESSED)
+            try:
+                with open_decompressed(io.BytesIO(data), max_output=limit) as stream:
+                    data = stream.read()
+            except DecompressionLimitError:
+                raise self._too_large(f"{name}: распакованный размер больше допустимых {limit} байт")
+            except Exception as exc:  # noqa: BLE001 - у gzip/bz2/zstd свои типы ошибок
+                raise HTTPException(status_code=400, detail=f"Не удалось распаковать {name}: {exc}")
+        self.total += len(data)
+        return data
+
+
+def _iter_archive_members(name: str, content: bytes, budget: _BatchBudget) -> Iterator[BatchItem]:
+    """
+    Разворачивает zip/tar(.gz) в CSV-файлы; любой другой файл считается одиночным CSV.
+
+    Число файлов, размер каждого и суммарный объём ограничены budget (превышение — 413);
+    размер проверяется до чтения по ZipInfo.file_size / TarInfo.size и ещё раз при чтении.
+    """
+    lname = name.lower()
+    if lname.endswith(".zip"):
+        with zipfile.ZipFile(io.BytesIO(content)) as zf:
+            for info in zf.infolist():
+                if not info.is_dir() and info.filename.lower().endswith(".csv"):
+                    with zf.open(info) as member_file:
+                        yield info.filename, budget.read(info.filename, member_file, info.file_size)
+    elif lname.endswith((".tar", ".tar.gz", ".tgz")):
+        with tarfile.open(fileobj=io.BytesIO(content), mode="r:*") as tf:
+            # по одному члену за раз: getmembers() распаковал бы весь архив ещё до проверок
+            for member in tf:
+                if member.isfile() and member.name.lower().endswith(".csv"):
+                    extracted = tf.extractfile(member)
+                    if extracted is not None:
+                        yield member.name, budget.read(member.name, extracted, member.size)
+    else:
+        yield name, budget.add(name, content)
+
+
+def _iter_ndjson_items(body: bytes) -> Iterator[BatchItem]:
+    """
+    Строки NDJSON вида {"name": ..., "csv": "<текст CSV>"}
+    или {"name": ..., "records": [{...}, ...]}.
+    """
+    for lineno, line in enumerate(body.splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            obj = json.loads(line)
+        except json.JSONDecodeError as exc:
+            raise HTTPException(status_code=400, detail=f"Строка {lineno}: некорректный JSON: {exc}")
+        if not isinstance(obj, dict):
+            raise HTTPException(status_code=400, detail=f"Строка {lineno}: ожидается JSON-объект")
+        name = str(obj.get("name", f"item-{lineno}"))
+        if "csv" in obj:
+            yield name, str(obj["csv"]).encode("utf-8")
+        elif "records" in obj:
+            yield name, obj["records"]
+        else:
+            raise HTTPException(status_code=400, detail=f"Строка {lineno}: нужно поле csv или records")
+
+
+def _analyze_batch_item(index: int, name: str, payload: Any, min_missing_share: float) -> Dict[str, Any]:
+    """Анализ одного элемента пакета; ошибки не роняют весь пакет, а попадают в результат."""
+    start = time.perf_counter()
+    try:
+        if isinstance(payload, (bytes, bytearray)):
+            df = pd.read_csv(open_decompressed(io.BytesIO(payload), max_output=MAX_DECOMPRESSED))
+        else:
+            df = pd.DataFrame.from_records(payload)
+        if df.shape[0] == 0:
+            raise ValueError("CSV пуст или не содержит строк")
+        profile = Profile(df)
+        summary = profile.summary
+        flags = profile.quality_flags(min_missing_share)
+    except Exception as exc:  # noqa: BLE001
+        return {"index": index, "name": name, "error": f"{type(exc).__name__}: {exc}"}
+    return {
+        "index": index,
+        "name": name,
+        "flags": flags,
+        "quality_score": flags.get("quality_score"),
+        "ok_for_model": flags.get("quality_score", 0.0) >= 0.5,
+        "n_rows": summary.n_rows,
+        "n_cols": summary.n_cols,
+        "latency_ms": (time.perf_counter() - start) * 1000.0,
+    }
+
+
+@app.post("/quality-flags-batch")
+async def quality_flags_batch(
+    request: Request,
+    min_missing_share: float = Query(0.1, description="Порог доли пропусков для пометки проблемной колонки"),
+):
+    """
+    Пакетная версия /quality-flags-from-csv: много маленьких датасетов за один запрос.
+
+    Вход (по Content-Type):
+    - multipart/form-data: несколько полей files (CSV, а также zip/tar(.gz) с CSV внутри);
+    - application/x-ndjson: по одному датасету на строку (поле csv или records).
+
+    Датасеты анализируются параллельно, результаты стримятся в NDJSON
+    по мере готовности (порядок — по завершению, исходный номер в поле index).
+    """
+    content_type = request.headers.get("content-type", "")
+    items: List[BatchItem] = []
+    if content_type.startswith("multipart/form-data"):
+        # starlette по умолчанию ограничивает multipart 1000 файлами
+        form = await request.form(max_files=BATCH_MAX_FILES)
+        budget = _BatchBudget()
+        for upload in form.getlist("files"):
+            if isinstance(upload, str):
+                continue
+            content = await upload.read()
+            try:
+                items.extend(_iter_archive_members(upload.filename or "upload.csv", content, budget))
+            except (zipfile.BadZipFile, tarfile.TarError) as exc:
+                raise HTTPException(status_code=400, detail=f"Не удалось распаковать {upload.filename}: {exc}")
+    elif content_type.startswith(("application/x-ndjson", "application/jsonl")):
+        items.extend(_iter_ndjson_items(await request.body()))
+    else:
+        raise HTTPException(
+            status_code=415,
+            detail="Ожидается multipart/form-data (поле files) или application/x-ndjson",
+        )
+    if not items:
+        raise HTTPException(status_code=400, detail="В запросе нет ни одного датасета")
+
+    futures = [
+        batch_executor.submit(_analyze_batch_item, i, name, payload, min_missing_share)
+        for i, (name, payload) in enumerate(items)
+    ]
+
+    def stream() -> Iterator[bytes]:
+        for fut in as_completed(futures):
+            yield dumps(fut.result()) + b"\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
@@ -0,0 +1,376 @@
+"""
+Вычислительные бэкенды ядра: pandas (по умолчанию), Polars и DuckDB.
+
+summarize_dataset, missing_table, correlation_matrix, top_categories и поиск нулей
+в compute_quality_flags берут агрегаты по колонкам у бэкенда (параметр backend
+или --backend в CLI). Данные остаются в pandas DataFrame, меняется только то,
+чем считаются агрегаты:
+
+- pandas — как раньше, однопоточно;
+- polars — колонки передаются в Polars (числовые — без копирования), все агрегаты
+  по всем колонкам собираются в одно выражение над LazyFrame, которое Polars
+  выполняет параллельно по колонкам;
+- duckdb — DataFrame читается DuckDB напрямую (без копирования), агрегаты по всем
+  колонкам — один SELECT, который DuckDB выполняет в несколько потоков.
+
+Результаты совпадают с pandas: счётчики (пропуски, уникальные, нули, частоты) и min/max —
+точно, mean/std/корреляции — с точностью до округления при суммировании (~1e-12),
+поэтому DatasetSummary и флаги качества одинаковы. Значения с равной частотой во всех
+бэкендах упорядочены по первому появлению в колонке.
+
+Колонки, которые бэкенд не может представить без потери смысла (object-колонки
+не только из строк — например, числа вперемешку со строками, — и частоты категорий),
+считаются pandas. Без установленного polars/duckdb — BackendError с подсказкой.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from pandas.api import types as ptypes
+
+try:  # опционально: pip install "s03[backends]"
+    import polars as pl
+except ImportError:  # pragma: no cover - зависит от окружения
+    pl = None
+
+try:
+    import duckdb
+except ImportError:  # pragma: no cover - зависит от окружения
+    duckdb = None
+
+BACKENDS = ("pandas", "polars", "duckdb")
+DEFAULT_BACKEND = "pandas"
+NUMERIC_STATS = ("min", "max", "mean", "std")
+
+
+class BackendError(ValueError):
+    """Неизвестный или недоступный (не установлен) бэкенд."""
+
+
+def _native(s: pd.Series) -> bool:
+    """Колонка без object-значений разных типов (такие колонки считает pandas)."""
+    return not ptypes.is_object_dtype(s.dtype) or pd.api.types.infer_dtype(s, skipna=True) in ("string", "empty")
+
+
+def _value_counts_series(values: Sequence[Any], counts: Sequence[int], name: Any) -> pd.Series:
+    index = pd.Index(list(values), dtype=object, name=name)
+    return pd.Series(np.asarray(counts, dtype=np.int64), index=index, name="count")
+
+
+class PandasBackend:
+    """Агрегаты ядра на pandas; остальные бэкенды переопределяют их и возвращаются сюда за «неудобными» колонками."""
+
+    name = "pandas"
+
+    def aggregates(
+        self,
+        df: pd.DataFrame,
+        numeric_pos: Sequence[int],
+        missing_counts: Optional[np.ndarray] = None,
+    ) -> Dict[str, np.ndarray]:
+        """
+        non_null и unique по всем колонкам, min/max/mean/std — по колонкам numeric_pos
+        (NaN для колонок без значений). missing_counts — уже посчитанные пропуски.
+        """
+        if missing_counts is None:
+            non_null = df.notna().sum().to_numpy(dtype=np.int64)
+        else:
+            non_null = len(df) - np.asarray(missing_counts, dtype=np.int64)
+        result = {"non_null": non_null, "unique": df.nunique(dropna=True).to_numpy(dtype=np.int64)}
+        numeric_pos = np.asarray(numeric_pos, dtype=np.int64)
+        for stat in NUMERIC_STATS:
+            result[stat] = np.full(len(numeric_pos), np.nan)
+        filled = non_null[numeric_pos] > 0 if numeric_pos.size else np.zeros(0, dtype=bool)
+        if filled.any():
+            numeric_df = df.iloc[:, numeric_pos[filled]]
+            # явное приведение к float, чтобы не было numpy/bool-типов
+            result["min"][filled] = numeric_df.min().to_numpy(dtype=float)
+            result["max"][filled] = numeric_df.max().to_numpy(dtype=float)
+            result["mean"][filled] = numeric_df.mean().to_numpy(dtype=float)
+            result["std"][filled] = numeric_df.std().to_numpy(dtype=float)
+        return result
+
+    def missing_counts(self, df: pd.DataFrame) -> np.ndarray:
+        return df.isna().sum().to_numpy(dtype=np.int64)
+
+    def correlation(self, numeric_df: pd.DataFrame) -> pd.DataFrame:
+        """Корреляция Пирсона по парам непустых значений (как DataFrame.corr)."""
+        return numeric_df.corr(numeric_only=True)
+
+    def zero_counts(self, numeric_df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """Число нулей и непустых значений в каждой числовой колонке."""
+        values = numeric_df.to_numpy(dtype=float, na_value=np.nan)
+        return (values == 0).sum(axis=0), (~np.isnan(values)).sum(axis=0)
+
+    def value_counts(self, s: pd.Series) -> pd.Series:
+        """Частоты непустых значений по убыванию; равные частоты — в порядке первого появления."""
+        return s.value_counts(dropna=True, sort=False).sort_values(ascending=False, kind="stable")
+
+    # --- общий каркас «бэкенд + pandas для остальных колонок»
+
+    def _split(self, df: pd.DataFrame, positions: Sequence[int]) -> Tuple[List[int], List[int]]:
+        native = [i for i in positions if _native(df.iloc[:, i])]
+        taken = set(native)
+        return native, [i for i in positions if i not in taken]
+
+    def _merge_aggregates(
+        self,
+        df: pd.DataFrame,
+        numeric_pos: Sequence[int],
+        missing_counts: Optional[np.ndarray],
+        native: List[int],
+        computed: Dict[str, Dict[int, float]],
+    ) -> Dict[str, np.ndarray]:
+        """Собирает массивы aggregates из значений бэкенда ({поле: {номер колонки: значение}}) и pandas."""
+        n_cols = df.shape[1]
+        rest = [i for i in range(n_cols) if i not in set(native)]
+        result: Dict[str, np.ndarray] = {
+            "non_null": np.zeros(n_cols, dtype=np.int64),
+            "unique": np.zeros(n_cols, dtype=np.int64),
+        }
+        for field in ("non_null", "unique"):
+            for i, value in computed[field].items():
+                result[field][i] = value
+        if missing_counts is not None:
+            result["non_null"] = len(df) - np.asarray(missing_counts, dtype=np.int64)
+        numeric_pos = list(numeric_pos)
+        for stat in NUMERIC_STATS:
+            result[stat] = np.array([computed[stat].get(i, np.nan) for i in numeric_pos], dtype=float)
+        if rest:
+            rest_numeric = [i for i in numeric_pos if i in set(rest)]
+            local = {i: j for j, i in enumerate(rest)}
+            fallback = PandasBackend.aggregates(
+                self,
+                df.iloc[:, rest],
+                [local[i] for i in rest_numeric],
+                missing_counts=None if missing_counts is None else np.asarray(missing_counts)[rest],
+            )
+            result["non_null"][rest] = fallback["non_null"]
+            result["unique"][rest] = fallback["unique"]
+            where = [numeric_pos.index(i) for i in rest_numeric]
+            for stat in NUMERIC_STATS:
+                result[stat][where] = fallback[stat]
+        return result
+
+    def _correlation_frame(self, numeric_df: pd.DataFrame, pairs: Dict[Tuple[int, int], float]) -> pd.DataFrame:
+        """Матрица корреляций из значений по парам (i <= j) — с теми же диагональю и границами, что у pandas."""
+        k = numeric_df.shape[1]
+        matrix = np.full((k, k), np.nan)
+        for (i, j), value in pairs.items():
+            value = np.nan if value is None else float(value)
+            if i == j and not np.isnan(value):
+                value = 1.0
+            matrix[i, j] = matrix[j, i] = value
+        np.clip(matrix, -1.0, 1.0, out=matrix)
+        return pd.DataFrame(matrix, index=numeric_df.columns, columns=numeric_df.columns)
+
+
+class PolarsBackend(PandasBackend):
+    name = "polars"
+
+    def __init__(self) -> None:
+        if pl is None:
+            raise BackendError('Для --backend polars нужен пакет polars: pip install "s03[backends]"')
+
+    @staticmethod
+    def _frame(df: pd.DataFrame, positions: Sequence[int]) -> "pl.DataFrame":
+        return pl.DataFrame([pl.from_pandas(df.iloc[:, i]).alias(f"c{i}") for i in positions])
+
+    def aggregates(self, df, numeric_pos, missing_counts=None):
+        native, _ = self._split(df, range(df.shape[1]))
+        native_set = set(native)
+        exprs = []
+        for i in native:
+            col = pl.col(f"c{i}")
+            if missing_counts is None:
+                exprs.append(col.count().alias(f"non_null_{i}"))
+            exprs.append(col.drop_nulls().n_unique().alias(f"unique_{i}"))
+        for i in numeric_pos:
+            if i in native_set:
+                x = pl.col(f"c{i}").cast(pl.Float64)
+                exprs += [getattr(x, stat)().alias(f"{stat}_{i}") for stat in NUMERIC_STATS]
+        row = self._frame(df, native).lazy().select(exprs).collect().row(0, named=True) if exprs else {}
+        computed: Dict[str, Dict[int, float]] = {field: {} for field in ("non_null", "unique", *NUMERIC_STATS)}
+        for key, value in row.items():
+            field, _, i = key.rpartition("_")
+            computed[field][int(i)] = np.nan if value is None else value
+        return self._merge_aggregates(df, numeric_pos, missing_counts, native, computed)
+
+    def missing_counts(self, df):
+        native, rest = self._split(df, range(df.shape[1]))
+        result = np.zeros(df.shape[1], dtype=np.int64)
+        if native:
+            result[native] = self._frame(df, native).null_count().row(0)
+        if rest:
+            result[rest] = df.iloc[:, rest].isna().sum().to_numpy(dtype=np.int64)
+        return result
+
+    def correlation(self, numeric_df):
+        if numeric_df.empty:
+            return pd.DataFrame()
+        k = numeric_df.shape[1]
+        frame = self._frame(numeric_df, range(k)).with_columns(pl.all().cast(pl.Float64))
+        exprs = []
+        for i in range(k):
+            for j in range(i, k):
+                a, b = pl.col(f"c{i}"), pl.col(f"c{j}")
+                # как pandas: пары, где оба значения конечны (пропуски и ±inf отбрасываются)
+                both = (a.is_finite() & b.is_finite()).fill_null(False)
+                exprs.append(pl.corr(a.filter(both), b.filter(both)).alias(f"{i}_{j}"))
+        row = frame.lazy().select(exprs).collect().row(0, named=True)
+        pairs = {tuple(map(int, key.split("_"))): value for key, value in row.items()}
+        return self._correlation_frame(numeric_df, pairs)
+
+    def zero_counts(self, numeric_df):
+        k = numeric_df.shape[1]
+        if not k:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        x = pl.all().cast(pl.Float64)
+        frame = self._frame(numeric_df, range(k)).lazy()
+        zeros = frame.select((x == 0).sum()).collect().row(0)
+        non_null = frame.select(x.count()).collect().row(0)
+        return np.asarray(zeros, dtype=np.int64), np.asarray(non_null, dtype=np.int64)
+
+    def value_counts(self, s):
+        if isinstance(s.dtype, pd.CategoricalDtype) or not _native(s):
+            return super().value_counts(s)
+        counts = (
+            pl.DataFrame({"v": pl.from_pandas(s)})
+            .lazy()
+            .with_row_index("i")
+            .drop_nulls("v")
+            .group_by("v")
+            .agg(pl.len().alias("n"), pl.col("i").min().alias("first"))
+            .sort(["n", "first"], descending=[True, False])
+            .collect()
+        )
+        return _value_counts_series(counts["v"].to_list(), counts["n"].to_numpy(), s.name)
+
+
+class DuckDBBackend(PandasBackend):
+    name = "duckdb"
+
+    def __init__(self) -> None:
+        if duckdb is None:
+            raise BackendError('Для --backend duckdb нужен пакет duckdb: pip install "s03[backends]"')
+
+    @staticmethod
+    def _query(df: pd.DataFrame, sql: str) -> List[Tuple[Any, ...]]:
+        """Выполняет sql над df, зарегистрированным как таблица t с колонками c0, c1, ... (без копирования данных)."""
+        frame = df.copy(deep=False)
+        frame.columns = [f"c{i}" for i in range(df.shape[1])]
+        con = duckdb.connect()
+        try:
+            con.register("t", frame)
+            return con.execute(sql).fetchall()
+        finally:
+            con.close()
+
+    @staticmethod
+    def _select(df: pd.DataFrame, exprs: List[Tuple[str, str]]) -> Dict[str, Any]:
+        if not exprs:
+            return {}
+        columns = ", ".join(f"{sql} AS {alias}" for alias, sql in exprs)
+        (row,) = DuckDBBackend._query(df, f"SELECT {columns} FROM t")
+        return {alias: value for (alias, _), value in zip(exprs, row)}
+
+    def aggregates(self, df, numeric_pos, missing_counts=None):
+        native, _ = self._split(df, range(df.shape[1]))
+        native_set = set(native)
+        exprs = []
+        for i in native:
+            if missing_counts is None:
+                exprs.append((f"non_null_{i}", f"count(c{i})"))
+            exprs.append((f"unique_{i}", f"count(DISTINCT c{i})"))
+        for i in numeric_pos:
+            if i in native_set:
+                x = f"CAST(c{i} AS DOUBLE)"
+                # STDDEV_SAMP падает на ±inf; тогда std — NULL (NaN), как в pandas
+                std = f"CASE WHEN bool_and(isfinite({x})) THEN stddev_samp(CASE WHEN isfinite({x}) THEN {x} END) END"
+                sql_stats = {"min": f"min({x})", "max": f"max({x})", "mean": f"avg({x})", "std": std}
+                exprs += [(f"{stat}_{i}", sql) for stat, sql in sql_stats.items()]
+        computed: Dict[str, Dict[int, float]] = {field: {} for field in ("non_null", "unique", *NUMERIC_STATS)}
+        for key, value in self._select(df, exprs).items():
+            field, _, i = key.rpartition("_")
+            computed[field][int(i)] = np.nan if value is None else value
+        return self._merge_aggregates(df, numeric_pos, missing_counts, native, computed)
+
+    def missing_counts(self, df):
+        native, rest = self._split(df, range(df.shape[1]))
+        result = np.zeros(df.shape[1], dtype=np.int64)
+        row = self._select(df, [(f"m{i}", f"count(*) - count(c{i})") for i in native])
+        for i in native:
+            result[i] = row[f"m{i}"]
+        if rest:
+            result[rest] = df.iloc[:, rest].isna().sum().to_numpy(dtype=np.int64)
+        return result
+
+    def correlation(self, numeric_df):
+        if numeric_df.empty:
+            return pd.DataFrame()
+        k = numeric_df.shape[1]
+        # corr() в DuckDB берёт только строки, где обе колонки непусты; ±inf pandas тоже отбрасывает
+        x = [f"CAST(c{i} AS DOUBLE)" for i in range(k)]
+        both = "CASE WHEN isfinite({a}) AND isfinite({b}) THEN {v} END"
+        exprs = [
+            (f"r{i}_{j}", f"corr({both.format(a=x[i], b=x[j], v=x[i])}, {both.format(a=x[i], b=x[j], v=x[j])})")
+            for i in range(k)
+            for j in range(i, k)
+        ]
+        row = self._select(numeric_df, exprs)
+        pairs = {tuple(map(int, key[1:].split("_"))): value for key, value in row.items()}
+        return self._correlation_frame(numeric_df, pairs)
+
+    def zero_counts(self, numeric_df):
+        k = numeric_df.shape[1]
+        zeros = np.zeros(k, dtype=np.int64)
+        non_null = np.zeros(k, dtype=np.int64)
+        # INTERVAL не приводится к DOUBLE: timedelta-колонки считает pandas
+        native = [i for i in range(k) if not ptypes.is_timedelta64_dtype(numeric_df.dtypes.iloc[i])]
+        rest = [i for i in range(k) if i not in set(native)]
+        exprs = []
+        for i in native:
+            # count_if по колонке без единого значения даёт NULL, а не 0
+            exprs += [(f"z{i}", f"coalesce(count_if(CAST(c{i} AS DOUBLE) = 0), 0)"), (f"n{i}", f"count(c{i})")]
+        row = self._select(numeric_df, exprs)
+        for i in native:
+            zeros[i], non_null[i] = row[f"z{i}"], row[f"n{i}"]
+        if rest:
+            zeros[rest], non_null[rest] = super().zero_counts(numeric_df.iloc[:, rest])
+        return zeros, non_null
+
+    def value_counts(self, s):
+        if isinstance(s.dtype, pd.CategoricalDtype) or not _native(s):
+            return super().value_counts(s)
+        frame = pd.DataFrame({"v": s.to_numpy(), "i": np.arange(len(s))})
+        rows = self._query(
+            frame,
+            "SELECT c0, count(*) AS n, min(c1) AS first FROM t WHERE c0 IS NOT NULL GROUP BY c0 ORDER BY n DESC, first",
+        )
+        return _value_counts_series([r[0] for r in rows], [r[1] for r in rows], s.name)
+
+
+_CLASSES = {"pandas": PandasBackend, "polars": PolarsBackend, "duckdb": DuckDBBackend}
+_INSTANCES: Dict[str, PandasBackend] = {}
+
+BackendLike = Union[None, str, PandasBackend]
+
+
+def get_backend(backend: BackendLike = None) -> PandasBackend:
+    """Бэкенд по имени (None — pandas); экземпляр бэкенда возвращается как есть."""
+    if isinstance(backend, PandasBackend):
+        return backend
+    name = (backend or DEFAULT_BACKEND).lower()
+    if name not in _CLASSES:
+        raise BackendError(f"Неизвестный бэкенд: {backend!r} (ожидается {', '.join(BACKENDS)})")
+    if name not in _INSTANCES:
+        _INSTANCES[name] = _CLASSES[name]()
+    return _INSTANCES[name]
+
+
+def available_backends() -> List[str]:
+    """Бэкенды, которые можно использовать в этом окружении."""
+    return [name for name in BACKENDS if name == "pandas" or (pl if name == "polars" else duckdb) is not None]
@@ -0,0 +1,119 @@
+"""
+Сравнение вычислительных бэкендов ядра (backends.py) на одних и тех же данных.
+
+Для каждого бэкенда функции ядра запускаются на одном и том же DataFrame,
+время берётся лучшее из repeat запусков, а результаты сверяются с pandas:
+счётчики и флаги качества — точно, mean/std/корреляции — с относительной
+точностью rtol (суммирование в разном порядке даёт расхождения в последних битах).
+Квантили p1..p99 не сверяются: их считает один и тот же KLL-скетч, а не бэкенд,
+и со случайным прореживанием они различаются от запуска к запуску.
+
+    rows = benchmark_backends(df, ["pandas", "polars", "duckdb"], repeat=3)
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .backends import NUMERIC_STATS, available_backends, get_backend
+from .core import (
+    compute_quality_flags,
+    correlation_matrix,
+    missing_table,
+    summarize_dataset,
+    top_categories,
+)
+from .duplicates import find_duplicates
+from .sketch import DEFAULT_K
+
+STAGES = ("summary", "missing", "correlation", "top_categories", "zero_values")
+DEFAULT_RTOL = 1e-9
+
+
+def _run(df: pd.DataFrame, backend: str, sketch_k: int) -> Dict[str, Callable[[], Any]]:
+    numeric = df.select_dtypes(include="number")
+    return {
+        "summary": lambda: summarize_dataset(df, sketch_k=sketch_k, backend=backend),
+        "missing": lambda: missing_table(df, backend=backend),
+        "correlation": lambda: correlation_matrix(df, numeric_df=numeric, backend=backend),
+        "top_categories": lambda: top_categories(df, backend=backend),
+        "zero_values": lambda: get_backend(backend).zero_counts(numeric),
+    }
+
+
+def _flags(df: pd.DataFrame, results: Dict[str, Any], backend: str, duplicates: Dict[str, Any]) -> Dict[str, Any]:
+    # дубликаты и выбросы от бэкенда не зависят: дубликаты считаются один раз, выбросы не проверяются
+    return compute_quality_flags(
+        results["summary"], results["missing"], df=df, duplicates=duplicates, outliers=[], backend=backend
+    )
+
+
+def _same(reference: Dict[str, Any], other: Dict[str, Any], rtol: float) -> List[str]:
+    """Этапы, где результаты бэкенда расходятся с эталоном."""
+    mismatched = []
+    ref, cur = reference["summary"], other["summary"]
+    counts_equal = all(
+        np.array_equal(getattr(ref, f), getattr(cur, f)) for f in ("non_null", "missing", "unique", "has_stats")
+    )
+    stats_close = all(
+        np.allclose(getattr(ref, f), getattr(cur, f), rtol=rtol, atol=0.0, equal_nan=True) for f in NUMERIC_STATS
+    )
+    if not (counts_equal and stats_close and ref.dtypes.tolist() == cur.dtypes.tolist()):
+        mismatched.append("summary")
+    if not reference["missing"].equals(other["missing"]):
+        mismatched.append("missing")
+    corr_ref, corr_cur = reference["correlation"], other["correlation"]
+    if corr_ref.shape != corr_cur.shape or not np.allclose(
+        corr_ref.to_numpy(), corr_cur.to_numpy(), rtol=rtol, atol=rtol, equal_nan=True
+    ):
+        mismatched.append("correlation")
+    tops_ref, tops_cur = reference["top_categories"], other["top_categories"]
+    if tops_ref.keys() != tops_cur.keys() or not all(tops_ref[k].equals(tops_cur[k]) for k in tops_ref):
+        mismatched.append("top_categories")
+    if not all(np.array_equal(a, b) for a, b in zip(reference["zero_values"], other["zero_values"])):
+        mismatched.append("zero_values")
+    if reference["flags"] != other["flags"]:
+        mismatched.append("flags")
+    return mismatched
+
+
+def benchmark_backends(
+    df: pd.DataFrame,
+    backends: Optional[Sequence[str]] = None,
+    repeat: int = 3,
+    sketch_k: int = DEFAULT_K,
+    rtol: float = DEFAULT_RTOL,
+) -> List[Dict[str, Any]]:
+    """
+    Время этапов ядра по бэкендам (лучшее из repeat, в секундах) и сверка с pandas.
+    Первым всегда считается pandas — эталон для поля mismatched.
+    """
+    names = ["pandas"] + [b for b in (backends or available_backends()) if b != "pandas"]
+    rows: List[Dict[str, Any]] = []
+    reference: Optional[Dict[str, Any]] = None
+    duplicates = find_duplicates(df)
+    for name in names:
+        get_backend(name)  # недоступный бэкенд — BackendError до начала замеров
+        timings: Dict[str, float] = {}
+        results: Dict[str, Any] = {}
+        for stage, fn in _run(df, name, sketch_k).items():
+            best = float("inf")
+            for _ in range(max(1, repeat)):
+                start = time.perf_counter()
+                results[stage] = fn()
+                best = min(best, time.perf_counter() - start)
+            timings[stage] = best
+        results["flags"] = _flags(df, results, name, duplicates)
+        row: Dict[str, Any] = {"backend": name, **timings, "total": sum(timings.values())}
+        if reference is None:
+            reference = results
+            row["mismatched"] = []
+        else:
+            row["mismatched"] = _same(reference, results, rtol)
+        row["speedup"] = rows[0]["total"] / row["total"] if rows and row["total"] else 1.0
+        rows.append(row)
+    return rows
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
+import json
+import os
 from pathlib import Path
-from typing import Optional
-from datetime import datetime
+from typing import Any, Dict, List, Optional
 
 import pandas as pd
 import typer
@@ -10,19 +11,69 @@ import typer
 from .core import (
     DatasetSummary,
     compute_quality_flags,
-    correlation_matrix,
     flatten_summary_for_print,
-    missing_table,
-    summarize_dataset,
-    top_categories,
+    missing_table_from_summary,
 )
-from .viz import (
-    plot_correlation_heatmap,
-    plot_missing_matrix,
-    plot_histograms_per_column,
-    save_top_categories_tables,
-    plot_categorical_distribution,
+from .accumulate import SummaryAccumulator
+from .backends import BACKENDS, BackendError, get_backend
+from .benchmark import STAGES as BENCHMARK_STAGES, benchmark_backends
+from .client import DaemonUnavailable, call_daemon, default_socket_path
+from .daemon import DEFAULT_MAX_DATASETS, DaemonServer, DatasetCache, active_cache
+from .distributed import (
+    DEFAULT_PORT,
+    DEFAULT_RETRIES,
+    DEFAULT_TIMEOUT,
+    TOKEN_ENV,
+    ShardError,
+    ShardOptions,
+    WorkerServer,
+    is_loopback,
+    parallel_shard_bytes,
+    parse_size,
+    profile_sharded,
+    sample_parallel,
 )
+from .drift import (
+    DEFAULT_TOP_K,
+    KS_THRESHOLD,
+    MISSING_THRESHOLD,
+    PSI_THRESHOLD,
+    SummarySnapshot,
+    compare_snapshots,
+    snapshot_chunks,
+    snapshot_dataframe,
+)
+from .duplicates import DEFAULT_MEMORY_LIMIT, DuplicateDetector, parse_key_spec
+from .formats import arrow_available
+from .infer import (
+    DEFAULT_SAMPLE_SIZE as TYPE_SAMPLE_SIZE,
+    DEFAULT_THRESHOLD as TYPE_THRESHOLD,
+    convert_chunks,
+    convert_types,
+    inference_frame,
+    infer_types,
+)
+from .missingness import DEFAULT_MAX_PATTERNS, DEFAULT_TOP_PATTERNS, MissingnessProfiler, missing_patterns_frame
+from .outliers import (
+    DEFAULT_METHOD as OUTLIER_METHOD,
+    DEFAULT_SAMPLE_SIZE as ISOLATION_SAMPLE_SIZE,
+    METHODS as OUTLIER_METHODS,
+    bottom_k_sample,
+    isolation_scores,
+    outliers_frame,
+    outliers_from_summary,
+)
+from .report import generate_report, generate_summary_report
+from .rules import Rule, RuleError, compile_rules, load_rules
+from .sampling import DEFAULT_MAX_STRATA, DEFAULT_SIZE as DEFAULT_SAMPLE_SIZE, ReservoirSampler, strata_frame
+from .segments import DEFAULT_MAX_GROUPS, SegmentProfiler, segments_frame
+from .selection import Selection, SelectionError, parse_column_list, read_csv
+from .session import Profile
+from .sketch import DEFAULT_K
+from .sqlsource import SQLProfile, SQLSourceError, profile_sql
+from .target import TargetProfiler, target_frame
+from .text import profile_text, text_profile_frame
+from .timeseries import DatetimeProfiler, timeseries_frame
 
 app = typer.Typer(help="Мини-CLI для EDA CSV-файлов")
 
@@ -31,40 +82,367 @@ def _load_csv(
     path: Path,
     sep: str = ",",
     encoding: str = "utf-8",
+    selection: Optional[Selection] = None,
 ) -> pd.DataFrame:
     if not path.exists():
         raise typer.BadParameter(f"Файл '{path}' не найден")
     try:
-        return pd.read_csv(path, sep=sep, encoding=encoding)
+        return read_csv(path, sep=sep, encoding=encoding, selection=selection)
+    except SelectionError as exc:
+        raise typer.BadParameter(str(exc)) from exc
+    except Exception as exc:  # noqa: BLE001
+        raise typer.BadParameter(f"Не удалось прочитать CSV: {exc}") from exc
+
+
+def _load_profile(
+    path: Path,
+    sep: str = ",",
+    encoding: str = "utf-8",
+    sketch_k: int = DEFAULT_K,
+    type_threshold: Optional[float] = None,
+    selection: Optional[Selection] = None,
+    backend: Optional[str] = None,
+) -> Profile:
+    """
+    Profile по CSV целиком (с выводом типов, если задан type_threshold);
+    selection ограничивает колонки и строки ещё при чтении, backend — чем считать агрегаты.
+    Внутри демона (eda-cli daemon) датасет берётся из его кэша: повторный вызов
+    с тем же файлом и параметрами не читает CSV и не пересчитывает готовое.
+    """
+    cache = active_cache()
+    if cache is None:
+        df = _load_csv(path, sep=sep, encoding=encoding, selection=selection)
+        inferences = []
+        if type_threshold is not None:
+            df, inferences = convert_types(df, threshold=type_threshold)
+        return Profile(df, sketch_k=sketch_k, inferences=inferences, backend=backend)
+    if not path.exists():
+        raise typer.BadParameter(f"Файл '{path}' не найден")
+    try:
+        return cache.get(
+            path,
+            sep=sep,
+            encoding=encoding,
+            type_threshold=type_threshold,
+            sketch_k=sketch_k,
+            selection=selection,
+            backend=backend,
+        )
+    except SelectionError as exc:
+        raise typer.BadParameter(str(exc)) from exc
+    except Exception as exc:  # noqa: BLE001
+        raise typer.BadParameter(f"Не удалось прочитать CSV: {exc}") from exc
+
+
+def _load_rules_option(path: Optional[str]) -> Optional[List[Rule]]:
+    if not path:
+        return None
+    if not Path(path).exists():
+        raise typer.BadParameter(f"Файл правил '{path}' не найден")
+    try:
+        return load_rules(path)
+    except RuleError as exc:
+        raise typer.BadParameter(str(exc)) from exc
+
+
+def _outlier_method_option(method: str) -> str:
+    if method not in OUTLIER_METHODS:
+        raise typer.BadParameter(f"Метод выбросов должен быть одним из: {', '.join(OUTLIER_METHODS)}")
+    return method
+
+
+def _segments_option(group_by: Optional[List[str]], max_groups: int, sketch_k: int) -> Optional[SegmentProfiler]:
+    columns = parse_column_list(group_by)
+    if not columns:
+        return None
+    try:
+        return SegmentProfiler(columns, max_groups=max_groups, sketch_k=sketch_k)
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc)) from exc
+
+
+def _update_segments(segments: SegmentProfiler, df: pd.DataFrame) -> None:
+    try:
+        segments.update(df)
+    except KeyError as exc:
+        raise typer.BadParameter(str(exc.args[0])) from exc
+
+
+def _backend_option(name: str, chunksize: int = 0, parse_jobs: int = 1) -> Optional[str]:
+    """Проверяет --backend; бэкенды считают по DataFrame целиком, поэтому не сочетаются с чанками."""
+    try:
+        backend = get_backend(name).name
+    except BackendError as exc:
+        raise typer.BadParameter(str(exc)) from exc
+    if backend != "pandas" and (chunksize > 0 or parse_jobs > 1):
+        raise typer.BadParameter(
+            "--backend polars/duckdb работает при чтении файла целиком (без --chunksize и --parse-jobs)"
+        )
+    return None if backend == "pandas" else backend
+
+
+def _selection_option(
+    columns: Optional[List[str]], exclude: Optional[List[str]], where: Optional[str]
+) -> Optional[Selection]:
+    selection = Selection(columns=parse_column_list(columns), exclude=parse_column_list(exclude), where=where)
+    return None if selection.is_empty else selection
+
+
+def _sql_option(
+    path: Optional[str],
+    sql: Optional[str],
+    table: Optional[str],
+    columns: Optional[List[str]],
+    exclude: Optional[List[str]],
+    where: Optional[str],
+    top_k: int = 20,
+    **unsupported: bool,
+) -> Optional[SQLProfile]:
+    """
+    Сводка по таблице --sql/--table (агрегаты считает база) или None для CSV.
+    unsupported — опции, которым нужны сами строки: {имя опции: задана ли}.
+    """
+    if sql is None:
+        if path is None:
+            raise typer.BadParameter("Укажите путь к CSV или --sql <база> --table <таблица>")
+        if table is not None:
+            raise typer.BadParameter("--table используется только вместе с --sql")
+        return None
+    if path is not None:
+        raise typer.BadParameter("Укажите либо путь к CSV, либо --sql, но не оба")
+    if table is None:
+        raise typer.BadParameter("Для --sql нужна --table")
+    rejected = [f"--{name.replace('_', '-')}" for name, given in unsupported.items() if given]
+    if where:
+        rejected.insert(0, "--where")
+    if rejected:
+        raise typer.BadParameter(f"С --sql не поддерживаются: {', '.join(rejected)}")
+    try:
+        return profile_sql(
+            sql, table, columns=parse_column_list(columns) or None, exclude=parse_column_list(exclude), top_k=top_k
+        )
+    except SQLSourceError as exc:
+        raise typer.BadParameter(str(exc)) from exc
+
+
+def _profile_parallel(
+    path: Path,
+    parse_jobs: int,
+    sep: str = ",",
+    encoding: str = "utf-8",
+    sketch_k: int = DEFAULT_K,
+    type_threshold: Optional[float] = None,
+    selection: Optional[Selection] = None,
+) -> SummaryAccumulator:
+    """
+    Сводка по CSV, разобранному параллельно: файл делится на диапазоны байт
+    по границам записей, диапазоны разбираются в parse_jobs процессах, частичные
+    сводки сливаются (см. distributed.py). Типы выводятся по началу файла.
+    """
+    if not path.exists():
+        raise typer.BadParameter(f"Файл '{path}' не найден")
+    try:
+        types = []
+        if type_threshold is not None:
+            head = read_csv(path, sep=sep, encoding=encoding, selection=selection, nrows=TYPE_SAMPLE_SIZE)
+            types = [info.to_dict() for info in infer_types(head, threshold=type_threshold)]
+        return profile_sharded(
+            [path],
+            processes=parse_jobs,
+            shard_bytes=parallel_shard_bytes([path], parse_jobs),
+            options=ShardOptions(
+                sep=sep,
+                encoding=encoding,
+                sketch_k=sketch_k,
+                types=types,
+                selection=selection.to_dict() if selection is not None else {},
+            ),
+        )
+    except (ShardError, SelectionError) as exc:
+        raise typer.BadParameter(str(exc)) from exc
+    except Exception as exc:  # noqa: BLE001
+        raise typer.BadParameter(f"Не удалось прочитать CSV: {exc}") from exc
+
+
+def _snapshot_csv(
+    path: Path,
+    chunksize: int = 0,
+    sep: str = ",",
+    encoding: str = "utf-8",
+    sketch_k: int = DEFAULT_K,
+    type_threshold: Optional[float] = None,
+    parse_jobs: int = 1,
+    selection: Optional[Selection] = None,
+    segments: Optional[SegmentProfiler] = None,
+    backend: Optional[str] = None,
+) -> SummarySnapshot:
+    """
+    Сводка по CSV со скетчами и top-значениями (для сохранения и сравнения).
+    При chunksize > 0 файл читается чанками: в памяти только один чанк и агрегаты.
+    При parse_jobs > 1 файл разбирается параллельно в нескольких процессах.
+    Если задан type_threshold, object-колонки сначала проходят вывод типов
+    (для чанков — по первому чанку, для параллельного разбора — по началу файла).
+    selection (--columns/--exclude/--where) применяется при чтении во всех режимах.
+    segments получает те же данные по ходу того же прохода (--group-by).
+    backend (--backend) считает агрегаты при чтении файла целиком.
+    """
+    if parse_jobs > 1:
+        if segments is not None:
+            raise typer.BadParameter("--group-by пока не поддерживается вместе с --parse-jobs")
+        acc = _profile_parallel(
+            path,
+            parse_jobs,
+            sep=sep,
+            encoding=encoding,
+            sketch_k=sketch_k,
+            type_threshold=type_threshold,
+            selection=selection,
+        )
+        return SummarySnapshot(summary=acc.finalize(), top_values=acc.top_values(), source=path.name)
+    if chunksize <= 0:
+        profile = _load_profile(
+            path,
+            sep=sep,
+            encoding=encoding,
+            sketch_k=sketch_k,
+            type_threshold=type_threshold,
+            selection=selection,
+            backend=backend,
+        )
+        if segments is not None:
+            _update_segments(segments, profile.df)
+        return snapshot_dataframe(
+            profile.df, source=path.name, summary=profile.summary, value_counts=profile.value_counts
+        )
+    if not path.exists():
+        raise typer.BadParameter(f"Файл '{path}' не найден")
+    try:
+        chunks = read_csv(path, sep=sep, encoding=encoding, selection=selection, chunksize=chunksize)
+        if type_threshold is not None:
+            chunks, _ = convert_chunks(chunks, threshold=type_threshold)
+        if segments is not None:
+            chunks = segments.feed(chunks)
+        return snapshot_chunks(chunks, sketch_k=sketch_k, source=path.name)
+    except SelectionError as exc:
+        raise typer.BadParameter(str(exc)) from exc
+    except KeyError as exc:
+        raise typer.BadParameter(str(exc.args[0])) from exc
     except Exception as exc:  # noqa: BLE001
         raise typer.BadParameter(f"Не удалось прочитать CSV: {exc}") from exc
 
 
+def _load_snapshot(path: str, chunksize: int, sep: str, encoding: str, sketch_k: int) -> SummarySnapshot:
+    """Сохранённая сводка (*.json) или CSV, по которому сводка строится на лету."""
+    p = Path(path)
+    if p.suffix.lower() == ".json":
+        if not p.exists():
+            raise typer.BadParameter(f"Файл '{path}' не найден")
+        try:
+            return SummarySnapshot.load(p)
+        except (ValueError, KeyError) as exc:
+            raise typer.BadParameter(f"Не удалось прочитать сводку '{path}': {exc}") from exc
+    return _snapshot_csv(p, chunksize, sep=sep, encoding=encoding, sketch_k=sketch_k)
+
+
 @app.command()
 def overview(
-    path: str = typer.Argument(..., help="Путь к CSV-файлу."),
+    path: Optional[str] = typer.Argument(None, help="Путь к CSV-файлу (или --sql/--table)."),
     sep: str = typer.Option(",", help="Разделитель в CSV."),
     encoding: str = typer.Option("utf-8", help="Кодировка файла."),
+    chunksize: int = typer.Option(
+        0, help="Читать файл чанками по N строк (0 — целиком). В памяти один чанк и скетчи фиксированного размера."
+    ),
+    sketch_k: int = typer.Option(DEFAULT_K, help="Точность квантильных скетчей p1..p99 (больше — точнее)."),
+    save_summary: Optional[str] = typer.Option(
+        None, help="Сохранить сводку со скетчами в JSON (для eda-cli compare)."
+    ),
+    infer: bool = typer.Option(
+        True, "--infer-types/--no-infer-types", help="Приводить object-колонки с числами/датами к нужному типу."
+    ),
+    type_threshold: float = typer.Option(
+        TYPE_THRESHOLD, help="Минимальная доля приводимых значений для смены типа колонки."
+    ),
+    parse_jobs: int = typer.Option(
+        1, help="Разбирать CSV в N процессах по диапазонам байт (1 — в одном процессе)."
+    ),
+    columns: Optional[List[str]] = typer.Option(
+        None, help="Профилировать только эти колонки (через запятую, можно повторять); остальные не разбираются."
+    ),
+    exclude: Optional[List[str]] = typer.Option(None, help="Не профилировать эти колонки (через запятую)."),
+    where: Optional[str] = typer.Option(
+        None,
+        help="Условие на строки (колонки, литералы, сравнения, and/or), например: \"country == 'RU' and amount > 0\".",
+    ),
+    group_by: Optional[List[str]] = typer.Option(
+        None, help="Сводка и quality_score по сегментам: колонки через запятую (например, country,device)."
+    ),
+    max_groups: int = typer.Option(DEFAULT_MAX_GROUPS, help="Максимум сегментов; остальные объединяются в один."),
+    backend: str = typer.Option(
+        "pandas", help=f"Чем считать агрегаты ядра: {', '.join(BACKENDS)} (при чтении файла целиком)."
+    ),
+    sql: Optional[str] = typer.Option(None, help="База SQLite/DuckDB вместо CSV: агрегаты считаются в базе."),
+    table: Optional[str] = typer.Option(None, help="Таблица или представление в базе --sql."),
 ) -> None:
     """
     Напечатать краткий обзор датасета:
     - размеры;
     - типы;
-    - простая табличка по колонкам.
+    - простая табличка по колонкам (включая квантили p1/p5/p50/p95/p99);
+    - с --group-by — размер и quality_score каждого сегмента (за тот же проход по файлу).
+
+    С --sql/--table таблица SQLite/DuckDB не выгружается: сводку дают агрегатные запросы в базе.
     """
-    df = _load_csv(Path(path), sep=sep, encoding=encoding)
-    summary: DatasetSummary = summarize_dataset(df)
+    sql_profile = _sql_option(
+        path,
+        sql,
+        table,
+        columns,
+        exclude,
+        where,
+        chunksize=chunksize > 0,
+        parse_jobs=parse_jobs > 1,
+        group_by=bool(group_by),
+        backend=backend != "pandas",
+    )
+    if sql_profile is not None:
+        snapshot = sql_profile.snapshot()
+    else:
+        segments = _segments_option(group_by, max_groups, sketch_k)
+        backend_name = _backend_option(backend, chunksize, parse_jobs)
+        snapshot = _snapshot_csv(
+            Path(path),
+            chunksize,
+            sep=sep,
+            encoding=encoding,
+            sketch_k=sketch_k,
+            type_threshold=type_threshold if infer else None,
+            parse_jobs=parse_jobs,
+            selection=_selection_option(columns, exclude, where),
+            segments=segments,
+            backend=backend_name,
+        )
+    summary: DatasetSummary = snapshot.summary
+    if save_summary:
+        snapshot.save(save_summary)
     summary_df = flatten_summary_for_print(summary)
 
     typer.echo(f"Строк: {summary.n_rows}")
     typer.echo(f"Столбцов: {summary.n_cols}")
     typer.echo("\nКолонки:")
     typer.echo(summary_df.to_string(index=False))
+    if sql_profile is None and segments is not None:
+        result = segments.result()
+        typer.echo(f"\nСегменты по {', '.join(map(str, result['by']))}: {result['n_segments']}")
+        if result["truncated"]:
+            typer.echo(f"(больше {max_groups} — остальные объединены в один сегмент)")
+        typer.echo(segments_frame(result).to_string(index=False))
+    if save_summary:
+        typer.echo(f"\nСводка сохранена: {save_summary}")
 
 
 @app.command()
 def report(
-    path: str = typer.Argument(..., help="Путь к CSV-файлу."),
+    path: Optional[str] = typer.Argument(None, help="Путь к CSV-файлу (или --sql/--table)."),
     out_dir: str = typer.Option("reports", help="Каталог для отчёта."),
     sep: str = typer.Option(",", help="Разделитель в CSV."),
     encoding: str = typer.Option("utf-8", help="Кодировка файла."),
@@ -72,6 +450,41 @@ def report(
     top_k_categories: int = typer.Option(10, help="Количество топ-категорий для отображения."),
     min_missing_share: float = typer.Option(0.1, help="Порог доли пропусков для проблемных колонок."),
     title: str = typer.Option("EDA-отчёт", help="Заголовок отчёта."),
+    sketch_k: int = typer.Option(DEFAULT_K, help="Точность квантильных скетчей p1..p99 (больше — точнее)."),
+    key: Optional[List[str]] = typer.Option(
+        None, help="Ключ, который должен быть уникален: колонка или список через запятую. Можно повторять."
+    ),
+    rules: Optional[str] = typer.Option(None, help="Файл правил качества (YAML/JSON)."),
+    infer: bool = typer.Option(
+        True, "--infer-types/--no-infer-types", help="Приводить object-колонки с числами/датами к нужному типу."
+    ),
+    type_threshold: float = typer.Option(
+        TYPE_THRESHOLD, help="Минимальная доля приводимых значений для смены типа колонки."
+    ),
+    target: Optional[str] = typer.Option(None, help="Целевая колонка: связь признаков с ней и поиск утечек."),
+    positive: Optional[str] = typer.Option(None, help="Значение положительного класса целевой колонки."),
+    outlier_method: str = typer.Option(OUTLIER_METHOD, help="Границы выбросов: iqr или mad."),
+    isolation: bool = typer.Option(False, help="Многомерный поиск аномальных строк изоляционным лесом."),
+    parse_jobs: int = typer.Option(
+        1, help="Разбирать CSV в N процессах по диапазонам байт (1 — в одном процессе)."
+    ),
+    columns: Optional[List[str]] = typer.Option(
+        None, help="Профилировать только эти колонки (через запятую, можно повторять); остальные не разбираются."
+    ),
+    exclude: Optional[List[str]] = typer.Option(None, help="Не профилировать эти колонки (через запятую)."),
+    where: Optional[str] = typer.Option(
+        None,
+        help="Условие на строки (колонки, литералы, сравнения, and/or), например: \"country == 'RU' and amount > 0\".",
+    ),
+    group_by: Optional[List[str]] = typer.Option(
+        None, help="Сводка и quality_score по сегментам: колонки через запятую (например, country,device)."
+    ),
+    max_groups: int = typer.Option(DEFAULT_MAX_GROUPS, help="Максимум сегментов; остальные объединяются в один."),
+    backend: str = typer.Option(
+        "pandas", help=f"Чем считать агрегаты ядра: {', '.join(BACKENDS)} (при чтении файла целиком)."
+    ),
+    sql: Optional[str] = typer.Option(None, help="База SQLite/DuckDB вместо CSV: агрегаты считаются в базе."),
+    table: Optional[str] = typer.Option(None, help="Таблица или представление в базе --sql."),
 ) -> None:
     """
     Сгенерировать полный EDA-отчёт:
@@ -80,148 +493,802 @@ def report(
     - корреляционная матрица;
     - top-k категорий по категориальным признакам;
     - картинки: гистограммы, матрица пропусков, heatmap корреляции.
+
+    С --parse-jobs > 1 файл разбирается параллельно и отчёт строится по сливаемой
+    сводке, как report-sharded: без корреляции, графиков и проверок по строкам.
+    С --sql/--table отчёт строится так же по сводке, посчитанной агрегатными запросами в базе.
     """
+    sql_profile = _sql_option(
+        path,
+        sql,
+        table,
+        columns,
+        exclude,
+        where,
+        top_k=top_k_categories,
+        key=bool(key),
+        rules=bool(rules),
+        target=bool(target),
+        isolation=isolation,
+        parse_jobs=parse_jobs > 1,
+        group_by=bool(group_by),
+        backend=backend != "pandas",
+    )
+    if sql_profile is not None:
+        _write_summary_report(
+            sql_profile.snapshot(),
+            sql_profile.zero_counts,
+            out_dir,
+            min_missing_share=min_missing_share,
+            top_k_categories=top_k_categories,
+            title=title,
+            outlier_method=_outlier_method_option(outlier_method),
+            duplicates=sql_profile.duplicates,
+        )
+        return
+    selection = _selection_option(columns, exclude, where)
+    backend_name = _backend_option(backend, parse_jobs=parse_jobs)
+    if parse_jobs > 1:
+        if key or rules or target or isolation or group_by:
+            raise typer.BadParameter(
+                "--key, --rules, --target, --isolation и --group-by требуют чтения файла целиком (--parse-jobs 1)"
+            )
+        acc = _profile_parallel(
+            Path(path),
+            parse_jobs,
+            sep=sep,
+            encoding=encoding,
+            sketch_k=sketch_k,
+            type_threshold=type_threshold if infer else None,
+            selection=selection,
+        )
+        _write_summary_report(
+            SummarySnapshot(summary=acc.finalize(), top_values=acc.top_values(), source=Path(path).name),
+            acc.zero_counts(),
+            out_dir,
+            min_missing_share=min_missing_share,
+            top_k_categories=top_k_categories,
+            title=title,
+            outlier_method=_outlier_method_option(outlier_method),
+        )
+        return
+    profile = _load_profile(
+        Path(path),
+        sep=sep,
+        encoding=encoding,
+        sketch_k=sketch_k,
+        type_threshold=type_threshold if infer else None,
+        selection=selection,
+        backend=backend_name,
+    )
+    if target:
+        # как в команде target: неизвестная колонка или --positive не того типа — ошибка параметра;
+        # результат кешируется в профиле, и generate_report его не пересчитывает
+        if target not in profile.df.columns:
+            raise typer.BadParameter(f"Целевая колонка '{target}' не найдена")
+        try:
+            profile.target(target, positive=positive, top_k=top_k_categories)
+        except (KeyError, ValueError) as exc:
+            raise typer.BadParameter(str(exc)) from exc
+    result = generate_report(
+        profile.df,
+        out_dir,
+        source_name=Path(path).name,
+        max_hist_columns=max_hist_columns,
+        top_k_categories=top_k_categories,
+        min_missing_share=min_missing_share,
+        title=title,
+        sketch_k=sketch_k,
+        key_columns=[parse_key_spec(k) for k in key or []],
+        rules=_load_rules_option(rules),
+        infer_types=infer,
+        type_threshold=type_threshold,
+        target=target,
+        positive=positive,
+        outlier_method=_outlier_method_option(outlier_method),
+        isolation=isolation,
+        profile=profile,
+        group_by=parse_column_list(group_by),
+        max_groups=max_groups,
+        backend=backend_name,
+    )
     out_root = Path(out_dir)
-    out_root.mkdir(parents=True, exist_ok=True)
-
-    df = _load_csv(Path(path), sep=sep, encoding=encoding)
-
-    # 1. Обзор
-    summary = summarize_dataset(df)
-    summary_df = flatten_summary_for_print(summary)
-    missing_df = missing_table(df)
-    corr_df = correlation_matrix(df)
-    top_cats = top_categories(df, max_columns=5, top_k=top_k_categories)
-
-    # 2. Качество в целом (учитываем min_missing_share)
-    quality_flags = compute_quality_flags(summary, missing_df, min_missing_share, df=df)
-
-    # 3. Сохраняем табличные артефакты
-    summary_df.to_csv(out_root / "summary.csv", index=False)
-    if not missing_df.empty:
-        missing_df.to_csv(out_root / "missing.csv", index=True)
-    if not corr_df.empty:
-        corr_df.to_csv(out_root / "correlation.csv", index=True)
-    save_top_categories_tables(top_cats, out_root / "top_categories")
-
-    # 4. Markdown-отчёт
-    md_path = out_root / "report.md"
-    with md_path.open("w", encoding="utf-8") as f:
-        f.write(f"# {title}\n\n")
-        f.write(f"Сгенерировано: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
-        f.write(f"Исходный файл: `{Path(path).name}`\n\n")
-        f.write(f"Строк: **{summary.n_rows}**, столбцов: **{summary.n_cols}**\n\n")
-
-        f.write("## Качество данных (эвристики)\n\n")
-        f.write(f"- Оценка качества: **{quality_flags.get('quality_score', 0.0):.2f}**\n")
-        f.write(f"- Макс. доля пропусков по колонке: **{quality_flags.get('max_missing_share', 0.0):.2%}**\n")
-        f.write(f"- Слишком мало строк: **{quality_flags.get('too_few_rows', False)}**\n")
-        f.write(f"- Слишком много колонок: **{quality_flags.get('too_many_columns', False)}**\n")
-        f.write(f"- Слишком много пропусков: **{quality_flags.get('too_many_missing', False)}**\n")
-        f.write(f"- Константные колонки: **{quality_flags.get('has_constant_columns', False)}**\n")
-        f.write(f"- Высокая кардинальность категориальных признаков: **{quality_flags.get('has_high_cardinality_categoricals', False)}**\n")
-        f.write(f"- Количество проблемных колонок по порогу {min_missing_share:.0%}: **{quality_flags.get('problematic_missing_count', 0)}**\n\n")
-        f.write(f"- Константные колонки: **{quality_flags.get('has_constant_columns', False)}**\n")
-        const_cols = quality_flags.get("constant_columns", [])
-        if const_cols:
-            f.write("  - Список константных колонок: " + ", ".join(f"`{c}`" for c in const_cols) + "\n")
-
-        f.write(f"- Высокая кардинальность категориальных: **{quality_flags.get('has_high_cardinality_categoricals', False)}** (порог: {quality_flags.get('high_cardinality_threshold')})\n")
-        high_card_cols = quality_flags.get("high_cardinality_columns", [])
-        if high_card_cols:
-            f.write("  - Список: " + ", ".join(f"`{c}`" for c in high_card_cols) + "\n")
-
-        f.write(f"- Подозрительные ID-колонки с дублями: **{quality_flags.get('has_suspicious_id_duplicates', False)}**\n")
-        suspicious = quality_flags.get("suspicious_id_columns", [])
-        if suspicious:
-            f.write("  - Список: " + ", ".join(f"`{c}`" for c in suspicious) + "\n")
-
-        f.write(f"- Колонки с большим числом нулей (>={quality_flags.get('zero_value_threshold', 0.0):.0%}): **{quality_flags.get('has_many_zero_values', False)}**\n")
-        zeros = quality_flags.get("zero_value_columns", [])
-        if zeros:
-            for info in zeros:
-                f.write(f"  - `{info['column']}`: {info['zero_share']:.2%} нулей\n")
-
-        f.write("### Параметры отчёта\n\n")
-        f.write(f"- Отображается топ-{top_k_categories} категорий для категориальных признаков\n")
-        f.write(f"- Колонки с долей пропусков > {min_missing_share:.0%} считаются проблемными\n\n")
-
-        # Используем problematic_missing_cols из quality_flags (если есть)
-        problematic_cols = quality_flags.get("problematic_missing_cols", [])
-        if problematic_cols:
-            f.write("### Проблемные колонки с высокой долей пропусков\n\n")
-            for col in problematic_cols:
-                # берём значение missing_share из missing_df, если он там присутствует
-                if (not missing_df.empty) and (col in missing_df.index):
-                    share = missing_df.loc[col, "missing_share"]
-                    f.write(f"- **{col}**: {share:.2%} пропусков\n")
-                else:
-                    f.write(f"- **{col}**: (доля пропусков не найдена в missing_table)\n")
-            f.write("\n")
-        else:
-            # Если quality_flags не вернул список, можно также вывести локально найденные колонки (как fallback)
-            local_problematic = missing_df[missing_df["missing_share"] > min_missing_share] if not missing_df.empty else pd.DataFrame()
-            if not local_problematic.empty:
-                f.write("### Локально найденные проблемные колонки (по missing_df)\n\n")
-                for col, row in local_problematic.iterrows():
-                    f.write(f"- **{col}**: {row['missing_share']:.2%} пропусков\n")
-                f.write("\n")
-
-        f.write("## Колонки\n\n")
-        f.write("См. файл `summary.csv`.\n\n")
-
-        f.write("## Пропуски\n\n")
-        if missing_df.empty:
-            f.write("Пропусков нет или датасет пуст.\n\n")
-        else:
-            f.write("См. файлы `missing.csv` и `missing_matrix.png`.\n\n")
-
-        f.write("## Корреляция числовых признаков\n\n")
-        if corr_df.empty:
-            f.write("Недостаточно числовых колонок для корреляции.\n\n")
-        else:
-            f.write("См. `correlation.csv` и `correlation_heatmap.png`.\n\n")
+    md_path = result["md_path"]
+    quality_flags = result["quality_flags"]
 
-        f.write("## Категориальные признаки\n\n")
-        if not top_cats:
-            f.write("Категориальные/строковые признаки не найдены.\n\n")
-        else:
-            f.write(f"Отображены топ-{top_k_categories} значений для каждой категориальной колонки.\n\n")
-            f.write("См. файлы в папке `top_categories/`.\n\n")
-
-        f.write("## Гистограммы числовых колонок\n\n")
-        f.write(f"Показаны гистограммы для первых {max_hist_columns} числовых колонок.\n\n")
-        f.write("См. файлы `hist_*.png`.\n")
-
-    # 5. Картинки
-    plot_histograms_per_column(df, out_root, max_columns=max_hist_columns)
-    plot_missing_matrix(df, out_root / "missing_matrix.png")
-    plot_correlation_heatmap(df, out_root / "correlation_heatmap.png")
-    
-    # 6. Дополнительная визуализация для категориальных признаков
-    cat_cols = [col.name for col in summary.columns if not col.is_numeric and col.unique > 1 and col.unique <= 20]
-    if cat_cols:
-        for i, col_name in enumerate(cat_cols[:2]):  # Ограничиваем 2 колонками для наглядности
-            cat_plot_path = out_root / f"categorical_{i+1}_{col_name}.png"
-            plot_categorical_distribution(df, col_name, cat_plot_path, top_k=top_k_categories)
-        
-        with md_path.open("a", encoding="utf-8") as f:
-            f.write("\n## Распределение категориальных признаков\n\n")
-            f.write("Дополнительные визуализации распределения категорий:\n\n")
-            for i, col_name in enumerate(cat_cols[:2]):
-                img_name = f"categorical_{i+1}_{col_name}.png"
-                f.write(f"### {col_name}\n")
-                f.write(f"![{col_name} distribution]({img_name})\n\n")
     typer.echo(f"Отчёт сгенерирован в каталоге: {out_root}")
     typer.echo(f"- Основной markdown: {md_path}")
-    typer.echo("- Табличные файлы: summary.csv, missing.csv, correlation.csv, top_categories/*.csv")
-    typer.echo("- Графики: hist_*.png, missing_matrix.png, correlation_heatmap.png")
+    typer.echo("- Табличные файлы: summary.csv, summary.json, missing.csv, correlation.csv, top_categories/*.csv")
+    typer.echo("- Графики: hist_*.png, missing_matrix.png, correlation_heatmap.png, timeline_*.png")
     typer.echo("Краткая сводка эвристик качества:")
     typer.echo(f"- quality_score: {quality_flags.get('quality_score', 0.0):.2f}")
     typer.echo(f"- problematic_missing_count: {quality_flags.get('problematic_missing_count', 0)}")
     typer.echo(f"- problematic_missing_cols: {quality_flags.get('problematic_missing_cols', [])}")
     typer.echo(f"- suspicious_id_columns: {quality_flags.get('suspicious_id_columns', [])}")
     typer.echo(f"- zero_value_columns: {quality_flags.get('zero_value_columns', [])}")
+    typer.echo(f"- duplicate_rows: {quality_flags.get('duplicate_rows', 0)}")
+    if "failed_rules" in quality_flags:
+        typer.echo(f"- failed_rules: {quality_flags['failed_rules']}")
+    typer.echo(f"- outlier_columns: {[c['column'] for c in quality_flags.get('outlier_columns', [])]}")
+    if result["target"] is not None:
+        typer.echo(f"- leakage_suspects: {result['target']['leakage_suspects']}")
+    if result["segments"] is not None:
+        worst = min(result["segments"]["segments"], key=lambda item: item["quality_score"], default=None)
+        typer.echo(f"- segments: {result['segments']['n_segments']} (segments.csv)")
+        if worst is not None:
+            typer.echo(f"- worst_segment: {worst['segment']} ({worst['quality_score']:.2f})")
+    converted = [info for info in result["inferred_types"] if info["inferred"]]
+    if converted:
+        typer.echo("Приведены типы: " + ", ".join(f"{info['column']} -> {info['inferred']}" for info in converted))
+
+
+@app.command()
+def duplicates(
+    path: str = typer.Argument(..., help="Путь к CSV-файлу."),
+    key: Optional[List[str]] = typer.Option(
+        None, help="Ключ, который должен быть уникален: колонка или список через запятую. Можно повторять."
+    ),
+    sep: str = typer.Option(",", help="Разделитель в CSV."),
+    encoding: str = typer.Option("utf-8", help="Кодировка файла."),
+    chunksize: int = typer.Option(100_000, help="Размер чанка при чтении файла."),
+    memory_limit: int = typer.Option(
+        DEFAULT_MEMORY_LIMIT, help="Сколько хэшей держать в памяти до сброса партиций на диск."
+    ),
+) -> None:
+    """
+    Найти полные дубликаты строк и нарушения уникальности ключей.
+    Файл читается чанками, хэши строк при необходимости сбрасываются на диск,
+    поэтому память ограничена независимо от размера файла.
+    """
+    p = Path(path)
+    if not p.exists():
+        raise typer.BadParameter(f"Файл '{path}' не найден")
+    detector = DuplicateDetector(keys=[parse_key_spec(k) for k in key or []], memory_limit=memory_limit)
+    try:
+        detector.update_many(read_csv(p, sep=sep, encoding=encoding, chunksize=chunksize))
+        result = detector.result()
+    except KeyError as exc:
+        raise typer.BadParameter(str(exc)) from exc
+    finally:
+        detector.close()
+
+    typer.echo(f"Строк: {result['n_rows']}")
+    typer.echo(f"Полных дубликатов строк: {result['duplicate_rows']} ({result['duplicate_row_share']:.2%})")
+    for violation in result["key_violations"]:
+        typer.echo(
+            f"Ключ ({', '.join(violation['columns'])}): дубликатов {violation['duplicate_rows']} "
+            f"({violation['duplicate_share']:.2%}), строк с пустым ключом: {violation['null_key_rows']}"
+        )
+
+
+@app.command()
+def check(
+    path: str = typer.Argument(..., help="Путь к CSV-файлу."),
+    rules: str = typer.Option(..., help="Файл правил качества (YAML/JSON)."),
+    sep: str = typer.Option(",", help="Разделитель в CSV."),
+    encoding: str = typer.Option("utf-8", help="Кодировка файла."),
+    chunksize: int = typer.Option(100_000, help="Размер чанка при чтении файла."),
+) -> None:
+    """
+    Проверить CSV по декларативным правилам (диапазоны, regex, допустимые
+    значения, not_null, уникальность, выражения по нескольким колонкам).
+    Файл читается чанками; при нарушении хотя бы одного правила код выхода 1.
+    """
+    p = Path(path)
+    if not p.exists():
+        raise typer.BadParameter(f"Файл '{path}' не найден")
+    compiled = compile_rules(_load_rules_option(rules))
+    try:
+        compiled.update_many(read_csv(p, sep=sep, encoding=encoding, chunksize=chunksize))
+        result = compiled.result()
+    except (KeyError, RuleError) as exc:
+        raise typer.BadParameter(str(exc)) from exc
+    finally:
+        compiled.close()
+
+    typer.echo(f"Строк: {result['n_rows']}")
+    for item in result["rules"]:
+        status = "OK " if item["passed"] else "FAIL"
+        line = f"[{status}] {item['name']}: {item['failed']} из {item['checked']} ({item['fail_share']:.2%})"
+        if item["examples"]:
+            line += f", примеры: {item['examples']}"
+        typer.echo(line)
+    typer.echo(f"Нарушено правил: {result['failed_rules']} из {len(result['rules'])}, штраф: {result['penalty']:.2f}")
+    if result["failed_rules"]:
+        raise typer.Exit(code=1)
+
+
+@app.command()
+def text(
+    path: str = typer.Argument(..., help="Путь к CSV-файлу."),
+    sep: str = typer.Option(",", help="Разделитель в CSV."),
+    encoding: str = typer.Option("utf-8", help="Кодировка файла."),
+    chunksize: int = typer.Option(100_000, help="Размер чанка при чтении файла."),
+) -> None:
+    """
+    Профиль строковых колонок: длины, пустые и пробельные строки, классы символов
+    (цифры/буквы/смешанные) и распознанные форматы (email, дата, число строкой).
+    """
+    p = Path(path)
+    if not p.exists():
+        raise typer.BadParameter(f"Файл '{path}' не найден")
+    try:
+        profiles = profile_text(read_csv(p, sep=sep, encoding=encoding, chunksize=chunksize))
+    except Exception as exc:  # noqa: BLE001
+        raise typer.BadParameter(f"Не удалось прочитать CSV: {exc}") from exc
+    if not profiles:
+        typer.echo("Строковых колонок нет.")
+        return
+    table = text_profile_frame(profiles)
+    typer.echo(table.to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+
+
+@app.command()
+def missingness(
+    path: str = typer.Argument(..., help="Путь к CSV-файлу."),
+    sep: str = typer.Option(",", help="Разделитель в CSV."),
+    encoding: str = typer.Option("utf-8", help="Кодировка файла."),
+    chunksize: int = typer.Option(100_000, help="Размер чанка при чтении файла."),
+    top: int = typer.Option(DEFAULT_TOP_PATTERNS, help="Сколько самых частых шаблонов и пар колонок показать."),
+    max_patterns: int = typer.Option(DEFAULT_MAX_PATTERNS, help="Сколько шаблонов пропусков отслеживать."),
+) -> None:
+    """
+    Совместные пропуски: самые частые наборы пропущенных колонок в строках
+    и пары колонок, которые пропадают вместе (мера Жаккара, условные доли).
+    """
+    p = Path(path)
+    if not p.exists():
+        raise typer.BadParameter(f"Файл '{path}' не найден")
+    try:
+        profiler = MissingnessProfiler(max_patterns=max_patterns)
+        profiler.update_many(read_csv(p, sep=sep, encoding=encoding, chunksize=chunksize))
+    except Exception as exc:  # noqa: BLE001
+        raise typer.BadParameter(f"Не удалось прочитать CSV: {exc}") from exc
+    result = profiler.result(top_patterns=top, top_pairs=top)
+    typer.echo(f"Строк: {result['n_rows']}, без пропусков: {result['complete_rows']} ({result['complete_share']:.1%})")
+    if not result["patterns"]:
+        typer.echo("Пропусков нет.")
+        return
+    suffix = " (счётчики редких приблизительные)" if result["patterns_truncated"] else ""
+    typer.echo(f"\nШаблоны пропусков (различных: {result['distinct_patterns']}{suffix}):")
+    typer.echo(missing_patterns_frame(result).to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+    if result["pairs"]:
+        typer.echo("\nКолонки, пропадающие вместе:")
+        typer.echo(pd.DataFrame(result["pairs"]).to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+
+
+@app.command()
+def types(
+    path: str = typer.Argument(..., help="Путь к CSV-файлу."),
+    sep: str = typer.Option(",", help="Разделитель в CSV."),
+    encoding: str = typer.Option("utf-8", help="Кодировка файла."),
+    threshold: float = typer.Option(TYPE_THRESHOLD, help="Минимальная доля приводимых значений для смены типа."),
+    sample_size: int = typer.Option(10_000, help="Сколько непустых значений колонки проверять."),
+) -> None:
+    """
+    Вывод типов для object-колонок: доля значений, приводимых к числу и к дате,
+    решение о приведении и примеры значений, которые не приводятся.
+    """
+    df = _load_csv(Path(path), sep=sep, encoding=encoding)
+    inferences = infer_types(df, threshold=threshold, sample_size=sample_size)
+    if not inferences:
+        typer.echo("object-колонок нет.")
+        return
+    table = inference_frame(inferences)[
+        ["column", "numeric_rate", "datetime_rate", "inferred", "offending_examples", "reason"]
+    ]
+    typer.echo(table.to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+
+
+@app.command()
+def outliers(
+    path: str = typer.Argument(..., help="Путь к CSV-файлу."),
+    method: str = typer.Option(OUTLIER_METHOD, help="Границы выбросов: iqr (q1/q3 ± 1.5·IQR) или mad (медиана ± 3.5·MAD)."),
+    k: Optional[float] = typer.Option(None, help="Множитель ширины границ (по умолчанию 1.5 для iqr, 3.5 для mad)."),
+    sep: str = typer.Option(",", help="Разделитель в CSV."),
+    encoding: str = typer.Option("utf-8", help="Кодировка файла."),
+    chunksize: int = typer.Option(100_000, help="Размер чанка при чтении файла."),
+    sketch_k: int = typer.Option(DEFAULT_K, help="Точность квантильных скетчей (больше — точнее)."),
+    isolation: bool = typer.Option(False, help="Многомерный поиск аномальных строк изоляционным лесом."),
+    sample_size: int = typer.Option(ISOLATION_SAMPLE_SIZE, help="Размер выборки строк для изоляционного леса."),
+) -> None:
+    """
+    Выбросы в числовых колонках за один проход по чанкам: робастные границы
+    (IQR или MAD) по квантильным скетчам и оценка числа значений за ними.
+    С --isolation строки дополнительно оцениваются изоляционным лесом на равномерной выборке.
+    """
+    method = _outlier_method_option(method)
+    p = Path(path)
+    if not p.exists():
+        raise typer.BadParameter(f"Файл '{path}' не найден")
+    acc = SummaryAccumulator(sketch_k=sketch_k)
+    sample = pd.DataFrame()
+    try:
+        chunks, _ = convert_chunks(read_csv(p, sep=sep, encoding=encoding, chunksize=chunksize))
+        if isolation:
+            # выборка строк копится тем же проходом, что и сводка
+            def feed():
+                for chunk in chunks:
+                    acc.update(chunk)
+                    yield chunk
+
+            sample = bottom_k_sample(feed(), sample_size)
+        else:
+            acc.update_many(chunks)
+    except ValueError as exc:
+        raise typer.BadParameter(f"Не удалось прочитать CSV: {exc}") from exc
+
+    results = outliers_from_summary(acc.finalize(), method=method, k=k)
+    if not results:
+        typer.echo("Числовых колонок нет.")
+        return
+    table = outliers_frame(results)[["name", "median", "lower", "upper", "low", "high", "outlier_share", "examples"]]
+    typer.echo(table.to_string(index=False, float_format=lambda v: f"{v:.4g}"))
+    if isolation:
+        iso = isolation_scores(sample, sample_size=sample_size)
+        if iso is not None:
+            typer.echo(
+                f"\nИзоляционный лес: выборка {iso['sample_size']} строк, аномальных (score >= {iso['threshold']}): "
+                f"{iso['anomalies']} ({iso['anomaly_share']:.2%})"
+            )
+            for row in iso["top"][:5]:
+                typer.echo(f"  строка {row['index']}: score {row['score']:.3f}")
+
+
+@app.command("target")
+def target_command(
+    path: str = typer.Argument(..., help="Путь к CSV-файлу."),
+    target: str = typer.Option(..., help="Целевая колонка."),
+    positive: Optional[str] = typer.Option(None, help="Значение положительного класса целевой колонки."),
+    sep: str = typer.Option(",", help="Разделитель в CSV."),
+    encoding: str = typer.Option("utf-8", help="Кодировка файла."),
+    chunksize: int = typer.Option(100_000, help="Размер чанка при чтении файла."),
+    top_k: int = typer.Option(10, help="Сколько категорий показывать для категориальных признаков."),
+    max_categories: int = typer.Option(1000, help="Сколько категорий на колонку отслеживать (редкие отбрасываются)."),
+    out: Optional[str] = typer.Option(None, help="Сохранить полный результат в JSON."),
+) -> None:
+    """
+    Связь признаков с целевой колонкой за один проход по чанкам: корреляция и AUC
+    для числовых признаков, среднее целевой по категориям и eta² для категориальных,
+    подозрения на утечку (почти идеальное разделение).
+    """
+    p = Path(path)
+    if not p.exists():
+        raise typer.BadParameter(f"Файл '{path}' не найден")
+    profiler = TargetProfiler(target, positive=positive, top_k=top_k, max_categories=max_categories)
+    try:
+        chunks, _ = convert_chunks(read_csv(p, sep=sep, encoding=encoding, chunksize=chunksize))
+        result = profiler.update_many(chunks).result()
+    except (KeyError, ValueError) as exc:
+        raise typer.BadParameter(str(exc)) from exc
+
+    typer.echo(f"Целевая: {result['target']} ({result['task']}), строк: {result['n_rows']}, среднее: {result['target_mean']:.4g}")
+    typer.echo(target_frame(result).to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+    if result["leakage_suspects"]:
+        typer.echo(f"\nПодозрение на утечку: {result['leakage_suspects']}")
+    if out:
+        Path(out).write_text(json.dumps(result, ensure_ascii=False, indent=2, default=str), encoding="utf-8")
+        typer.echo(f"\nРезультат сохранён: {out}")
+
+
+@app.command()
+def timeseries(
+    path: str = typer.Argument(..., help="Путь к CSV-файлу, отсортированному по времени."),
+    column: Optional[List[str]] = typer.Option(
+        None, help="Временная колонка (можно повторять). По умолчанию — выведенные по первому чанку."
+    ),
+    period: Optional[str] = typer.Option(None, help="Период счётчиков строк (h, D, W, MS); по умолчанию по длине ряда."),
+    sep: str = typer.Option(",", help="Разделитель в CSV."),
+    encoding: str = typer.Option("utf-8", help="Кодировка файла."),
+    chunksize: int = typer.Option(100_000, help="Размер чанка при чтении файла."),
+    counts: bool = typer.Option(False, help="Напечатать число строк по периодам."),
+) -> None:
+    """
+    Профиль временных колонок за один проход по чанкам: диапазон меток, шаг ряда,
+    разрывы, дубликаты меток и число строк по периодам.
+    """
+    p = Path(path)
+    if not p.exists():
+        raise typer.BadParameter(f"Файл '{path}' не найден")
+    try:
+        if column:
+            chunks = read_csv(p, sep=sep, encoding=encoding, chunksize=chunksize, parse_dates=list(column))
+        else:
+            chunks, _ = convert_chunks(read_csv(p, sep=sep, encoding=encoding, chunksize=chunksize))
+        profiles = DatetimeProfiler(columns=list(column) if column else None, period=period).update_many(chunks).result()
+    except (KeyError, ValueError) as exc:
+        raise typer.BadParameter(str(exc)) from exc
+    if not profiles:
+        typer.echo("Временных колонок нет.")
+        return
+    typer.echo(timeseries_frame(profiles).to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+    for profile in profiles:
+        if profile["sorted"] is False:
+            typer.echo(f"\n{profile['name']}: метки не отсортированы — разрывы и дубликаты не считались.")
+        for gap in profile["largest_gaps"]:
+            typer.echo(f"{profile['name']}: разрыв {gap['start']} — {gap['end']} ({gap['duration']})")
+        if counts:
+            typer.echo(f"\n{profile['name']} по периодам ({profile['period']}):")
+            for ts, n in profile["period_counts"].items():
+                typer.echo(f"  {ts}  {n}")
+
+
+@app.command()
+def compare(
+    reference: str = typer.Argument(..., help="Эталон: сохранённая сводка (*.json) или CSV."),
+    current: str = typer.Argument(..., help="Текущие данные: сохранённая сводка (*.json) или CSV."),
+    sep: str = typer.Option(",", help="Разделитель в CSV."),
+    encoding: str = typer.Option("utf-8", help="Кодировка файла."),
+    chunksize: int = typer.Option(0, help="Читать CSV чанками по N строк (0 — целиком)."),
+    sketch_k: int = typer.Option(DEFAULT_K, help="Точность квантильных скетчей для CSV."),
+    bins: int = typer.Option(10, help="Число квантильных бинов для PSI."),
+    psi_threshold: float = typer.Option(PSI_THRESHOLD, help="Порог PSI для пометки дрейфа."),
+    ks_threshold: float = typer.Option(KS_THRESHOLD, help="Порог KS-статистики для пометки дрейфа."),
+    missing_threshold: float = typer.Option(MISSING_THRESHOLD, help="Порог изменения доли пропусков."),
+    out: Optional[str] = typer.Option(None, help="Сохранить полный результат сравнения в JSON."),
+) -> None:
+    """
+    Сравнить два датасета по колонкам: PSI/KS по квантильным скетчам,
+    изменение доли пропусков и числа уникальных, сдвиги top-k значений.
+    Сохранённые сводки (overview --save-summary, summary.json из report)
+    сравниваются без чтения исходных данных.
+    """
+    result = compare_snapshots(
+        _load_snapshot(reference, chunksize, sep, encoding, sketch_k),
+        _load_snapshot(current, chunksize, sep, encoding, sketch_k),
+        bins=bins,
+        psi_threshold=psi_threshold,
+        ks_threshold=ks_threshold,
+        missing_threshold=missing_threshold,
+    )
+    if out:
+        Path(out).write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    typer.echo(f"Строк: {result['reference']['n_rows']} -> {result['current']['n_rows']}")
+    if result["added_columns"]:
+        typer.echo(f"Новые колонки: {result['added_columns']}")
+    if result["removed_columns"]:
+        typer.echo(f"Пропавшие колонки: {result['removed_columns']}")
+    table = pd.DataFrame(
+        [
+            {
+                "name": c["name"],
+                "psi": c["psi"],
+                "ks": c["ks"],
+                "missing_delta": c["missing_share_delta"],
+                "unique_change": c["unique_change"],
+                "top_entered": ", ".join(c.get("top_entered", [])),
+                "drifted": c["drifted"],
+            }
+            for c in result["columns"]
+        ]
+    )
+    if not table.empty:
+        typer.echo(table.to_string(index=False, float_format=lambda v: f"{v:.4f}"))
+    typer.echo(f"Колонки с дрейфом: {result['drifted_columns']}")
+
+
+@app.command()
+def sample(
+    path: str = typer.Argument(..., help="Путь к CSV-файлу."),
+    out: str = typer.Option(..., help="Куда сохранить выборку: *.parquet или *.csv (*.csv.gz — со сжатием)."),
+    size: int = typer.Option(DEFAULT_SAMPLE_SIZE, help="Размер выборки (строк)."),
+    seed: int = typer.Option(0, help="Seed генератора: одинаковый seed — одинаковая выборка."),
+    stratify: Optional[List[str]] = typer.Option(
+        None, help="Стратифицировать по колонкам (через запятую, например country,device)."
+    ),
+    allocation: str = typer.Option(
+        "proportional", help="Распределение выборки по стратам: proportional или equal (поровну)."
+    ),
+    max_strata: int = typer.Option(DEFAULT_MAX_STRATA, help="Максимум страт; остальные объединяются в одну."),
+    sep: str = typer.Option(",", help="Разделитель в CSV."),
+    encoding: str = typer.Option("utf-8", help="Кодировка файла."),
+    chunksize: int = typer.Option(100_000, help="Размер чанка при чтении файла."),
+    sketch_k: int = typer.Option(DEFAULT_K, help="Точность квантильных скетчей для сравнения выборки с данными."),
+    parse_jobs: int = typer.Option(1, help="Разбирать CSV в N процессах по диапазонам байт (1 — в одном процессе)."),
+    columns: Optional[List[str]] = typer.Option(None, help="Оставить в выборке только эти колонки (через запятую)."),
+    exclude: Optional[List[str]] = typer.Option(None, help="Не включать эти колонки (через запятую)."),
+    where: Optional[str] = typer.Option(None, help="Выбирать только строки, удовлетворяющие условию (как в report)."),
+    summary_out: Optional[str] = typer.Option(
+        None, "--summary", help="Сохранить страты и сравнение выборки с данными в JSON."
+    ),
+) -> None:
+    """
+    Равномерная или стратифицированная выборка строк за один проход по файлу
+    (память — не больше size строк на страту) и сравнение выборки со всеми данными:
+    доли пропусков, PSI/KS по квантильным скетчам, сдвиги top-k значений.
+    """
+    p, target = Path(path), Path(out)
+    if not p.exists():
+        raise typer.BadParameter(f"Файл '{path}' не найден")
+    suffixes = [s.lower() for s in target.suffixes]
+    if ".parquet" not in suffixes and ".csv" not in suffixes:
+        raise typer.BadParameter("--out: ожидается файл *.parquet или *.csv")
+    if ".parquet" in suffixes and not arrow_available():
+        raise typer.BadParameter("Для Parquet нужен pyarrow: pip install pyarrow")
+    selection = _selection_option(columns, exclude, where)
+    sampler_options = {
+        "size": size,
+        "seed": seed,
+        "by": parse_column_list(stratify),
+        "allocation": allocation,
+        "max_strata": max_strata,
+    }
+    try:
+        if parse_jobs > 1:
+            acc, sampler = sample_parallel(
+                p,
+                parse_jobs,
+                ShardOptions(
+                    sep=sep,
+                    encoding=encoding,
+                    sketch_k=sketch_k,
+                    chunksize=chunksize,
+                    selection=selection.to_dict() if selection is not None else {},
+                ),
+                **sampler_options,
+            )
+        else:
+            acc = SummaryAccumulator(sketch_k=sketch_k)
+            sampler = ReservoirSampler(**sampler_options)
+            chunks = read_csv(p, sep=sep, encoding=encoding, selection=selection, chunksize=chunksize)
+            acc.update_many(sampler.feed(chunks))
+    except KeyError as exc:
+        raise typer.BadParameter(str(exc.args[0])) from exc
+    except (ValueError, ShardError) as exc:
+        raise typer.BadParameter(str(exc)) from exc
+    except Exception as exc:  # noqa: BLE001
+        raise typer.BadParameter(f"Не удалось прочитать CSV: {exc}") from exc
+
+    rows = sampler.sample()
+    target.parent.mkdir(parents=True, exist_ok=True)
+    if ".parquet" in suffixes:
+        rows.to_parquet(target, index=False)
+    else:
+        rows.to_csv(target, index=False)
+
+    population = SummarySnapshot(summary=acc.finalize(), top_values=acc.top_values(DEFAULT_TOP_K), source=str(p))
+    comparison = compare_snapshots(population, snapshot_dataframe(rows, sketch_k=sketch_k, source=str(target)))
+    strata = sampler.strata()
+    typer.echo(f"Строк в данных: {sampler.n_rows}, в выборке: {len(rows)} -> {target}")
+    if sampler.by:
+        typer.echo(f"\nСтраты по {', '.join(sampler.by)} ({allocation}):")
+        typer.echo(strata_frame(strata).to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+    table = pd.DataFrame(
+        [
+            {
+                "name": c["name"],
+                "missing_data": c["missing_share_reference"],
+                "missing_sample": c["missing_share_current"],
+                "psi": c["psi"],
+                "ks": c["ks"],
+                "differs": c["drifted"],
+            }
+            for c in comparison["columns"]
+        ]
+    )
+    if not table.empty:
+        typer.echo("\nВыборка против всех данных:")
+        typer.echo(table.to_string(index=False, float_format=lambda v: f"{v:.4f}"))
+    if comparison["drifted_columns"]:
+        suffix = " (ожидаемо при --allocation equal)" if sampler.by and allocation == "equal" else ""
+        typer.echo(f"Колонки, где выборка заметно отличается от данных{suffix}: {comparison['drifted_columns']}")
+    if summary_out:
+        payload = {"sampling": {**sampler_options, "n_rows": sampler.n_rows, "sample_rows": len(rows)}}
+        payload.update(strata=strata, comparison=comparison)
+        Path(summary_out).write_text(json.dumps(payload, ensure_ascii=False, indent=2, default=str), encoding="utf-8")
+
+
+@app.command()
+def benchmark(
+    path: str = typer.Argument(..., help="Путь к CSV-файлу."),
+    backend: Optional[List[str]] = typer.Option(
+        None, help=f"Бэкенды для сравнения (через запятую; по умолчанию — все установленные из {', '.join(BACKENDS)})."
+    ),
+    repeat: int = typer.Option(3, help="Сколько раз повторять каждый этап (берётся лучшее время)."),
+    sep: str = typer.Option(",", help="Разделитель в CSV."),
+    encoding: str = typer.Option("utf-8", help="Кодировка файла."),
+    infer: bool = typer.Option(
+        True, "--infer-types/--no-infer-types", help="Приводить object-колонки с числами/датами к нужному типу."
+    ),
+) -> None:
+    """
+    Сравнить бэкенды ядра (pandas, polars, duckdb) на одном файле: время сводки, пропусков,
+    корреляции, top-категорий и поиска нулей, а также совпадение результатов с pandas.
+    """
+    df = _load_csv(Path(path), sep=sep, encoding=encoding)
+    if infer:
+        df, _ = convert_types(df)
+    try:
+        rows = benchmark_backends(df, parse_column_list(backend) or None, repeat=repeat)
+    except BackendError as exc:
+        raise typer.BadParameter(str(exc)) from exc
+    typer.echo(f"Строк: {len(df)}, столбцов: {df.shape[1]}; время — лучшее из {repeat}, секунды")
+    table = pd.DataFrame(
+        [
+            {
+                **{k: row[k] for k in ("backend", *BENCHMARK_STAGES, "total", "speedup")},
+                "matches_pandas": ", ".join(row["mismatched"]) or "да",
+            }
+            for row in rows
+        ]
+    )
+    typer.echo(table.to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+
+
+@app.command()
+def worker(
+    host: str = typer.Option("127.0.0.1", help="Адрес, на котором слушать (0.0.0.0 — все интерфейсы)."),
+    port: int = typer.Option(DEFAULT_PORT, help="TCP-порт воркера."),
+    token: Optional[str] = typer.Option(
+        None, help=f"Общий токен: запросы без него отклоняются (по умолчанию {TOKEN_ENV})."
+    ),
+    data_root: Optional[str] = typer.Option(None, help="Каталог данных: файлы вне него воркер не читает."),
+) -> None:
+    """
+    Запустить воркер распределённого профилирования (см. report-sharded).
+    Файлы читаются по путям, которые присылает координатор, — они должны
+    быть доступны воркеру (общая файловая система). Слушать не loopback-адрес
+    можно только с токеном.
+    """
+    token = token or os.environ.get(TOKEN_ENV) or None
+    if token is None and not is_loopback(host):
+        raise typer.BadParameter(
+            f"Воркер на {host} без токена читал бы любые файлы по запросу из сети: задайте --token или {TOKEN_ENV}"
+        )
+    if data_root is not None and not Path(data_root).is_dir():
+        raise typer.BadParameter(f"Каталог '{data_root}' не найден")
+    with WorkerServer((host, port), token=token, data_root=data_root) as server:
+        typer.echo(f"Воркер слушает {server.endpoint}")
+        if data_root is None:
+            typer.echo("Внимание: --data-root не задан, воркер читает любые доступные ему файлы", err=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+def _write_summary_report(
+    snapshot: SummarySnapshot,
+    zero_counts: Dict[Any, int],
+    out_dir: str,
+    min_missing_share: float = 0.1,
+    top_k_categories: int = 10,
+    title: str = "EDA-отчёт",
+    outlier_method: str = OUTLIER_METHOD,
+    duplicates: Optional[Dict[str, Any]] = None,
+) -> None:
+    """Отчёт только по сводке (report-sharded, report --parse-jobs, report --sql) и его краткий вывод."""
+    summary = snapshot.summary
+    outliers = outliers_from_summary(summary, method=outlier_method)
+    quality_flags = compute_quality_flags(
+        summary,
+        missing_table_from_summary(summary),
+        min_missing_share,
+        zero_counts=zero_counts,
+        duplicates=duplicates,
+        outliers=outliers,
+    )
+    result = generate_summary_report(
+        snapshot,
+        out_dir,
+        quality_flags,
+        min_missing_share=min_missing_share,
+        top_k_categories=top_k_categories,
+        title=title,
+        outliers=outliers,
+    )
+    typer.echo(f"Отчёт сгенерирован в каталоге: {out_dir}")
+    typer.echo(f"- Основной markdown: {result['md_path']}")
+    typer.echo(f"- Строк: {summary.n_rows}, столбцов: {summary.n_cols}")
+    typer.echo(f"- quality_score: {quality_flags['quality_score']:.2f}")
+    if duplicates is not None:
+        typer.echo(f"- duplicate_rows: {quality_flags['duplicate_rows']}")
+
+
+@app.command("report-sharded")
+def report_sharded(
+    paths: List[str] = typer.Argument(..., help="CSV-файлы с одинаковым набором колонок."),
+    out_dir: str = typer.Option("reports", help="Каталог для отчёта."),
+    worker_endpoint: Optional[List[str]] = typer.Option(
+        None, "--worker", help="Адрес воркера host:port (можно повторять). Без воркеров — локальные процессы."
+    ),
+    processes: int = typer.Option(0, help="Число локальных процессов без --worker (0 — по числу CPU)."),
+    shard_size: str = typer.Option("64MB", help="Размер шарда: байты или с суффиксом KB/MB/GB."),
+    retries: int = typer.Option(DEFAULT_RETRIES, help="Сколько раз повторять упавший шард."),
+    timeout: float = typer.Option(DEFAULT_TIMEOUT, help="Таймаут ответа воркера по одному шарду, сек."),
+    worker_token: Optional[str] = typer.Option(None, help=f"Токен воркеров (по умолчанию {TOKEN_ENV})."),
+    sep: str = typer.Option(",", help="Разделитель в CSV."),
+    encoding: str = typer.Option("utf-8", help="Кодировка файла."),
+    sketch_k: int = typer.Option(DEFAULT_K, help="Точность квантильных скетчей p1..p99 (больше — точнее)."),
+    min_missing_share: float = typer.Option(0.1, help="Порог доли пропусков для проблемных колонок."),
+    top_k_categories: int = typer.Option(10, help="Количество топ-категорий для отображения."),
+    title: str = typer.Option("EDA-отчёт", help="Заголовок отчёта."),
+) -> None:
+    """
+    Распределённый отчёт: файлы делятся на шарды по байтам, шарды считаются
+    на воркерах (eda-cli worker) или в локальных процессах, частичные сводки
+    сливаются в итоговую; упавшие шарды повторяются на других воркерах.
+    """
+    for path in paths:
+        if not Path(path).exists():
+            raise typer.BadParameter(f"Файл '{path}' не найден")
+    try:
+        shard_bytes = parse_size(shard_size)
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc)) from exc
+    try:
+        acc = profile_sharded(
+            paths,
+            workers=worker_endpoint or [],
+            processes=processes or None,
+            shard_bytes=shard_bytes,
+            max_retries=retries,
+            timeout=timeout,
+            options=ShardOptions(sep=sep, encoding=encoding, sketch_k=sketch_k),
+            token=worker_token or os.environ.get(TOKEN_ENV) or None,
+        )
+    except ShardError as exc:
+        raise typer.BadParameter(str(exc)) from exc
+
+    source = ", ".join(Path(p).name for p in paths)
+    _write_summary_report(
+        SummarySnapshot(summary=acc.finalize(), top_values=acc.top_values(), source=source),
+        acc.zero_counts(),
+        out_dir,
+        min_missing_share=min_missing_share,
+        top_k_categories=top_k_categories,
+        title=title,
+    )
+
+
+@app.command()
+def daemon(
+    socket_path: Optional[str] = typer.Option(
+        None, "--socket", help="Путь к Unix-сокету (по умолчанию EDA_CLI_SOCKET или стандартный)."
+    ),
+    max_datasets: int = typer.Option(DEFAULT_MAX_DATASETS, help="Сколько датасетов держать в памяти (LRU)."),
+    memory_budget: str = typer.Option("2GB", help="Бюджет памяти на датасеты, например 512MB или 4GB."),
+    status: bool = typer.Option(False, "--status", help="Показать состояние работающего демона и выйти."),
+    stop: bool = typer.Option(False, "--stop", help="Остановить работающий демон."),
+) -> None:
+    """
+    Демон, который держит прочитанные датасеты и посчитанные профили в памяти.
+    Пока он запущен, overview и report выполняются в нём через Unix-сокет,
+    и повторные вызовы по тому же файлу не читают и не пересчитывают его заново.
+    """
+    path = socket_path or default_socket_path()
+    if status or stop:
+        try:
+            if stop:
+                call_daemon({"op": "shutdown"}, path)
+                typer.echo(f"Демон остановлен: {path}")
+                return
+            stats = call_daemon({"op": "stats"}, path)["result"]
+        except DaemonUnavailable as exc:
+            typer.echo(str(exc))
+            raise typer.Exit(code=1)
+        typer.echo(
+            f"Датасетов: {len(stats['datasets'])}/{stats['max_datasets']}, память: "
+            f"{stats['nbytes'] / 1024**2:.1f}/{stats['memory_budget'] / 1024**2:.0f} MB, "
+            f"попаданий: {stats['hits']}, промахов: {stats['misses']}, вытеснений: {stats['evictions']}"
+        )
+        for item in stats["datasets"]:
+            typer.echo(
+                f"- {item['path']}: {item['rows']} строк, {item['nbytes'] / 1024**2:.1f} MB, {item['hits']} обращений"
+            )
+        return
+    try:
+        cache = DatasetCache(max_datasets=max_datasets, memory_budget=parse_size(memory_budget))
+        server = DaemonServer(path, app=app, cache=cache)
+    except (ValueError, RuntimeError, OSError) as exc:
+        raise typer.BadParameter(str(exc)) from exc
+    typer.echo(f"Демон слушает {path} (датасетов до {max_datasets}, память до {memory_budget}). Ctrl+C — остановка.")
+    with server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
 
 
 if __name__ == "__main__":
@@ -0,0 +1,102 @@
+"""
+Точка входа eda-cli: тонкий клиент демона с откатом на выполнение в своём процессе.
+
+Команды из DAEMON_COMMANDS сначала отправляются работающему демону (eda-cli daemon)
+через Unix-сокет: он держит датасеты и посчитанные Profile в памяти, поэтому
+повторные вызовы не читают CSV заново. Если демона нет или он не отвечает (нет сокета,
+соединение отклонено или оборвано, таймаут, испорченный ответ), команда выполняется
+как обычно — в этом процессе. На подключение отводится CONNECT_TIMEOUT секунд,
+на выполнение команды — DEFAULT_TIMEOUT.
+
+Модуль зависит только от стандартной библиотеки: до обращения к демону не
+импортируются ни pandas, ни typer, ни matplotlib.
+
+- EDA_CLI_SOCKET — путь к сокету (по умолчанию $XDG_RUNTIME_DIR/eda-cli.sock
+  или ~/.cache/eda-cli/daemon.sock);
+- EDA_CLI_NO_DAEMON=1 — всегда выполнять команды в своём процессе.
+"""
+
+from __future__ import annotations
+
+import os
+import socket
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .transport import recv_message, send_message
+
+# команды, которые выигрывают от кэша демона (читают CSV целиком)
+DAEMON_COMMANDS = ("overview", "report")
+DEFAULT_TIMEOUT = 3600.0
+# живой демон принимает соединение сразу; зависший не должен задерживать запуск команды
+CONNECT_TIMEOUT = 2.0
+
+
+class DaemonUnavailable(ConnectionError):
+    """Демон не запущен или не отвечает."""
+
+
+def default_socket_path() -> str:
+    if os.environ.get("EDA_CLI_SOCKET"):
+        return os.environ["EDA_CLI_SOCKET"]
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return str(Path(runtime_dir) / "eda-cli.sock")
+    return str(Path.home() / ".cache" / "eda-cli" / "daemon.sock")
+
+
+def call_daemon(
+    request: Dict[str, Any],
+    socket_path: Optional[str] = None,
+    timeout: float = DEFAULT_TIMEOUT,
+    connect_timeout: float = CONNECT_TIMEOUT,
+) -> Dict[str, Any]:
+    """Один запрос к демону; DaemonUnavailable, если демона нет или он не ответил."""
+    path = socket_path or default_socket_path()
+    if not hasattr(socket, "AF_UNIX") or not os.path.exists(path):
+        raise DaemonUnavailable(f"Демон не запущен: нет сокета {path}")
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(min(connect_timeout, timeout))
+            sock.connect(path)
+            sock.settimeout(timeout)
+            send_message(sock, request)
+            response = recv_message(sock)
+    except (OSError, ValueError) as exc:
+        # OSError: отказ, обрыв, таймаут (socket.timeout); ValueError: испорченный кадр
+        raise DaemonUnavailable(f"Демон не отвечает: {exc}") from exc
+    if not isinstance(response, dict):
+        raise DaemonUnavailable(f"Некорректный ответ демона: {response!r}")
+    if not response.get("ok"):
+        raise RuntimeError(response.get("error", "ошибка демона"))
+    return response
+
+
+def run_remote(argv: List[str], socket_path: Optional[str] = None) -> Optional[int]:
+    """Выполняет команду в демоне и печатает её вывод; None, если демона нет или он завис."""
+    try:
+        # ping обслуживается отдельным потоком демона и отвечает сразу даже во время чужой команды;
+        # не ответил за CONNECT_TIMEOUT — процесс демона завис, ждать час выполнения незачем
+        call_daemon({"op": "ping"}, socket_path, timeout=CONNECT_TIMEOUT)
+        response = call_daemon({"op": "run", "argv": argv, "cwd": os.getcwd()}, socket_path)
+    except DaemonUnavailable:
+        return None
+    sys.stdout.write(response.get("stdout", ""))
+    sys.stderr.write(response.get("stderr", ""))
+    return int(response.get("exit_code", 0))
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if argv and argv[0] in DAEMON_COMMANDS and not os.environ.get("EDA_CLI_NO_DAEMON"):
+        code = run_remote(argv)
+        if code is not None:
+            sys.exit(code)
+    from .cli import app
+
+    app(args=argv, prog_name="eda-cli")
+
+
+if __name__ == "__main__":
+    main()
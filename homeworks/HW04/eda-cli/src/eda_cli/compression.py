@@ -0,0 +1,177 @@
+"""
+Потоковое чтение сжатых CSV: gzip, bz2 и zstd (zstd — если установлен zstandard).
+
+Сжатие определяется по сигнатуре первых байт, а не по расширению: выгрузки
+вида data.csv.gz, загрузки без имени и временные копии (*.part) читаются одинаково,
+а несжатый файл с расширением .gz не ломает чтение. Распаковка потоковая —
+в памяти только текущий блок, и ни сжатые, ни распакованные данные целиком
+не материализуются:
+
+    pd.read_csv(path, compression=detect_compression(path), chunksize=100_000)
+    pd.read_csv(open_decompressed(fileobj))
+
+Модуль зависит только от стандартной библиотеки (zstandard — опционально),
+поэтому его используют и CLI, и воркеры распределённого профилирования, и API.
+
+Защита от «бомб» (маленький сжатый файл, распаковывающийся в гигабайты): распаковка
+идёт кусками не больше OUTPUT_BLOCK, а суммарный объём распакованных данных сверяется
+с лимитом max_output — при превышении DecompressionLimitError (в API — ответ 413).
+"""
+
+from __future__ import annotations
+
+import bz2
+import gzip
+import io
+import os
+import zlib
+from typing import Any, BinaryIO, Callable, Iterator, Optional, Tuple, Union
+
+try:  # опционально: pip install zstandard
+    import zstandard
+except ImportError:  # pragma: no cover - зависит от окружения
+    zstandard = None
+
+PathLike = Union[str, "os.PathLike[str]"]
+
+COMPRESSIONS = ("gzip", "bz2", "zstd")
+_MAGIC = (
+    (b"\x1f\x8b", "gzip"),
+    (b"BZh", "bz2"),
+    (b"\x28\xb5\x2f\xfd", "zstd"),
+)
+# Content-Encoding тела запроса -> способ сжатия
+CONTENT_ENCODINGS = {"gzip": "gzip", "x-gzip": "gzip", "zstd": "zstd"}
+
+# лимит распакованных данных по умолчанию и наибольший кусок распаковки за один шаг
+DEFAULT_MAX_DECOMPRESSED = 1 << 30
+OUTPUT_BLOCK = 1 << 20
+# zstd-декомпрессору нельзя задать размер выхода, поэтому вход подаётся срезами:
+# блок zstd из 4 байт разворачивается максимум в 128 КБ, и 128 байт входа дают не больше ~4 МБ
+_ZSTD_INPUT_SLICE = 128
+
+
+class DecompressionLimitError(ValueError):
+    """Распакованные данные больше допустимого (защита от «бомб»)."""
+
+
+def _check_limit(total: int, max_output: Optional[int]) -> None:
+    if max_output is not None and total > max_output:
+        raise DecompressionLimitError(f"Распакованные данные больше лимита {max_output} байт")
+
+
+class _LimitedReader(io.RawIOBase):
+    """Поток распакованных байт, обрывающийся DecompressionLimitError после max_output байт."""
+
+    def __init__(self, stream: BinaryIO, max_output: int) -> None:
+        self.stream = stream
+        self.max_output = max_output
+        self.total = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        data = self.stream.read(min(len(buffer), OUTPUT_BLOCK))
+        self.total += len(data)
+        _check_limit(self.total, self.max_output)
+        buffer[: len(data)] = data
+        return len(data)
+
+
+def sniff_compression(head: bytes) -> Optional[str]:
+    """Способ сжатия по первым байтам данных (None — несжатые)."""
+    for magic, compression in _MAGIC:
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def detect_compression(path: PathLike) -> Optional[str]:
+    """Способ сжатия файла по сигнатуре (значение для pd.read_csv(compression=...))."""
+    with open(path, "rb") as f:
+        return sniff_compression(f.read(4))
+
+
+def _require_zstd() -> None:
+    if zstandard is None:
+        raise ValueError("Для zstd нужен пакет zstandard: pip install zstandard")
+
+
+def open_decompressed(
+    raw: BinaryIO, compression: Optional[str] = None, max_output: Optional[int] = None
+) -> BinaryIO:
+    """
+    Поток распакованных байт поверх raw. Без compression способ определяется
+    по сигнатуре (raw должен поддерживать seek). Закрытие результата не закрывает raw.
+    С max_output чтение сжатых данных дальше max_output распакованных байт — DecompressionLimitError.
+    """
+    if compression is None:
+        head = raw.read(4)
+        raw.seek(-len(head), os.SEEK_CUR)
+        compression = sniff_compression(head)
+    if compression is None:
+        return raw
+    if compression == "gzip":
+        stream = gzip.GzipFile(fileobj=raw, mode="rb")
+    elif compression == "bz2":
+        stream = bz2.BZ2File(raw, mode="rb")
+    elif compression == "zstd":
+        _require_zstd()
+        stream = zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True, closefd=False)
+    else:
+        raise ValueError(f"Неизвестный способ сжатия: {compression}")
+    if max_output is None:
+        return stream
+    return io.BufferedReader(_LimitedReader(stream, max_output), buffer_size=1 << 16)
+
+
+def _new_decompressobj(compression: str) -> Any:
+    if compression == "gzip":
+        return zlib.decompressobj(16 + zlib.MAX_WBITS)
+    if compression == "zstd":
+        _require_zstd()
+        return zstandard.ZstdDecompressor().decompressobj()
+    raise ValueError(f"Неподдерживаемое сжатие тела запроса: {compression}")
+
+
+def incremental_decompressor(
+    compression: str, max_output: Optional[int] = None
+) -> Callable[[bytes, bool], Iterator[bytes]]:
+    """
+    Функция decompress(chunk, final) для распаковки потока кусками (тело HTTP-запроса):
+    возвращает итератор распакованных кусков не больше OUTPUT_BLOCK (для zstd — несколько МБ).
+    Несколько членов gzip или кадров zstd подряд распаковываются по очереди;
+    на последнем куске проверяется, что поток не оборван. Больше max_output
+    распакованных байт за весь поток — DecompressionLimitError.
+    """
+    errors: Tuple[type, ...] = (zlib.error,) + ((zstandard.ZstdError,) if zstandard is not None else ())
+    state = {"dobj": _new_decompressobj(compression), "in_frame": False, "total": 0}
+
+    def pieces(data: bytes) -> Iterator[bytes]:
+        while data:
+            dobj = state["dobj"]
+            if compression == "zstd":
+                out = dobj.decompress(data[:_ZSTD_INPUT_SLICE])
+                data = data[_ZSTD_INPUT_SLICE:]
+            else:
+                out = dobj.decompress(data, OUTPUT_BLOCK)
+                data = dobj.unconsumed_tail
+            state["in_frame"] = not dobj.eof
+            if dobj.eof:
+                data = dobj.unused_data + data
+                state["dobj"] = _new_decompressobj(compression)
+            if out:
+                state["total"] += len(out)
+                _check_limit(state["total"], max_output)
+                yield out
+
+    def decompress(chunk: bytes, final: bool) -> Iterator[bytes]:
+        try:
+            yield from pieces(chunk)
+        except errors as exc:
+            raise ValueError(f"Некорректный поток {compression}: {exc}") from exc
+        if final and state["in_frame"]:
+            raise ValueError(f"Поток {compression} оборван")
+
+    return decompress
@@ -1,10 +1,19 @@
 from __future__ import annotations
-from dataclasses import dataclass, asdict
-from typing import Any, Dict, List, Optional, Sequence
 
+import math
+from dataclasses import dataclass, asdict, fields
+from collections.abc import Sequence as SequenceABC
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
 import pandas as pd
 from pandas.api import types as ptypes
 
+from .backends import NUMERIC_STATS, BackendLike, get_backend
+from .duplicates import find_duplicates
+from .outliers import OUTLIER_SHARE_THRESHOLD, detect_outliers
+from .sketch import DEFAULT_K, QUANTILES, KLLSketch
+
 
 @dataclass
 class ColumnSummary:
@@ -20,79 +29,403 @@ class ColumnSummary:
     max: Optional[float] = None
     mean: Optional[float] = None
     std: Optional[float] = None
+    # квантили по KLL-скетчу (см. sketch.QUANTILES)
+    p1: Optional[float] = None
+    p5: Optional[float] = None
+    p50: Optional[float] = None
+    p95: Optional[float] = None
+    p99: Optional[float] = None
 
     def to_dict(self) -> Dict[str, Any]:
         return asdict(self)
 
 
-@dataclass
+SUMMARY_FIELDS = tuple(f.name for f in fields(ColumnSummary))
+QUANTILE_FIELDS = tuple(QUANTILES)
+STAT_FIELDS = ("min", "max", "mean", "std") + QUANTILE_FIELDS
+# поле ColumnSummary -> атрибут-массив DatasetSummary
+_FIELD_ARRAYS = {name: name for name in SUMMARY_FIELDS}
+_FIELD_ARRAYS.update(name="names", dtype="dtypes")
+
+
+def _array_property(field_name: str, cast: Callable[[Any], Any]) -> property:
+    attr = _FIELD_ARRAYS[field_name]
+
+    def getter(self: "ColumnView") -> Any:
+        return cast(getattr(self._summary, attr)[self._i])
+
+    return property(getter)
+
+
+def _stat_property(field_name: str) -> property:
+    def getter(self: "ColumnView") -> Optional[float]:
+        value = float(getattr(self._summary, field_name)[self._i])
+        if not self._summary.has_stats[self._i] or math.isnan(value):
+            return None
+        return value
+
+    return property(getter)
+
+
+class ColumnView:
+    """
+    Лёгкое представление одной колонки DatasetSummary: значения читаются
+    из массивов сводки по требованию, отдельные объекты на поля не создаются.
+    Атрибуты совпадают с ColumnSummary.
+    """
+
+    __slots__ = ("_summary", "_i")
+
+    def __init__(self, summary: "DatasetSummary", i: int) -> None:
+        self._summary = summary
+        self._i = i
+
+    name = _array_property("name", lambda v: v)
+    dtype = _array_property("dtype", str)
+    non_null = _array_property("non_null", int)
+    missing = _array_property("missing", int)
+    missing_share = _array_property("missing_share", float)
+    unique = _array_property("unique", int)
+    example_values = _array_property("example_values", list)
+    is_numeric = _array_property("is_numeric", bool)
+    min = _stat_property("min")
+    max = _stat_property("max")
+    mean = _stat_property("mean")
+    std = _stat_property("std")
+    p1 = _stat_property("p1")
+    p5 = _stat_property("p5")
+    p50 = _stat_property("p50")
+    p95 = _stat_property("p95")
+    p99 = _stat_property("p99")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in SUMMARY_FIELDS}
+
+    def materialize(self) -> ColumnSummary:
+        return ColumnSummary(**self.to_dict())
+
+    def __repr__(self) -> str:
+        return f"ColumnView({self.name!r}, dtype={self.dtype!r}, non_null={self.non_null})"
+
+
+class _ColumnsView(SequenceABC):
+    """Последовательность ColumnView поверх массивов сводки (summary.columns)."""
+
+    __slots__ = ("_summary",)
+
+    def __init__(self, summary: "DatasetSummary") -> None:
+        self._summary = summary
+
+    def __len__(self) -> int:
+        return len(self._summary.names)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [ColumnView(self._summary, j) for j in range(*i.indices(len(self)))]
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("column index out of range")
+        return ColumnView(self._summary, i)
+
+    def __iter__(self) -> Iterator[ColumnView]:
+        for i in range(len(self)):
+            yield ColumnView(self._summary, i)
+
+
 class DatasetSummary:
-    n_rows: int
-    n_cols: int
-    columns: List[ColumnSummary]
+    """
+    Сводка по датасету в колоночном виде (struct-of-arrays): по numpy-массиву
+    на каждое поле ColumnSummary вместо списка объектов на колонку.
+
+    - summary.columns — последовательность ColumnView с теми же атрибутами, что у ColumnSummary;
+    - summary.names / non_null / missing / ... — массивы для векторных операций;
+    - has_stats — маска колонок, для которых определены min/max/mean/std и квантили
+      (для остальных эти поля равны None в ColumnView/to_dict; NaN в массивах
+      статистик, например std по одному значению, тоже отдаётся как None);
+    - sketches — KLL-скетчи числовых колонок (None для остальных): их можно
+      слить со сводкой по другому чанку/партиции или сохранить на диск.
+
+    Конструктор DatasetSummary(n_rows, n_cols, columns) по списку ColumnSummary сохранён;
+    summarize_dataset создаёт сводку сразу из массивов через from_arrays.
+    """
+
+    __slots__ = (
+        "n_rows",
+        "n_cols",
+        "names",
+        "dtypes",
+        "non_null",
+        "missing",
+        "missing_share",
+        "unique",
+        "example_values",
+        "is_numeric",
+        "has_stats",
+        "min",
+        "max",
+        "mean",
+        "std",
+        "p1",
+        "p5",
+        "p50",
+        "p95",
+        "p99",
+        "sketches",
+        "_positions",
+    )
+
+    def __init__(self, n_rows: int, n_cols: int, columns: Sequence[ColumnSummary] = ()) -> None:
+        columns = list(columns)
+        stats = {
+            stat: np.array([np.nan if getattr(c, stat) is None else getattr(c, stat) for c in columns], dtype=float)
+            for stat in STAT_FIELDS
+        }
+        self._set_arrays(
+            n_rows,
+            n_cols,
+            names=[c.name for c in columns],
+            dtypes=[c.dtype for c in columns],
+            non_null=[c.non_null for c in columns],
+            missing=[c.missing for c in columns],
+            missing_share=[c.missing_share for c in columns],
+            unique=[c.unique for c in columns],
+            example_values=[list(c.example_values) for c in columns],
+            is_numeric=[c.is_numeric for c in columns],
+            has_stats=[c.min is not None for c in columns],
+            stats=stats,
+        )
+
+    @classmethod
+    def from_arrays(cls, n_rows: int, n_cols: int, **arrays: Any) -> "DatasetSummary":
+        """
+        Создаёт сводку напрямую из массивов: names, dtypes, non_null, missing, missing_share,
+        unique, example_values, is_numeric, необязательные has_stats и sketches,
+        а также stats — словарь {поле из STAT_FIELDS: массив}.
+        """
+        summary = cls.__new__(cls)
+        summary._set_arrays(n_rows, n_cols, **arrays)
+        return summary
+
+    @classmethod
+    def from_dict(
+        cls, data: Dict[str, Any], sketches: Optional[Dict[str, Dict[str, Any]]] = None
+    ) -> "DatasetSummary":
+        """Обратное к to_dict(); sketches — {колонка: KLLSketch.to_dict()} для восстановления скетчей."""
+        columns = [ColumnSummary(**{f: c.get(f) for f in SUMMARY_FIELDS}) for c in data["columns"]]
+        summary = cls(int(data["n_rows"]), int(data["n_cols"]), columns)
+        if sketches:
+            summary.sketches = _object_array(
+                [KLLSketch.from_dict(sketches[c.name]) if c.name in sketches else None for c in columns]
+            )
+        return summary
+
+    def _set_arrays(
+        self,
+        n_rows: int,
+        n_cols: int,
+        *,
+        names: Sequence[Any],
+        dtypes: Sequence[str],
+        non_null: Sequence[int],
+        missing: Sequence[int],
+        missing_share: Sequence[float],
+        unique: Sequence[int],
+        example_values: Sequence[List[Any]],
+        is_numeric: Sequence[bool],
+        has_stats: Optional[Sequence[bool]] = None,
+        stats: Optional[Dict[str, Sequence[float]]] = None,
+        sketches: Optional[Sequence[Optional[KLLSketch]]] = None,
+    ) -> None:
+        k = len(names)
+        self.n_rows = int(n_rows)
+        self.n_cols = int(n_cols)
+        self.names = _object_array(names)
+        self.dtypes = _object_array(dtypes)
+        self.non_null = np.asarray(non_null, dtype=np.int64)
+        self.missing = np.asarray(missing, dtype=np.int64)
+        self.missing_share = np.asarray(missing_share, dtype=float)
+        self.unique = np.asarray(unique, dtype=np.int64)
+        self.example_values = _object_array(example_values)
+        self.is_numeric = np.asarray(is_numeric, dtype=bool)
+        self.has_stats = (
+            self.is_numeric & (self.non_null > 0) if has_stats is None else np.asarray(has_stats, dtype=bool)
+        )
+        stats = stats or {}
+        unknown = set(stats) - set(STAT_FIELDS)
+        if unknown:
+            raise ValueError(f"Неизвестные поля статистик: {sorted(unknown)}")
+        for stat in STAT_FIELDS:
+            values = stats.get(stat)
+            setattr(self, stat, np.full(k, np.nan) if values is None else np.asarray(values, dtype=float))
+        self.sketches = _object_array([None] * k if sketches is None else sketches)
+        self._positions = None
+
+    @property
+    def columns(self) -> Sequence[ColumnView]:
+        return _ColumnsView(self)
+
+    def position(self, name: Any) -> Optional[int]:
+        """Номер колонки по имени (или None)."""
+        if self._positions is None:
+            self._positions = {n: i for i, n in enumerate(self.names.tolist())}
+        return self._positions.get(name)
+
+    def column(self, name: Any) -> Optional[ColumnView]:
+        i = self.position(name)
+        return None if i is None else ColumnView(self, i)
+
+    def field_values(self, field_name: str) -> List[Any]:
+        """Значения поля ColumnSummary по всем колонкам (для статистик — None, если не определены)."""
+        values = getattr(self, _FIELD_ARRAYS[field_name]).tolist()
+        if field_name in STAT_FIELDS:
+            return [v if ok and v == v else None for v, ok in zip(values, self.has_stats.tolist())]
+        return values
 
     def to_dict(self) -> Dict[str, Any]:
+        columnar = [self.field_values(name) for name in SUMMARY_FIELDS]
         return {
             "n_rows": self.n_rows,
             "n_cols": self.n_cols,
-            "columns": [c.to_dict() for c in self.columns],
+            "columns": [dict(zip(SUMMARY_FIELDS, row)) for row in zip(*columnar)],
+        }
+
+    def to_columnar(self) -> Dict[str, Any]:
+        """
+        Компактный вид: по массиву на поле ColumnSummary вместо списка объектов.
+        Числовые поля отдаются numpy-массивами как есть (без копирования).
+        """
+        columns: Dict[str, Any] = {}
+        for name in SUMMARY_FIELDS:
+            if name in ("name", "dtype", "example_values") or name in STAT_FIELDS:
+                columns[name] = self.field_values(name)
+            else:
+                columns[name] = getattr(self, _FIELD_ARRAYS[name])
+        return {"n_rows": self.n_rows, "n_cols": self.n_cols, "columns": columns}
+
+    def to_frame(self, include_examples: bool = False) -> pd.DataFrame:
+        """Таблица «колонка = строка»; массивы переиспользуются без копирования, где это возможно."""
+        data: Dict[str, Any] = {
+            "name": self.names,
+            "dtype": self.dtypes,
+            "non_null": self.non_null,
+            "missing": self.missing,
+            "missing_share": self.missing_share,
+            "unique": self.unique,
+            "is_numeric": self.is_numeric,
         }
+        for stat in STAT_FIELDS:
+            data[stat] = np.where(self.has_stats, getattr(self, stat), np.nan)
+        if include_examples:
+            data["example_values"] = self.example_values
+        return pd.DataFrame(data, copy=False)
+
+    def __repr__(self) -> str:
+        return f"DatasetSummary(n_rows={self.n_rows}, n_cols={self.n_cols})"
+
+
+def _object_array(values: Sequence[Any]) -> np.ndarray:
+    """1-D object-массив (без попыток numpy развернуть вложенные списки)."""
+    if isinstance(values, np.ndarray) and values.dtype == object and values.ndim == 1:
+        return values
+    arr = np.empty(len(values), dtype=object)
+    arr[:] = list(values)
+    return arr
+
+
+def _example_values(s: pd.Series, k: int) -> List[str]:
+    """Первые k различных непустых значений колонки (в строковом виде, в порядке появления)."""
+    if k <= 0:
+        return []
+    # смотрим окнами растущего размера с начала колонки: обычно хватает первых строк,
+    # и в str приводится только окно, а не вся колонка
+    result: List[str] = []
+    start, window = 0, max(64, 8 * k)
+    while start < len(s) and len(result) < k:
+        part = s.iloc[start : start + window].dropna()
+        for text in part.astype(str).unique().tolist():
+            if text not in result:
+                result.append(text)
+                if len(result) == k:
+                    break
+        start += window
+        window *= 2
+    return result
+
+
+def numeric_values(s: pd.Series) -> np.ndarray:
+    """Непустые значения числовой колонки как float64-массив (для nullable-типов тоже)."""
+    values = s.to_numpy(dtype=float, na_value=np.nan)
+    return values[~np.isnan(values)]
 
 
 def summarize_dataset(
     df: pd.DataFrame,
     example_values_per_column: int = 3,
+    sketch_k: int = DEFAULT_K,
+    missing_counts: Optional[np.ndarray] = None,
+    backend: BackendLike = None,
 ) -> DatasetSummary:
-    """Полный обзор датасета по колонкам."""
+    """
+    Полный обзор датасета по колонкам (агрегаты считаются по всему фрейму сразу).
+    Квантили p1..p99 оцениваются KLL-скетчем с точностью sketch_k
+    (для колонок не длиннее sketch_k значений — точно).
+    missing_counts — уже посчитанное число пропусков по колонкам (см. session.Profile).
+    backend — чем считать агрегаты по колонкам: pandas, polars или duckdb (см. backends.py).
+    """
     n_rows, n_cols = df.shape
-    columns: List[ColumnSummary] = []
-    for name in df.columns:
-        s = df[name]
-        dtype_str = str(s.dtype)
-        non_null = int(s.notna().sum())
-        missing = n_rows - non_null
-        missing_share = float(missing / n_rows) if n_rows > 0 else 0.0
-        unique = int(s.nunique(dropna=True))
-        examples = (
-            s.dropna().astype(str).unique()[:example_values_per_column].tolist()
-            if non_null > 0
-            else []
-        )
-        is_numeric = bool(ptypes.is_numeric_dtype(s))
-        min_val: Optional[float] = None
-        max_val: Optional[float] = None
-        mean_val: Optional[float] = None
-        std_val: Optional[float] = None
-        if is_numeric and non_null > 0:
-            # явное приведение, чтобы не было numpy-типов
-            min_val = float(s.min())
-            max_val = float(s.max())
-            mean_val = float(s.mean())
-            std_val = float(s.std())
-        columns.append(
-            ColumnSummary(
-                name=name,
-                dtype=dtype_str,
-                non_null=non_null,
-                missing=missing,
-                missing_share=missing_share,
-                unique=unique,
-                example_values=examples,
-                is_numeric=is_numeric,
-                min=min_val,
-                max=max_val,
-                mean=mean_val,
-                std=std_val,
-            )
-        )
-    return DatasetSummary(n_rows=n_rows, n_cols=n_cols, columns=columns)
+    is_numeric = np.array([ptypes.is_numeric_dtype(t) for t in df.dtypes], dtype=bool)
+    aggregates = get_backend(backend).aggregates(df, np.flatnonzero(is_numeric), missing_counts=missing_counts)
+    non_null = aggregates["non_null"]
+    missing = n_rows - non_null
+    missing_share = missing / n_rows if n_rows > 0 else np.zeros(n_cols)
+    unique = aggregates["unique"]
+    has_stats = is_numeric & (non_null > 0)
+
+    stats = {stat: np.full(n_cols, np.nan) for stat in STAT_FIELDS}
+    for stat in NUMERIC_STATS:
+        stats[stat][is_numeric] = aggregates[stat]
+    sketches: List[Optional[KLLSketch]] = [None] * n_cols
+    numeric_pos = np.flatnonzero(has_stats)
+    if numeric_pos.size:
+        qs = list(QUANTILES.values())
+        for i in numeric_pos:
+            sketch = KLLSketch(k=sketch_k).update(numeric_values(df.iloc[:, i]))
+            sketches[i] = sketch
+            for field, value in zip(QUANTILE_FIELDS, sketch.quantiles(qs)):
+                stats[field][i] = value
+
+    examples = [
+        _example_values(df.iloc[:, i], example_values_per_column) if non_null[i] > 0 else []
+        for i in range(n_cols)
+    ]
+    return DatasetSummary.from_arrays(
+        n_rows,
+        n_cols,
+        names=list(df.columns),
+        dtypes=[str(t) for t in df.dtypes],
+        non_null=non_null,
+        missing=missing,
+        missing_share=missing_share,
+        unique=unique,
+        example_values=examples,
+        is_numeric=is_numeric,
+        has_stats=has_stats,
+        stats=stats,
+        sketches=sketches,
+    )
 
 
-def missing_table(df: pd.DataFrame) -> pd.DataFrame:
-    """Таблица пропусков по колонкам: count/share."""
+def missing_table(
+    df: pd.DataFrame, missing_counts: Optional[np.ndarray] = None, backend: BackendLike = None
+) -> pd.DataFrame:
+    """Таблица пропусков по колонкам: count/share (missing_counts — уже посчитанные пропуски)."""
     if df.empty:
         return pd.DataFrame(columns=["missing_count", "missing_share"])
-    total = df.isna().sum()
+    if missing_counts is None:
+        missing_counts = get_backend(backend).missing_counts(df)
+    total = pd.Series(np.asarray(missing_counts, dtype=np.int64), index=df.columns)
     share = total / len(df)
     result = (
         pd.DataFrame(
@@ -105,18 +438,44 @@ def missing_table(df: pd.DataFrame) -> pd.DataFrame:
     return result
 
 
-def correlation_matrix(df: pd.DataFrame) -> pd.DataFrame:
-    """Корреляция Пирсона для числовых колонок."""
-    numeric_df = df.select_dtypes(include="number")
+def missing_table_from_summary(summary: DatasetSummary) -> pd.DataFrame:
+    """То же, что missing_table, но по готовой сводке (без исходных данных)."""
+    if summary.n_rows == 0 or summary.n_cols == 0:
+        return pd.DataFrame(columns=["missing_count", "missing_share"])
+    result = pd.DataFrame(
+        {"missing_count": summary.missing, "missing_share": summary.missing_share},
+        index=pd.Index(summary.names),
+    )
+    return result.sort_values("missing_share", ascending=False)
+
+
+def correlation_matrix(
+    df: pd.DataFrame, numeric_df: Optional[pd.DataFrame] = None, backend: BackendLike = None
+) -> pd.DataFrame:
+    """Корреляция Пирсона для числовых колонок (numeric_df — уже выбранные числовые колонки df)."""
+    if numeric_df is None:
+        numeric_df = df.select_dtypes(include="number")
+    # как corr(numeric_only=True): timedelta, которые select_dtypes("number") тоже отбирает, не участвуют
+    numeric_df = numeric_df.loc[
+        :, [ptypes.is_numeric_dtype(dtype) and not ptypes.is_timedelta64_dtype(dtype) for dtype in numeric_df.dtypes]
+    ]
     if numeric_df.empty:
         return pd.DataFrame()
-    return numeric_df.corr(numeric_only=True)
+    return get_backend(backend).correlation(numeric_df)
 
 
 def top_categories(
-    df: pd.DataFrame, max_columns: int = 5, top_k: int = 5
+    df: pd.DataFrame,
+    max_columns: int = 5,
+    top_k: int = 5,
+    value_counts: Optional[Callable[[Any], pd.Series]] = None,
+    backend: BackendLike = None,
 ) -> Dict[str, pd.DataFrame]:
-    """Для категориальных/строковых колонок считает top-k значений."""
+    """
+    Для категориальных/строковых колонок считает top-k значений
+    (при равных частотах — в порядке первого появления).
+    value_counts(name) — источник уже посчитанных частот колонки (см. session.Profile).
+    """
     result: Dict[str, pd.DataFrame] = {}
     candidate_cols: List[str] = []
     for name in df.columns:
@@ -124,8 +483,8 @@ def top_categories(
         if ptypes.is_object_dtype(s) or isinstance(s.dtype, pd.CategoricalDtype):
             candidate_cols.append(name)
     for name in candidate_cols[:max_columns]:
-        s = df[name]
-        vc = s.value_counts(dropna=True).head(top_k)
+        counts = value_counts(name) if value_counts is not None else get_backend(backend).value_counts(df[name])
+        vc = counts.head(top_k)
         if vc.empty:
             continue
         share = vc / vc.sum()
@@ -140,11 +499,22 @@ def top_categories(
     return result
 
 
+def _is_id_like_name(name: str) -> bool:
+    lname = name.lower()
+    return lname == "id" or lname.endswith("_id") or lname.startswith("id_") or lname in {"user_id", "uid"}
+
+
 def compute_quality_flags(
     summary: DatasetSummary,
     missing_df: pd.DataFrame,
     min_missing_share: float = 0.1,
     df: Optional[pd.DataFrame] = None,
+    key_columns: Sequence[Sequence[str]] = (),
+    duplicates: Optional[Dict[str, Any]] = None,
+    rules_result: Optional[Dict[str, Any]] = None,
+    zero_counts: Optional[Dict[Any, int]] = None,
+    outliers: Optional[List[Dict[str, Any]]] = None,
+    backend: BackendLike = None,
 ) -> Dict[str, Any]:
     """
     Эвристики качества данных:
@@ -155,7 +525,14 @@ def compute_quality_flags(
     - категориальные с высокой кардинальностью;
     - проблемные колонки по порогу пропусков;
     - подозрительные дубликаты id-полей;
-    - много нулей в числовых колонках (если передан df).
+    - много нулей в числовых колонках (по zero_counts — числу нулей в колонке, например
+      из SummaryAccumulator.zero_counts() или session.Profile, — или по df бэкендом backend);
+    - дубликаты строк и нарушения составных ключей key_columns: берутся из duplicates
+      (результат duplicates.DuplicateDetector, например по чанкам) или считаются по df;
+    - пользовательские правила: rules_result — результат rules.evaluate_rules,
+      каждое нарушенное правило снижает score на свой weight;
+    - выбросы в числовых колонках: берутся из outliers (результат outliers.detect_outliers
+      или outliers.outliers_from_summary — например, по скетчам сводки) или считаются по df.
     """
     flags: Dict[str, Any] = {}
 
@@ -171,17 +548,14 @@ def compute_quality_flags(
     n_cols = summary.n_cols
 
     # 1) константные колонки
-    constant_columns = [col.name for col in summary.columns if col.unique <= 1 and col.non_null > 0]
+    names = summary.names
+    constant_columns = names[(summary.unique <= 1) & (summary.non_null > 0)].tolist()
     flags["has_constant_columns"] = len(constant_columns) > 0
     flags["constant_columns"] = constant_columns
 
     # 2) высококардинальные категориальные признаки
     HIGH_CARDINALITY_THRESHOLD = max(50, int(max(10, n_rows * 0.1)))
-    high_cardinality_columns = [
-        col.name
-        for col in summary.columns
-        if (not col.is_numeric) and (col.unique > HIGH_CARDINALITY_THRESHOLD)
-    ]
+    high_cardinality_columns = names[~summary.is_numeric & (summary.unique > HIGH_CARDINALITY_THRESHOLD)].tolist()
     flags["has_high_cardinality_categoricals"] = len(high_cardinality_columns) > 0
     flags["high_cardinality_columns"] = high_cardinality_columns
     flags["high_cardinality_threshold"] = HIGH_CARDINALITY_THRESHOLD
@@ -195,38 +569,74 @@ def compute_quality_flags(
     flags["min_missing_share"] = min_missing_share
 
     # 4) подозрительные id-колонки с дублями (ищем типичные имена *_id, id, user_id)
-    suspicious_id_columns = []
-    id_like_names = set()
-    for col in summary.columns:
-        lname = col.name.lower()
-        if lname == "id" or lname.endswith("_id") or lname.startswith("id_") or lname in {"user_id", "uid"}:
-            id_like_names.add(col.name)
+    id_like = np.array([_is_id_like_name(str(name)) for name in names.tolist()], dtype=bool)
     # если такие колонки есть — проверим уникальность по summary
-    for name in id_like_names:
-        col = next((c for c in summary.columns if c.name == name), None)
-        if col is None:
-            continue
-        if col.non_null > 0 and col.unique < col.non_null:
-            suspicious_id_columns.append(name)
+    suspicious_id_columns = names[
+        id_like & (summary.non_null > 0) & (summary.unique < summary.non_null)
+    ].tolist()
     flags["has_suspicious_id_duplicates"] = len(suspicious_id_columns) > 0
     flags["suspicious_id_columns"] = suspicious_id_columns
 
     # 5) много нулей в числовых колонках (требует df для точного расчёта)
     zero_value_columns = []
     ZERO_VALUE_THRESHOLD = 0.5  # если >50% значений == 0 => тревожно
-    if df is not None and not df.empty:
-        numeric_cols = df.select_dtypes(include="number").columns
-        for name in numeric_cols:
-            s = df[name].dropna()
-            if s.empty:
+    if zero_counts is None and df is not None and not df.empty:
+        numeric_df = df.select_dtypes(include="number")
+        zeros, non_null = get_backend(backend).zero_counts(numeric_df)
+        for name, z, n in zip(numeric_df.columns, zeros.tolist(), non_null.tolist()):
+            if n == 0:
                 continue
-            zero_share = float((s == 0).sum() / len(s))
+            zero_share = float(z / n)
+            if zero_share >= ZERO_VALUE_THRESHOLD:
+                zero_value_columns.append({"column": name, "zero_share": zero_share})
+    elif zero_counts:
+        for name, zeros in zero_counts.items():
+            i = summary.position(name)
+            if i is None or summary.non_null[i] == 0:
+                continue
+            zero_share = float(zeros / summary.non_null[i])
             if zero_share >= ZERO_VALUE_THRESHOLD:
                 zero_value_columns.append({"column": name, "zero_share": zero_share})
     flags["has_many_zero_values"] = len(zero_value_columns) > 0
     flags["zero_value_columns"] = zero_value_columns
     flags["zero_value_threshold"] = ZERO_VALUE_THRESHOLD
 
+    # 6) дубликаты строк и нарушения ключей (хэширование строк)
+    if duplicates is None and df is not None:
+        duplicates = find_duplicates(df, keys=key_columns)
+    if duplicates is not None:
+        violated = [v for v in duplicates["key_violations"] if v["duplicate_rows"] > 0]
+        flags["duplicate_rows"] = duplicates["duplicate_rows"]
+        flags["duplicate_row_share"] = duplicates["duplicate_row_share"]
+        flags["has_duplicate_rows"] = duplicates["duplicate_rows"] > 0
+        flags["key_violations"] = duplicates["key_violations"]
+        flags["has_key_violations"] = len(violated) > 0
+
+    # 7) декларативные правила (rules.py)
+    if rules_result is not None:
+        flags["rules"] = rules_result["rules"]
+        flags["failed_rules"] = rules_result["failed_rules"]
+        flags["rules_penalty"] = rules_result["penalty"]
+
+    # 8) выбросы (робастные границы IQR/MAD, см. outliers.py)
+    if outliers is None and df is not None:
+        outliers = detect_outliers(df)
+    if outliers is not None:
+        outlier_columns = [
+            {
+                "column": item["name"],
+                "outliers": item["outliers"],
+                "outlier_share": item["outlier_share"],
+                "lower": item["lower"],
+                "upper": item["upper"],
+            }
+            for item in outliers
+            if item["outlier_share"] >= OUTLIER_SHARE_THRESHOLD
+        ]
+        flags["has_outliers"] = len(outlier_columns) > 0
+        flags["outlier_columns"] = outlier_columns
+        flags["outlier_share_threshold"] = OUTLIER_SHARE_THRESHOLD
+
     # --- расчёт интегрального показателя качества (score 0..1)
     score = 1.0
     # большая максимальная доля пропусков — сильный штраф
@@ -248,6 +658,14 @@ def compute_quality_flags(
     if flags["has_many_zero_values"]:
         # суммарный штраф, но не слишком большой
         score -= min(0.12, 0.06 * len(zero_value_columns))
+    if flags.get("has_duplicate_rows"):
+        score -= min(0.15, 0.05 + flags["duplicate_row_share"])
+    if flags.get("has_key_violations"):
+        score -= min(0.2, 0.1 * len(violated))
+    if rules_result is not None:
+        score -= rules_result["penalty"]
+    if flags.get("has_outliers"):
+        score -= min(0.1, 0.03 * len(flags["outlier_columns"]))
 
     # clamp
     score = max(0.0, min(1.0, score))
@@ -258,21 +676,4 @@ def compute_quality_flags(
 
 def flatten_summary_for_print(summary: DatasetSummary) -> pd.DataFrame:
     """Превращает DatasetSummary в табличку для более удобного вывода."""
-    rows: List[Dict[str, Any]] = []
-    for col in summary.columns:
-        rows.append(
-            {
-                "name": col.name,
-                "dtype": col.dtype,
-                "non_null": col.non_null,
-                "missing": col.missing,
-                "missing_share": col.missing_share,
-                "unique": col.unique,
-                "is_numeric": col.is_numeric,
-                "min": col.min,
-                "max": col.max,
-                "mean": col.mean,
-                "std": col.std,
-            }
-        )
-    return pd.DataFrame(rows)
+    return summary.to_frame()
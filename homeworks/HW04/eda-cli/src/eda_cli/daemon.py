@@ -0,0 +1,243 @@
+"""
+Демон профилирования: держит прочитанные датасеты и их Profile в памяти между вызовами CLI.
+
+    eda-cli daemon &                      # слушает Unix-сокет (см. client.default_socket_path)
+    eda-cli overview data.csv             # первый вызов читает CSV и считает сводку
+    eda-cli report data.csv --top-k-categories 5   # повторные — по готовому Profile
+
+- Кэш DatasetCache: ключ — путь, параметры чтения, порог вывода типов, sketch_k
+  и выбор колонок/строк (--columns/--exclude/--where);
+  запись проверяется по mtime/размеру файла и перечитывается, если файл изменился.
+  Вытеснение — LRU по числу датасетов и по бюджету памяти (по df.memory_usage(deep=True),
+  промежуточные результаты Profile не учитываются, так что бюджет приблизительный).
+- Протокол — кадры transport.py поверх Unix-сокета:
+  {"op": "run", "argv": [...], "cwd": "..."} -> {"ok": true, "stdout": ..., "stderr": ..., "exit_code": 0};
+  также "ping", "stats", "clear" и "shutdown".
+- Команды выполняются тем же typer-приложением, что и без демона, по одной за раз
+  (stdout и рабочий каталог процесса общие); внутри демона cli берёт датасеты
+  из активного кэша (active_cache()).
+"""
+
+from __future__ import annotations
+
+import contextlib
+import io
+import os
+import socketserver
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .client import DaemonUnavailable, call_daemon
+from .infer import ColumnInference, convert_types
+from .selection import Selection, read_csv
+from .session import Profile
+from .sketch import DEFAULT_K
+from .transport import recv_message, send_message
+
+DEFAULT_MAX_DATASETS = 8
+DEFAULT_MEMORY_BUDGET = 2 * 1024**3
+
+_active_cache: Optional["DatasetCache"] = None
+
+
+def active_cache() -> Optional["DatasetCache"]:
+    """Кэш работающего в этом процессе демона (None вне демона)."""
+    return _active_cache
+
+
+@dataclass
+class CachedDataset:
+    profile: Profile
+    nbytes: int
+    mtime_ns: int
+    size: int
+    hits: int = 0
+
+
+class DatasetCache:
+    """LRU-кэш прочитанных CSV и их Profile с ограничением по числу и по памяти."""
+
+    def __init__(self, max_datasets: int = DEFAULT_MAX_DATASETS, memory_budget: int = DEFAULT_MEMORY_BUDGET) -> None:
+        self.max_datasets = max_datasets
+        self.memory_budget = memory_budget
+        self.entries: "OrderedDict[Tuple[Any, ...], CachedDataset]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.RLock()
+
+    @property
+    def nbytes(self) -> int:
+        return sum(entry.nbytes for entry in self.entries.values())
+
+    def get(
+        self,
+        path: Path,
+        sep: str = ",",
+        encoding: str = "utf-8",
+        type_threshold: Optional[float] = None,
+        sketch_k: int = DEFAULT_K,
+        selection: Optional[Selection] = None,
+        backend: Optional[str] = None,
+    ) -> Profile:
+        """
+        Profile датасета из кэша или только что прочитанный (с выводом типов при type_threshold).
+        Выбор колонок и строк (selection) входит в ключ: разные выборки кэшируются отдельно.
+        """
+        path = Path(path).resolve()
+        stat = path.stat()
+        selection_key = selection.key() if selection is not None else ()
+        key = (str(path), sep, encoding, type_threshold, sketch_k, selection_key, backend or "pandas")
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None and (entry.mtime_ns, entry.size) == (stat.st_mtime_ns, stat.st_size):
+                self.entries.move_to_end(key)
+                entry.hits += 1
+                self.hits += 1
+                return entry.profile
+            self.misses += 1
+            df = read_csv(path, sep=sep, encoding=encoding, selection=selection)
+            inferences: List[ColumnInference] = []
+            if type_threshold is not None:
+                df, inferences = convert_types(df, threshold=type_threshold)
+            profile = Profile(df, sketch_k=sketch_k, inferences=inferences, backend=backend)
+            nbytes = int(df.memory_usage(deep=True).sum())
+            self.entries[key] = CachedDataset(profile, nbytes, stat.st_mtime_ns, stat.st_size)
+            self.entries.move_to_end(key)
+            self._evict(keep=key)
+            return profile
+
+    def _evict(self, keep: Tuple[Any, ...]) -> None:
+        # только что загруженный датасет не вытесняется, даже если один превышает бюджет
+        while len(self.entries) > 1 and (
+            len(self.entries) > self.max_datasets or self.nbytes > self.memory_budget
+        ):
+            oldest = next(iter(self.entries))
+            if oldest == keep:
+                break
+            del self.entries[oldest]
+            self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self.entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "datasets": [
+                    {
+                        "path": key[0],
+                        "type_threshold": key[3],
+                        "sketch_k": key[4],
+                        "selection": list(key[5]),
+                        "rows": len(entry.profile.df),
+                        "nbytes": entry.nbytes,
+                        "hits": entry.hits,
+                    }
+                    for key, entry in self.entries.items()
+                ],
+                "nbytes": self.nbytes,
+                "memory_budget": self.memory_budget,
+                "max_datasets": self.max_datasets,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+def run_command(app: Any, argv: List[str], cwd: Optional[str] = None) -> Dict[str, Any]:
+    """Выполняет команду typer-приложения, перехватывая вывод и код возврата."""
+    stdout, stderr = io.StringIO(), io.StringIO()
+    exit_code = 0
+    previous_cwd = os.getcwd()
+    try:
+        if cwd:
+            os.chdir(cwd)
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            try:
+                app(args=list(argv), prog_name="eda-cli", standalone_mode=False)
+            except Exception as exc:  # noqa: BLE001
+                # ошибки разбора аргументов и BadParameter печатаются как в обычном CLI (show),
+                # typer.Exit несёт только код возврата
+                if hasattr(exc, "show"):
+                    exc.show(file=stderr)
+                elif not hasattr(exc, "exit_code"):
+                    stderr.write(f"{type(exc).__name__}: {exc}\n")
+                exit_code = getattr(exc, "exit_code", 1)
+    finally:
+        os.chdir(previous_cwd)
+    return {"stdout": stdout.getvalue(), "stderr": stderr.getvalue(), "exit_code": exit_code}
+
+
+class _DaemonHandler(socketserver.BaseRequestHandler):
+    server: "DaemonServer"
+
+    def handle(self) -> None:
+        try:
+            request = recv_message(self.request)
+        except (ConnectionError, ValueError):
+            return
+        try:
+            if not isinstance(request, dict):
+                raise ValueError("Запрос должен быть JSON-объектом")
+            op = request.get("op")
+            if op == "ping":
+                response = {"ok": True, "pid": os.getpid()}
+            elif op == "stats":
+                response = {"ok": True, "result": self.server.cache.stats()}
+            elif op == "clear":
+                self.server.cache.clear()
+                response = {"ok": True}
+            elif op == "run":
+                with self.server.run_lock:
+                    result = run_command(self.server.app, request.get("argv", []), request.get("cwd"))
+                response = {"ok": True, **result}
+            elif op == "shutdown":
+                response = {"ok": True}
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+            else:
+                response = {"ok": False, "error": f"Неизвестная операция: {op}"}
+        except Exception as exc:  # noqa: BLE001
+            response = {"ok": False, "error": f"{type(exc).__name__}: {exc}"}
+        send_message(self.request, response)
+
+
+class DaemonServer(socketserver.ThreadingUnixStreamServer):
+    """
+    Демон на Unix-сокете: DaemonServer(path, app=cli.app, cache=DatasetCache()).serve_forever().
+    Пока сервер создан, его кэш доступен команде через active_cache().
+    """
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, app: Any, cache: Optional[DatasetCache] = None) -> None:
+        global _active_cache
+        self.socket_path = socket_path
+        self.app = app
+        self.cache = cache or DatasetCache()
+        self.run_lock = threading.Lock()
+        Path(socket_path).parent.mkdir(parents=True, exist_ok=True)
+        try:
+            call_daemon({"op": "ping"}, socket_path, timeout=1.0)
+        except DaemonUnavailable:
+            pass
+        else:
+            raise RuntimeError(f"Демон уже запущен: {socket_path}")
+        # сокет от упавшего демона мешает bind — удаляем его
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(socket_path)
+        super().__init__(socket_path, _DaemonHandler)
+        os.chmod(socket_path, 0o600)
+        _active_cache = self.cache
+
+    def server_close(self) -> None:
+        global _active_cache
+        super().server_close()
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(self.socket_path)
+        if _active_cache is self.cache:
+            _active_cache = None
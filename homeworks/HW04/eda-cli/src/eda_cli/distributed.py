@@ -0,0 +1,487 @@
+"""
+Распределённое профилирование: координатор делит CSV на шарды, воркеры считают
+частичные SummaryAccumulator, координатор сливает их в итоговую сводку.
+
+- Шард — диапазон байт [start, end) одного файла; границы шардов стоят в начале
+  записей: plan_shards ищет перевод строки вне кавычек, отслеживая чётность числа
+  кавычек от начала данных (экранированная кавычка "" чётность не меняет), поэтому
+  переводы строк внутри кавычек запись не разрывают. Заголовок воркер читает
+  из файла сам, поэтому файлы должны быть доступны воркерам по тому же пути (общая ФС).
+  Сжатый файл (gzip/bz2/zstd) нельзя начать читать с середины — он целиком
+  становится одним шардом и распаковывается воркером потоково.
+- Транспорт — обычный TCP: кадр = 8 байт длины (big-endian) + JSON (см. transport.py).
+  Запрос {"op": "profile", "shard": {...}, "options": {...}},
+  ответ {"ok": true, "result": SummaryAccumulator.to_dict()} или {"ok": false, "error": "..."}.
+- Без адресов воркеров шарды считаются локальными процессами (ProcessPoolExecutor) —
+  так работает и параллельный разбор одного большого файла (--parse-jobs в CLI).
+  sample_parallel так же собирает выборку строк: выборки шардов (sampling.py) сливаются точно.
+- Упавший шард (ошибка соединения, таймаут, ошибка на воркере) возвращается
+  в очередь и уходит другому воркеру — тому, на котором он ещё не падал (если такой остался);
+  после max_retries повторов — ShardError.
+- Воркер читает файлы по присланным путям, поэтому доступ к нему ограничивается:
+  общий токен (--token / EDA_CLI_WORKER_TOKEN; координатор передаёт его в каждом запросе)
+  и каталог data_root, вне которого пути отклоняются. Слушать не loopback-адрес
+  без токена CLI не даёт.
+"""
+
+from __future__ import annotations
+
+import hmac
+import io
+import ipaddress
+import mmap
+import os
+import socket
+import socketserver
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple, Union
+
+import pandas as pd
+
+from .accumulate import SummaryAccumulator
+from .compression import detect_compression
+from .infer import ColumnInference, apply_inferred_types
+from .sampling import ReservoirSampler
+from .selection import Selection, read_csv
+from .sketch import DEFAULT_K
+from .transport import recv_message, send_message
+
+PathLike = Union[str, Path]
+
+DEFAULT_SHARD_BYTES = 64 * 1024 * 1024
+DEFAULT_RETRIES = 2
+DEFAULT_TIMEOUT = 600.0
+DEFAULT_PORT = 7070
+_QUOTE = b'"'
+_MIN_PARALLEL_SHARD = 1024 * 1024
+# после стольких ошибок подряд воркер выбывает, чтобы «мёртвый» хост не съедал повторы шардов
+_WORKER_FAILURE_LIMIT = 2
+# общий токен воркеров по умолчанию (для eda-cli worker и report-sharded)
+TOKEN_ENV = "EDA_CLI_WORKER_TOKEN"
+
+
+class ShardError(RuntimeError):
+    """Шард не удалось посчитать (в том числе после всех повторов)."""
+
+
+@dataclass
+class Shard:
+    index: int
+    path: str
+    start: int
+    end: int
+
+
+@dataclass
+class ShardOptions:
+    sep: str = ","
+    encoding: str = "utf-8"
+    sketch_k: int = DEFAULT_K
+    example_values_per_column: int = 3
+    chunksize: int = 100_000
+    # решения вывода типов (ColumnInference.to_dict()), принятые координатором по началу файла:
+    # все шарды приводят колонки одинаково
+    types: List[Dict[str, Any]] = field(default_factory=list)
+    # выбор колонок и строк (Selection.to_dict()): usecols и фильтр применяются в каждом шарде
+    selection: Dict[str, Any] = field(default_factory=dict)
+
+
+# --- планирование и чтение шардов
+
+_SIZE_UNITS = {"": 1, "B": 1, "K": 1024, "KB": 1024, "M": 1024**2, "MB": 1024**2, "G": 1024**3, "GB": 1024**3}
+
+
+def parse_size(text: str) -> int:
+    """'64MB' / '512K' / '1000' -> число байт."""
+    value = text.strip().upper()
+    number = value.rstrip("BKMG")
+    unit = value[len(number) :]
+    if unit not in _SIZE_UNITS or not number:
+        raise ValueError(f"Некорректный размер: {text!r}")
+    size = int(float(number) * _SIZE_UNITS[unit])
+    if size <= 0:
+        raise ValueError(f"Размер должен быть положительным: {text!r}")
+    return size
+
+
+def _data_offset(path: PathLike) -> int:
+    """Смещение первой строки данных (сразу после заголовка)."""
+    with open(path, "rb") as f:
+        f.readline()
+        return f.tell()
+
+
+def _record_boundaries(path: PathLike, start: int, shard_bytes: int) -> List[int]:
+    """
+    Начала записей примерно через shard_bytes, начиная с start: первый перевод строки
+    после очередной отметки, стоящий вне кавычек (по чётности кавычек от start).
+    """
+    size = os.path.getsize(path)
+    bounds = [start]
+    if size <= start:
+        return bounds
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        pos, inside = start, False
+        while pos + shard_bytes < size:
+            target = pos + shard_bytes
+            inside ^= mm[pos:target].count(_QUOTE) % 2 == 1
+            cursor = target
+            while True:
+                newline = mm.find(b"\n", cursor)
+                if newline < 0:
+                    return bounds
+                inside ^= mm[cursor:newline].count(_QUOTE) % 2 == 1
+                cursor = newline + 1
+                if not inside:
+                    break
+            if cursor >= size:
+                break
+            bounds.append(cursor)
+            pos = cursor
+    return bounds
+
+
+def plan_shards(paths: Sequence[PathLike], shard_bytes: int = DEFAULT_SHARD_BYTES) -> List[Shard]:
+    """Делит файлы на диапазоны байт примерно по shard_bytes (без учёта заголовка) по границам записей."""
+    if shard_bytes <= 0:
+        raise ValueError("shard_bytes должен быть положительным")
+    shards: List[Shard] = []
+    for path in paths:
+        size = os.path.getsize(path)
+        if detect_compression(path) is not None:
+            shards.append(Shard(index=len(shards), path=str(path), start=0, end=size))
+            continue
+        bounds = _record_boundaries(path, _data_offset(path), shard_bytes)
+        for start, end in zip(bounds, bounds[1:] + [size]):
+            if start < end:
+                shards.append(Shard(index=len(shards), path=str(path), start=start, end=end))
+    return shards
+
+
+def parallel_shard_bytes(paths: Sequence[PathLike], jobs: int) -> int:
+    """
+    Размер шарда для разбора на jobs процессах: по несколько шардов на процесс
+    (чтобы быстрые процессы забирали больше), но не больше DEFAULT_SHARD_BYTES.
+    """
+    total = sum(os.path.getsize(path) for path in paths)
+    return max(_MIN_PARALLEL_SHARD, min(DEFAULT_SHARD_BYTES, total // max(1, 4 * jobs) + 1))
+
+
+def read_shard(shard: Shard, options: ShardOptions) -> Iterator[pd.DataFrame]:
+    """Чанки DataFrame из строк, начинающихся в [shard.start, shard.end)."""
+    selection = Selection(**options.selection) if options.selection else None
+    if detect_compression(shard.path) is not None:
+        return read_csv(
+            shard.path, sep=options.sep, encoding=options.encoding, selection=selection, chunksize=options.chunksize
+        )
+    with open(shard.path, "rb") as f:
+        header = f.readline()
+        data_start = f.tell()
+        if shard.start > data_start:
+            # строку, начатую до шарда, дочитывает предыдущий шард
+            f.seek(shard.start - 1)
+            f.readline()
+        pos = f.tell()
+        data = f.read(max(0, shard.end - pos)) if pos < shard.end else b""
+        if data and not data.endswith(b"\n"):
+            data += f.readline()
+    if not data.strip():
+        return iter(())
+    if selection is None:
+        return pd.read_csv(
+            io.BytesIO(header + data), sep=options.sep, encoding=options.encoding, chunksize=options.chunksize
+        )
+    plan = selection.plan(pd.read_csv(io.BytesIO(header), sep=options.sep, encoding=options.encoding).columns)
+    chunks = pd.read_csv(
+        io.BytesIO(header + data),
+        sep=options.sep,
+        encoding=options.encoding,
+        chunksize=options.chunksize,
+        usecols=plan.usecols,
+    )
+    return plan.apply_chunks(chunks)
+
+
+def profile_shard(shard: Dict[str, Any], options: Dict[str, Any]) -> Dict[str, Any]:
+    """Частичная сводка одного шарда (принимает и возвращает JSON-совместимые словари)."""
+    opts = ShardOptions(**options)
+    acc = SummaryAccumulator(example_values_per_column=opts.example_values_per_column, sketch_k=opts.sketch_k)
+    inferences = [ColumnInference(**info) for info in opts.types]
+    for chunk in read_shard(Shard(**shard), opts):
+        acc.update(apply_inferred_types(chunk, inferences))
+    return acc.to_dict()
+
+
+def sample_shard(
+    shard: Dict[str, Any], options: Dict[str, Any], sampler_options: Dict[str, Any]
+) -> Tuple[Dict[str, Any], ReservoirSampler]:
+    """Частичная сводка и выборка строк одного шарда (у каждого шарда свой поток случайных ключей)."""
+    opts = ShardOptions(**options)
+    acc = SummaryAccumulator(example_values_per_column=opts.example_values_per_column, sketch_k=opts.sketch_k)
+    sampler = ReservoirSampler(**sampler_options, stream=shard["index"] + 1)
+    for chunk in read_shard(Shard(**shard), opts):
+        acc.update(chunk)
+        sampler.update(chunk)
+    return acc.to_dict(), sampler
+
+
+def sample_parallel(
+    path: PathLike,
+    jobs: int,
+    options: Optional[ShardOptions] = None,
+    **sampler_options: Any,
+) -> Tuple[SummaryAccumulator, ReservoirSampler]:
+    """
+    Выборка строк (ReservoirSampler(**sampler_options)) и сводка по всему файлу,
+    разобранному в jobs локальных процессах. Выборки и сводки шардов сливаются по порядку шардов.
+    """
+    options = options or ShardOptions()
+    shards = plan_shards([path], parallel_shard_bytes([path], jobs))
+    merged_acc = SummaryAccumulator(
+        example_values_per_column=options.example_values_per_column, sketch_k=options.sketch_k
+    )
+    merged = ReservoirSampler(**sampler_options)
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(sample_shard, asdict(s), asdict(options), sampler_options) for s in shards]
+        for future in futures:
+            acc, sampler = future.result()
+            merged_acc.merge(SummaryAccumulator.from_dict(acc))
+            merged.merge(sampler)
+    return merged_acc, merged
+
+
+# --- TCP-воркер
+
+
+class _WorkerHandler(socketserver.BaseRequestHandler):
+    server: "WorkerServer"
+
+    def handle(self) -> None:
+        try:
+            request = recv_message(self.request)
+        except (ConnectionError, ValueError):
+            return
+        try:
+            if not isinstance(request, dict):
+                raise ValueError("Запрос должен быть JSON-объектом")
+            self.server.check_token(request.get("token"))
+            if request.get("op") == "ping":
+                response = {"ok": True}
+            elif request.get("op") == "profile":
+                shard = dict(request["shard"])
+                shard["path"] = str(self.server.check_path(shard["path"]))
+                response = {"ok": True, "result": profile_shard(shard, request.get("options", {}))}
+            else:
+                response = {"ok": False, "error": f"Неизвестная операция: {request.get('op')}"}
+        except Exception as exc:  # noqa: BLE001
+            response = {"ok": False, "error": f"{type(exc).__name__}: {exc}"}
+        send_message(self.request, response)
+
+
+class WorkerServer(socketserver.ThreadingTCPServer):
+    """
+    TCP-воркер: eda-cli worker --port 7070 или WorkerServer(("127.0.0.1", 0)) в тестах.
+    token — общий секрет, без которого запросы отклоняются; data_root — каталог,
+    вне которого воркер не читает файлы.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(
+        self, address: Tuple[str, int], token: Optional[str] = None, data_root: Optional[PathLike] = None
+    ) -> None:
+        self.token = token
+        self.data_root = Path(data_root).expanduser().resolve() if data_root else None
+        super().__init__(address, _WorkerHandler)
+
+    @property
+    def endpoint(self) -> str:
+        host, port = self.server_address[:2]
+        return f"{host}:{port}"
+
+    def check_token(self, token: Any) -> None:
+        if self.token is None:
+            return
+        if not isinstance(token, str) or not hmac.compare_digest(token.encode(), self.token.encode()):
+            raise PermissionError("Неверный токен воркера")
+
+    def check_path(self, path: str) -> Path:
+        resolved = Path(path).expanduser().resolve()
+        if self.data_root is not None and not resolved.is_relative_to(self.data_root):
+            raise PermissionError(f"Путь вне каталога данных воркера: {path}")
+        return resolved
+
+
+def is_loopback(host: str) -> bool:
+    """True для localhost и loopback-адресов (127.0.0.0/8, ::1)."""
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def parse_endpoint(endpoint: str) -> Tuple[str, int]:
+    """'host:port' (или просто host — порт по умолчанию) -> (host, port)."""
+    host, _, port = endpoint.rpartition(":")
+    if not host:
+        return endpoint, DEFAULT_PORT
+    return host, int(port)
+
+
+def call_worker(
+    endpoint: str, request: Dict[str, Any], timeout: float = DEFAULT_TIMEOUT, token: Optional[str] = None
+) -> Any:
+    if token is not None:
+        request = {**request, "token": token}
+    with socket.create_connection(parse_endpoint(endpoint), timeout=timeout) as sock:
+        send_message(sock, request)
+        response = recv_message(sock)
+    if not response.get("ok"):
+        raise ShardError(response.get("error", "ошибка воркера"))
+    return response.get("result")
+
+
+# --- координатор
+
+
+@dataclass
+class _Task:
+    shard: Shard
+    attempt: int = 0
+    failed_on: Set[str] = field(default_factory=set)
+
+
+class ShardCoordinator:
+    """
+    Раздаёт шарды воркерам и сливает частичные сводки.
+
+    Каждый воркер обслуживается своим потоком, который берёт следующий шард
+    из общего списка, поэтому быстрые воркеры получают больше шардов. Потоки ждут
+    на условии (новый шард в списке, завершение, выбывший воркер), а не опрашивают очередь.
+    Повтор упавшего шарда достаётся воркеру, на котором шард ещё не падал; если он падал
+    на всех оставшихся — любому. Воркер с _WORKER_FAILURE_LIMIT ошибками подряд выбывает.
+    """
+
+    def __init__(
+        self,
+        workers: Sequence[str] = (),
+        processes: Optional[int] = None,
+        max_retries: int = DEFAULT_RETRIES,
+        timeout: float = DEFAULT_TIMEOUT,
+        token: Optional[str] = None,
+    ) -> None:
+        self.workers = list(workers)
+        self.processes = processes or os.cpu_count() or 1
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.token = token
+        self.failures: List[Dict[str, Any]] = []
+
+    def _run_shard(self, endpoint: Optional[str], shard: Shard, options: ShardOptions, pool) -> Dict[str, Any]:
+        if endpoint is None:
+            return pool.submit(profile_shard, asdict(shard), asdict(options)).result()
+        request = {"op": "profile", "shard": asdict(shard), "options": asdict(options)}
+        return call_worker(endpoint, request, timeout=self.timeout, token=self.token)
+
+    def run(self, shards: Sequence[Shard], options: Optional[ShardOptions] = None) -> SummaryAccumulator:
+        options = options or ShardOptions()
+        endpoints: List[Optional[str]] = list(self.workers) if self.workers else [None] * self.processes
+        pending = [_Task(shard) for shard in shards]
+        results: Dict[int, Dict[str, Any]] = {}
+        state: Dict[str, Any] = {"remaining": len(shards), "fatal": None}
+        live = [endpoint or "local" for endpoint in endpoints]
+        changed = threading.Condition()
+        self.failures = []
+
+        def take(name: str) -> Optional[_Task]:
+            # вызывается под changed
+            for i, task in enumerate(pending):
+                if name not in task.failed_on or all(worker in task.failed_on for worker in live):
+                    return pending.pop(i)
+            return None
+
+        def loop(endpoint: Optional[str], pool) -> None:
+            name = endpoint or "local"
+            consecutive = 0
+            while True:
+                with changed:
+                    task = None
+                    while state["remaining"] and state["fatal"] is None:
+                        task = take(name)
+                        if task is not None:
+                            break
+                        changed.wait()
+                    if task is None:
+                        return
+                shard = task.shard
+                try:
+                    result = self._run_shard(endpoint, shard, options, pool)
+                except Exception as exc:  # noqa: BLE001
+                    consecutive += 1
+                    with changed:
+                        self.failures.append(
+                            {"shard": shard.index, "worker": name, "attempt": task.attempt, "error": str(exc)}
+                        )
+                        if task.attempt >= self.max_retries:
+                            state["fatal"] = ShardError(
+                                f"Шард {shard.index} ({shard.path}:{shard.start}-{shard.end}) "
+                                f"не посчитан после {task.attempt + 1} попыток: {exc}"
+                            )
+                        task.attempt += 1
+                        task.failed_on.add(name)
+                        pending.append(task)
+                        if consecutive >= _WORKER_FAILURE_LIMIT:
+                            live.remove(name)
+                        changed.notify_all()
+                    if consecutive >= _WORKER_FAILURE_LIMIT:
+                        return
+                    continue
+                consecutive = 0
+                with changed:
+                    results[shard.index] = result
+                    state["remaining"] -= 1
+                    changed.notify_all()
+
+        pool = None if self.workers else ProcessPoolExecutor(max_workers=self.processes)
+        try:
+            threads = [threading.Thread(target=loop, args=(ep, pool), daemon=True) for ep in endpoints]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+
+        if state["fatal"] is not None:
+            raise state["fatal"]
+        if state["remaining"]:
+            raise ShardError(f"Не осталось рабочих воркеров, не посчитано шардов: {state['remaining']}")
+
+        merged = SummaryAccumulator(
+            example_values_per_column=options.example_values_per_column, sketch_k=options.sketch_k
+        )
+        for index in sorted(results):
+            merged.merge(SummaryAccumulator.from_dict(results[index]))
+        return merged
+
+
+def profile_sharded(
+    paths: Sequence[PathLike],
+    workers: Sequence[str] = (),
+    processes: Optional[int] = None,
+    shard_bytes: int = DEFAULT_SHARD_BYTES,
+    max_retries: int = DEFAULT_RETRIES,
+    timeout: float = DEFAULT_TIMEOUT,
+    options: Optional[ShardOptions] = None,
+    token: Optional[str] = None,
+) -> SummaryAccumulator:
+    """Сливаемая сводка по файлам, посчитанная шардами на воркерах (или локальных процессах)."""
+    coordinator = ShardCoordinator(workers, processes=processes, max_retries=max_retries, timeout=timeout, token=token)
+    return coordinator.run(plan_shards(paths, shard_bytes), options)
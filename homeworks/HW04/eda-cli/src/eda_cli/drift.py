@@ -0,0 +1,251 @@
+"""
+Сохранённые сводки (summary.json) и сравнение двух сводок на дрейф.
+
+SummarySnapshot = DatasetSummary + KLL-скетчи числовых колонок + счётчики
+самых частых значений строковых колонок. Этого достаточно, чтобы сравнивать
+датасеты без повторного чтения данных:
+
+- числовые колонки: PSI по бинам-квантилям эталонной сводки и статистика
+  Колмогорова-Смирнова — обе по функциям распределения из скетчей;
+- строковые колонки: PSI по top-k значениям (остальное — в корзине «прочее»)
+  и сдвиги top-k (какие значения вошли в топ/выпали из него);
+- для всех колонок: изменение доли пропусков, числа уникальных и типа.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+from pandas.api import types as ptypes
+
+from .accumulate import SummaryAccumulator
+from .core import DatasetSummary, summarize_dataset
+from .sketch import DEFAULT_K, KLLSketch
+
+PathLike = Union[str, Path]
+
+SNAPSHOT_FORMAT = "eda-cli-summary"
+SNAPSHOT_VERSION = 1
+DEFAULT_TOP_K = 20
+
+DEFAULT_BINS = 10
+PSI_THRESHOLD = 0.2  # PSI >= 0.2 — заметный сдвиг распределения
+KS_THRESHOLD = 0.1
+MISSING_THRESHOLD = 0.05
+_EPS = 1e-4  # защита PSI от пустых бинов
+
+
+@dataclass
+class SummarySnapshot:
+    """Сводка, пригодная для сохранения на диск и сравнения с другой сводкой."""
+
+    summary: DatasetSummary
+    top_values: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    source: str = ""
+
+    def to_dict(self) -> Dict[str, Any]:
+        sketches = {
+            str(name): sketch.to_dict()
+            for name, sketch in zip(self.summary.names.tolist(), self.summary.sketches.tolist())
+            if sketch is not None
+        }
+        return {
+            "format": SNAPSHOT_FORMAT,
+            "version": SNAPSHOT_VERSION,
+            "source": self.source,
+            "summary": self.summary.to_dict(),
+            "sketches": sketches,
+            "top_values": {str(k): v for k, v in self.top_values.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SummarySnapshot":
+        if data.get("format") != SNAPSHOT_FORMAT:
+            raise ValueError("Это не сохранённая сводка eda-cli (нет format=eda-cli-summary)")
+        if int(data.get("version", 0)) > SNAPSHOT_VERSION:
+            raise ValueError(f"Неподдерживаемая версия сводки: {data.get('version')}")
+        return cls(
+            summary=DatasetSummary.from_dict(data["summary"], sketches=data.get("sketches")),
+            top_values={
+                k: {str(v): int(c) for v, c in counts.items()} for k, counts in data.get("top_values", {}).items()
+            },
+            source=data.get("source", ""),
+        )
+
+    def save(self, path: PathLike) -> Path:
+        p = Path(path)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        p.write_text(json.dumps(self.to_dict(), ensure_ascii=False), encoding="utf-8")
+        return p
+
+    @classmethod
+    def load(cls, path: PathLike) -> "SummarySnapshot":
+        return cls.from_dict(json.loads(Path(path).read_text(encoding="utf-8")))
+
+
+def dataframe_top_values(
+    df: pd.DataFrame,
+    top_k: int = DEFAULT_TOP_K,
+    value_counts: Optional[Callable[[Any], pd.Series]] = None,
+) -> Dict[str, Dict[str, int]]:
+    """Счётчики top_k самых частых значений для нечисловых колонок (value_counts — готовые частоты)."""
+    result: Dict[str, Dict[str, int]] = {}
+    for name in df.columns:
+        s = df[name]
+        if ptypes.is_numeric_dtype(s):
+            continue
+        vc = (value_counts(name) if value_counts is not None else s.value_counts(dropna=True)).head(top_k)
+        result[str(name)] = dict(zip(vc.index.astype(str), vc.to_numpy().tolist()))
+    return result
+
+
+def snapshot_dataframe(
+    df: pd.DataFrame,
+    top_k: int = DEFAULT_TOP_K,
+    sketch_k: int = DEFAULT_K,
+    source: str = "",
+    summary: Optional[DatasetSummary] = None,
+    value_counts: Optional[Callable[[Any], pd.Series]] = None,
+) -> SummarySnapshot:
+    """
+    SummarySnapshot по DataFrame (готовые summary и частоты value_counts(name)
+    можно передать, чтобы не считать заново).
+    """
+    return SummarySnapshot(
+        summary=summary if summary is not None else summarize_dataset(df, sketch_k=sketch_k),
+        top_values=dataframe_top_values(df, top_k=top_k, value_counts=value_counts),
+        source=source,
+    )
+
+
+def snapshot_chunks(
+    chunks: Iterable[pd.DataFrame],
+    top_k: int = DEFAULT_TOP_K,
+    sketch_k: int = DEFAULT_K,
+    source: str = "",
+) -> SummarySnapshot:
+    """SummarySnapshot по потоку чанков (для файлов, которые не помещаются в память)."""
+    acc = SummaryAccumulator(sketch_k=sketch_k).update_many(chunks)
+    return SummarySnapshot(summary=acc.finalize(), top_values=acc.top_values(top_k), source=source)
+
+
+def population_stability_index(expected: np.ndarray, actual: np.ndarray) -> float:
+    """PSI = sum((a - e) * ln(a / e)) по долям в одних и тех же бинах."""
+    e = np.clip(np.asarray(expected, dtype=float), _EPS, None)
+    a = np.clip(np.asarray(actual, dtype=float), _EPS, None)
+    return float(np.sum((a - e) * np.log(a / e)))
+
+
+def numeric_drift(reference: KLLSketch, current: KLLSketch, bins: int = DEFAULT_BINS) -> Dict[str, float]:
+    """PSI по квантильным бинам эталона и KS-статистика по двум скетчам."""
+    edges = np.unique(reference.quantiles(np.linspace(0.0, 1.0, bins + 1)[1:-1]))
+    ref_cdf = np.concatenate([[0.0], reference.cdf(edges), [1.0]])
+    cur_cdf = np.concatenate([[0.0], current.cdf(edges), [1.0]])
+    points = np.concatenate([reference.retained(), current.retained()])
+    ks = float(np.max(np.abs(reference.cdf(points) - current.cdf(points)))) if points.size else 0.0
+    return {"psi": population_stability_index(np.diff(ref_cdf), np.diff(cur_cdf)), "ks": ks}
+
+
+def categorical_drift(
+    reference: Dict[str, int],
+    ref_non_null: int,
+    current: Dict[str, int],
+    cur_non_null: int,
+    top_k: int = 10,
+) -> Dict[str, Any]:
+    """PSI по top-значениям (+ корзина «прочее») и сдвиги top_k."""
+    values = sorted(set(reference) | set(current))
+    ref = np.array([reference.get(v, 0) for v in values], dtype=float) / max(ref_non_null, 1)
+    cur = np.array([current.get(v, 0) for v in values], dtype=float) / max(cur_non_null, 1)
+    # значения вне сохранённого топа попадают в «прочее»
+    ref_p = np.append(ref, max(0.0, 1.0 - ref.sum()))
+    cur_p = np.append(cur, max(0.0, 1.0 - cur.sum()))
+
+    ref_top = [v for v, _ in sorted(reference.items(), key=lambda kv: kv[1], reverse=True)[:top_k]]
+    cur_top = [v for v, _ in sorted(current.items(), key=lambda kv: kv[1], reverse=True)[:top_k]]
+    delta = cur - ref
+    j = int(np.argmax(np.abs(delta))) if values else -1
+    return {
+        "psi": population_stability_index(ref_p, cur_p),
+        "top_entered": [v for v in cur_top if v not in ref_top],
+        "top_left": [v for v in ref_top if v not in cur_top],
+        "max_share_delta": float(delta[j]) if j >= 0 else 0.0,
+        "max_share_delta_value": values[j] if j >= 0 else None,
+    }
+
+
+def compare_snapshots(
+    reference: SummarySnapshot,
+    current: SummarySnapshot,
+    bins: int = DEFAULT_BINS,
+    top_k: int = 10,
+    psi_threshold: float = PSI_THRESHOLD,
+    ks_threshold: float = KS_THRESHOLD,
+    missing_threshold: float = MISSING_THRESHOLD,
+) -> Dict[str, Any]:
+    """
+    Дрейф по колонкам между эталонной (reference) и текущей (current) сводками.
+    Колонка помечается drifted, если PSI >= psi_threshold, KS >= ks_threshold,
+    доля пропусков изменилась на missing_threshold и больше или сменился тип.
+    """
+    ref, cur = reference.summary, current.summary
+    ref_names = [str(n) for n in ref.names.tolist()]
+    cur_names = [str(n) for n in cur.names.tolist()]
+    cur_pos = {n: i for i, n in enumerate(cur_names)}
+    ref_set = set(ref_names)
+
+    columns: List[Dict[str, Any]] = []
+    for i, name in enumerate(ref_names):
+        j = cur_pos.get(name)
+        if j is None:
+            continue
+        item: Dict[str, Any] = {
+            "name": name,
+            "dtype_reference": ref.dtypes[i],
+            "dtype_current": cur.dtypes[j],
+            "dtype_changed": ref.dtypes[i] != cur.dtypes[j],
+            "missing_share_reference": float(ref.missing_share[i]),
+            "missing_share_current": float(cur.missing_share[j]),
+            "missing_share_delta": float(cur.missing_share[j] - ref.missing_share[i]),
+            "unique_reference": int(ref.unique[i]),
+            "unique_current": int(cur.unique[j]),
+            "unique_change": int(cur.unique[j] - ref.unique[i]),
+            "unique_ratio": float(cur.unique[j] / ref.unique[i]) if ref.unique[i] else None,
+            "psi": None,
+            "ks": None,
+        }
+        ref_sketch, cur_sketch = ref.sketches[i], cur.sketches[j]
+        if ref_sketch is not None and cur_sketch is not None and ref_sketch.n and cur_sketch.n:
+            item.update(numeric_drift(ref_sketch, cur_sketch, bins=bins))
+        elif name in reference.top_values and name in current.top_values:
+            item.update(
+                categorical_drift(
+                    reference.top_values[name],
+                    int(ref.non_null[i]),
+                    current.top_values[name],
+                    int(cur.non_null[j]),
+                    top_k=top_k,
+                )
+            )
+        item["drifted"] = bool(
+            item["dtype_changed"]
+            or abs(item["missing_share_delta"]) >= missing_threshold
+            or (item["psi"] is not None and item["psi"] >= psi_threshold)
+            or (item["ks"] is not None and item["ks"] >= ks_threshold)
+        )
+        columns.append(item)
+
+    return {
+        "reference": {"source": reference.source, "n_rows": ref.n_rows, "n_cols": ref.n_cols},
+        "current": {"source": current.source, "n_rows": cur.n_rows, "n_cols": cur.n_cols},
+        "added_columns": [n for n in cur_names if n not in ref_set],
+        "removed_columns": [n for n in ref_names if n not in cur_pos],
+        "columns": columns,
+        "drifted_columns": [c["name"] for c in columns if c["drifted"]],
+        "thresholds": {"psi": psi_threshold, "ks": ks_threshold, "missing_share": missing_threshold},
+    }
@@ -0,0 +1,206 @@
+"""
+Поиск дубликатов строк и нарушений составных ключей через 64-битные хэши.
+
+Каждая строка (или набор ключевых колонок) хэшируется векторно
+pd.util.hash_pandas_object; число дубликатов = строк - различных хэшей.
+Хэши раскладываются по партициям по старшим битам; если в памяти набирается
+больше memory_limit хэшей, буферы партиций сбрасываются на диск, а при подсчёте
+каждая партиция загружается отдельно. Так память ограничена размером одной
+партиции, и DuplicateDetector работает на чанках файла любого размера.
+"""
+
+from __future__ import annotations
+
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from pandas.api import types as ptypes
+
+DEFAULT_PARTITIONS = 64
+DEFAULT_MEMORY_LIMIT = 8_000_000  # хэшей в памяти (~64 МБ) до сброса на диск
+
+
+def parse_key_spec(spec: str) -> List[str]:
+    """'country, city' -> ['country', 'city']."""
+    return [part.strip() for part in spec.split(",") if part.strip()]
+
+
+def hash_rows(df: pd.DataFrame) -> np.ndarray:
+    """
+    64-битный хэш каждой строки. Числовые колонки приводятся к float64, чтобы
+    одно и то же значение давало один хэш в чанках с разным выведенным типом (int/float).
+    """
+    if df.shape[1] == 0:
+        return np.zeros(len(df), dtype=np.uint64)
+    normalized = {}
+    for i, name in enumerate(df.columns):
+        s = df.iloc[:, i]
+        if ptypes.is_numeric_dtype(s):
+            s = pd.Series(s.to_numpy(dtype=float, na_value=np.nan) + 0.0, index=s.index)
+        normalized[i] = s
+    frame = pd.DataFrame(normalized, copy=False)
+    return pd.util.hash_pandas_object(frame, index=False).to_numpy(dtype=np.uint64)
+
+
+class PartitionedHashSet:
+    """Множество 64-битных хэшей с разбиением на партиции и сбросом на диск."""
+
+    def __init__(
+        self,
+        n_partitions: int = DEFAULT_PARTITIONS,
+        memory_limit: int = DEFAULT_MEMORY_LIMIT,
+        spill_dir: Optional[Path] = None,
+    ) -> None:
+        if n_partitions < 1 or n_partitions & (n_partitions - 1):
+            raise ValueError("n_partitions должно быть степенью двойки")
+        self.n_partitions = n_partitions
+        self._shift = np.uint64(64 - max(1, n_partitions.bit_length() - 1))
+        self.memory_limit = memory_limit
+        self._spill_root = spill_dir
+        self._spill_dir: Optional[Path] = None
+        self._buffers: List[List[np.ndarray]] = [[] for _ in range(n_partitions)]
+        self._buffered = 0
+        self.total = 0
+
+    def add(self, hashes: np.ndarray) -> None:
+        if hashes.size == 0:
+            return
+        self.total += int(hashes.size)
+        if self.n_partitions == 1:
+            self._buffers[0].append(hashes)
+        else:
+            part = (hashes >> self._shift).astype(np.intp)
+            order = np.argsort(part, kind="stable")
+            bounds = np.searchsorted(part[order], np.arange(self.n_partitions + 1))
+            sorted_hashes = hashes[order]
+            for p in range(self.n_partitions):
+                lo, hi = bounds[p], bounds[p + 1]
+                if hi > lo:
+                    self._buffers[p].append(sorted_hashes[lo:hi])
+        self._buffered += int(hashes.size)
+        if self._buffered > self.memory_limit:
+            self._spill()
+
+    def _spill(self) -> None:
+        if self._spill_dir is None:
+            self._spill_dir = Path(tempfile.mkdtemp(prefix="eda-dups-", dir=self._spill_root))
+        for p, chunks in enumerate(self._buffers):
+            if chunks:
+                # в партиции храним только различные хэши — файл растёт медленнее
+                with (self._spill_dir / f"part-{p:04d}.u64").open("ab") as f:
+                    np.unique(np.concatenate(chunks)).tofile(f)
+                self._buffers[p] = []
+        self._buffered = 0
+
+    def _partition(self, p: int) -> np.ndarray:
+        parts = list(self._buffers[p])
+        if self._spill_dir is not None:
+            path = self._spill_dir / f"part-{p:04d}.u64"
+            if path.exists():
+                parts.append(np.fromfile(path, dtype=np.uint64))
+        return np.concatenate(parts) if parts else np.empty(0, dtype=np.uint64)
+
+    def count_distinct(self) -> int:
+        return sum(int(np.unique(self._partition(p)).size) for p in range(self.n_partitions))
+
+    @property
+    def spilled(self) -> bool:
+        return self._spill_dir is not None
+
+    def close(self) -> None:
+        if self._spill_dir is not None:
+            shutil.rmtree(self._spill_dir, ignore_errors=True)
+            self._spill_dir = None
+        self._buffers = [[] for _ in range(self.n_partitions)]
+        self._buffered = 0
+
+
+class DuplicateDetector:
+    """
+    Дубликаты строк и нарушения составных ключей по потоку чанков.
+
+    det = DuplicateDetector(keys=[["user_id"], ["country", "city"]])
+    for chunk in pd.read_csv(path, chunksize=100_000):
+        det.update(chunk)
+    info = det.result()
+
+    Строки с пропуском хотя бы в одной ключевой колонке в проверку ключа
+    не входят и считаются отдельно (null_key_rows).
+    """
+
+    def __init__(
+        self,
+        keys: Sequence[Sequence[str]] = (),
+        n_partitions: int = DEFAULT_PARTITIONS,
+        memory_limit: int = DEFAULT_MEMORY_LIMIT,
+        spill_dir: Optional[Path] = None,
+    ) -> None:
+        self.keys = [list(k) for k in keys if k]
+        self.n_rows = 0
+        self._rows = PartitionedHashSet(n_partitions, memory_limit, spill_dir)
+        self._key_sets = [PartitionedHashSet(n_partitions, memory_limit, spill_dir) for _ in self.keys]
+        self._null_key_rows = [0] * len(self.keys)
+
+    def update(self, chunk: pd.DataFrame) -> "DuplicateDetector":
+        missing = sorted({c for key in self.keys for c in key} - set(chunk.columns))
+        if missing:
+            raise KeyError(f"Ключевые колонки не найдены: {missing}")
+        self.n_rows += len(chunk)
+        self._rows.add(hash_rows(chunk))
+        for i, key in enumerate(self.keys):
+            sub = chunk[key]
+            complete = sub.notna().all(axis=1).to_numpy()
+            self._null_key_rows[i] += int((~complete).sum())
+            self._key_sets[i].add(hash_rows(sub[complete]))
+        return self
+
+    def update_many(self, chunks: Iterable[pd.DataFrame]) -> "DuplicateDetector":
+        for chunk in chunks:
+            self.update(chunk)
+        return self
+
+    def result(self) -> Dict[str, Any]:
+        duplicate_rows = self._rows.total - self._rows.count_distinct()
+        key_violations = []
+        for key, hashes, null_rows in zip(self.keys, self._key_sets, self._null_key_rows):
+            dup = hashes.total - hashes.count_distinct()
+            key_violations.append(
+                {
+                    "columns": key,
+                    "duplicate_rows": dup,
+                    "duplicate_share": dup / hashes.total if hashes.total else 0.0,
+                    "null_key_rows": null_rows,
+                }
+            )
+        return {
+            "n_rows": self.n_rows,
+            "duplicate_rows": duplicate_rows,
+            "duplicate_row_share": duplicate_rows / self.n_rows if self.n_rows else 0.0,
+            "key_violations": key_violations,
+        }
+
+    def close(self) -> None:
+        self._rows.close()
+        for hashes in self._key_sets:
+            hashes.close()
+
+
+def find_duplicates(
+    data: Any,
+    keys: Sequence[Sequence[str]] = (),
+    memory_limit: int = DEFAULT_MEMORY_LIMIT,
+) -> Dict[str, Any]:
+    """Дубликаты по DataFrame или итерируемому набору чанков."""
+    detector = DuplicateDetector(keys=keys, memory_limit=memory_limit)
+    try:
+        if isinstance(data, pd.DataFrame):
+            detector.update(data)
+        else:
+            detector.update_many(data)
+        return detector.result()
+    finally:
+        detector.close()
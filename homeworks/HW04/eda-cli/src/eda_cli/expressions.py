@@ -0,0 +1,228 @@
+"""
+Безопасные выражения над колонками: правила type: expression и --where.
+
+Выражение разбирается модулем ast и вычисляется напрямую над колонками DataFrame,
+без DataFrame.eval: разрешены только имена колонок (в том числе в `обратных кавычках`),
+литералы (числа, строки, True/False/None и их списки для in), сравнения, арифметика
+и логические операторы (and/or/not и &/|/~). Локальные переменные (@x), атрибуты,
+вызовы функций, индексация и прочее отклоняются ещё при разборе — ExpressionError.
+Арифметика над одними литералами не должна расти без предела (10**10**10, 'x' * 10**10):
+целые литералы ограничены int64, степень — только колонка или литерал в небольшой
+литеральной степени, умножение со строками запрещено:
+
+    expr = compile_expression("purchases <= sessions and `plan type` in ['Pro', 'Basic']")
+    expr.columns                    # ['purchases', 'sessions', 'plan type']
+    mask = expr.evaluate(df)        # pd.Series того же индекса
+"""
+
+from __future__ import annotations
+
+import ast
+import io
+import operator
+import re
+import tokenize
+from typing import Any, Callable, Dict, List
+
+import pandas as pd
+
+
+class ExpressionError(ValueError):
+    """Выражение содержит недопустимые конструкции или не вычисляется на данных."""
+
+
+_BACKTICK = re.compile(r"`([^`]*)`")
+_PLACEHOLDER = "__eda_col_{}__"
+_MAX_INT_LITERAL = 2**63 - 1
+_MAX_EXPONENT = 64
+
+_BIN_OPS: Dict[type, Callable[[Any, Any], Any]] = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+}
+_UNARY_OPS: Dict[type, Callable[[Any], Any]] = {
+    ast.USub: operator.neg,
+    ast.UAdd: operator.pos,
+    ast.Invert: operator.invert,
+    ast.Not: operator.invert,
+}
+_COMPARE_OPS: Dict[type, Callable[[Any, Any], Any]] = {
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+}
+
+
+def _replace_booleans(source: str) -> str:
+    """& и | — как and и or (приоритет ниже сравнений), как в DataFrame.eval."""
+    try:
+        tokens = [
+            (tokenize.NAME, {"&": "and", "|": "or"}[tok.string]) if tok.type == tokenize.OP and tok.string in "&|"
+            else (tok.type, tok.string)
+            for tok in tokenize.generate_tokens(io.StringIO(source).readline)
+        ]
+    except (tokenize.TokenError, SyntaxError):
+        return source  # ошибку покажет ast.parse
+    return tokenize.untokenize(tokens)
+
+
+def _literal(node: ast.AST) -> bool:
+    if isinstance(node, ast.Constant):
+        return node.value is None or isinstance(node.value, (bool, int, float, str))
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+        return _literal(node.operand)
+    return False
+
+
+def _number(node: ast.AST) -> Any:
+    """Значение числового литерала (с унарным знаком) или None."""
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+        value = _number(node.operand)
+        return None if value is None else (-value if isinstance(node.op, ast.USub) else value)
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+        return node.value
+    return None
+
+
+def _has_string(node: ast.AST) -> bool:
+    return any(isinstance(n, ast.Constant) and isinstance(n.value, str) for n in ast.walk(node))
+
+
+def _has_name(node: ast.AST) -> bool:
+    return any(isinstance(n, ast.Name) for n in ast.walk(node))
+
+
+class CompiledExpression:
+    """Проверенное выражение: колонки, на которые оно ссылается, и вычисление над DataFrame."""
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        names: List[str] = []
+
+        def substitute(match: "re.Match[str]") -> str:
+            names.append(match.group(1))
+            return _PLACEHOLDER.format(len(names) - 1)
+
+        source = _BACKTICK.sub(substitute, text)
+        if "@" in source:
+            raise ExpressionError(f"Локальные переменные (@имя) в выражениях не поддерживаются: {text!r}")
+        self._quoted = {_PLACEHOLDER.format(i): name for i, name in enumerate(names)}
+        try:
+            self._tree = ast.parse(_replace_booleans(source.strip()), mode="eval")
+        except SyntaxError as exc:
+            raise ExpressionError(f"Синтаксическая ошибка в выражении {text!r}: {exc.msg}") from exc
+        self.columns: List[str] = []
+        self._check(self._tree.body)
+
+    def _column(self, name: str) -> str:
+        return self._quoted.get(name, name)
+
+    def _check(self, node: ast.AST) -> None:
+        if isinstance(node, ast.Name):
+            column = self._column(node.id)
+            if column not in self.columns:
+                self.columns.append(column)
+        elif _literal(node):
+            value = _number(node)
+            if isinstance(value, int) and abs(value) > _MAX_INT_LITERAL:
+                raise ExpressionError(f"Слишком большой числовой литерал в выражении {self.text!r}")
+        elif isinstance(node, ast.BoolOp):
+            for value in node.values:
+                self._check(value)
+        elif isinstance(node, ast.BinOp) and type(node.op) in _BIN_OPS:
+            self._check_binop(node)
+            self._check(node.left)
+            self._check(node.right)
+        elif isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OPS:
+            self._check(node.operand)
+        elif isinstance(node, ast.Compare):
+            self._check(node.left)
+            for op, right in zip(node.ops, node.comparators):
+                if isinstance(op, (ast.In, ast.NotIn)):
+                    if not (isinstance(right, (ast.List, ast.Tuple, ast.Set)) and all(map(_literal, right.elts))):
+                        raise ExpressionError(f"Справа от in ожидается список литералов: {self.text!r}")
+                elif type(op) in _COMPARE_OPS:
+                    self._check(right)
+                else:
+                    raise ExpressionError(f"Недопустимое сравнение {type(op).__name__} в выражении {self.text!r}")
+        else:
+            raise ExpressionError(
+                f"Недопустимая конструкция {type(node).__name__} в выражении {self.text!r}: разрешены только "
+                "колонки, литералы, сравнения, арифметика и логические операторы"
+            )
+
+    def _check_binop(self, node: ast.BinOp) -> None:
+        """Запрещает арифметику, результат которой растёт без предела ещё до обращения к данным."""
+        if isinstance(node.op, ast.Pow):
+            exponent = _number(node.right)
+            if exponent is None or abs(exponent) > _MAX_EXPONENT:
+                raise ExpressionError(
+                    f"Показатель степени должен быть числовым литералом не больше {_MAX_EXPONENT} по модулю: "
+                    f"{self.text!r}"
+                )
+            if not (_has_name(node.left) or _number(node.left) is not None):
+                raise ExpressionError(f"Основание степени — колонка или числовой литерал: {self.text!r}")
+        if isinstance(node.op, (ast.Mult, ast.Pow)) and (_has_string(node.left) or _has_string(node.right)):
+            raise ExpressionError(f"Умножение и степень со строками не поддерживаются: {self.text!r}")
+
+    def evaluate(self, df: pd.DataFrame) -> Any:
+        """Результат над колонками df (обычно логическая pd.Series); нет колонки — ExpressionError."""
+        missing = [c for c in self.columns if c not in df.columns]
+        if missing:
+            raise ExpressionError(f"Нет колонок: {', '.join(missing)}")
+        try:
+            return self._eval(self._tree.body, df)
+        except ExpressionError:
+            raise
+        except Exception as exc:  # noqa: BLE001 - ошибки типов зависят от данных
+            raise ExpressionError(f"Не удалось вычислить {self.text!r}: {exc}") from exc
+
+    def _eval(self, node: ast.AST, df: pd.DataFrame) -> Any:
+        if isinstance(node, ast.Name):
+            return df[self._column(node.id)]
+        if isinstance(node, ast.Constant):
+            return node.value
+        if isinstance(node, ast.BoolOp):
+            combine = operator.and_ if isinstance(node.op, ast.And) else operator.or_
+            result = self._eval(node.values[0], df)
+            for value in node.values[1:]:
+                result = combine(result, self._eval(value, df))
+            return result
+        if isinstance(node, ast.BinOp):
+            return _BIN_OPS[type(node.op)](self._eval(node.left, df), self._eval(node.right, df))
+        if isinstance(node, ast.UnaryOp):
+            operand = self._eval(node.operand, df)
+            if isinstance(node.op, ast.Not) and not isinstance(operand, pd.Series):
+                return not operand
+            return _UNARY_OPS[type(node.op)](operand)
+        # ast.Compare: цепочка a < b < c — попарные сравнения, объединённые через &
+        result = None
+        left = self._eval(node.left, df)
+        for op, right_node in zip(node.ops, node.comparators):
+            if isinstance(op, (ast.In, ast.NotIn)):
+                values = [ast.literal_eval(elt) for elt in right_node.elts]
+                part = left.isin(values) if isinstance(left, pd.Series) else left in values
+                if isinstance(op, ast.NotIn):
+                    part = ~part if isinstance(part, pd.Series) else not part
+                right = None
+            else:
+                right = self._eval(right_node, df)
+                part = _COMPARE_OPS[type(op)](left, right)
+            result = part if result is None else result & part
+            left = right
+        return result
+
+
+def compile_expression(text: str) -> CompiledExpression:
+    """Разбирает и проверяет выражение; недопустимые конструкции — ExpressionError."""
+    if not isinstance(text, str) or not text.strip():
+        raise ExpressionError("Пустое выражение")
+    return CompiledExpression(text)
@@ -0,0 +1,142 @@
+"""
+Бинарные форматы результатов для HTTP API: Arrow IPC stream и Parquet.
+
+Табличные результаты (summary по колонкам, пропуски, top-k категорий)
+собираются сразу в pyarrow.Table, минуя списки python-словарей,
+и отдаются клиенту в формате, выбранном по заголовку Accept.
+pyarrow — опциональная зависимость (pip install "s03[arrow]").
+"""
+
+from __future__ import annotations
+
+import io
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from .core import STAT_FIELDS, DatasetSummary
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - зависит от окружения
+    pa = None
+    pq = None
+
+JSON_MEDIA_TYPE = "application/json"
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+PARQUET_MEDIA_TYPE = "application/vnd.apache.parquet"
+
+# media type -> внутреннее имя формата (x-parquet — распространённый неофициальный вариант)
+_MEDIA_TYPES = {
+    JSON_MEDIA_TYPE: "json",
+    ARROW_STREAM_MEDIA_TYPE: "arrow",
+    PARQUET_MEDIA_TYPE: "parquet",
+    "application/x-parquet": "parquet",
+}
+FORMAT_MEDIA_TYPES = {"arrow": ARROW_STREAM_MEDIA_TYPE, "parquet": PARQUET_MEDIA_TYPE}
+
+
+def negotiate_format(accept: Optional[str]) -> Optional[str]:
+    """
+    Выбирает формат ответа по Accept: json | arrow | parquet.
+    Пустой Accept и */* означают json; None — ни один тип не поддерживается.
+    """
+    if not accept:
+        return "json"
+    candidates = []
+    for position, token in enumerate(accept.split(",")):
+        media_type, _, params = token.strip().partition(";")
+        media_type = media_type.strip().lower()
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if q <= 0:
+            continue
+        if media_type in _MEDIA_TYPES:
+            candidates.append((-q, position, _MEDIA_TYPES[media_type]))
+        elif media_type in ("*/*", "application/*"):
+            candidates.append((-q, position, "json"))
+    if not candidates:
+        return None
+    return min(candidates)[2]
+
+
+def arrow_available() -> bool:
+    return pa is not None
+
+
+def _require_arrow() -> None:
+    if pa is None:
+        raise RuntimeError("Для форматов Arrow/Parquet нужен pyarrow: pip install pyarrow")
+
+
+def summary_to_arrow(summary: DatasetSummary) -> "pa.Table":
+    """DatasetSummary -> pyarrow.Table (одна строка на колонку датасета)."""
+    _require_arrow()
+    no_stats = ~summary.has_stats
+    arrays = {
+        "name": pa.array(summary.names.astype(str), pa.string()),
+        "dtype": pa.array(summary.dtypes, pa.string()),
+        "non_null": pa.array(summary.non_null, pa.int64()),
+        "missing": pa.array(summary.missing, pa.int64()),
+        "missing_share": pa.array(summary.missing_share, pa.float64()),
+        "unique": pa.array(summary.unique, pa.int64()),
+        "example_values": pa.array(summary.example_values, pa.list_(pa.string())),
+        "is_numeric": pa.array(summary.is_numeric, pa.bool_()),
+    }
+    for stat in STAT_FIELDS:
+        arrays[stat] = pa.array(getattr(summary, stat), pa.float64(), mask=no_stats)
+    metadata = {"n_rows": str(summary.n_rows), "n_cols": str(summary.n_cols)}
+    return pa.table(arrays, metadata=metadata)
+
+
+def missing_to_arrow(missing_df: pd.DataFrame) -> "pa.Table":
+    """Результат missing_table -> pyarrow.Table с колонкой column вместо индекса."""
+    _require_arrow()
+    return pa.table(
+        {
+            "column": pa.array(missing_df.index.astype(str), pa.string()),
+            "missing_count": pa.array(missing_df["missing_count"].to_numpy(), pa.int64()),
+            "missing_share": pa.array(missing_df["missing_share"].to_numpy(), pa.float64()),
+        }
+    )
+
+
+def top_categories_to_arrow(top_cats: Dict[str, pd.DataFrame]) -> "pa.Table":
+    """Словарь top_categories -> одна длинная таблица (column, value, count, share)."""
+    _require_arrow()
+    tables = list(top_cats.values())
+    if not tables:
+        tables = [pd.DataFrame({"value": pd.Series([], dtype=object), "count": [], "share": []})]
+    return pa.table(
+        {
+            "column": pa.array(
+                np.repeat(np.array(list(top_cats), dtype=object), [len(t) for t in top_cats.values()]),
+                pa.string(),
+            ),
+            "value": pa.array(np.concatenate([t["value"].to_numpy(dtype=object) for t in tables]), pa.string()),
+            "count": pa.array(np.concatenate([t["count"].to_numpy() for t in tables]), pa.int64()),
+            "share": pa.array(np.concatenate([t["share"].to_numpy() for t in tables]), pa.float64()),
+        }
+    )
+
+
+def render_table(table: "pa.Table", fmt: str) -> bytes:
+    """Сериализует pyarrow.Table в Arrow IPC stream или Parquet."""
+    _require_arrow()
+    sink = io.BytesIO()
+    if fmt == "arrow":
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+    elif fmt == "parquet":
+        pq.write_table(table, sink)
+    else:
+        raise ValueError(f"Неизвестный бинарный формат: {fmt}")
+    return sink.getvalue()
@@ -0,0 +1,175 @@
+"""
+Вывод типов для object-колонок, которые на самом деле числа или даты.
+
+Из-за нескольких «плохих» значений pandas читает числовую колонку как object,
+и дальше она считается категориальной (top_categories, кардинальность и т.п.).
+infer_types берёт выборку непустых значений каждой object-колонки, векторно
+пробует pd.to_numeric и pd.to_datetime и считает долю успешных приведений.
+Колонки, где доля не ниже threshold, apply_inferred_types приводит целиком
+(непреобразуемые значения становятся пропусками) — дальше весь конвейер
+работает уже с числовым/временным типом.
+"""
+
+from __future__ import annotations
+
+import itertools
+import warnings
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import pandas as pd
+from pandas.api import types as ptypes
+
+DEFAULT_THRESHOLD = 0.95
+DEFAULT_SAMPLE_SIZE = 10_000
+MAX_OFFENDING_EXAMPLES = 5
+
+
+@dataclass
+class ColumnInference:
+    column: Any
+    dtype: str
+    sample_size: int
+    numeric_rate: float
+    datetime_rate: float
+    inferred: Optional[str] = None  # "numeric" | "datetime" | None
+    decimal_comma: bool = False
+    offending_examples: List[str] = field(default_factory=list)
+    reason: str = ""
+    # сколько непустых значений стали пропусками при приведении всей колонки (заполняет apply_inferred_types)
+    coerced_to_null: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _to_numeric(values: pd.Series, decimal_comma: bool = False) -> pd.Series:
+    if decimal_comma:
+        values = values.astype(str).str.replace(",", ".", regex=False)
+    return pd.to_numeric(values, errors="coerce")
+
+
+def _to_datetime(values: pd.Series) -> pd.Series:
+    with warnings.catch_warnings():
+        # «не удалось определить формат» — ожидаемо для нестандартных строк
+        warnings.simplefilter("ignore", UserWarning)
+        return pd.to_datetime(values, errors="coerce")
+
+
+def infer_column(
+    s: pd.Series,
+    threshold: float = DEFAULT_THRESHOLD,
+    sample_size: int = DEFAULT_SAMPLE_SIZE,
+    seed: int = 0,
+) -> ColumnInference:
+    """Доли успешного приведения выборки к числу и к дате и итоговое решение."""
+    non_null = s.dropna()
+    if len(non_null) > sample_size:
+        non_null = non_null.sample(n=sample_size, random_state=seed)
+    n = len(non_null)
+    info = ColumnInference(column=s.name, dtype=str(s.dtype), sample_size=n, numeric_rate=0.0, datetime_rate=0.0)
+    if n == 0:
+        info.reason = "нет непустых значений"
+        return info
+    # булевы значения pandas приводит к 0/1 — их не трогаем
+    if non_null.map(type).eq(bool).all():
+        info.reason = "булевы значения"
+        return info
+
+    numeric = _to_numeric(non_null)
+    numeric_ok = numeric.notna()
+    if numeric_ok.mean() < threshold and non_null.astype(str).str.contains(",", regex=False).any():
+        comma = _to_numeric(non_null, decimal_comma=True)
+        if comma.notna().mean() > numeric_ok.mean():
+            numeric, numeric_ok, info.decimal_comma = comma, comma.notna(), True
+    info.numeric_rate = float(numeric_ok.mean())
+
+    if info.numeric_rate >= threshold:
+        text = non_null[numeric_ok].astype(str).str.strip()
+        # коды с ведущими нулями (индексы, артикулы) при приведении к числу теряют смысл
+        if text.str.match(r"^[+-]?0\d").any():
+            info.reason = "ведущие нули — похоже на код, а не число"
+            info.offending_examples = pd.unique(text[text.str.match(r"^[+-]?0\d")])[:MAX_OFFENDING_EXAMPLES].tolist()
+            return info
+        info.inferred = "numeric"
+        bad = non_null[~numeric_ok]
+    else:
+        dates = _to_datetime(non_null.astype(str))
+        dates_ok = dates.notna()
+        info.datetime_rate = float(dates_ok.mean())
+        if info.datetime_rate >= threshold:
+            info.inferred = "datetime"
+            bad = non_null[~dates_ok]
+        else:
+            info.reason = "ни число, ни дата"
+            bad = non_null[~numeric_ok] if info.numeric_rate >= info.datetime_rate else non_null[~dates_ok]
+    info.offending_examples = pd.unique(bad.astype(str))[:MAX_OFFENDING_EXAMPLES].tolist()
+    return info
+
+
+def infer_types(
+    df: pd.DataFrame,
+    threshold: float = DEFAULT_THRESHOLD,
+    sample_size: int = DEFAULT_SAMPLE_SIZE,
+    columns: Optional[Sequence[Any]] = None,
+) -> List[ColumnInference]:
+    """Вывод типов для object-колонок df (или только для columns)."""
+    names = columns if columns is not None else [c for c in df.columns if ptypes.is_object_dtype(df[c])]
+    return [infer_column(df[name], threshold=threshold, sample_size=sample_size) for name in names]
+
+
+def apply_inferred_types(df: pd.DataFrame, inferences: Sequence[ColumnInference]) -> pd.DataFrame:
+    """
+    Приводит колонки с выведенным типом (остальные не трогает и не копирует).
+    Подходит и для чанков: типы выводятся по первому чанку и применяются к остальным.
+    Число значений, ставших пропусками, накапливается в info.coerced_to_null.
+    """
+    todo = [info for info in inferences if info.inferred is not None and info.column in df.columns]
+    if not todo:
+        return df
+    result = df.copy(deep=False)
+    for info in todo:
+        s = df[info.column]
+        if info.inferred == "numeric":
+            result[info.column] = _to_numeric(s, decimal_comma=info.decimal_comma)
+        else:
+            result[info.column] = _to_datetime(s.astype(str))
+        info.coerced_to_null += int(result[info.column].isna().sum() - s.isna().sum())
+    return result
+
+
+def convert_types(
+    df: pd.DataFrame,
+    threshold: float = DEFAULT_THRESHOLD,
+    sample_size: int = DEFAULT_SAMPLE_SIZE,
+) -> Tuple[pd.DataFrame, List[ColumnInference]]:
+    """infer_types + apply_inferred_types: (приведённый DataFrame, отчёт по колонкам)."""
+    inferences = infer_types(df, threshold=threshold, sample_size=sample_size)
+    return apply_inferred_types(df, inferences), inferences
+
+
+def convert_chunks(
+    chunks: Iterable[pd.DataFrame],
+    threshold: float = DEFAULT_THRESHOLD,
+    sample_size: int = DEFAULT_SAMPLE_SIZE,
+) -> Tuple[Iterator[pd.DataFrame], List[ColumnInference]]:
+    """
+    Типы выводятся по первому чанку и применяются ко всем чанкам потока,
+    чтобы колонка не меняла тип от чанка к чанку.
+    """
+    it = iter(chunks)
+    first = next(it, None)
+    if first is None:
+        return iter(()), []
+    inferences = infer_types(first, threshold=threshold, sample_size=sample_size)
+    return (apply_inferred_types(chunk, inferences) for chunk in itertools.chain([first], it)), inferences
+
+
+def inference_frame(inferences: Sequence[ColumnInference]) -> pd.DataFrame:
+    """Таблица вывода типов (для CSV и печати)."""
+    rows = []
+    for info in inferences:
+        row = info.to_dict()
+        row["offending_examples"] = "; ".join(row["offending_examples"])
+        rows.append(row)
+    return pd.DataFrame(rows, columns=list(ColumnInference.__dataclass_fields__))
@@ -0,0 +1,258 @@
+"""
+Фоновые задачи для HTTP API: долгий анализ больших CSV без синхронного ожидания.
+
+Клиент создаёт задачу (POST /jobs), получает её id и опрашивает статус,
+а результат забирает, когда задача завершена. Одинаковые задачи (тот же
+контент файла и те же параметры) не пересчитываются: повторный запрос
+возвращает уже существующую задачу. Завершённые задачи живут ttl_seconds
+и затем удаляются вместе со своими артефактами.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple, Union
+
+import pandas as pd
+
+from .compression import open_decompressed
+from .report import generate_report
+from .session import Profile
+
+PathLike = Union[str, Path]
+
+JOB_KINDS = ("quality", "report")
+HASH_BLOCK_SIZE = 1 << 20
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    content_hash: str
+    params: Dict[str, Any]
+    status: str = "pending"  # pending -> running -> done | failed
+    stage: str = "queued"
+    rows_processed: int = 0
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "failed")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "stage": self.stage,
+            "rows_processed": self.rows_processed,
+            "content_hash": self.content_hash,
+            "params": self.params,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+        }
+
+
+def hash_stream(stream: BinaryIO, sink: Optional[BinaryIO] = None) -> str:
+    """sha256 содержимого потока блоками; при наличии sink одновременно копирует данные в него."""
+    h = hashlib.sha256()
+    while True:
+        block = stream.read(HASH_BLOCK_SIZE)
+        if not block:
+            break
+        h.update(block)
+        if sink is not None:
+            sink.write(block)
+    return h.hexdigest()
+
+
+def hash_file(path: PathLike) -> str:
+    with Path(path).open("rb") as f:
+        return hash_stream(f)
+
+
+class JobManager:
+    """
+    Очередь фоновых задач поверх ThreadPoolExecutor.
+
+    - дедупликация по (kind, content_hash, params);
+    - прогресс: стадия и число прочитанных строк;
+    - TTL-эвикция завершённых задач (ленивая, при обращениях к менеджеру).
+    """
+
+    def __init__(
+        self,
+        work_dir: Optional[PathLike] = None,
+        max_workers: int = 2,
+        ttl_seconds: float = 3600.0,
+        chunksize: int = 100_000,
+        max_decompressed: Optional[int] = None,
+    ) -> None:
+        self._work_dir = Path(work_dir) if work_dir is not None else None
+        self.ttl_seconds = ttl_seconds
+        self.chunksize = chunksize
+        self.max_decompressed = max_decompressed
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="eda-job")
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, Job] = {}
+        self._by_key: Dict[Tuple[str, str, Tuple[Tuple[str, Any], ...]], str] = {}
+
+    @property
+    def work_dir(self) -> Path:
+        if self._work_dir is None:
+            self._work_dir = Path(tempfile.mkdtemp(prefix="eda-cli-jobs-"))
+        self._work_dir.mkdir(parents=True, exist_ok=True)
+        return self._work_dir
+
+    def job_dir(self, job_id: str) -> Path:
+        return self.work_dir / job_id
+
+    def store_upload(self, stream: BinaryIO) -> Tuple[Path, str]:
+        """Сохраняет загруженный файл во временный каталог, параллельно считая хэш."""
+        uploads = self.work_dir / "uploads"
+        uploads.mkdir(parents=True, exist_ok=True)
+        tmp_path = uploads / f"{uuid.uuid4().hex}.part"
+        with tmp_path.open("wb") as sink:
+            content_hash = hash_stream(stream, sink)
+        return tmp_path, content_hash
+
+    def submit(
+        self,
+        kind: str,
+        source: PathLike,
+        content_hash: str,
+        params: Optional[Dict[str, Any]] = None,
+        owns_source: bool = False,
+    ) -> Job:
+        """
+        Ставит задачу в очередь или возвращает уже существующую с тем же ключом.
+        owns_source=True означает, что source — временная копия загрузки,
+        и менеджер сам удалит её (сразу при дедупликации или вместе с задачей).
+        """
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Неизвестный тип задачи: {kind}")
+        params = dict(params or {})
+        key = (kind, content_hash, tuple(sorted(params.items())))
+        source = Path(source)
+        self.evict_expired()
+        with self._lock:
+            existing_id = self._by_key.get(key)
+            existing = self._jobs.get(existing_id) if existing_id else None
+            if existing is not None and existing.status != "failed":
+                if owns_source:
+                    source.unlink(missing_ok=True)
+                return existing
+            job = Job(id=uuid.uuid4().hex, kind=kind, content_hash=content_hash, params=params)
+            self._jobs[job.id] = job
+            self._by_key[key] = job.id
+        if owns_source:
+            job_dir = self.job_dir(job.id)
+            job_dir.mkdir(parents=True, exist_ok=True)
+            source = source.rename(job_dir / "input.csv")
+        self._executor.submit(self._run, job, source)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        self.evict_expired()
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def evict_expired(self, now: Optional[float] = None) -> List[str]:
+        now = time.time() if now is None else now
+        with self._lock:
+            expired = [
+                job
+                for job in self._jobs.values()
+                if job.finished_at is not None and now - job.finished_at > self.ttl_seconds
+            ]
+            for job in expired:
+                del self._jobs[job.id]
+                self._by_key = {k: v for k, v in self._by_key.items() if v != job.id}
+        for job in expired:
+            if self._work_dir is not None:
+                shutil.rmtree(self._work_dir / job.id, ignore_errors=True)
+        return [job.id for job in expired]
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+    # --- выполнение
+
+    def _read_csv(self, job: Job, source: Path) -> pd.DataFrame:
+        job.stage = "reading"
+        chunks: List[pd.DataFrame] = []
+        # загрузка хранится как есть: сжатая копия распаковывается при чтении, не больше max_decompressed байт
+        with source.open("rb") as raw, open_decompressed(raw, max_output=self.max_decompressed) as stream:
+            for chunk in pd.read_csv(stream, chunksize=self.chunksize):
+                chunks.append(chunk)
+                job.rows_processed += len(chunk)
+        if not chunks:
+            return pd.DataFrame()
+        return pd.concat(chunks, ignore_index=True)
+
+    def _run(self, job: Job, source: Path) -> None:
+        job.status = "running"
+        try:
+            df = self._read_csv(job, source)
+            if job.kind == "report":
+                job.result = self._run_report(job, df)
+            else:
+                job.result = self._run_quality(job, df)
+            job.stage = "done"
+            job.status = "done"
+        except Exception as exc:  # noqa: BLE001
+            job.error = f"{type(exc).__name__}: {exc}"
+            job.status = "failed"
+        finally:
+            job.finished_at = time.time()
+
+    def _run_quality(self, job: Job, df: pd.DataFrame) -> Dict[str, Any]:
+        min_missing_share = float(job.params.get("min_missing_share", 0.1))
+        job.stage = "summarizing"
+        profile = Profile(df)
+        summary = profile.summary
+        job.stage = "quality"
+        flags = profile.quality_flags(min_missing_share)
+        return {
+            "flags": flags,
+            "quality_score": flags.get("quality_score"),
+            "ok_for_model": flags.get("quality_score", 0.0) >= 0.5,
+            "n_rows": summary.n_rows,
+            "n_cols": summary.n_cols,
+        }
+
+    def _run_report(self, job: Job, df: pd.DataFrame) -> Dict[str, Any]:
+        job.stage = "report"
+        out_dir = self.job_dir(job.id) / "report"
+        params = job.params
+        result = generate_report(
+            df,
+            out_dir,
+            source_name=str(params.get("source_name", "")),
+            max_hist_columns=int(params.get("max_hist_columns", 6)),
+            top_k_categories=int(params.get("top_k_categories", 10)),
+            min_missing_share=float(params.get("min_missing_share", 0.1)),
+            title=str(params.get("title", "EDA-отчёт")),
+        )
+        artifacts = sorted(p.relative_to(out_dir).as_posix() for p in out_dir.rglob("*") if p.is_file())
+        flags = result["quality_flags"]
+        return {
+            "quality_score": flags.get("quality_score"),
+            "flags": flags,
+            "n_rows": result["n_rows"],
+            "n_cols": result["n_cols"],
+            "artifacts": artifacts,
+        }
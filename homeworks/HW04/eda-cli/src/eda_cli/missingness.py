@@ -0,0 +1,196 @@
+"""
+Совместные пропуски: какие колонки пропадают вместе и какие наборы пропусков
+(шаблоны) встречаются в строках чаще всего.
+
+За один проход по чанкам (память не зависит от числа строк):
+
+- маска пропусков строки упаковывается в битовое множество (np.packbits: колонка — бит),
+  упакованные строки хэшируются в 64 бита (для <= 64 колонок хэш взаимно однозначен),
+  и одинаковые шаблоны считаются через np.unique по хэшам. Счётчики шаблонов
+  ограничены max_patterns: при переполнении остаются самые частые (как top-значения
+  в accumulate), поэтому для редких шаблонов счёт приблизительный;
+- матрица совместных пропусков C[a, b] — число строк, где пропущены обе колонки, —
+  это попарные popcount(маска_a & маска_b); они считаются одним матричным
+  произведением M^T M (BLAS) только по колонкам, в которых в чанке есть пропуски.
+
+По матрице для пар колонок считаются мера Жаккара и условные доли
+P(b пропущена | a пропущена) — по ним видно, что поля теряются одним этапом конвейера.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_MAX_PATTERNS = 10_000
+DEFAULT_TOP_PATTERNS = 20
+DEFAULT_TOP_PAIRS = 20
+# строки маски, обрабатываемые за раз (ограничивает float32-копию для матричного произведения)
+_BLOCK_ROWS = 1 << 16
+_MIX = np.uint64(0x9E3779B97F4A7C15)
+
+
+def _hash_packed(packed: np.ndarray) -> np.ndarray:
+    """64-битный хэш упакованных строк (n x n_bytes) по словам uint64."""
+    n, n_bytes = packed.shape
+    width = (n_bytes + 7) // 8
+    words = np.zeros((n, width * 8), dtype=np.uint8)
+    words[:, :n_bytes] = packed
+    words = words.view(np.uint64)
+    h = words[:, 0].copy()
+    with np.errstate(over="ignore"):
+        for j in range(1, width):
+            # умножение на нечётное и xor-сдвиг обратимы, поэтому коллизии возможны лишь между словами
+            h = (h * _MIX) ^ words[:, j]
+            h ^= h >> np.uint64(31)
+    return h
+
+
+class MissingnessProfiler:
+    """
+    Шаблоны пропусков и матрица совместных пропусков по потоку чанков.
+
+    profiler = MissingnessProfiler()
+    for chunk in pd.read_csv(path, chunksize=100_000):
+        profiler.update(chunk)
+    result = profiler.result()
+    """
+
+    def __init__(self, max_patterns: int = DEFAULT_MAX_PATTERNS) -> None:
+        self.max_patterns = max_patterns
+        self.names: Optional[List[Any]] = None
+        self.n_rows = 0
+        self.missing: Optional[np.ndarray] = None
+        self.co_missing: Optional[np.ndarray] = None
+        # хэш шаблона -> [число строк, упакованная маска]
+        self.patterns: Dict[int, List[Any]] = {}
+        self.truncated = False
+
+    def _ensure_columns(self, names: Sequence[Any]) -> None:
+        if self.names is None:
+            self.names = list(names)
+            k = len(self.names)
+            self.missing = np.zeros(k, dtype=np.int64)
+            self.co_missing = np.zeros((k, k), dtype=np.int64)
+        elif list(names) != self.names:
+            raise ValueError("Набор колонок чанка не совпадает с предыдущими чанками")
+
+    def update(self, chunk: pd.DataFrame) -> "MissingnessProfiler":
+        return self.update_mask(chunk.isna().to_numpy(), chunk.columns)
+
+    def update_many(self, chunks: Iterable[pd.DataFrame]) -> "MissingnessProfiler":
+        for chunk in chunks:
+            self.update(chunk)
+        return self
+
+    def update_mask(self, mask: np.ndarray, names: Sequence[Any]) -> "MissingnessProfiler":
+        """Обновление по готовой матрице пропусков (n_rows x n_cols, True — пропуск), например из Profile."""
+        self._ensure_columns(names)
+        for start in range(0, mask.shape[0], _BLOCK_ROWS):
+            self._update_block(mask[start : start + _BLOCK_ROWS])
+        return self
+
+    def _update_block(self, mask: np.ndarray) -> None:
+        self.n_rows += mask.shape[0]
+        counts = mask.sum(axis=0)
+        self.missing += counts
+        cols = np.flatnonzero(counts)
+        if cols.size:
+            sub = mask[:, cols].astype(np.float32)
+            self.co_missing[np.ix_(cols, cols)] += np.rint(sub.T @ sub).astype(np.int64)
+
+        packed = np.packbits(mask, axis=1)
+        hashes = _hash_packed(packed)
+        unique, first, pattern_counts = np.unique(hashes, return_index=True, return_counts=True)
+        patterns = self.patterns
+        for h, i, count in zip(unique.tolist(), first.tolist(), pattern_counts.tolist()):
+            entry = patterns.get(h)
+            if entry is None:
+                patterns[h] = [count, packed[i].tobytes()]
+            else:
+                entry[0] += count
+        if len(patterns) > 2 * self.max_patterns:
+            keep = sorted(patterns.items(), key=lambda kv: kv[1][0], reverse=True)[: self.max_patterns]
+            self.patterns = dict(keep)
+            self.truncated = True
+
+    def _pattern_columns(self, packed: bytes) -> List[Any]:
+        bits = np.unpackbits(np.frombuffer(packed, dtype=np.uint8))[: len(self.names or [])]
+        return [self.names[i] for i in np.flatnonzero(bits)]
+
+    def result(self, top_patterns: int = DEFAULT_TOP_PATTERNS, top_pairs: int = DEFAULT_TOP_PAIRS) -> Dict[str, Any]:
+        names = self.names or []
+        n_rows = self.n_rows
+        missing = self.missing if self.missing is not None else np.zeros(0, dtype=np.int64)
+        with_missing = [i for i in range(len(names)) if missing[i] > 0]
+
+        patterns = []
+        complete_rows = 0
+        for count, packed in sorted(self.patterns.values(), key=lambda entry: entry[0], reverse=True):
+            columns = self._pattern_columns(packed)
+            if not columns:
+                complete_rows = count
+                continue
+            if len(patterns) < top_patterns:
+                patterns.append({"missing": columns, "n_missing": len(columns), "count": count, "share": count / n_rows})
+
+        pairs = []
+        for pos, a in enumerate(with_missing):
+            for b in with_missing[pos + 1 :]:
+                both = int(self.co_missing[a, b])
+                if both == 0:
+                    continue
+                union = int(missing[a] + missing[b]) - both
+                pairs.append(
+                    {
+                        "a": names[a],
+                        "b": names[b],
+                        "both": both,
+                        "jaccard": both / union,
+                        "p_b_given_a": both / int(missing[a]),
+                        "p_a_given_b": both / int(missing[b]),
+                    }
+                )
+        pairs.sort(key=lambda p: (p["jaccard"], p["both"]), reverse=True)
+
+        return {
+            "n_rows": n_rows,
+            "complete_rows": complete_rows,
+            "complete_share": complete_rows / n_rows if n_rows else 0.0,
+            "missing_counts": {names[i]: int(missing[i]) for i in with_missing},
+            "distinct_patterns": len(self.patterns),
+            "patterns_truncated": self.truncated,
+            "patterns": patterns,
+            "pairs": pairs[:top_pairs],
+            "co_missing": {
+                "columns": [names[i] for i in with_missing],
+                "counts": self.co_missing[np.ix_(with_missing, with_missing)].tolist() if with_missing else [],
+            },
+        }
+
+
+def profile_missingness(data: Any, max_patterns: int = DEFAULT_MAX_PATTERNS) -> Dict[str, Any]:
+    """Совместные пропуски по DataFrame или итератору чанков."""
+    profiler = MissingnessProfiler(max_patterns=max_patterns)
+    if isinstance(data, pd.DataFrame):
+        profiler.update(data)
+    else:
+        profiler.update_many(data)
+    return profiler.result()
+
+
+def missing_patterns_frame(result: Dict[str, Any]) -> pd.DataFrame:
+    """Шаблон пропусков на строку: какие колонки пропущены вместе и в скольких строках."""
+    rows = [
+        {"missing": ", ".join(map(str, p["missing"])), "n_missing": p["n_missing"], "count": p["count"], "share": p["share"]}
+        for p in result["patterns"]
+    ]
+    return pd.DataFrame(rows, columns=["missing", "n_missing", "count", "share"])
+
+
+def co_missing_frame(result: Dict[str, Any]) -> pd.DataFrame:
+    """Матрица совместных пропусков (колонки с пропусками x они же)."""
+    columns = result["co_missing"]["columns"]
+    return pd.DataFrame(result["co_missing"]["counts"], index=columns, columns=columns)
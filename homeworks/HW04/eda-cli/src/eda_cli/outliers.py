@@ -0,0 +1,299 @@
+"""
+Выбросы в числовых колонках: робастные границы и (по желанию) изоляционный лес.
+
+Границы не зависят от mean/std, которые сами портятся выбросами:
+- iqr: [q1 - k * IQR, q3 + k * IQR], k = 1.5;
+- mad: median ± k * 1.4826 * MAD (модифицированный z-score), k = 3.5.
+Если IQR или MAD равны нулю (больше половины значений одинаковы, например нули
+в выручке), вместо них берётся среднее абсолютное отклонение от медианы —
+иначе выбросом оказалось бы любое значение, отличное от медианы.
+
+detect_outliers считает по DataFrame точно, одной матричной операцией по всем
+числовым колонкам. outliers_from_summary работает без данных — по KLL-скетчам
+сводки (например, собранной по чанкам или шардам): квантили, MAD и число
+значений за границами оцениваются по скетчу.
+
+isolation_scores — многомерная оценка аномальности строк изоляционным лесом
+(Liu et al., 2008) на случайной выборке строк; реализован на numpy,
+обход деревьев векторизован по всем строкам сразу.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+from pandas.api import types as ptypes
+
+from .sampling import ReservoirSampler
+from .sketch import KLLSketch
+
+METHODS = ("iqr", "mad")
+DEFAULT_METHOD = "iqr"
+DEFAULT_K = {"iqr": 1.5, "mad": 3.5}
+# колонка считается «с выбросами», если за границами не меньше этой доли значений
+OUTLIER_SHARE_THRESHOLD = 0.01
+MAX_EXAMPLES = 3
+_MAD_SCALE = 1.4826  # MAD -> стандартное отклонение для нормального распределения
+_MEANAD_SCALE = 1.2533  # то же для среднего абсолютного отклонения
+
+DEFAULT_SAMPLE_SIZE = 10_000
+DEFAULT_TREES = 100
+TREE_SAMPLE_SIZE = 256
+ISOLATION_THRESHOLD = 0.6  # score >= 0.6 — строка заметно легче изолируется, чем типичная
+
+
+def _check_method(method: str) -> None:
+    if method not in METHODS:
+        raise ValueError(f"Неизвестный метод выбросов: {method!r} (ожидается {', '.join(METHODS)})")
+
+
+def outlier_columns(df: pd.DataFrame) -> List[Any]:
+    """Числовые колонки (без bool), по которым ищутся выбросы."""
+    return [c for c in df.columns if ptypes.is_numeric_dtype(df[c]) and not ptypes.is_bool_dtype(df[c])]
+
+
+def _bounds(q1, median, q3, mad, meanad, method: str, k: float):
+    """Векторно: нижняя и верхняя граница по робастной статистике колонок."""
+    scale = np.where(mad > 0, _MAD_SCALE * mad, _MEANAD_SCALE * meanad)
+    if method == "iqr":
+        spread = np.where(q3 - q1 > 0, q3 - q1, scale)
+        return q1 - k * spread, q3 + k * spread
+    return median - k * scale, median + k * scale
+
+
+def _column_result(name, method, n, stats, lower, upper, low, high, examples, estimated) -> Dict[str, Any]:
+    outliers = int(low + high)
+    return {
+        "name": name,
+        "method": method,
+        "n": int(n),
+        "q1": float(stats[0]),
+        "median": float(stats[1]),
+        "q3": float(stats[2]),
+        "mad": float(stats[3]),
+        "lower": float(lower),
+        "upper": float(upper),
+        "low": int(low),
+        "high": int(high),
+        "outliers": outliers,
+        "outlier_share": outliers / n if n else 0.0,
+        "examples": examples,
+        "estimated": estimated,
+    }
+
+
+def detect_outliers(df: pd.DataFrame, method: str = DEFAULT_METHOD, k: Optional[float] = None) -> List[Dict[str, Any]]:
+    """Точные границы и число выбросов по всем числовым колонкам df."""
+    _check_method(method)
+    k = DEFAULT_K[method] if k is None else k
+    names = outlier_columns(df)
+    if not names or df.empty:
+        return []
+    X = df[names].to_numpy(dtype=float, na_value=np.nan)
+    n = (~np.isnan(X)).sum(axis=0)
+    keep = n > 0
+    names, X, n = [c for c, ok in zip(names, keep) if ok], X[:, keep], n[keep]
+    if not names:
+        return []
+    q1, median, q3 = np.nanquantile(X, [0.25, 0.5, 0.75], axis=0)
+    deviation = np.abs(X - median)
+    mad = np.nanmedian(deviation, axis=0)
+    meanad = np.nanmean(deviation, axis=0)
+    lower, upper = _bounds(q1, median, q3, mad, meanad, method, k)
+    below, above = X < lower, X > upper  # NaN ни с чем не сравнивается — пропуски не выбросы
+    low, high = below.sum(axis=0), above.sum(axis=0)
+
+    results = []
+    for j, name in enumerate(names):
+        examples: List[float] = []
+        if low[j] or high[j]:
+            outside = np.flatnonzero(below[:, j] | above[:, j])
+            top = outside[np.argsort(-deviation[outside, j], kind="stable")[:MAX_EXAMPLES]]
+            examples = X[top, j].tolist()
+        stats = (q1[j], median[j], q3[j], mad[j])
+        results.append(_column_result(name, method, n[j], stats, lower[j], upper[j], low[j], high[j], examples, False))
+    return results
+
+
+def _sketch_stats(sketch: KLLSketch):
+    q1, median, q3 = sketch.quantiles([0.25, 0.5, 0.75])
+    values, weights = sketch.weighted()
+    deviation = np.abs(values - median)
+    if sketch.is_exact:
+        return q1, median, q3, np.median(deviation), float(deviation.mean())
+    order = np.argsort(deviation, kind="stable")
+    cum = np.cumsum(weights[order])
+    mad = deviation[order][np.searchsorted(cum, cum[-1] / 2.0)]
+    meanad = float(np.sum(weights * deviation) / cum[-1])
+    return q1, median, q3, mad, meanad
+
+
+def outliers_from_summary(summary, method: str = DEFAULT_METHOD, k: Optional[float] = None) -> List[Dict[str, Any]]:
+    """
+    Границы и оценка числа выбросов по скетчам DatasetSummary (без исходных данных).
+    Для небольших колонок скетч точный, и результат совпадает с detect_outliers.
+    """
+    _check_method(method)
+    k = DEFAULT_K[method] if k is None else k
+    results = []
+    for name, sketch, dtype in zip(summary.names.tolist(), summary.sketches.tolist(), summary.dtypes):
+        if sketch is None or sketch.n == 0 or dtype == "bool":
+            continue
+        q1, median, q3, mad, meanad = _sketch_stats(sketch)
+        lower, upper = _bounds(q1, median, q3, np.float64(mad), np.float64(meanad), method, k)
+        n = sketch.n
+        low = int(round(n * float(sketch.cdf([lower], strict=True)[0])))
+        high = int(round(n * (1.0 - float(sketch.cdf([upper])[0]))))
+        # min/max скетч хранит точно, даже если при уплотнении они выпали из уровней
+        values = np.unique(np.append(sketch.retained(), [sketch.min, sketch.max]))
+        outside = values[(values < lower) | (values > upper)]
+        examples = outside[np.argsort(-np.abs(outside - median), kind="stable")[:MAX_EXAMPLES]].tolist()
+        results.append(
+            _column_result(name, method, n, (q1, median, q3, mad), lower, upper, low, high, examples, not sketch.is_exact)
+        )
+    return results
+
+
+def outliers_frame(results: List[Dict[str, Any]]) -> pd.DataFrame:
+    """Таблица выбросов по колонкам (для CSV и печати)."""
+    rows = [{**r, "examples": "; ".join(f"{v:g}" for v in r["examples"])} for r in results]
+    columns = ["name", "method", "n", "q1", "median", "q3", "mad", "lower", "upper", "low", "high",
+               "outliers", "outlier_share", "examples", "estimated"]
+    return pd.DataFrame(rows, columns=columns)
+
+
+# --- изоляционный лес
+
+
+def _average_path(n):
+    """c(n) — средняя длина пути неуспешного поиска в BST из n элементов."""
+    n = np.asarray(n, dtype=float)
+    safe = np.maximum(n, 2.0)
+    c = 2.0 * (np.log(safe - 1.0) + np.euler_gamma) - 2.0 * (safe - 1.0) / safe
+    return np.where(n > 2, c, np.where(n == 2, 1.0, 0.0))
+
+
+class IsolationForest:
+    """
+    Изоляционный лес: деревья случайных разбиений по случайной колонке.
+    Аномальные строки изолируются за меньшее число разбиений;
+    score = 2 ** (-E[h(x)] / c(psi)), близкий к 1 — аномалия, ~0.5 и ниже — норма.
+    """
+
+    def __init__(self, n_trees: int = DEFAULT_TREES, sample_size: int = TREE_SAMPLE_SIZE, seed: int = 0) -> None:
+        self.n_trees = n_trees
+        self.sample_size = sample_size
+        self.rng = np.random.default_rng(seed)
+        self.trees: List[Dict[str, np.ndarray]] = []
+        self.psi = 0
+
+    def _build(self, X: np.ndarray) -> Dict[str, np.ndarray]:
+        limit = int(math.ceil(math.log2(max(len(X), 2))))
+        feature, threshold, left, right, size = [], [], [], [], []
+        stack = [(np.arange(len(X)), 0, -1, False)]
+        while stack:
+            idx, depth, parent, is_right = stack.pop()
+            node = len(feature)
+            if parent >= 0:
+                (right if is_right else left)[parent] = node
+            feature.append(-1)
+            threshold.append(0.0)
+            left.append(-1)
+            right.append(-1)
+            size.append(len(idx))
+            if depth >= limit or len(idx) <= 1:
+                continue
+            part = X[idx]
+            lo, hi = part.min(axis=0), part.max(axis=0)
+            candidates = np.flatnonzero(hi > lo)
+            if candidates.size == 0:
+                continue
+            f = int(self.rng.choice(candidates))
+            t = float(self.rng.uniform(lo[f], hi[f]))
+            feature[node], threshold[node] = f, t
+            go_left = part[:, f] < t
+            stack.append((idx[~go_left], depth + 1, node, True))
+            stack.append((idx[go_left], depth + 1, node, False))
+        return {
+            "feature": np.array(feature),
+            "threshold": np.array(threshold),
+            "left": np.array(left),
+            "right": np.array(right),
+            "size": np.array(size),
+        }
+
+    def fit(self, X: np.ndarray) -> "IsolationForest":
+        X = np.asarray(X, dtype=float)
+        self.psi = min(self.sample_size, len(X))
+        self.trees = []
+        for _ in range(self.n_trees):
+            idx = self.rng.choice(len(X), size=self.psi, replace=False)
+            self.trees.append(self._build(X[idx]))
+        return self
+
+    def _path_length(self, tree: Dict[str, np.ndarray], X: np.ndarray) -> np.ndarray:
+        rows = np.arange(len(X))
+        node = np.zeros(len(X), dtype=np.int64)
+        depth = np.zeros(len(X))
+        active = tree["feature"][node] >= 0
+        # все строки спускаются по дереву одновременно: шаг цикла — уровень дерева
+        while active.any():
+            r, nd = rows[active], node[active]
+            go_left = X[r, tree["feature"][nd]] < tree["threshold"][nd]
+            node[active] = np.where(go_left, tree["left"][nd], tree["right"][nd])
+            depth[active] += 1
+            active = tree["feature"][node] >= 0
+        return depth + _average_path(tree["size"][node])
+
+    def score(self, X: np.ndarray) -> np.ndarray:
+        X = np.asarray(X, dtype=float)
+        mean_path = np.mean([self._path_length(tree, X) for tree in self.trees], axis=0)
+        return np.power(2.0, -mean_path / max(float(_average_path(self.psi)), 1e-9))
+
+
+def bottom_k_sample(chunks: Iterable[pd.DataFrame], size: int, seed: int = 0) -> pd.DataFrame:
+    """Равномерная выборка size строк из потока чанков: строки с наименьшими случайными ключами."""
+    return ReservoirSampler(size, seed=seed).update_many(chunks).sample()
+
+
+def isolation_scores(
+    df: pd.DataFrame,
+    sample_size: int = DEFAULT_SAMPLE_SIZE,
+    n_trees: int = DEFAULT_TREES,
+    threshold: float = ISOLATION_THRESHOLD,
+    top_n: int = 10,
+    seed: int = 0,
+) -> Optional[Dict[str, Any]]:
+    """
+    Многомерная аномальность строк на выборке до sample_size строк.
+    Пропуски заменяются медианой колонки. None, если числовых колонок нет.
+    """
+    names = outlier_columns(df)
+    if not names or df.empty:
+        return None
+    sample = df.sample(n=sample_size, random_state=seed) if len(df) > sample_size else df
+    X = sample[names].to_numpy(dtype=float, na_value=np.nan)
+    medians = np.nan_to_num(np.nanmedian(X, axis=0)) if X.size else np.zeros(len(names))
+    X = np.where(np.isnan(X), medians, X)
+    scores = IsolationForest(n_trees=n_trees, seed=seed).fit(X).score(X)
+    order = np.argsort(-scores, kind="stable")[:top_n]
+    anomalies = int((scores >= threshold).sum())
+    return {
+        "columns": names,
+        "sample_size": int(len(sample)),
+        "n_trees": n_trees,
+        "threshold": threshold,
+        "anomalies": anomalies,
+        "anomaly_share": anomalies / len(sample),
+        "top": [
+            {
+                "index": sample.index[i].item() if hasattr(sample.index[i], "item") else sample.index[i],
+                "score": float(scores[i]),
+                "values": dict(zip(map(str, names), X[i].tolist())),
+            }
+            for i in order
+        ],
+    }
@@ -0,0 +1,522 @@
+from __future__ import annotations
+
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence, Union
+
+import pandas as pd
+
+from .core import flatten_summary_for_print, missing_table_from_summary
+from .drift import SummarySnapshot, snapshot_dataframe
+from .infer import DEFAULT_THRESHOLD as TYPE_THRESHOLD, convert_types, inference_frame
+from .missingness import co_missing_frame, missing_patterns_frame
+from .outliers import DEFAULT_METHOD as OUTLIER_METHOD, outliers_frame
+from .rules import Rule, evaluate_rules
+from .segments import DEFAULT_MAX_GROUPS, OTHER_SEGMENT, segment_columns_frame, segments_frame
+from .session import Profile
+from .sketch import DEFAULT_K
+from .target import target_categories_frame, target_frame
+from .text import text_profile_frame
+from .timeseries import timeseries_frame
+from .viz import (
+    plot_categorical_distribution,
+    plot_correlation_heatmap,
+    plot_histograms_per_column,
+    plot_missing_matrix,
+    plot_timeline,
+    save_top_categories_tables,
+)
+
+PathLike = Union[str, Path]
+
+
+def _write_quality_section(f, quality_flags: Dict[str, Any], min_missing_share: float) -> None:
+    """Раздел «Качество данных» в report.md (общий для полного отчёта и отчёта по сводке)."""
+    f.write("## Качество данных (эвристики)\n\n")
+    f.write(f"- Оценка качества: **{quality_flags.get('quality_score', 0.0):.2f}**\n")
+    f.write(f"- Макс. доля пропусков по колонке: **{quality_flags.get('max_missing_share', 0.0):.2%}**\n")
+    f.write(f"- Слишком мало строк: **{quality_flags.get('too_few_rows', False)}**\n")
+    f.write(f"- Слишком много колонок: **{quality_flags.get('too_many_columns', False)}**\n")
+    f.write(f"- Слишком много пропусков: **{quality_flags.get('too_many_missing', False)}**\n")
+    f.write(f"- Константные колонки: **{quality_flags.get('has_constant_columns', False)}**\n")
+    f.write(f"- Высокая кардинальность категориальных признаков: **{quality_flags.get('has_high_cardinality_categoricals', False)}**\n")
+    f.write(f"- Количество проблемных колонок по порогу {min_missing_share:.0%}: **{quality_flags.get('problematic_missing_count', 0)}**\n\n")
+    f.write(f"- Константные колонки: **{quality_flags.get('has_constant_columns', False)}**\n")
+    const_cols = quality_flags.get("constant_columns", [])
+    if const_cols:
+        f.write("  - Список константных колонок: " + ", ".join(f"`{c}`" for c in const_cols) + "\n")
+
+    f.write(f"- Высокая кардинальность категориальных: **{quality_flags.get('has_high_cardinality_categoricals', False)}** (порог: {quality_flags.get('high_cardinality_threshold')})\n")
+    high_card_cols = quality_flags.get("high_cardinality_columns", [])
+    if high_card_cols:
+        f.write("  - Список: " + ", ".join(f"`{c}`" for c in high_card_cols) + "\n")
+
+    f.write(f"- Подозрительные ID-колонки с дублями: **{quality_flags.get('has_suspicious_id_duplicates', False)}**\n")
+    suspicious = quality_flags.get("suspicious_id_columns", [])
+    if suspicious:
+        f.write("  - Список: " + ", ".join(f"`{c}`" for c in suspicious) + "\n")
+
+    f.write(f"- Колонки с большим числом нулей (>={quality_flags.get('zero_value_threshold', 0.0):.0%}): **{quality_flags.get('has_many_zero_values', False)}**\n")
+    zeros = quality_flags.get("zero_value_columns", [])
+    if zeros:
+        for info in zeros:
+            f.write(f"  - `{info['column']}`: {info['zero_share']:.2%} нулей\n")
+
+    f.write(
+        f"- Полные дубликаты строк: **{quality_flags.get('duplicate_rows', 0)}** "
+        f"({quality_flags.get('duplicate_row_share', 0.0):.2%})\n"
+    )
+    for violation in quality_flags.get("key_violations", []):
+        key = ", ".join(f"`{c}`" for c in violation["columns"])
+        f.write(
+            f"  - Ключ ({key}): дубликатов **{violation['duplicate_rows']}** "
+            f"({violation['duplicate_share']:.2%}), строк с пустым ключом: {violation['null_key_rows']}\n"
+        )
+    if "outlier_columns" in quality_flags:
+        f.write(
+            f"- Колонки с выбросами (>={quality_flags['outlier_share_threshold']:.0%} значений за робастными границами): "
+            f"**{quality_flags['has_outliers']}**\n"
+        )
+        for info in quality_flags["outlier_columns"]:
+            f.write(f"  - `{info['column']}`: {info['outliers']} ({info['outlier_share']:.2%})\n")
+    f.write("\n")
+
+    if "rules" in quality_flags:
+        f.write("### Правила качества\n\n")
+        f.write(
+            f"Нарушено правил: **{quality_flags['failed_rules']}** из {len(quality_flags['rules'])}, "
+            f"штраф к оценке: **{quality_flags['rules_penalty']:.2f}**\n\n"
+        )
+        for item in quality_flags["rules"]:
+            status = "OK" if item["passed"] else "нарушено"
+            f.write(
+                f"- `{item['name']}` ({item['type']}): {status}, "
+                f"{item['failed']} из {item['checked']} ({item['fail_share']:.2%})\n"
+            )
+        f.write("\n")
+
+
+def _write_outliers_section(f, outliers: Sequence[Dict[str, Any]], isolation: Optional[Dict[str, Any]]) -> None:
+    """Раздел «Выбросы»: робастные границы по колонкам и итог изоляционного леса."""
+    f.write("## Выбросы\n\n")
+    method = outliers[0]["method"]
+    rule = "q1 - 1.5·IQR .. q3 + 1.5·IQR" if method == "iqr" else "медиана ± 3.5·1.4826·MAD"
+    f.write(f"Границы: {rule} (не зависят от mean/std).\n\n")
+    f.write("| Колонка | Медиана | Границы | Выбросов | Доля | Самые дальние |\n")
+    f.write("|---|---|---|---|---|---|\n")
+    for item in outliers:
+        if not item["outliers"]:
+            continue
+        examples = ", ".join(f"{v:g}" for v in item["examples"]) or "—"
+        f.write(
+            f"| `{item['name']}` | {item['median']:g} | {item['lower']:g} .. {item['upper']:g} "
+            f"| {item['outliers']} | {item['outlier_share']:.2%} | {examples} |\n"
+        )
+    f.write("\nГраницы по всем числовым колонкам — в `outliers.csv`.\n\n")
+    if isolation is not None:
+        f.write(
+            f"Изоляционный лес ({isolation['n_trees']} деревьев, выборка {isolation['sample_size']} строк): "
+            f"аномальных строк (score >= {isolation['threshold']}) — **{isolation['anomalies']}** "
+            f"({isolation['anomaly_share']:.2%}).\n"
+        )
+        top = ", ".join(f"{row['index']} ({row['score']:.2f})" for row in isolation["top"][:5])
+        f.write(f"Самые аномальные строки (индекс, score): {top}\n\n")
+
+
+def _write_target_section(f, result: Dict[str, Any], max_features: int = 15) -> None:
+    """Раздел «Целевая переменная»: признаки по силе связи с целевой и подозрения на утечку."""
+    f.write("## Целевая переменная\n\n")
+    task = "бинарная классификация" if result["task"] == "binary" else "регрессия"
+    label = "Доля положительного класса" if result["task"] == "binary" else "Среднее"
+    f.write(f"Целевая: `{result['target']}` ({task}), строк: **{result['n_rows']}**, ")
+    f.write(f"{label.lower()}: **{result['target_mean']:.4g}**\n\n")
+    suspects = result["leakage_suspects"]
+    if suspects:
+        f.write(
+            "**Подозрение на утечку целевой** (почти идеальное разделение): "
+            + ", ".join(f"`{c}`" for c in suspects)
+            + "\n\n"
+        )
+    metric = "AUC" if result["task"] == "binary" else "corr"
+    f.write(f"| Признак | Тип | Сила связи | {metric} / eta² | Утечка? |\n")
+    f.write("|---|---|---|---|---|\n")
+    for feature in result["features"][:max_features]:
+        if feature["kind"] == "numeric":
+            value = feature["auc"] if result["task"] == "binary" else feature["corr"]
+        else:
+            value = feature["eta2"]
+        strength = "—" if feature["strength"] is None else f"{feature['strength']:.3f}"
+        value_text = "—" if value is None else f"{value:.3f}"
+        leak = "да" if feature["leakage"] else ""
+        f.write(f"| `{feature['name']}` | {feature['kind']} | {strength} | {value_text} | {leak} |\n")
+    f.write("\nВсе признаки — в `target.csv`, среднее целевой по категориям — в `target_categories.csv`.\n\n")
+
+
+def _write_missingness_section(f, result: Dict[str, Any], max_rows: int = 10) -> None:
+    """Подраздел «Совместные пропуски»: частые шаблоны пропусков и пары колонок, пропадающих вместе."""
+    f.write("### Совместные пропуски\n\n")
+    f.write(
+        f"Строк без пропусков: **{result['complete_rows']}** ({result['complete_share']:.1%}), "
+        f"различных шаблонов пропусков: **{result['distinct_patterns']}**\n\n"
+    )
+    f.write("| Пропущены вместе | Строк | Доля |\n")
+    f.write("|---|---|---|\n")
+    for p in result["patterns"][:max_rows]:
+        f.write(f"| {', '.join(f'`{c}`' for c in p['missing'])} | {p['count']} | {p['share']:.2%} |\n")
+    if result["pairs"]:
+        f.write("\n| Колонка A | Колонка B | Вместе | Жаккар | P(B пропущена \\| A) | P(A пропущена \\| B) |\n")
+        f.write("|---|---|---|---|---|---|\n")
+        for pair in result["pairs"][:max_rows]:
+            f.write(
+                f"| `{pair['a']}` | `{pair['b']}` | {pair['both']} | {pair['jaccard']:.2f} "
+                f"| {pair['p_b_given_a']:.2f} | {pair['p_a_given_b']:.2f} |\n"
+            )
+    f.write("\nВсе шаблоны — в `missing_patterns.csv`, матрица совместных пропусков — в `co_missing.csv`.\n\n")
+
+
+def _write_segments_section(f, result: Dict[str, Any]) -> None:
+    """Раздел «Сегменты»: размер и quality_score каждого сегмента."""
+    f.write("## Сегменты\n\n")
+    by = ", ".join(f"`{c}`" for c in result["by"])
+    f.write(f"Разбивка по {by}: сегментов **{result['n_segments']}**")
+    if result["truncated"]:
+        f.write(f" (больше {result['max_groups']} — остальные объединены в «{OTHER_SEGMENT}»)")
+    f.write("\n\n")
+    f.write("| Сегмент | Строк | Доля | quality_score | Макс. доля пропусков | Выбросы |\n")
+    f.write("|---|---|---|---|---|---|\n")
+    for _, row in segments_frame(result).iterrows():
+        f.write(
+            f"| {row['segment']} | {row['n_rows']} | {row['share']:.1%} | {row['quality_score']:.2f} "
+            f"| {row['max_missing_share']:.1%} | {row['outlier_columns'] or '—'} |\n"
+        )
+    f.write("\nФлаги по сегментам — в `segments.csv`, сводка по колонкам внутри сегментов — в `segment_columns.csv`.\n\n")
+
+
+def generate_report(
+    df: pd.DataFrame,
+    out_dir: PathLike,
+    source_name: str = "",
+    max_hist_columns: int = 6,
+    top_k_categories: int = 10,
+    min_missing_share: float = 0.1,
+    title: str = "EDA-отчёт",
+    sketch_k: int = DEFAULT_K,
+    key_columns: Sequence[Sequence[str]] = (),
+    rules: Optional[Sequence[Rule]] = None,
+    infer_types: bool = True,
+    type_threshold: float = TYPE_THRESHOLD,
+    target: Optional[str] = None,
+    positive: Any = None,
+    outlier_method: str = OUTLIER_METHOD,
+    isolation: bool = False,
+    profile: Optional[Profile] = None,
+    group_by: Sequence[str] = (),
+    max_groups: int = DEFAULT_MAX_GROUPS,
+    backend: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Генерирует полный EDA-отчёт по уже загруженному DataFrame в каталог out_dir.
+    Используется и CLI-командой report, и фоновыми задачами HTTP API.
+    При infer_types object-колонки, которые на самом деле числа или даты,
+    сначала приводятся к нужному типу (см. eda_cli.infer).
+    При заданной target в отчёт добавляется связь признаков с целевой (см. eda_cli.target).
+    Выбросы ищутся по робастным границам outlier_method (iqr/mad); при isolation —
+    ещё и многомерно, изоляционным лесом на выборке строк (см. eda_cli.outliers).
+    profile — готовая сессия по df (например, из кэша eda-cli daemon): вывод типов в ней
+    уже применён, а посчитанные ранее промежуточные результаты переиспользуются.
+    При group_by добавляется раздел по сегментам (см. eda_cli.segments).
+    backend — чем считать агрегаты ядра: pandas, polars или duckdb (см. eda_cli.backends).
+    Возвращает путь к report.md, флаги качества и размеры датасета.
+    """
+    out_root = Path(out_dir)
+    out_root.mkdir(parents=True, exist_ok=True)
+
+    # 0. Вывод типов: всё остальное считается уже по приведённым колонкам
+    if profile is None:
+        inferences = []
+        if infer_types:
+            df, inferences = convert_types(df, threshold=type_threshold)
+        profile = Profile(df, sketch_k=sketch_k, inferences=inferences, backend=backend)
+    df, inferences = profile.df, profile.inferences
+    converted = [info for info in inferences if info.inferred is not None]
+
+    # 1. Обзор: промежуточные результаты (пропуски, числовые колонки, корреляция, частоты)
+    # считаются один раз и общие для ядра и графиков
+    summary = profile.summary
+    summary_df = flatten_summary_for_print(summary)
+    missing_df = profile.missing
+    missingness = profile.missingness
+    corr_df = profile.correlation
+    top_cats = profile.top_categories(max_columns=5, top_k=top_k_categories)
+    text_profiles = profile.text
+    time_profiles = profile.datetimes
+    target_result = profile.target(target, positive=positive, top_k=top_k_categories) if target else None
+    segments_result = None
+    if group_by:
+        segments_result = profile.segments(
+            group_by, max_groups=max_groups, min_missing_share=min_missing_share, outlier_method=outlier_method
+        )
+
+    # 2. Качество в целом (учитываем min_missing_share)
+    rules_result = evaluate_rules(df, rules) if rules else None
+    outliers = profile.outliers(outlier_method)
+    isolation_result = profile.isolation if isolation else None
+    quality_flags = profile.quality_flags(
+        min_missing_share,
+        key_columns=key_columns,
+        rules_result=rules_result,
+        outlier_method=outlier_method,
+    )
+
+    # 3. Сохраняем табличные артефакты
+    summary_df.to_csv(out_root / "summary.csv", index=False)
+    if not missing_df.empty:
+        missing_df.to_csv(out_root / "missing.csv", index=True)
+    if missingness["patterns"]:
+        missing_patterns_frame(missingness).to_csv(out_root / "missing_patterns.csv", index=False)
+        co_missing_frame(missingness).to_csv(out_root / "co_missing.csv", index=True)
+    if not corr_df.empty:
+        corr_df.to_csv(out_root / "correlation.csv", index=True)
+    save_top_categories_tables(top_cats, out_root / "top_categories")
+    if text_profiles:
+        text_profile_frame(text_profiles).to_csv(out_root / "text_profile.csv", index=False)
+    if outliers:
+        outliers_frame(outliers).to_csv(out_root / "outliers.csv", index=False)
+    if target_result is not None:
+        target_frame(target_result).to_csv(out_root / "target.csv", index=False)
+        target_categories_frame(target_result).to_csv(out_root / "target_categories.csv", index=False)
+    if time_profiles:
+        timeseries_frame(time_profiles).to_csv(out_root / "timeseries.csv", index=False)
+    if segments_result is not None:
+        segments_frame(segments_result).to_csv(out_root / "segments.csv", index=False)
+        segment_columns_frame(segments_result).to_csv(out_root / "segment_columns.csv", index=False)
+    if inferences:
+        inference_frame(inferences).to_csv(out_root / "type_inference.csv", index=False)
+    # сводка со скетчами — для eda-cli compare без повторного чтения данных
+    snapshot_dataframe(df, summary=summary, source=source_name, value_counts=profile.value_counts).save(
+        out_root / "summary.json"
+    )
+
+    # 4. Markdown-отчёт
+    md_path = out_root / "report.md"
+    with md_path.open("w", encoding="utf-8") as f:
+        f.write(f"# {title}\n\n")
+        f.write(f"Сгенерировано: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+        f.write(f"Исходный файл: `{source_name}`\n\n")
+        f.write(f"Строк: **{summary.n_rows}**, столбцов: **{summary.n_cols}**\n\n")
+
+        _write_quality_section(f, quality_flags, min_missing_share)
+
+        f.write("### Параметры отчёта\n\n")
+        f.write(f"- Отображается топ-{top_k_categories} категорий для категориальных признаков\n")
+        f.write(f"- Колонки с долей пропусков > {min_missing_share:.0%} считаются проблемными\n\n")
+
+        # Используем problematic_missing_cols из quality_flags (если есть)
+        problematic_cols = quality_flags.get("problematic_missing_cols", [])
+        if problematic_cols:
+            f.write("### Проблемные колонки с высокой долей пропусков\n\n")
+            for col in problematic_cols:
+                # берём значение missing_share из missing_df, если он там присутствует
+                if (not missing_df.empty) and (col in missing_df.index):
+                    share = missing_df.loc[col, "missing_share"]
+                    f.write(f"- **{col}**: {share:.2%} пропусков\n")
+                else:
+                    f.write(f"- **{col}**: (доля пропусков не найдена в missing_table)\n")
+            f.write("\n")
+        else:
+            # Если quality_flags не вернул список, можно также вывести локально найденные колонки (как fallback)
+            local_problematic = missing_df[missing_df["missing_share"] > min_missing_share] if not missing_df.empty else pd.DataFrame()
+            if not local_problematic.empty:
+                f.write("### Локально найденные проблемные колонки (по missing_df)\n\n")
+                for col, row in local_problematic.iterrows():
+                    f.write(f"- **{col}**: {row['missing_share']:.2%} пропусков\n")
+                f.write("\n")
+
+        if converted:
+            f.write("## Вывод типов\n\n")
+            f.write("| Колонка | Тип | Доля приведённых | Стали пропусками | Примеры неприводимых |\n")
+            f.write("|---|---|---|---|---|\n")
+            for info in converted:
+                rate = info.numeric_rate if info.inferred == "numeric" else info.datetime_rate
+                examples = ", ".join(f"`{v}`" for v in info.offending_examples) or "—"
+                f.write(f"| `{info.column}` | {info.inferred} | {rate:.1%} | {info.coerced_to_null} | {examples} |\n")
+            f.write("\nРешения по всем object-колонкам — в `type_inference.csv`.\n\n")
+
+        f.write("## Колонки\n\n")
+        f.write("См. файл `summary.csv`.\n\n")
+
+        f.write("## Пропуски\n\n")
+        if missing_df.empty:
+            f.write("Пропусков нет или датасет пуст.\n\n")
+        else:
+            f.write("См. файлы `missing.csv` и `missing_matrix.png`.\n\n")
+            if missingness["patterns"]:
+                _write_missingness_section(f, missingness)
+
+        f.write("## Корреляция числовых признаков\n\n")
+        if corr_df.empty:
+            f.write("Недостаточно числовых колонок для корреляции.\n\n")
+        else:
+            f.write("См. `correlation.csv` и `correlation_heatmap.png`.\n\n")
+
+        f.write("## Категориальные признаки\n\n")
+        if not top_cats:
+            f.write("Категориальные/строковые признаки не найдены.\n\n")
+        else:
+            f.write(f"Отображены топ-{top_k_categories} значений для каждой категориальной колонки.\n\n")
+            f.write("См. файлы в папке `top_categories/`.\n\n")
+
+        if text_profiles:
+            f.write("## Строковые колонки\n\n")
+            f.write("| Колонка | Длина (min / медиана / max) | Пустые | Пробельные | Формат |\n")
+            f.write("|---|---|---|---|---|\n")
+            for p in text_profiles:
+                lengths = f"{p['min_length']} / {p['p50_length']:.0f} / {p['max_length']}" if p["non_null"] else "—"
+                f.write(
+                    f"| `{p['name']}` | {lengths} | {p['empty_share']:.1%} | {p['whitespace_share']:.1%} "
+                    f"| {p['inferred_format'] or '—'} |\n"
+                )
+            f.write("\nПодробности (классы символов, доли форматов) — в `text_profile.csv`.\n\n")
+
+        if outliers:
+            _write_outliers_section(f, outliers, isolation_result)
+
+        if target_result is not None:
+            _write_target_section(f, target_result)
+
+        if segments_result is not None:
+            _write_segments_section(f, segments_result)
+
+        if time_profiles:
+            f.write("## Временные колонки\n\n")
+            f.write("| Колонка | Диапазон | Шаг | Регулярность | Разрывы (пропущено шагов) | Дубликаты меток |\n")
+            f.write("|---|---|---|---|---|---|\n")
+            for p in time_profiles:
+                regularity = f"{p['regularity']:.1%}" if p["regularity"] is not None else "—"
+                gaps = f"{p['gaps']} ({p['missing_periods']})" if p["gaps"] is not None else "—"
+                duplicates = p["duplicates"] if p["duplicates"] is not None else "—"
+                f.write(
+                    f"| `{p['name']}` | {p['min']} — {p['max']} | {p['inferred_freq'] or '—'} "
+                    f"| {regularity} | {gaps} | {duplicates} |\n"
+                )
+            f.write("\nПодробности — в `timeseries.csv`.\n\n")
+            for i, p in enumerate(time_profiles[:2]):
+                f.write(f"### Число строк по периодам: {p['name']} ({p['period']})\n")
+                f.write(f"![{p['name']} timeline](timeline_{i+1}_{p['name']}.png)\n\n")
+
+        f.write("## Гистограммы числовых колонок\n\n")
+        f.write(f"Показаны гистограммы для первых {max_hist_columns} числовых колонок.\n\n")
+        f.write("См. файлы `hist_*.png`.\n")
+
+    # 5. Картинки
+    plot_histograms_per_column(df, out_root, max_columns=max_hist_columns, numeric_df=profile.numeric)
+    plot_missing_matrix(df, out_root / "missing_matrix.png", mask=profile.missing_mask)
+    plot_correlation_heatmap(df, out_root / "correlation_heatmap.png", corr=corr_df)
+    for i, p in enumerate(time_profiles[:2]):
+        plot_timeline(
+            p["period_counts"],
+            out_root / f"timeline_{i+1}_{p['name']}.png",
+            title=f"Rows per period: {p['name']}",
+            gaps=p["largest_gaps"],
+        )
+    
+    # 6. Дополнительная визуализация для категориальных признаков
+    cat_cols = [col.name for col in summary.columns if not col.is_numeric and col.unique > 1 and col.unique <= 20]
+    if cat_cols:
+        for i, col_name in enumerate(cat_cols[:2]):  # Ограничиваем 2 колонками для наглядности
+            cat_plot_path = out_root / f"categorical_{i+1}_{col_name}.png"
+            plot_categorical_distribution(
+                df, col_name, cat_plot_path, top_k=top_k_categories, value_counts=profile.value_counts(col_name)
+            )
+        
+        with md_path.open("a", encoding="utf-8") as f:
+            f.write("\n## Распределение категориальных признаков\n\n")
+            f.write("Дополнительные визуализации распределения категорий:\n\n")
+            for i, col_name in enumerate(cat_cols[:2]):
+                img_name = f"categorical_{i+1}_{col_name}.png"
+                f.write(f"### {col_name}\n")
+                f.write(f"![{col_name} distribution]({img_name})\n\n")
+
+    return {
+        "md_path": md_path,
+        "n_rows": summary.n_rows,
+        "n_cols": summary.n_cols,
+        "quality_flags": quality_flags,
+        "inferred_types": [info.to_dict() for info in inferences],
+        "target": target_result,
+        "segments": segments_result,
+        "missingness": missingness,
+        "outliers": outliers,
+        "isolation": isolation_result,
+    }
+
+
+def generate_summary_report(
+    snapshot: SummarySnapshot,
+    out_dir: PathLike,
+    quality_flags: Dict[str, Any],
+    min_missing_share: float = 0.1,
+    top_k_categories: int = 10,
+    title: str = "EDA-отчёт",
+    outliers: Optional[Sequence[Dict[str, Any]]] = None,
+) -> Dict[str, Any]:
+    """
+    Отчёт только по сводке, без исходных данных (например, после распределённого профилирования):
+    summary.csv, summary.json, missing.csv, top_categories/*.csv и report.md.
+    Корреляции и графики требуют данных и в такой отчёт не входят.
+    """
+    out_root = Path(out_dir)
+    out_root.mkdir(parents=True, exist_ok=True)
+    summary = snapshot.summary
+    missing_df = missing_table_from_summary(summary)
+
+    flatten_summary_for_print(summary).to_csv(out_root / "summary.csv", index=False)
+    if not missing_df.empty:
+        missing_df.to_csv(out_root / "missing.csv", index=True)
+    top_cats = {}
+    for name, counts in snapshot.top_values.items():
+        i = summary.position(name)
+        if i is None or not counts:
+            continue
+        items = sorted(counts.items(), key=lambda kv: kv[1], reverse=True)[:top_k_categories]
+        top_cats[name] = pd.DataFrame(
+            {
+                "value": [v for v, _ in items],
+                "count": [c for _, c in items],
+                "share": [c / summary.non_null[i] for _, c in items],
+            }
+        )
+    save_top_categories_tables(top_cats, out_root / "top_categories")
+    snapshot.save(out_root / "summary.json")
+    if outliers:
+        outliers_frame(outliers).to_csv(out_root / "outliers.csv", index=False)
+
+    md_path = out_root / "report.md"
+    with md_path.open("w", encoding="utf-8") as f:
+        f.write(f"# {title}\n\n")
+        f.write(f"Сгенерировано: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+        f.write(f"Исходные данные: `{snapshot.source}`\n\n")
+        f.write(f"Строк: **{summary.n_rows}**, столбцов: **{summary.n_cols}**\n\n")
+        _write_quality_section(f, quality_flags, min_missing_share)
+        if outliers:
+            _write_outliers_section(f, outliers, None)
+
+        f.write("## Колонки\n\n")
+        f.write("См. файлы `summary.csv` и `summary.json`.\n\n")
+        f.write("## Пропуски\n\n")
+        if missing_df.empty:
+            f.write("Пропусков нет или датасет пуст.\n\n")
+        else:
+            f.write("См. файл `missing.csv`.\n\n")
+        f.write("## Категориальные признаки\n\n")
+        if not top_cats:
+            f.write("Категориальные/строковые признаки не найдены.\n")
+        else:
+            f.write(f"Топ-{top_k_categories} значений по колонкам — в папке `top_categories/`.\n")
+
+    return {
+        "md_path": md_path,
+        "n_rows": summary.n_rows,
+        "n_cols": summary.n_cols,
+        "quality_flags": quality_flags,
+    }
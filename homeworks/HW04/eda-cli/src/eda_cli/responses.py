@@ -0,0 +1,296 @@
+"""
+Быстрая сериализация ответов HTTP API, сжатие тел ответов и распаковка тел запросов.
+
+- FastJSONResponse: JSON через orjson (если установлен), иначе стандартный json;
+  numpy-скаляры и массивы сериализуются без ручного приведения типов.
+- CompressionMiddleware: сжатие ответов zstd (если установлен zstandard) или gzip
+  по заголовку Accept-Encoding, в том числе для стриминговых ответов (NDJSON).
+- DecompressionMiddleware: распаковка тел запросов с Content-Encoding: gzip/zstd
+  на лету, по мере получения кусков тела (сжатое тело целиком в памяти не держится);
+  распакованное тело больше max_size — ответ 413.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import zlib
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .compression import (
+    CONTENT_ENCODINGS,
+    DEFAULT_MAX_DECOMPRESSED,
+    DecompressionLimitError,
+    incremental_decompressor,
+)
+
+try:  # опциональные ускорители: pip install "s03[fast]"
+    import orjson
+except ImportError:  # pragma: no cover - зависит от окружения
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - зависит от окружения
+    zstandard = None
+
+
+def _to_builtin(obj: Any) -> Any:
+    """
+    Приводит content для стандартного json так, как его пишет orjson: numpy-типы ->
+    обычные python-объекты, NaN/±inf -> None (в JSON нет NaN и Infinity).
+    """
+    if isinstance(obj, dict):
+        return {k: _to_builtin(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_to_builtin(v) for v in obj]
+    if isinstance(obj, np.ndarray):
+        return _to_builtin(obj.tolist())
+    if isinstance(obj, np.generic):
+        obj = obj.item()
+    if isinstance(obj, float) and not math.isfinite(obj):
+        return None
+    return obj
+
+
+def dumps(content: Any) -> bytes:
+    """Сериализует content в JSON (bytes); NaN и ±inf — null в обоих сериализаторах."""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(_to_builtin(content), ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse без промежуточного jsonable_encoder и с сериализацией через orjson."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+# --- сжатие ответов
+
+# Типы, которые уже сжаты (или бинарные картинки), — их не трогаем.
+EXCLUDED_CONTENT_TYPES = (
+    "image/",
+    "application/zip",
+    "application/gzip",
+    "application/zstd",
+    "application/vnd.apache.parquet",
+)
+
+
+def available_encodings() -> List[str]:
+    """Поддерживаемые кодировки в порядке предпочтения сервера."""
+    return (["zstd"] if zstandard is not None else []) + ["gzip"]
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Выбирает кодировку по Accept-Encoding (токены с q=0 исключаются)."""
+    accepted = set()
+    for token in accept_encoding.split(","):
+        name, _, params = token.strip().partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if q > 0 and name.strip():
+            accepted.add(name.strip().lower())
+    for encoding in available_encodings():
+        if encoding in accepted or "*" in accepted:
+            return encoding
+    return None
+
+
+def _make_compressor(encoding: str, gzip_level: int, zstd_level: int) -> Callable[[bytes, bool], bytes]:
+    """Возвращает функцию compress(chunk, final) для потокового сжатия."""
+    if encoding == "zstd":
+        cobj = zstandard.ZstdCompressor(level=zstd_level).compressobj()
+
+        def compress_zstd(chunk: bytes, final: bool) -> bytes:
+            flush_mode = zstandard.COMPRESSOBJ_FLUSH_FINISH if final else zstandard.COMPRESSOBJ_FLUSH_BLOCK
+            return cobj.compress(chunk) + cobj.flush(flush_mode)
+
+        return compress_zstd
+
+    zobj = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress_gzip(chunk: bytes, final: bool) -> bytes:
+        return zobj.compress(chunk) + zobj.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+    return compress_gzip
+
+
+class CompressionMiddleware:
+    """
+    ASGI-middleware: сжимает ответы zstd/gzip.
+    Маленькие ответы (< minimum_size) и уже закодированные тела не сжимаются.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, zstd_level: int = 3) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.zstd_level = zstd_level
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressingResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressingResponder:
+    """Состояние одного ответа: буферизует start-сообщение до первого куска тела."""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send) -> None:
+        self.middleware = middleware
+        self.encoding = encoding
+        self._send = send
+        self.start_message: Optional[Message] = None
+        self.passthrough = False
+        self.compress: Optional[Callable[[bytes, bool], bytes]] = None
+
+    async def _flush_start(self) -> None:
+        if self.start_message is not None:
+            await self._send(self.start_message)
+            self.start_message = None
+
+    async def send(self, message: Message) -> None:
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            content_type = headers.get("content-type", "").lower()
+            self.start_message = message
+            self.passthrough = "content-encoding" in headers or content_type.startswith(EXCLUDED_CONTENT_TYPES)
+            return
+        if self.passthrough or message_type != "http.response.body":
+            # уже закодированные тела, pathsend и прочие расширения — как есть
+            if self.compress is None:
+                self.passthrough = True
+            await self._flush_start()
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.compress is None:
+            if not more_body and len(body) < self.middleware.minimum_size:
+                self.passthrough = True
+                await self._flush_start()
+                await self._send(message)
+                return
+            self.compress = _make_compressor(self.encoding, self.middleware.gzip_level, self.middleware.zstd_level)
+            body = self.compress(body, not more_body)
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                headers["Content-Length"] = str(len(body))
+            await self._flush_start()
+        else:
+            body = self.compress(body, not more_body)
+        await self._send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+
+# --- распаковка запросов
+
+
+class DecompressionMiddleware:
+    """
+    ASGI-middleware: распаковывает тела запросов с Content-Encoding gzip/zstd,
+    так что эндпоинты (включая multipart-загрузки) видят обычное тело.
+    Неподдерживаемая кодировка — 415; повреждённый поток — ошибка разбора тела (400);
+    распакованное тело больше max_size байт — 413. Тело отдаётся приложению кусками
+    по мере распаковки, поэтому в памяти не больше одного распакованного куска.
+    """
+
+    def __init__(self, app: ASGIApp, max_size: int = DEFAULT_MAX_DECOMPRESSED) -> None:
+        self.app = app
+        self.max_size = max_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        content_encoding = Headers(scope=scope).get("content-encoding", "").strip().lower()
+        if content_encoding in ("", "identity"):
+            await self.app(scope, receive, send)
+            return
+        compression = CONTENT_ENCODINGS.get(content_encoding)
+        if compression == "zstd" and zstandard is None:
+            compression = None
+        if compression is None:
+            response = FastJSONResponse(
+                {"detail": f"Неподдерживаемый Content-Encoding: {content_encoding}"}, status_code=415
+            )
+            await response(scope, receive, send)
+            return
+
+        decompress = incremental_decompressor(compression, max_output=self.max_size)
+        # длина и кодировка относились к сжатому телу
+        scope = dict(scope)
+        scope["headers"] = [
+            (name, value) for name, value in scope["headers"] if name not in (b"content-encoding", b"content-length")
+        ]
+        state: Dict[str, Any] = {"pieces": iter(()), "more_body": True, "done": False, "exceeded": False}
+        started = {"response": False}
+
+        async def receive_decompressed() -> Message:
+            if state["done"]:
+                return await receive()
+            while True:
+                try:
+                    piece = next(state["pieces"], None)
+                except DecompressionLimitError:
+                    state["exceeded"] = True
+                    raise
+                if piece is not None:
+                    return {"type": "http.request", "body": piece, "more_body": True}
+                if not state["more_body"]:
+                    state["done"] = True
+                    return {"type": "http.request", "body": b"", "more_body": False}
+                message = await receive()
+                if message["type"] != "http.request":
+                    return message
+                state["more_body"] = message.get("more_body", False)
+                state["pieces"] = decompress(message.get("body", b""), not state["more_body"])
+
+        async def send_or_413(message: Message) -> None:
+            # ошибку чтения тела приложение превращает в 400; при превышении лимита отвечаем 413
+            if state["exceeded"]:
+                if message["type"] == "http.response.start" and not started["response"]:
+                    started["response"] = True
+                    await self._too_large(scope, receive, send)
+                return
+            if message["type"] == "http.response.start":
+                started["response"] = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive_decompressed, send_or_413)
+        except DecompressionLimitError:
+            if not started["response"]:
+                await self._too_large(scope, receive, send)
+
+    async def _too_large(self, scope: Scope, receive: Receive, send: Send) -> None:
+        response = FastJSONResponse(
+            {"detail": f"Распакованное тело запроса больше {self.max_size} байт"}, status_code=413
+        )
+        await response(scope, receive, send)
@@ -0,0 +1,383 @@
+"""
+Декларативные правила качества данных (YAML/JSON) и их векторная проверка.
+
+Формат файла правил:
+
+    rules:
+      - name: age_range
+        type: range            # range | not_null | allowed | regex | unique | expression
+        columns: [age]         # или column: age
+        min: 0
+        max: 120
+        weight: 0.1            # штраф к quality_score, если правило нарушено (по умолчанию 0.05)
+        max_fail_share: 0.01   # допустимая доля нарушений (по умолчанию 0)
+      - type: not_null
+        columns: [user_id, country]
+      - type: allowed
+        column: plan
+        values: [Free, Basic, Pro]
+      - type: regex
+        column: email
+        pattern: '^[^@]+@[^@]+$'
+      - type: unique
+        columns: [country, city]   # составной ключ
+      - type: expression
+        expr: purchases_last_30d <= sessions_last_30d
+
+Правила компилируются один раз (compile_rules), а затем на каждом чанке
+проверяются за один проход: все range-проверки — сравнением матрицы значений
+(колонка x строка) с векторами границ, все not_null — одним isna, все allowed — одним DataFrame.isin;
+regex — строковыми операциями pandas по колонке, unique — через хэши строк,
+expression — безопасным вычислителем expressions.py (только колонки, литералы, сравнения,
+арифметика и логические операторы; вызовы, атрибуты и @переменные отклоняются при разборе).
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+from pandas.api import types as ptypes
+
+from .duplicates import PartitionedHashSet, hash_rows
+from .expressions import CompiledExpression, ExpressionError, compile_expression
+
+PathLike = Union[str, Path]
+
+RULE_TYPES = ("range", "not_null", "allowed", "regex", "unique", "expression")
+DEFAULT_WEIGHT = 0.05
+MAX_EXAMPLES = 3
+_RANGE_BLOCK_ROWS = 1 << 14
+
+
+class RuleError(ValueError):
+    """Ошибка в описании правил."""
+
+
+@dataclass
+class Rule:
+    name: str
+    type: str
+    columns: List[str]
+    weight: float = DEFAULT_WEIGHT
+    max_fail_share: float = 0.0
+    params: Dict[str, Any] = field(default_factory=dict)
+
+
+def _parse_rule(raw: Dict[str, Any], index: int) -> Rule:
+    if not isinstance(raw, dict):
+        raise RuleError(f"Правило #{index}: ожидается объект")
+    rtype = raw.get("type")
+    if rtype not in RULE_TYPES:
+        raise RuleError(f"Правило #{index}: type должен быть одним из {list(RULE_TYPES)}")
+    columns = raw.get("columns", [raw["column"]] if "column" in raw else [])
+    if isinstance(columns, str):
+        columns = [columns]
+    columns = [str(c) for c in columns]
+    params = {k: v for k, v in raw.items() if k not in ("name", "type", "column", "columns", "weight", "max_fail_share")}
+
+    if rtype == "expression":
+        if not params.get("expr"):
+            raise RuleError(f"Правило #{index}: для expression нужно поле expr")
+        try:
+            compile_expression(params["expr"])
+        except ExpressionError as exc:
+            raise RuleError(f"Правило #{index}: {exc}") from exc
+    elif not columns:
+        raise RuleError(f"Правило #{index}: нужно указать column или columns")
+    if rtype == "range" and params.get("min") is None and params.get("max") is None:
+        raise RuleError(f"Правило #{index}: для range нужно min и/или max")
+    if rtype == "allowed" and not isinstance(params.get("values"), list):
+        raise RuleError(f"Правило #{index}: для allowed нужен список values")
+    if rtype == "regex":
+        try:
+            re.compile(params.get("pattern", ""))
+        except (re.error, TypeError) as exc:
+            raise RuleError(f"Правило #{index}: некорректный pattern: {exc}") from exc
+        if not params.get("pattern"):
+            raise RuleError(f"Правило #{index}: для regex нужно поле pattern")
+
+    name = raw.get("name") or (f"{rtype}:{','.join(columns)}" if columns else f"{rtype}:{params['expr']}")
+    return Rule(
+        name=str(name),
+        type=rtype,
+        columns=columns,
+        weight=float(raw.get("weight", DEFAULT_WEIGHT)),
+        max_fail_share=float(raw.get("max_fail_share", 0.0)),
+        params=params,
+    )
+
+
+def parse_rules(data: Dict[str, Any]) -> List[Rule]:
+    """Словарь {"rules": [...]} (или просто список правил) -> список Rule."""
+    raw_rules = data.get("rules") if isinstance(data, dict) else data
+    if not isinstance(raw_rules, list):
+        raise RuleError("Ожидается список правил в поле rules")
+    return [_parse_rule(raw, i) for i, raw in enumerate(raw_rules, start=1)]
+
+
+def parse_rules_text(text: str, fmt: Optional[str] = None) -> List[Rule]:
+    """Правила из текста JSON или YAML (YAML требует PyYAML)."""
+    if fmt == "json" or (fmt is None and text.lstrip().startswith(("{", "["))):
+        try:
+            return parse_rules(json.loads(text))
+        except json.JSONDecodeError as exc:
+            raise RuleError(f"Некорректный JSON: {exc}") from exc
+    try:
+        import yaml
+    except ImportError as exc:  # pragma: no cover - зависит от окружения
+        raise RuleError("Для YAML-правил нужен PyYAML: pip install pyyaml") from exc
+    try:
+        return parse_rules(yaml.safe_load(text))
+    except yaml.YAMLError as exc:
+        raise RuleError(f"Некорректный YAML: {exc}") from exc
+
+
+def load_rules(path: PathLike) -> List[Rule]:
+    p = Path(path)
+    fmt = "json" if p.suffix.lower() == ".json" else None
+    return parse_rules_text(p.read_text(encoding="utf-8"), fmt=fmt)
+
+
+class CompiledRules:
+    """
+    Скомпилированный набор правил с накоплением результатов по чанкам.
+
+    compiled = compile_rules(rules)
+    for chunk in chunks:
+        compiled.update(chunk)
+    result = compiled.result()
+    """
+
+    def __init__(self, rules: Sequence[Rule]) -> None:
+        self.rules = list(rules)
+        n = len(self.rules)
+        self.n_rows = 0
+        self.failed = np.zeros(n, dtype=np.int64)
+        self.checked = np.zeros(n, dtype=np.int64)
+        self.examples: List[List[Any]] = [[] for _ in range(n)]
+
+        # range: одна матрица значений на все (правило, колонка)
+        self._range_rule: List[int] = []
+        self._range_cols: List[str] = []
+        lo, hi = [], []
+        # not_null: один isna на все (правило, колонка)
+        self._nn_rule: List[int] = []
+        self._nn_cols: List[str] = []
+        # allowed: один DataFrame.isin со своим набором значений на каждую (правило, колонка)
+        self._allowed_rule: List[int] = []
+        self._allowed_cols: List[str] = []
+        self._allowed_values: Dict[int, List[Any]] = {}
+        self._regex: List[int] = []
+        self._unique: Dict[int, PartitionedHashSet] = {}
+        self._expressions: Dict[int, CompiledExpression] = {}
+
+        for i, rule in enumerate(self.rules):
+            if rule.type == "range":
+                for col in rule.columns:
+                    self._range_rule.append(i)
+                    self._range_cols.append(col)
+                    lo.append(-np.inf if rule.params.get("min") is None else float(rule.params["min"]))
+                    hi.append(np.inf if rule.params.get("max") is None else float(rule.params["max"]))
+            elif rule.type == "not_null":
+                for col in rule.columns:
+                    self._nn_rule.append(i)
+                    self._nn_cols.append(col)
+            elif rule.type == "allowed":
+                for col in rule.columns:
+                    self._allowed_values[len(self._allowed_cols)] = list(rule.params["values"])
+                    self._allowed_rule.append(i)
+                    self._allowed_cols.append(col)
+            elif rule.type == "regex":
+                self._regex.append(i)
+            elif rule.type == "unique":
+                self._unique[i] = PartitionedHashSet()
+            else:
+                self._expressions[i] = compile_expression(rule.params["expr"])
+        self._lo = np.asarray(lo, dtype=float)
+        self._hi = np.asarray(hi, dtype=float)
+        self._range_rule_idx = np.asarray(self._range_rule, dtype=np.intp)
+        self._nn_rule_idx = np.asarray(self._nn_rule, dtype=np.intp)
+        self._range_unique = list(dict.fromkeys(self._range_cols))
+        pos = {c: j for j, c in enumerate(self._range_unique)}
+        self._range_take = np.asarray([pos[c] for c in self._range_cols], dtype=np.intp)
+        self._allowed_rule_idx = np.asarray(self._allowed_rule, dtype=np.intp)
+
+    @property
+    def required_columns(self) -> List[str]:
+        return sorted({c for rule in self.rules for c in rule.columns})
+
+    def _add_examples(self, i: int, values: Iterable[Any]) -> None:
+        room = MAX_EXAMPLES - len(self.examples[i])
+        if room > 0:
+            self.examples[i].extend(_to_builtin(v) for v in list(values)[:room])
+
+    def _update_ranges(self, chunk: pd.DataFrame) -> None:
+        # матрица (колонка x строка): каждая колонка читается один раз, сколько бы правил на неё ни было
+        n_rules, n = len(self.rules), len(chunk)
+        matrix = np.empty((len(self._range_unique), n), dtype=float)
+        not_number = np.zeros(len(self._range_unique), dtype=np.int64)
+        for j, col in enumerate(self._range_unique):
+            s = chunk[col]
+            if ptypes.is_numeric_dtype(s):
+                matrix[j] = s.to_numpy(dtype=float, na_value=np.nan)
+            else:
+                # нечисловые значения -> NaN в матрице и отдельный счётчик нарушений
+                numeric = pd.to_numeric(s, errors="coerce")
+                matrix[j] = numeric.to_numpy(dtype=float, na_value=np.nan)
+                not_number[j] = int((s.notna() & numeric.isna()).sum())
+        present = (~np.isnan(matrix)).sum(axis=1) + not_number
+
+        # все (правило, колонка) сравниваются разом, по блокам строк, чтобы промежуточные маски помещались в кэш
+        lo, hi = self._lo[:, None], self._hi[:, None]
+        out_of_range = np.zeros(len(self._range_cols), dtype=np.int64)
+        for r0 in range(0, n, _RANGE_BLOCK_ROWS):
+            values = matrix[:, r0 : r0 + _RANGE_BLOCK_ROWS][self._range_take]
+            out_of_range += ((values < lo) | (values > hi)).sum(axis=1)
+        failed = out_of_range + not_number[self._range_take]
+        self.failed += np.bincount(self._range_rule_idx, weights=failed, minlength=n_rules).astype(np.int64)
+        self.checked += np.bincount(
+            self._range_rule_idx, weights=present[self._range_take], minlength=n_rules
+        ).astype(np.int64)
+
+        # примеры собираем только для нарушенных проверок и только пока их меньше MAX_EXAMPLES
+        for j in np.flatnonzero(failed):
+            i, col = self._range_rule[j], self._range_cols[j]
+            row, raw = matrix[self._range_take[j]], chunk[col].to_numpy()
+            for r0 in range(0, n, _RANGE_BLOCK_ROWS):
+                if len(self.examples[i]) >= MAX_EXAMPLES:
+                    break
+                block = row[r0 : r0 + _RANGE_BLOCK_ROWS]
+                mask = (block < self._lo[j]) | (block > self._hi[j])
+                if not_number[self._range_take[j]]:
+                    mask |= np.isnan(block) & pd.notna(raw[r0 : r0 + _RANGE_BLOCK_ROWS])
+                self._add_examples(i, raw[r0 : r0 + _RANGE_BLOCK_ROWS][mask])
+
+    def update(self, chunk: pd.DataFrame) -> "CompiledRules":
+        missing = sorted(set(self.required_columns) - set(chunk.columns))
+        if missing:
+            raise KeyError(f"Колонки из правил не найдены: {missing}")
+        self.n_rows += len(chunk)
+        n_rules = len(self.rules)
+
+        if self._range_cols:
+            self._update_ranges(chunk)
+
+        if self._nn_cols:
+            nulls = chunk[self._nn_cols].isna().to_numpy()
+            self.failed += np.bincount(self._nn_rule_idx, weights=nulls.sum(axis=0), minlength=n_rules).astype(np.int64)
+            self.checked += np.bincount(self._nn_rule_idx, minlength=n_rules) * len(chunk)
+
+        if self._allowed_cols:
+            frame = pd.DataFrame({j: chunk[c] for j, c in enumerate(self._allowed_cols)}, copy=False)
+            present = frame.notna().to_numpy()
+            fail = present & ~frame.isin(self._allowed_values).to_numpy()
+            self.failed += np.bincount(self._allowed_rule_idx, weights=fail.sum(axis=0), minlength=n_rules).astype(np.int64)
+            self.checked += np.bincount(self._allowed_rule_idx, weights=present.sum(axis=0), minlength=n_rules).astype(np.int64)
+            for j in np.flatnonzero(fail.any(axis=0)):
+                i = self._allowed_rule[j]
+                if len(self.examples[i]) < MAX_EXAMPLES:
+                    self._add_examples(i, frame[j].to_numpy()[fail[:, j]])
+
+        for i in self._regex:
+            rule = self.rules[i]
+            for col in rule.columns:
+                s = chunk[col]
+                present = s.notna()
+                matched = s[present].astype(str).str.fullmatch(rule.params["pattern"])
+                fail = present & ~matched.reindex(s.index, fill_value=True).astype(bool)
+                self.failed[i] += int(fail.sum())
+                self.checked[i] += int(present.sum())
+                if fail.any():
+                    self._add_examples(i, s[fail].head(MAX_EXAMPLES))
+
+        for i, hashes in self._unique.items():
+            sub = chunk[self.rules[i].columns]
+            complete = sub.notna().all(axis=1).to_numpy()
+            hashes.add(hash_rows(sub[complete]))
+            self.checked[i] += int(complete.sum())
+
+        for i, expr in self._expressions.items():
+            refs = [c for c in expr.columns if c in chunk.columns]
+            present = chunk[refs].notna().all(axis=1) if refs else pd.Series(True, index=chunk.index)
+            try:
+                ok = expr.evaluate(chunk)
+            except ExpressionError as exc:
+                raise RuleError(f"Правило {self.rules[i].name}: не удалось вычислить expr: {exc}") from exc
+            fail = present & ~pd.Series(ok, index=chunk.index).fillna(False).astype(bool)
+            self.failed[i] += int(fail.sum())
+            self.checked[i] += int(present.sum())
+            if fail.any() and refs:
+                self._add_examples(i, chunk.loc[fail, refs].head(MAX_EXAMPLES).to_dict("records"))
+        return self
+
+    def update_many(self, chunks: Iterable[pd.DataFrame]) -> "CompiledRules":
+        for chunk in chunks:
+            self.update(chunk)
+        return self
+
+    def result(self) -> Dict[str, Any]:
+        failed = self.failed.copy()
+        for i, hashes in self._unique.items():
+            failed[i] = hashes.total - hashes.count_distinct()
+        items = []
+        penalty = 0.0
+        for i, rule in enumerate(self.rules):
+            checked = int(self.checked[i])
+            fail_share = float(failed[i] / checked) if checked else 0.0
+            passed = fail_share <= rule.max_fail_share
+            if not passed:
+                penalty += rule.weight
+            items.append(
+                {
+                    "name": rule.name,
+                    "type": rule.type,
+                    "columns": rule.columns,
+                    "failed": int(failed[i]),
+                    "checked": checked,
+                    "fail_share": fail_share,
+                    "passed": passed,
+                    "weight": rule.weight,
+                    "examples": self.examples[i],
+                }
+            )
+        return {
+            "n_rows": self.n_rows,
+            "rules": items,
+            "failed_rules": sum(1 for item in items if not item["passed"]),
+            "penalty": penalty,
+        }
+
+    def close(self) -> None:
+        for hashes in self._unique.values():
+            hashes.close()
+
+
+def compile_rules(rules: Sequence[Rule]) -> CompiledRules:
+    return CompiledRules(rules)
+
+
+def evaluate_rules(data: Any, rules: Sequence[Rule]) -> Dict[str, Any]:
+    """Проверка правил по DataFrame или итерируемому набору чанков."""
+    compiled = compile_rules(rules)
+    try:
+        if isinstance(data, pd.DataFrame):
+            compiled.update(data)
+        else:
+            compiled.update_many(data)
+        return compiled.result()
+    finally:
+        compiled.close()
+
+
+def _to_builtin(value: Any) -> Any:
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, dict):
+        return {k: _to_builtin(v) for k, v in value.items()}
+    return value
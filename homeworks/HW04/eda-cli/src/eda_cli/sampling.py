@@ -0,0 +1,236 @@
+"""
+Выборки из больших CSV за один проход: равномерная и стратифицированная.
+
+Каждой строке присваивается случайный ключ, в выборку попадают строки с наименьшими
+ключами (bottom-k — вариант reservoir sampling). В памяти держится не больше size
+строк на страту: строки чанка с ключом не меньше текущего k-го ключа отбрасываются
+сразу, без копирования. Выборки с ключами сливаются точно — объединение выборок
+шардов с отбором наименьших ключей равно выборке по всему файлу, поэтому шарды
+можно разбирать параллельно:
+
+    sampler = ReservoirSampler(10_000, seed=42, by=["country"])
+    for chunk in pd.read_csv(path, chunksize=100_000):
+        sampler.update(chunk)
+    sample = sampler.sample()            # строки в порядке файла
+    sampler.strata()                     # размеры страт в данных и в выборке
+
+- Стратификация: по каждой страте (значению ключа by) держится своя bottom-k выборка
+  на size строк. Объём выборки по стратам распределяется в конце, когда размеры страт
+  известны: proportional — пропорционально размеру страты (метод наибольших остатков),
+  equal — поровну (остаток от маленьких страт отдаётся большим). Внутри страты выборка
+  равномерная. Страт не больше max_strata, строки новых значений ключа после
+  переполнения попадают в общую страту OTHER_STRATUM.
+- Воспроизводимость: ключи порождаются генератором numpy с фиксированным seed;
+  при параллельном разборе у каждого шарда свой поток (seed, номер шарда), поэтому
+  выборка воспроизводима при том же числе процессов (см. distributed.sample_parallel).
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_SIZE = 10_000
+DEFAULT_MAX_STRATA = 100
+ALLOCATIONS = ("proportional", "equal")
+OTHER_STRATUM = "(прочие)"
+
+StratumKey = Tuple[Any, ...]
+# номер потока в старших битах позиции: строки разных шардов упорядочиваются по шардам
+_STREAM_SHIFT = 40
+
+
+class _BottomK:
+    """size строк с наименьшими ключами среди всех предложенных."""
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.frame: Optional[pd.DataFrame] = None
+        self.keys = np.empty(0)
+        self.positions = np.empty(0, dtype=np.int64)
+        self.threshold = np.inf
+
+    def offer(self, frame: pd.DataFrame, keys: np.ndarray, positions: np.ndarray) -> None:
+        if len(self.keys) >= self.size:
+            passed = keys < self.threshold
+            if not passed.any():
+                return
+            if not passed.all():
+                frame, keys, positions = frame[passed], keys[passed], positions[passed]
+        merged = frame if self.frame is None else pd.concat([self.frame, frame])
+        keys = np.concatenate([self.keys, keys])
+        positions = np.concatenate([self.positions, positions])
+        if len(keys) > self.size:
+            keep = np.argpartition(keys, self.size - 1)[: self.size]
+            keep.sort()
+            merged, keys, positions = merged.iloc[keep], keys[keep], positions[keep]
+        self.frame, self.keys, self.positions = merged, keys, positions
+        if len(keys) >= self.size:
+            self.threshold = keys.max()
+
+    def smallest(self, n: int) -> Tuple[Optional[pd.DataFrame], np.ndarray]:
+        """n строк с наименьшими ключами (равномерная выборка из страты) и их позиции."""
+        if self.frame is None or n >= len(self.keys):
+            return self.frame, self.positions
+        keep = np.sort(np.argpartition(self.keys, n - 1)[:n]) if n > 0 else np.empty(0, dtype=np.int64)
+        return self.frame.iloc[keep], self.positions[keep]
+
+
+def allocate(populations: Sequence[int], size: int, allocation: str = "proportional") -> List[int]:
+    """Сколько строк взять из каждой страты (сумма — min(size, всего строк))."""
+    if allocation not in ALLOCATIONS:
+        raise ValueError(f"Неизвестное распределение: {allocation!r} (ожидается {', '.join(ALLOCATIONS)})")
+    populations = [int(n) for n in populations]
+    total = sum(populations)
+    if total <= size:
+        return populations
+    if allocation == "proportional":
+        quotas = [size * n / total for n in populations]
+        counts = [int(q) for q in quotas]
+        # метод наибольших остатков: недостающие строки — стратам с наибольшей дробной частью
+        order = sorted(range(len(quotas)), key=lambda i: quotas[i] - counts[i], reverse=True)
+        for i in order[: size - sum(counts)]:
+            counts[i] += 1
+        return counts
+    counts = [0] * len(populations)
+    remaining = size
+    open_strata = [i for i, n in enumerate(populations) if n > 0]
+    while remaining and open_strata:
+        share = max(1, remaining // len(open_strata))
+        for i in list(open_strata):
+            take = min(share, populations[i] - counts[i], remaining)
+            counts[i] += take
+            remaining -= take
+            if counts[i] == populations[i]:
+                open_strata.remove(i)
+            if not remaining:
+                break
+    return counts
+
+
+class ReservoirSampler:
+    """Равномерная или стратифицированная выборка по потоку чанков (см. описание модуля)."""
+
+    def __init__(
+        self,
+        size: int = DEFAULT_SIZE,
+        seed: int = 0,
+        by: Optional[Sequence[Any]] = None,
+        allocation: str = "proportional",
+        max_strata: int = DEFAULT_MAX_STRATA,
+        stream: Optional[int] = None,
+    ) -> None:
+        if size <= 0:
+            raise ValueError("Размер выборки должен быть положительным")
+        if allocation not in ALLOCATIONS:
+            raise ValueError(f"Неизвестное распределение: {allocation!r} (ожидается {', '.join(ALLOCATIONS)})")
+        if max_strata <= 0:
+            raise ValueError("max_strata должен быть положительным")
+        self.size = size
+        self.seed = seed
+        self.by = list(by or [])
+        self.allocation = allocation
+        self.max_strata = max_strata
+        self.rng = np.random.default_rng(seed if stream is None else [seed, stream])
+        self.n_rows = 0
+        self._base = (stream or 0) << _STREAM_SHIFT
+        self.reservoirs: Dict[StratumKey, _BottomK] = {}
+        self.populations: Dict[StratumKey, int] = {}
+
+    def _stratum(self, key: StratumKey) -> StratumKey:
+        if key in self.reservoirs or len(self.reservoirs) < self.max_strata:
+            return key
+        return (OTHER_STRATUM,)
+
+    def _offer(self, key: StratumKey, frame: pd.DataFrame, keys: np.ndarray, positions: np.ndarray) -> None:
+        reservoir = self.reservoirs.get(key)
+        if reservoir is None:
+            reservoir = self.reservoirs[key] = _BottomK(self.size)
+        self.populations[key] = self.populations.get(key, 0) + len(frame)
+        reservoir.offer(frame, keys, positions)
+
+    def update(self, chunk: pd.DataFrame) -> "ReservoirSampler":
+        keys = self.rng.random(len(chunk))
+        positions = self._base + self.n_rows + np.arange(len(chunk), dtype=np.int64)
+        self.n_rows += len(chunk)
+        if not self.by:
+            self._offer((), chunk, keys, positions)
+            return self
+        missing = [c for c in self.by if c not in chunk.columns]
+        if missing:
+            raise KeyError(f"Колонки стратификации не найдены: {', '.join(map(str, missing))}")
+        grouped = chunk.groupby(self.by, sort=False, dropna=False, observed=True)
+        for key, idx in grouped.indices.items():
+            key = self._stratum(key if isinstance(key, tuple) else (key,))
+            self._offer(key, chunk.take(idx), keys[idx], positions[idx])
+        return self
+
+    def update_many(self, chunks: Iterable[pd.DataFrame]) -> "ReservoirSampler":
+        for chunk in chunks:
+            self.update(chunk)
+        return self
+
+    def feed(self, chunks: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        """Пропускает чанки дальше, попутно обновляя выборку (один проход на два потребителя)."""
+        for chunk in chunks:
+            self.update(chunk)
+            yield chunk
+
+    def merge(self, other: "ReservoirSampler") -> "ReservoirSampler":
+        """Сливает выборку другого шарда (у шардов должны быть разные stream)."""
+        self.n_rows += other.n_rows
+        for key, reservoir in other.reservoirs.items():
+            if reservoir.frame is None:
+                continue
+            self._offer(self._stratum(key), reservoir.frame, reservoir.keys, reservoir.positions)
+            # _offer учёл только строки выборки другого шарда, а не всю его страту
+            self.populations[self._stratum(key)] += other.populations[key] - len(reservoir.frame)
+        return self
+
+    def _allocation(self) -> List[Tuple[StratumKey, int, int]]:
+        keys = list(self.reservoirs)
+        counts = allocate([self.populations[k] for k in keys], self.size, self.allocation)
+        return [(key, self.populations[key], n) for key, n in zip(keys, counts)]
+
+    def sample(self) -> pd.DataFrame:
+        """Выборка в порядке строк файла."""
+        frames, positions = [], []
+        for key, _, n in self._allocation():
+            frame, pos = self.reservoirs[key].smallest(n)
+            if frame is not None and len(pos):
+                frames.append(frame)
+                positions.append(pos)
+        if not frames:
+            return pd.DataFrame()
+        sample = pd.concat(frames) if len(frames) > 1 else frames[0]
+        if len(frames) > 1:
+            sample = sample.iloc[np.argsort(np.concatenate(positions), kind="stable")]
+        return sample
+
+    def strata(self) -> List[Dict[str, Any]]:
+        """Размер страты в данных и в выборке; weight — сколько строк данных представляет строка выборки."""
+        rows = []
+        for key, population, n in sorted(self._allocation(), key=lambda item: -item[1]):
+            if key == (OTHER_STRATUM,):
+                label = OTHER_STRATUM
+            else:
+                label = ", ".join(f"{c}={'NA' if pd.isna(v) else v}" for c, v in zip(self.by, key)) or "(все строки)"
+            rows.append(
+                {
+                    "stratum": label,
+                    "population": population,
+                    "population_share": population / self.n_rows if self.n_rows else 0.0,
+                    "sample": n,
+                    "sample_share": n / min(self.size, self.n_rows) if self.n_rows else 0.0,
+                    "weight": population / n if n else None,
+                }
+            )
+        return rows
+
+
+def strata_frame(strata: List[Dict[str, Any]]) -> pd.DataFrame:
+    return pd.DataFrame(
+        strata, columns=["stratum", "population", "population_share", "sample", "sample_share", "weight"]
+    )
@@ -0,0 +1,190 @@
+"""
+Профилирование по сегментам (group-by) за один проход.
+
+Для каждого значения ключа сегментации (одна колонка или несколько, например
+country или country + device) держится свой SummaryAccumulator. Чанк один раз
+разбивается groupby на сегменты, и каждый кусок попадает в аккумулятор своего
+сегмента, поэтому сводка и флаги качества по всем сегментам получаются за одно
+чтение файла, а не за N запусков по отфильтрованным подмножествам:
+
+    profiler = SegmentProfiler(["country"])
+    for chunk in pd.read_csv(path, chunksize=100_000):
+        profiler.update(chunk)
+    result = profiler.result()          # сводка и quality_score по каждому сегменту
+
+- Число сегментов ограничено max_groups: сегменты заводятся в порядке появления,
+  строки всех следующих новых значений ключа попадают в общий сегмент OTHER_SEGMENT.
+  Память на сегмент — как у потоковой сводки (скетчи, хэши уникальных, top-значения).
+- Колонки ключа в сводку сегмента не входят: внутри сегмента они константны.
+- Флаги качества считаются по сводке сегмента, как в report-sharded
+  (пропуски, нули, выбросы по скетчам; без проверок дубликатов по строкам).
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from .accumulate import SummaryAccumulator
+from .core import compute_quality_flags, flatten_summary_for_print, missing_table_from_summary
+from .outliers import DEFAULT_METHOD as OUTLIER_METHOD, outliers_from_summary
+from .sketch import DEFAULT_K
+
+DEFAULT_MAX_GROUPS = 100
+OTHER_SEGMENT = "(прочие)"
+
+SegmentKey = Tuple[Any, ...]
+
+
+def _segment_label(by: Sequence[Any], key: SegmentKey) -> str:
+    if key == (OTHER_SEGMENT,):
+        return OTHER_SEGMENT
+    return ", ".join(f"{column}={'NA' if pd.isna(value) else value}" for column, value in zip(by, key))
+
+
+class SegmentProfiler:
+    """Сливаемые сводки по сегментам потока чанков (см. описание модуля)."""
+
+    def __init__(
+        self,
+        by: Sequence[Any],
+        max_groups: int = DEFAULT_MAX_GROUPS,
+        example_values_per_column: int = 3,
+        sketch_k: int = DEFAULT_K,
+    ) -> None:
+        if not by:
+            raise ValueError("Нужна хотя бы одна колонка сегментации")
+        if max_groups <= 0:
+            raise ValueError("max_groups должен быть положительным")
+        self.by = list(by)
+        self.max_groups = max_groups
+        self.example_values_per_column = example_values_per_column
+        self.sketch_k = sketch_k
+        self.n_rows = 0
+        self.segments: Dict[SegmentKey, SummaryAccumulator] = {}
+        self.other: Optional[SummaryAccumulator] = None
+
+    def _accumulator(self, key: SegmentKey) -> SummaryAccumulator:
+        acc = self.segments.get(key)
+        if acc is not None:
+            return acc
+        if len(self.segments) < self.max_groups:
+            acc = self.segments[key] = SummaryAccumulator(self.example_values_per_column, self.sketch_k)
+            return acc
+        if self.other is None:
+            self.other = SummaryAccumulator(self.example_values_per_column, self.sketch_k)
+        return self.other
+
+    def update(self, chunk: pd.DataFrame) -> "SegmentProfiler":
+        missing = [c for c in self.by if c not in chunk.columns]
+        if missing:
+            raise KeyError(f"Колонки сегментации не найдены: {', '.join(map(str, missing))}")
+        self.n_rows += len(chunk)
+        values = chunk.drop(columns=self.by)
+        # groupby один раз сортирует чанк по ключу; строки сегмента берутся по позициям
+        grouped = chunk.groupby(self.by, sort=False, dropna=False, observed=True)
+        for key, positions in grouped.indices.items():
+            key = key if isinstance(key, tuple) else (key,)
+            self._accumulator(key).update(values.take(positions))
+        return self
+
+    def update_many(self, chunks: Iterable[pd.DataFrame]) -> "SegmentProfiler":
+        for chunk in chunks:
+            self.update(chunk)
+        return self
+
+    def feed(self, chunks: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        """Пропускает чанки дальше, попутно обновляя сегменты (один проход на два потребителя)."""
+        for chunk in chunks:
+            self.update(chunk)
+            yield chunk
+
+    def result(self, min_missing_share: float = 0.1, outlier_method: str = OUTLIER_METHOD) -> Dict[str, Any]:
+        """Сводка, флаги качества и quality_score по каждому сегменту (по убыванию числа строк)."""
+        items: List[Tuple[SegmentKey, SummaryAccumulator]] = list(self.segments.items())
+        if self.other is not None:
+            items.append(((OTHER_SEGMENT,), self.other))
+        segments = []
+        for key, acc in sorted(items, key=lambda item: -item[1].n_rows):
+            summary = acc.finalize()
+            flags = compute_quality_flags(
+                summary,
+                missing_table_from_summary(summary),
+                min_missing_share,
+                zero_counts=acc.zero_counts(),
+                outliers=outliers_from_summary(summary, method=outlier_method),
+            )
+            segments.append(
+                {
+                    "segment": _segment_label(self.by, key),
+                    "key": None if acc is self.other else list(key),
+                    "n_rows": summary.n_rows,
+                    "share": summary.n_rows / self.n_rows if self.n_rows else 0.0,
+                    "quality_score": flags["quality_score"],
+                    "flags": flags,
+                    "summary": summary,
+                }
+            )
+        return {
+            "by": self.by,
+            "n_rows": self.n_rows,
+            "n_segments": len(self.segments),
+            "truncated": self.other is not None,
+            "max_groups": self.max_groups,
+            "segments": segments,
+        }
+
+
+def profile_segments(
+    df: pd.DataFrame,
+    by: Sequence[Any],
+    max_groups: int = DEFAULT_MAX_GROUPS,
+    min_missing_share: float = 0.1,
+    sketch_k: int = DEFAULT_K,
+) -> Dict[str, Any]:
+    """Сегментная сводка по DataFrame целиком."""
+    return SegmentProfiler(by, max_groups=max_groups, sketch_k=sketch_k).update(df).result(min_missing_share)
+
+
+def segments_frame(result: Dict[str, Any]) -> pd.DataFrame:
+    """Сегмент на строку: размер, quality_score и главные флаги."""
+    rows = []
+    for item in result["segments"]:
+        flags = item["flags"]
+        rows.append(
+            {
+                "segment": item["segment"],
+                "n_rows": item["n_rows"],
+                "share": item["share"],
+                "quality_score": item["quality_score"],
+                "max_missing_share": flags.get("max_missing_share", 0.0),
+                "problematic_missing_cols": ", ".join(map(str, flags.get("problematic_missing_cols", []))),
+                "constant_columns": ", ".join(map(str, flags.get("constant_columns", []))),
+                "outlier_columns": ", ".join(str(c["column"]) for c in flags.get("outlier_columns", [])),
+            }
+        )
+    return pd.DataFrame(
+        rows,
+        columns=[
+            "segment",
+            "n_rows",
+            "share",
+            "quality_score",
+            "max_missing_share",
+            "problematic_missing_cols",
+            "constant_columns",
+            "outlier_columns",
+        ],
+    )
+
+
+def segment_columns_frame(result: Dict[str, Any]) -> pd.DataFrame:
+    """Сводка по колонкам внутри каждого сегмента (длинный формат: сегмент x колонка)."""
+    frames = [
+        flatten_summary_for_print(item["summary"]).assign(segment=item["segment"]) for item in result["segments"]
+    ]
+    if not frames:
+        return pd.DataFrame()
+    df = pd.concat(frames, ignore_index=True)
+    return df[["segment", *[c for c in df.columns if c != "segment"]]]
@@ -0,0 +1,128 @@
+"""
+Выбор колонок и строк до профилирования: --columns, --exclude и --where.
+
+Выбор проталкивается в чтение CSV: по заголовку файла считается список колонок,
+которые нужно разобрать (usecols), — выбранные и упомянутые в условии --where,
+остальные колонки парсер пропускает и не размещает в памяти. Условие — безопасное
+выражение над колонками (expressions.py, как expression в правилах качества: без @,
+атрибутов и вызовов), вычисляется векторно на каждом чанке, после чего колонки,
+нужные только условию, отбрасываются:
+
+    selection = Selection(columns=["country", "amount"], where="country == 'RU' and amount > 0")
+    df = read_csv(path, selection=selection)                     # целиком
+    chunks = read_csv(path, selection=selection, chunksize=100_000)  # поток отфильтрованных чанков
+
+Условие вычисляется по типам, которые дал парсер CSV (до вывода типов).
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import pandas as pd
+
+from .compression import PathLike, detect_compression
+from .expressions import CompiledExpression, ExpressionError, compile_expression
+
+
+class SelectionError(ValueError):
+    """Некорректный выбор колонок или условие --where."""
+
+
+def parse_column_list(values: Optional[Sequence[str]]) -> List[str]:
+    """['a, b', 'c'] -> ['a', 'b', 'c'] (опцию можно повторять и перечислять через запятую)."""
+    return [part.strip() for value in values or [] for part in value.split(",") if part.strip()]
+
+
+@dataclass
+class SelectionPlan:
+    """Выбор, привязанный к заголовку файла: что разбирать и что оставить."""
+
+    usecols: Optional[List[Any]]
+    keep: List[Any]
+    where: Optional[CompiledExpression] = None
+
+    def apply(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Оставляет строки, удовлетворяющие условию, и выбранные колонки."""
+        if self.where is not None:
+            try:
+                mask = self.where.evaluate(df)
+            except ExpressionError as exc:
+                raise SelectionError(f"Не удалось вычислить --where: {exc}") from exc
+            if not isinstance(mask, pd.Series) or not pd.api.types.is_bool_dtype(mask.dtype):
+                raise SelectionError(f"--where должно давать логическое значение: {self.where.text}")
+            df = df[mask.fillna(False).astype(bool)]
+        if list(df.columns) != self.keep:
+            df = df[self.keep]
+        return df
+
+    def apply_chunks(self, chunks: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        for chunk in chunks:
+            yield self.apply(chunk)
+
+
+@dataclass
+class Selection:
+    columns: List[str] = field(default_factory=list)
+    exclude: List[str] = field(default_factory=list)
+    where: Optional[str] = None
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.columns or self.exclude or self.where)
+
+    def key(self) -> Tuple[Any, ...]:
+        """Ключ для кэшей: одинаковый выбор — одинаковые данные."""
+        return (tuple(self.columns), tuple(self.exclude), self.where or "")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"columns": list(self.columns), "exclude": list(self.exclude), "where": self.where}
+
+    def plan(self, header: Sequence[Any]) -> SelectionPlan:
+        """Привязывает выбор к заголовку; неизвестные колонки и ошибки в условии — SelectionError."""
+        header = list(header)
+        unknown = [c for c in [*self.columns, *self.exclude] if c not in header]
+        if unknown:
+            raise SelectionError(f"Нет колонок: {', '.join(map(str, unknown))}")
+        chosen = set(self.columns) if self.columns else set(header)
+        keep = [c for c in header if c in chosen and c not in self.exclude]
+        if not keep:
+            raise SelectionError("После --columns/--exclude не осталось колонок")
+        needed = set(keep)
+        expr = None
+        if self.where:
+            # синтаксис, запрещённые конструкции и опечатки в именах колонок видно ещё до чтения файла;
+            # ошибки типов зависят от данных и проявятся на первом чанке
+            try:
+                expr = compile_expression(self.where)
+            except ExpressionError as exc:
+                raise SelectionError(f"Некорректное условие --where: {exc}") from exc
+            missing = [c for c in expr.columns if c not in header]
+            if missing:
+                raise SelectionError(f"Некорректное условие --where: нет колонок {', '.join(missing)}")
+            needed.update(expr.columns)
+        usecols = None if len(needed) == len(header) else [c for c in header if c in needed]
+        return SelectionPlan(usecols=usecols, keep=keep, where=expr)
+
+
+def read_csv(
+    path: PathLike,
+    sep: str = ",",
+    encoding: str = "utf-8",
+    selection: Optional[Selection] = None,
+    **kwargs: Any,
+) -> Union[pd.DataFrame, Iterator[pd.DataFrame]]:
+    """
+    pd.read_csv со сжатием по сигнатуре файла и выбором колонок/строк.
+    С chunksize возвращает поток уже отфильтрованных чанков.
+    """
+    compression = detect_compression(path)
+    if selection is None or selection.is_empty:
+        return pd.read_csv(path, sep=sep, encoding=encoding, compression=compression, **kwargs)
+    header = pd.read_csv(path, sep=sep, encoding=encoding, compression=compression, nrows=0).columns
+    plan = selection.plan(header)
+    data = pd.read_csv(path, sep=sep, encoding=encoding, compression=compression, usecols=plan.usecols, **kwargs)
+    if kwargs.get("chunksize"):
+        return plan.apply_chunks(data)
+    return plan.apply(data)
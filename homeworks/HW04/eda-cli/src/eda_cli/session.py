@@ -0,0 +1,206 @@
+"""
+Сессия профилирования одного DataFrame с общими промежуточными результатами.
+
+summarize_dataset, missing_table, compute_quality_flags, correlation_matrix и графики viz
+по отдельности каждый раз заново считают df.isna(), выбирают числовые колонки
+(select_dtypes) и частоты значений. Profile считает эти примитивы лениво, по первому
+обращению, запоминает их и передаёт уже готовыми во все функции ядра и viz —
+так каждый дорогой проход по данным выполняется не больше одного раза на датасет:
+
+    profile = Profile(df)
+    profile.summary             # summarize_dataset с готовыми счётчиками пропусков
+    profile.missing             # missing_table по тем же счётчикам
+    profile.correlation         # corr() по общему числовому представлению
+    profile.quality_flags(0.1)  # флаги по готовым сводке, пропускам, нулям и выбросам
+
+Агрегаты ядра (пропуски, уникальные, min/max/mean/std, корреляция, нули, частоты) считает
+бэкенд backend — pandas, polars или duckdb (см. backends.py); результаты от него не зависят.
+
+DataFrame после создания Profile менять нельзя: запомненные результаты не пересчитываются.
+Поэтому Profile можно держать между вызовами — так делает демон (daemon.py).
+"""
+
+from __future__ import annotations
+
+from functools import cached_property
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .backends import BackendLike, get_backend
+from .core import (
+    DatasetSummary,
+    compute_quality_flags,
+    correlation_matrix,
+    missing_table,
+    summarize_dataset,
+    top_categories,
+)
+from .duplicates import find_duplicates
+from .infer import ColumnInference
+from .missingness import MissingnessProfiler
+from .outliers import DEFAULT_METHOD as OUTLIER_METHOD, detect_outliers, isolation_scores
+from .segments import DEFAULT_MAX_GROUPS, SegmentProfiler
+from .sketch import DEFAULT_K
+from .target import profile_target
+from .text import profile_text
+from .timeseries import profile_datetimes
+
+
+class Profile:
+    """Ленивые и запоминаемые промежуточные результаты профилирования одного DataFrame."""
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        sketch_k: int = DEFAULT_K,
+        example_values_per_column: int = 3,
+        inferences: Optional[List[ColumnInference]] = None,
+        backend: BackendLike = None,
+    ) -> None:
+        self.df = df
+        self.backend = get_backend(backend)
+        self.sketch_k = sketch_k
+        self.example_values_per_column = example_values_per_column
+        # решения вывода типов, которыми df получен из исходного CSV (см. infer.convert_types)
+        self.inferences: List[ColumnInference] = list(inferences or [])
+        self._value_counts: Dict[Any, pd.Series] = {}
+        self._duplicates: Dict[Tuple[Tuple[str, ...], ...], Dict[str, Any]] = {}
+        self._outliers: Dict[Tuple[str, Optional[float]], List[Dict[str, Any]]] = {}
+        self._targets: Dict[Tuple[str, Any, int], Dict[str, Any]] = {}
+        self._segments: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+
+    # --- примитивы ---
+
+    @cached_property
+    def missing_mask(self) -> np.ndarray:
+        """Матрица пропусков (n_rows x n_cols, True — пропуск)."""
+        return self.df.isna().to_numpy()
+
+    @cached_property
+    def missing_counts(self) -> np.ndarray:
+        """Число пропусков по колонкам (у pandas — по общей матрице пропусков, у остальных — бэкендом)."""
+        if self.backend.name == "pandas" or "missing_mask" in self.__dict__:
+            return self.missing_mask.sum(axis=0)
+        return self.backend.missing_counts(self.df)
+
+    @cached_property
+    def numeric(self) -> pd.DataFrame:
+        """Числовые колонки (без bool) — для корреляции, нулей, выбросов и гистограмм."""
+        return self.df.select_dtypes(include="number")
+
+    @cached_property
+    def correlation(self) -> pd.DataFrame:
+        return correlation_matrix(self.df, numeric_df=self.numeric, backend=self.backend)
+
+    @cached_property
+    def zero_counts(self) -> Dict[Any, int]:
+        """Число нулей в числовых колонках (для флага has_many_zero_values)."""
+        if self.numeric.empty:
+            return {}
+        zeros, _ = self.backend.zero_counts(self.numeric)
+        return dict(zip(self.numeric.columns, zeros.tolist()))
+
+    def value_counts(self, name: Any) -> pd.Series:
+        """Частоты значений колонки (без пропусков), по убыванию; равные — в порядке первого появления."""
+        if name not in self._value_counts:
+            self._value_counts[name] = self.backend.value_counts(self.df[name])
+        return self._value_counts[name]
+
+    # --- результаты ядра поверх примитивов ---
+
+    @cached_property
+    def summary(self) -> DatasetSummary:
+        return summarize_dataset(
+            self.df,
+            example_values_per_column=self.example_values_per_column,
+            sketch_k=self.sketch_k,
+            missing_counts=self.missing_counts,
+            backend=self.backend,
+        )
+
+    @cached_property
+    def missing(self) -> pd.DataFrame:
+        return missing_table(self.df, missing_counts=self.missing_counts)
+
+    @cached_property
+    def missingness(self) -> Dict[str, Any]:
+        """Шаблоны и пары совместных пропусков по общей матрице пропусков (см. missingness.py)."""
+        return MissingnessProfiler().update_mask(self.missing_mask, self.df.columns).result()
+
+    def top_categories(self, max_columns: int = 5, top_k: int = 5) -> Dict[str, pd.DataFrame]:
+        return top_categories(self.df, max_columns=max_columns, top_k=top_k, value_counts=self.value_counts)
+
+    def duplicates(self, key_columns: Sequence[Sequence[str]] = ()) -> Dict[str, Any]:
+        key = tuple(tuple(columns) for columns in key_columns)
+        if key not in self._duplicates:
+            self._duplicates[key] = find_duplicates(self.df, keys=key_columns)
+        return self._duplicates[key]
+
+    def outliers(self, method: str = OUTLIER_METHOD, k: Optional[float] = None) -> List[Dict[str, Any]]:
+        key = (method, k)
+        if key not in self._outliers:
+            self._outliers[key] = detect_outliers(self.numeric, method=method, k=k)
+        return self._outliers[key]
+
+    @cached_property
+    def isolation(self) -> Optional[Dict[str, Any]]:
+        """Изоляционный лес по числовым колонкам (см. outliers.isolation_scores)."""
+        return isolation_scores(self.numeric)
+
+    @cached_property
+    def text(self) -> List[Dict[str, Any]]:
+        """Профиль строковых колонок (см. text.profile_text)."""
+        return profile_text(self.df)
+
+    @cached_property
+    def datetimes(self) -> List[Dict[str, Any]]:
+        """Профиль временных колонок (см. timeseries.profile_datetimes)."""
+        return profile_datetimes(self.df)
+
+    def target(self, target: str, positive: Any = None, top_k: int = 10) -> Dict[str, Any]:
+        """Связь признаков с целевой колонкой (см. target.profile_target)."""
+        key = (target, positive, top_k)
+        if key not in self._targets:
+            self._targets[key] = profile_target(self.df, target, positive=positive, top_k=top_k)
+        return self._targets[key]
+
+    def segments(
+        self,
+        by: Sequence[Any],
+        max_groups: int = DEFAULT_MAX_GROUPS,
+        min_missing_share: float = 0.1,
+        outlier_method: str = OUTLIER_METHOD,
+    ) -> Dict[str, Any]:
+        """Сводка и флаги качества по сегментам (см. segments.SegmentProfiler)."""
+        key = (tuple(by), max_groups, min_missing_share, outlier_method)
+        if key not in self._segments:
+            profiler = SegmentProfiler(
+                by,
+                max_groups=max_groups,
+                example_values_per_column=self.example_values_per_column,
+                sketch_k=self.sketch_k,
+            )
+            self._segments[key] = profiler.update(self.df).result(min_missing_share, outlier_method=outlier_method)
+        return self._segments[key]
+
+    def quality_flags(
+        self,
+        min_missing_share: float = 0.1,
+        key_columns: Sequence[Sequence[str]] = (),
+        rules_result: Optional[Dict[str, Any]] = None,
+        outlier_method: str = OUTLIER_METHOD,
+    ) -> Dict[str, Any]:
+        """compute_quality_flags по запомненным сводке, пропускам, нулям, дубликатам и выбросам."""
+        return compute_quality_flags(
+            self.summary,
+            self.missing,
+            min_missing_share,
+            df=self.df,
+            key_columns=key_columns,
+            duplicates=self.duplicates(key_columns),
+            rules_result=rules_result,
+            zero_counts=self.zero_counts,
+            outliers=self.outliers(outlier_method),
+        )
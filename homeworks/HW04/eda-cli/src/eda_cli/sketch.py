@@ -0,0 +1,181 @@
+"""
+Сливаемые (mergeable) квантильные скетчи для числовых колонок.
+
+KLLSketch — компактная версия KLL (Karnin, Lang, Liberty, 2016) на numpy:
+значения добавляются батчами, уровни уплотняются сортировкой и прореживанием
+через один, а скетчи с разных чанков/партиций/воркеров сливаются через merge.
+Точность задаётся параметром k: ошибка по рангу порядка 1.7 / k
+(k=200 -> около 1%). Пока в скетче не больше k значений, квантили точные.
+
+Прореживание случайное: по умолчанию у каждого скетча свой генератор (seed=None).
+Общий seed у шардов делал бы их ошибки уплотнения коррелированными, и при merge
+они бы складывались, а не гасили друг друга.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_K = 200
+# квантили, которые попадают в DatasetSummary (поле -> уровень)
+QUANTILES = {"p1": 0.01, "p5": 0.05, "p50": 0.5, "p95": 0.95, "p99": 0.99}
+
+_MIN_LEVEL_CAPACITY = 8
+_CAPACITY_DECAY = 2.0 / 3.0
+# update() добавляет большие батчи блоками по _BLOCK_FACTOR * k значений: сортируются только блоки,
+# а не весь батч целиком; блоки ровно по k тратили бы больше времени на накладные расходы numpy
+_BLOCK_FACTOR = 128
+
+
+class KLLSketch:
+    """
+    Квантильный скетч KLL.
+
+    - update(values): добавить батч значений (NaN игнорируются);
+    - merge(other): слить другой скетч (с любым k — используется наибольший);
+    - quantiles(qs): оценки квантилей; cdf(points): оценки функции распределения;
+    - to_dict()/from_dict(): сериализация в JSON-совместимый словарь.
+    """
+
+    __slots__ = ("k", "n", "min", "max", "levels", "_rng")
+
+    def __init__(self, k: int = DEFAULT_K, seed: Optional[int] = None) -> None:
+        if k < _MIN_LEVEL_CAPACITY:
+            raise ValueError(f"k должен быть не меньше {_MIN_LEVEL_CAPACITY}")
+        self.k = int(k)
+        self.n = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self.levels: List[np.ndarray] = [np.empty(0, dtype=float)]
+        self._rng = np.random.default_rng(seed)
+
+    # --- построение
+
+    def update(self, values: Any) -> "KLLSketch":
+        arr = np.asarray(values, dtype=float).ravel()
+        arr = arr[~np.isnan(arr)]
+        if arr.size == 0:
+            return self
+        self.n += int(arr.size)
+        self.min = min(self.min, float(arr.min()))
+        self.max = max(self.max, float(arr.max()))
+        block = self.k * _BLOCK_FACTOR
+        for start in range(0, arr.size, block):
+            self.levels[0] = np.concatenate([self.levels[0], arr[start : start + block]])
+            self._compress()
+        return self
+
+    def merge(self, other: "KLLSketch") -> "KLLSketch":
+        if other.n == 0:
+            return self
+        self.k = max(self.k, other.k)
+        self.n += other.n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0, dtype=float))
+        for h, level in enumerate(other.levels):
+            if level.size:
+                self.levels[h] = np.concatenate([self.levels[h], level])
+        self._compress()
+        return self
+
+    def _capacity(self, h: int) -> int:
+        depth = len(self.levels) - h - 1
+        return max(_MIN_LEVEL_CAPACITY, int(math.ceil(self.k * _CAPACITY_DECAY**depth)))
+
+    def _compress(self) -> None:
+        # уплотняем самый нижний переполненный уровень, пока все уровни не влезут
+        h = 0
+        while h < len(self.levels):
+            level = self.levels[h]
+            if level.size <= self._capacity(h):
+                h += 1
+                continue
+            if h + 1 == len(self.levels):
+                self.levels.append(np.empty(0, dtype=float))
+            level = np.sort(level)
+            keep = level[-1:] if level.size % 2 else level[:0]
+            even = level[: level.size - keep.size]
+            offset = int(self._rng.integers(2))
+            self.levels[h] = keep
+            self.levels[h + 1] = np.concatenate([self.levels[h + 1], even[offset::2]])
+            # добавленный уровень меняет ёмкости всех нижних — начинаем сначала
+            h = 0
+
+    # --- запросы
+
+    @property
+    def is_exact(self) -> bool:
+        """True, если ни одного уплотнения не было и квантили точные."""
+        return all(level.size == 0 for level in self.levels[1:])
+
+    def quantiles(self, qs: Sequence[float]) -> np.ndarray:
+        qs = np.asarray(qs, dtype=float)
+        if self.n == 0:
+            return np.full(qs.shape, np.nan)
+        if self.is_exact:
+            # точный режим: та же линейная интерполяция, что у pandas/numpy quantile
+            return np.quantile(self.levels[0], qs)
+        values, weights = self.weighted()
+        order = np.argsort(values, kind="stable")
+        values, cum = values[order], np.cumsum(weights[order])
+        idx = np.searchsorted(cum, qs * cum[-1], side="left")
+        result = values[np.clip(idx, 0, values.size - 1)]
+        # крайние квантили — точные min/max
+        result = np.where(qs <= 0.0, self.min, result)
+        return np.where(qs >= 1.0, self.max, result)
+
+    def cdf(self, points: Any, strict: bool = False) -> np.ndarray:
+        """Оценка доли значений <= x (при strict — < x) для каждой точки x (функция распределения)."""
+        points = np.asarray(points, dtype=float)
+        if self.n == 0:
+            return np.full(points.shape, np.nan)
+        values, weights = self.weighted()
+        order = np.argsort(values, kind="stable")
+        cum = np.concatenate([[0.0], np.cumsum(weights[order])])
+        return cum[np.searchsorted(values[order], points, side="left" if strict else "right")] / cum[-1]
+
+    def retained(self) -> np.ndarray:
+        """Все хранимые в скетче значения (без весов)."""
+        return np.concatenate(self.levels)
+
+    def weighted(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Хранимые значения и их веса (значение уровня h представляет 2**h исходных)."""
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(level.size, 2.0**h) for h, level in enumerate(self.levels)])
+        return values, weights
+
+    def quantile(self, q: float) -> float:
+        return float(self.quantiles([q])[0])
+
+    def __len__(self) -> int:
+        return self.n
+
+    def __repr__(self) -> str:
+        return f"KLLSketch(k={self.k}, n={self.n}, retained={sum(level.size for level in self.levels)})"
+
+    # --- сериализация
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "type": "kll",
+            "k": self.k,
+            "n": self.n,
+            "min": self.min if self.n else None,
+            "max": self.max if self.n else None,
+            "levels": [level.tolist() for level in self.levels],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], seed: Optional[int] = None) -> "KLLSketch":
+        sketch = cls(k=int(data["k"]), seed=seed)
+        sketch.n = int(data["n"])
+        if sketch.n:
+            sketch.min = float(data["min"])
+            sketch.max = float(data["max"])
+        sketch.levels = [np.asarray(level, dtype=float) for level in data["levels"]] or [np.empty(0)]
+        return sketch
@@ -0,0 +1,468 @@
+"""
+Профилирование таблиц SQLite/DuckDB без выгрузки данных: агрегаты считает сама база.
+
+Вместо чтения таблицы в pandas генерируются агрегатные запросы по пачкам колонок
+(по batch_size колонок в одном SELECT), и в Python попадают только их результаты:
+
+- COUNT(*), COUNT(c), COUNT(DISTINCT c) — строки, пропуски, уникальные значения;
+- MIN/MAX/AVG, число нулей и стандартное отклонение числовых колонок. В SQLite нет
+  STDDEV, поэтому вторым запросом считается сумма квадратов отклонений от среднего
+  SUM((c - mean) * (c - mean)) — устойчиво, в отличие от SUM(c * c) - n * mean²;
+- квантили p1..p99 — quantile_cont в DuckDB; в SQLite — значения с нужными номерами
+  в порядке сортировки (row_number() OVER (ORDER BY c)) с линейной интерполяцией, как в pandas;
+- top-k значений нечисловых колонок — GROUP BY c ORDER BY count DESC LIMIT k,
+  по одному подзапросу на колонку, объединённых UNION ALL;
+- полные дубликаты строк — COUNT(*) минус число строк SELECT DISTINCT *.
+
+Примеры значений берутся из первых строк таблицы (LIMIT), как из начала CSV.
+
+    profile = profile_sql("shop.sqlite", "orders")
+    profile.summary                     # DatasetSummary, как у summarize_dataset
+    profile.snapshot()                  # для report/compare (top_values, source=shop.sqlite:orders)
+
+Тип базы определяется по сигнатуре файла; база открывается только на чтение.
+DuckDB — опциональная зависимость (pip install "s03[backends]").
+
+Отличия от профилирования DataFrame: скетчей нет (outliers_from_summary их пропускает,
+поэтому выбросы не оцениваются); значения с равной частотой в top-k упорядочены
+по значению, а не по первому появлению; типы колонок берутся из схемы таблицы,
+а в SQLite (где тип не обязателен) — по фактическим типам значений.
+"""
+
+from __future__ import annotations
+
+import math
+import sqlite3
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .compression import PathLike
+from .core import STAT_FIELDS, DatasetSummary, _example_values
+from .drift import SummarySnapshot
+from .sketch import QUANTILES
+
+try:  # опционально: pip install "s03[backends]"
+    import duckdb
+except ImportError:  # pragma: no cover - зависит от окружения
+    duckdb = None
+
+DIALECTS = ("sqlite", "duckdb")
+DEFAULT_BATCH_SIZE = 64
+DEFAULT_TOP_K = 20
+# сколько первых строк читается ради примеров значений
+EXAMPLE_ROWS = 256
+
+_SQLITE_MAGIC = b"SQLite format 3\x00"
+_DUCKDB_MAGIC = b"DUCK"  # по смещению 8
+
+_DUCKDB_INTEGER = {
+    "TINYINT", "SMALLINT", "INTEGER", "BIGINT", "HUGEINT",
+    "UTINYINT", "USMALLINT", "UINTEGER", "UBIGINT", "UHUGEINT",
+}
+_DUCKDB_FLOAT = {"FLOAT", "DOUBLE", "REAL"}
+
+
+class SQLSourceError(ValueError):
+    """Файл не является базой SQLite/DuckDB, нет таблицы или колонок, не установлен duckdb."""
+
+
+def quote_identifier(name: str) -> str:
+    """Имя колонки/таблицы в двойных кавычках (одинаково для SQLite и DuckDB)."""
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def detect_dialect(path: PathLike) -> str:
+    """sqlite или duckdb — по сигнатуре файла."""
+    try:
+        with open(path, "rb") as f:
+            head = f.read(16)
+    except OSError as exc:
+        raise SQLSourceError(f"Не удалось открыть базу '{path}': {exc}") from exc
+    if head.startswith(_SQLITE_MAGIC):
+        return "sqlite"
+    if head[8:12] == _DUCKDB_MAGIC:
+        return "duckdb"
+    raise SQLSourceError(f"'{path}' не похож на базу SQLite или DuckDB")
+
+
+def _connect(path: PathLike, dialect: str) -> Any:
+    if dialect == "sqlite":
+        return sqlite3.connect(f"{Path(path).resolve().as_uri()}?mode=ro", uri=True)
+    if duckdb is None:
+        raise SQLSourceError('Для баз DuckDB нужен пакет duckdb: pip install "s03[backends]"')
+    return duckdb.connect(str(path), read_only=True)
+
+
+def _fetchall(conn: Any, sql: str) -> List[Tuple[Any, ...]]:
+    try:
+        return conn.execute(sql).fetchall()
+    except Exception as exc:  # noqa: BLE001 - sqlite3.Error / duckdb.Error
+        raise SQLSourceError(f"Ошибка запроса к базе: {exc}") from exc
+
+
+def list_tables(conn: Any, dialect: str) -> List[str]:
+    if dialect == "sqlite":
+        sql = (
+            "SELECT name FROM sqlite_master WHERE type IN ('table', 'view') "
+            "AND name NOT LIKE 'sqlite_%' ORDER BY name"
+        )
+    else:
+        sql = "SELECT table_name FROM information_schema.tables ORDER BY table_name"
+    return [row[0] for row in _fetchall(conn, sql)]
+
+
+def _table_schema(conn: Any, dialect: str, table: str) -> List[Tuple[str, str]]:
+    """[(колонка, объявленный тип)] в порядке таблицы."""
+    tables = list_tables(conn, dialect)
+    if table not in tables:
+        raise SQLSourceError(f"Таблица '{table}' не найдена; есть: {', '.join(tables) or '(пусто)'}")
+    if dialect == "sqlite":
+        rows = _fetchall(conn, f"PRAGMA table_info({quote_identifier(table)})")
+        return [(row[1], (row[2] or "").upper()) for row in rows]
+    rows = _fetchall(conn, f"DESCRIBE {quote_identifier(table)}")
+    return [(row[0], str(row[1]).upper()) for row in rows]
+
+
+def _sqlite_affinity(declared: str) -> str:
+    """Правила type affinity SQLite: integer, real, numeric, text или blob."""
+    if "INT" in declared:
+        return "integer"
+    if any(part in declared for part in ("CHAR", "CLOB", "TEXT")):
+        return "text"
+    if not declared or "BLOB" in declared:
+        return "blob"
+    if any(part in declared for part in ("REAL", "FLOA", "DOUB")):
+        return "real"
+    return "numeric"
+
+
+def _duckdb_kind(declared: str) -> str:
+    """integer, float, bool, datetime или other по типу DuckDB."""
+    base = declared.split("(")[0].strip()
+    if base in _DUCKDB_INTEGER:
+        return "integer"
+    if base in _DUCKDB_FLOAT or base == "DECIMAL":
+        return "float"
+    if base == "BOOLEAN":
+        return "bool"
+    if base.startswith("TIMESTAMP") or base == "DATE":
+        return "datetime"
+    return "other"
+
+
+def _value_at(ranges: Sequence[Tuple[int, int, float]], rank: int) -> float:
+    """Значение с номером rank в отсортированной колонке по диапазонам номеров [lo, hi) различных значений."""
+    return next(value for lo, hi, value in ranges if lo <= rank < hi)
+
+
+def _batches(items: Sequence[Any], size: int) -> List[Sequence[Any]]:
+    return [items[i : i + size] for i in range(0, len(items), max(1, size))]
+
+
+@dataclass
+class SQLProfile:
+    """Результат profile_sql: сводка и агрегаты, нужные флагам качества и отчёту."""
+
+    summary: DatasetSummary
+    top_values: Dict[str, Dict[str, int]]
+    zero_counts: Dict[str, int]
+    duplicates: Dict[str, Any]
+    source: str
+    queries: int = 0
+    dialect: str = "sqlite"
+
+    def snapshot(self) -> SummarySnapshot:
+        return SummarySnapshot(summary=self.summary, top_values=self.top_values, source=self.source)
+
+
+class _TableProfiler:
+    """Генерация и выполнение агрегатных запросов по одной таблице."""
+
+    def __init__(self, conn: Any, dialect: str, table: str, batch_size: int) -> None:
+        self.conn = conn
+        self.dialect = dialect
+        self.table = quote_identifier(table)
+        self.batch_size = batch_size
+        self.queries = 0
+
+    def fetch(self, sql: str) -> List[Tuple[Any, ...]]:
+        self.queries += 1
+        return _fetchall(self.conn, sql)
+
+    def numeric_expr(self, column: str, kind: str) -> Optional[str]:
+        """Выражение для числовых агрегатов колонки или None, если колонка не числовая."""
+        c = quote_identifier(column)
+        if self.dialect == "sqlite":
+            # тип в SQLite не обязателен, и в числовой колонке может оказаться строка; такая колонка
+            # считается строковой (см. _dtype), и её MIN/MAX/AVG отбрасываются, поэтому здесь
+            # не нужна проверка typeof на каждом значении
+            return None if kind == "text" else c
+        if kind in ("integer", "float"):
+            return f"CAST({c} AS DOUBLE)"
+        if kind == "bool":
+            return f"CAST({c} AS INTEGER)"
+        return None
+
+    def base_aggregates(self, columns: Sequence[Tuple[str, str]]) -> Tuple[int, Dict[str, Dict[str, Any]]]:
+        """COUNT/MIN/MAX/AVG/нули (+ COUNT DISTINCT, STDDEV и квантили в DuckDB) пачками колонок."""
+        n_rows = 0
+        result: Dict[str, Dict[str, Any]] = {}
+        quantiles = ", ".join(repr(q) for q in QUANTILES.values())
+        for batch in _batches(columns, self.batch_size):
+            exprs = ["COUNT(*)"]
+            layout = []
+            for name, kind in batch:
+                c = quote_identifier(name)
+                fields = ["non_null"]
+                exprs.append(f"COUNT({c})")
+                if self.dialect == "duckdb":
+                    fields.append("unique")
+                    exprs.append(f"COUNT(DISTINCT {c})")
+                else:
+                    fields += ["numeric", "integer"]
+                    exprs += [
+                        f"SUM(typeof({c}) IN ('integer', 'real'))",
+                        f"SUM(typeof({c}) = 'integer')",
+                    ]
+                x = self.numeric_expr(name, kind)
+                if x is not None:
+                    fields += ["min", "max", "mean", "zeros"]
+                    exprs += [f"MIN({x})", f"MAX({x})", f"AVG({x})", f"SUM(CASE WHEN {x} = 0 THEN 1 ELSE 0 END)"]
+                    if self.dialect == "duckdb":
+                        fields += ["std", "quantiles"]
+                        # STDDEV_SAMP падает на ±inf; тогда std — NULL (NaN), как в pandas
+                        finite = f"CASE WHEN isfinite({x}) THEN {x} END"
+                        std = f"CASE WHEN bool_and(isfinite({x})) THEN STDDEV_SAMP({finite}) END"
+                        exprs += [std, f"quantile_cont({x}, [{quantiles}])"]
+                layout.append((name, fields))
+            (row,) = self.fetch(f"SELECT {', '.join(exprs)} FROM {self.table}")
+            n_rows = int(row[0])
+            pos = 1
+            for name, fields in layout:
+                result[name] = dict(zip(fields, row[pos : pos + len(fields)]))
+                pos += len(fields)
+        return n_rows, result
+
+    def sum_squares(self, columns: Sequence[Tuple[str, str, float]]) -> Dict[str, float]:
+        """
+        SUM((c - mean)²) для колонок [(имя, вид, среднее)] — стандартное отклонение в SQLite.
+        Нечисловое среднее (±inf в колонке) не подставляется в SQL: сумма квадратов — NaN, как std в pandas.
+        """
+        result: Dict[str, float] = {name: np.nan for name, _, mean in columns if not math.isfinite(mean)}
+        columns = [column for column in columns if column[0] not in result]
+        for batch in _batches(columns, self.batch_size):
+            exprs = []
+            for name, kind, mean in batch:
+                x = self.numeric_expr(name, kind)
+                exprs.append(f"SUM(({x} - ({mean!r})) * ({x} - ({mean!r})))")
+            (row,) = self.fetch(f"SELECT {', '.join(exprs)} FROM {self.table}")
+            result.update({name: float(value or 0.0) for (name, _, _), value in zip(batch, row)})
+        return result
+
+    def sqlite_distributions(self, columns: Sequence[Tuple[str, str, int]]) -> Dict[str, Tuple[int, List[float]]]:
+        """
+        Число уникальных и квантили p1..p99 числовых колонок [(имя, вид, непустых)] в SQLite.
+        Одна сортировка на колонку: GROUP BY даёт различные значения по возрастанию
+        (GROUP BY через сортировку быстрее COUNT(DISTINCT) на B-дереве), накопленная сумма
+        частот — номера строк, а номер группы последней строки — число уникальных.
+        В Python попадают только значения с номерами, нужными для линейной интерполяции, как в pandas.
+        """
+        result: Dict[str, Tuple[int, List[float]]] = {}
+        for batch in _batches(list(enumerate(columns)), self.batch_size):
+            parts = []
+            for i, (name, kind, n) in batch:
+                x = self.numeric_expr(name, kind)
+                positions = [q * (n - 1) for q in QUANTILES.values()]
+                ranks = sorted({int(f(p)) for p in positions for f in (math.floor, math.ceil)} | {n - 1})
+                hit = " OR ".join(f"(cum - n <= {r} AND {r} < cum)" for r in ranks)
+                parts.append(
+                    f"SELECT * FROM (SELECT {i} AS i, v, cum - n AS lo, cum, g FROM ("
+                    "SELECT v, n, SUM(n) OVER w AS cum, row_number() OVER w AS g "
+                    f"FROM (SELECT {x} AS v, COUNT(*) AS n FROM {self.table} WHERE {x} IS NOT NULL GROUP BY v) "
+                    f"WINDOW w AS (ORDER BY v ROWS UNBOUNDED PRECEDING)) WHERE {hit})"
+                )
+            found: Dict[int, List[Tuple[int, int, float]]] = {}
+            groups: Dict[int, int] = {}
+            for i, value, lo, hi, g in self.fetch(" UNION ALL ".join(parts)):
+                found.setdefault(int(i), []).append((int(lo), int(hi), float(value)))
+                groups[int(i)] = max(groups.get(int(i), 0), int(g))
+
+            for i, (name, _, n) in batch:
+                quantiles = []
+                for q in QUANTILES.values():
+                    p = q * (n - 1)
+                    lo, hi = _value_at(found[i], math.floor(p)), _value_at(found[i], math.ceil(p))
+                    quantiles.append(lo + (hi - lo) * (p - math.floor(p)))
+                result[name] = (groups[i], quantiles)
+        return result
+
+    def top_values(self, columns: Sequence[str], top_k: int) -> Tuple[Dict[str, Dict[str, int]], Dict[str, int]]:
+        """
+        Top-k значений и число уникальных: подзапрос GROUP BY на колонку,
+        пачка подзапросов — один UNION ALL.
+        """
+        top: Dict[str, Dict[str, int]] = {name: {} for name in columns}
+        unique: Dict[str, int] = {name: 0 for name in columns}
+        for batch in _batches(list(enumerate(columns)), self.batch_size):
+            parts = []
+            for i, name in batch:
+                c = quote_identifier(name)
+                parts.append(
+                    f"SELECT * FROM (SELECT {i} AS i, CAST({c} AS TEXT) AS v, COUNT(*) AS n, "
+                    f"COUNT(*) OVER () AS groups FROM {self.table} WHERE {c} IS NOT NULL "
+                    f"GROUP BY {c} ORDER BY n DESC, v LIMIT {max(1, int(top_k))})"
+                )
+            for i, value, count, groups in self.fetch(" UNION ALL ".join(parts)):
+                top[columns[int(i)]][value] = int(count)
+                unique[columns[int(i)]] = int(groups)
+        return top, unique
+
+    def head(self, columns: Sequence[str], limit: int) -> pd.DataFrame:
+        select = ", ".join(quote_identifier(c) for c in columns)
+        rows = self.fetch(f"SELECT {select} FROM {self.table} LIMIT {int(limit)}")
+        return pd.DataFrame.from_records(rows, columns=list(columns))
+
+    def distinct_rows(self, columns: Sequence[str]) -> int:
+        select = ", ".join(quote_identifier(c) for c in columns)
+        (row,) = self.fetch(f"SELECT COUNT(*) FROM (SELECT 1 FROM {self.table} GROUP BY {select})")
+        return int(row[0])
+
+
+def _dtype(dialect: str, kind: str, agg: Dict[str, Any], missing: int) -> Tuple[str, bool]:
+    """pandas-подобный тип колонки и признак числовой колонки."""
+    if dialect == "sqlite":
+        non_null = agg["non_null"]
+        if kind == "text":
+            return "object", False
+        if non_null == 0:
+            numeric = kind in ("integer", "real", "numeric")
+            return ("float64" if numeric else "object"), numeric
+        if (agg["numeric"] or 0) < non_null:
+            return "object", False
+        integer = (agg["integer"] or 0) == non_null
+        return ("int64" if integer and missing == 0 else "float64"), True
+    if kind == "integer":
+        return ("int64" if missing == 0 else "float64"), True
+    if kind == "float":
+        return "float64", True
+    if kind == "bool":
+        return ("bool" if missing == 0 else "object"), missing == 0
+    if kind == "datetime":
+        return "datetime64[ns]", False
+    return "object", False
+
+
+def profile_sql(
+    db: PathLike,
+    table: str,
+    columns: Optional[Sequence[str]] = None,
+    exclude: Sequence[str] = (),
+    top_k: int = DEFAULT_TOP_K,
+    example_values_per_column: int = 3,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> SQLProfile:
+    """
+    Сводка по таблице SQLite/DuckDB, посчитанная агрегатными запросами внутри базы.
+    columns/exclude — выбор колонок (как --columns/--exclude).
+    """
+    dialect = detect_dialect(db)
+    conn = _connect(db, dialect)
+    try:
+        schema = _table_schema(conn, dialect, table)
+        header = [name for name, _ in schema]
+        unknown = [c for c in [*(columns or []), *exclude] if c not in header]
+        if unknown:
+            raise SQLSourceError(f"Нет колонок: {', '.join(map(str, unknown))}")
+        chosen = set(columns) if columns else set(header)
+        kinds = [
+            (name, _sqlite_affinity(declared) if dialect == "sqlite" else _duckdb_kind(declared))
+            for name, declared in schema
+            if name in chosen and name not in exclude
+        ]
+        if not kinds:
+            raise SQLSourceError("После --columns/--exclude не осталось колонок")
+        names = [name for name, _ in kinds]
+        profiler = _TableProfiler(conn, dialect, table, batch_size)
+        n_rows, aggs = profiler.base_aggregates(kinds)
+
+        n_cols = len(names)
+        dtypes, is_numeric = [], []
+        for name, kind in kinds:
+            dtype, numeric = _dtype(dialect, kind, aggs[name], n_rows - int(aggs[name]["non_null"]))
+            dtypes.append(dtype)
+            is_numeric.append(numeric)
+        non_null = np.array([int(aggs[name]["non_null"]) for name in names], dtype=np.int64)
+        has_stats = np.array(is_numeric, dtype=bool) & (non_null > 0)
+
+        unique = {name: int(aggs[name].get("unique", 0)) for name in names}
+        stats = {stat: np.full(n_cols, np.nan) for stat in STAT_FIELDS}
+        with_stats = [(i, names[i], kinds[i][1]) for i in np.flatnonzero(has_stats)]
+        for i, name, _ in with_stats:
+            agg = aggs[name]
+            stats["min"][i], stats["max"][i], stats["mean"][i] = agg["min"], agg["max"], agg["mean"]
+            if dialect == "duckdb":
+                stats["std"][i] = np.nan if agg["std"] is None else agg["std"]
+                for field_name, value in zip(QUANTILES, agg["quantiles"]):
+                    stats[field_name][i] = value
+        if dialect == "sqlite":
+            # среднее берём из stats: NULL (SQLite возвращает его вместо NaN при +inf и -inf) там уже NaN
+            squares = profiler.sum_squares([(name, kind, float(stats["mean"][i])) for i, name, kind in with_stats])
+            distributions = profiler.sqlite_distributions(
+                [(name, kind, int(non_null[i])) for i, name, kind in with_stats]
+            )
+            for i, name, _ in with_stats:
+                n = int(non_null[i])
+                stats["std"][i] = math.sqrt(squares[name] / (n - 1)) if n > 1 else np.nan
+                unique[name], quantiles = distributions[name]
+                for field_name, value in zip(QUANTILES, quantiles):
+                    stats[field_name][i] = value
+
+        categorical = [name for name, numeric in zip(names, is_numeric) if not numeric]
+        top_values: Dict[str, Dict[str, int]] = {}
+        if categorical and n_rows:
+            top_values, categorical_unique = profiler.top_values(categorical, top_k)
+            if dialect == "sqlite":
+                unique.update(categorical_unique)
+        head = profiler.head(names, EXAMPLE_ROWS) if example_values_per_column > 0 else None
+        examples = [
+            _example_values(head[name], example_values_per_column) if head is not None else [] for name in names
+        ]
+        distinct = profiler.distinct_rows(names) if n_rows else 0
+    finally:
+        conn.close()
+
+    summary = DatasetSummary.from_arrays(
+        n_rows,
+        n_cols,
+        names=names,
+        dtypes=dtypes,
+        non_null=non_null,
+        missing=n_rows - non_null,
+        missing_share=(n_rows - non_null) / n_rows if n_rows > 0 else np.zeros(n_cols),
+        unique=[unique[name] for name in names],
+        example_values=examples,
+        is_numeric=is_numeric,
+        has_stats=has_stats,
+        stats=stats,
+    )
+    duplicate_rows = n_rows - distinct
+    return SQLProfile(
+        summary=summary,
+        top_values=top_values,
+        zero_counts={
+            name: int(aggs[name].get("zeros") or 0) for name, numeric in zip(names, is_numeric) if numeric
+        },
+        duplicates={
+            "n_rows": n_rows,
+            "duplicate_rows": duplicate_rows,
+            "duplicate_row_share": duplicate_rows / n_rows if n_rows else 0.0,
+            "key_violations": [],
+        },
+        source=f"{Path(db).name}:{table}",
+        queries=profiler.queries,
+        dialect=dialect,
+    )
@@ -0,0 +1,291 @@
+"""
+Связь признаков с целевой переменной (для датасетов под обучение с учителем).
+
+Целевая колонка кодируется числом y: бинарная (0/1 — задача binary) или
+произвольная числовая (regression). За один проход по чанкам считаются:
+
+- числовые признаки: корреляция с y (для бинарной цели — точечно-бисериальная)
+  по суммам Σx, Σy, Σx², Σy², Σxy — одной матричной операцией на чанк;
+  для бинарной цели ещё AUC по KLL-скетчам признака в каждом классе;
+- категориальные признаки: среднее y (доля положительного класса) по категориям
+  через groupby и eta² — доля дисперсии y, объяснённая категориями.
+  Счётчики категорий ограничены max_categories (редкие отбрасываются),
+  поэтому память не растёт на колонках с высокой кардинальностью.
+
+Подозрение на утечку — почти идеальное разделение: AUC >= 0.99 (или <= 0.01),
+|corr| >= 0.99 или eta² >= 0.95 на колонке, которая не похожа на идентификатор
+(и не меньше MIN_LEAKAGE_ROWS строк).
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+from pandas.api import types as ptypes
+
+from .sketch import DEFAULT_K, KLLSketch
+
+DEFAULT_MAX_CATEGORIES = 1000
+DEFAULT_TOP_K = 10
+MIN_CATEGORY_SUPPORT = 5
+LEAKAGE_AUC = 0.99
+LEAKAGE_CORR = 0.99
+LEAKAGE_ETA2 = 0.95
+# категориальная колонка, где категорий больше этой доли строк, похожа на идентификатор
+ID_LIKE_SHARE = 0.5
+# на меньшем числе строк «идеальное разделение» слишком часто бывает случайным
+MIN_LEAKAGE_ROWS = 100
+
+
+def _auc(pos: KLLSketch, neg: KLLSketch) -> Optional[float]:
+    """P(x_pos > x_neg) + 0.5 * P(x_pos == x_neg) по двум скетчам."""
+    if pos.n == 0 or neg.n == 0:
+        return None
+    values, weights = pos.weighted()
+    below = (neg.cdf(values, strict=True) + neg.cdf(values)) / 2.0
+    return float(np.sum(weights * below) / np.sum(weights))
+
+
+class TargetProfiler:
+    """
+    Статистики признаков относительно целевой колонки по потоку чанков.
+
+    profiler = TargetProfiler("churned")
+    for chunk in pd.read_csv(path, chunksize=100_000):
+        profiler.update(chunk)
+    result = profiler.result()
+
+    Тип задачи и набор признаков определяются по первому чанку. positive —
+    значение положительного класса (для нечисловой бинарной цели по умолчанию
+    берётся последнее по сортировке, например "yes" для yes/no).
+    """
+
+    def __init__(
+        self,
+        target: Any,
+        positive: Any = None,
+        top_k: int = DEFAULT_TOP_K,
+        max_categories: int = DEFAULT_MAX_CATEGORIES,
+        sketch_k: int = DEFAULT_K,
+    ) -> None:
+        self.target = target
+        self.positive = positive
+        self.top_k = top_k
+        self.max_categories = max_categories
+        self.sketch_k = sketch_k
+        self.task: Optional[str] = None
+        self.n_rows = 0
+        self.numeric: List[Any] = []
+        self.categorical: List[Any] = []
+        self._shift: Optional[np.ndarray] = None
+        self._sums: Optional[Dict[str, np.ndarray]] = None
+        self._y = {"n": 0, "sum": 0.0, "sumsq": 0.0}
+        self._sketches: Dict[Any, List[KLLSketch]] = {}
+        self._groups: Dict[Any, pd.DataFrame] = {}
+        self._truncated: Dict[Any, bool] = {}
+
+    # --- кодирование цели
+
+    def _setup(self, chunk: pd.DataFrame) -> None:
+        if self.target not in chunk.columns:
+            raise KeyError(f"Целевая колонка '{self.target}' не найдена")
+        s = chunk[self.target].dropna()
+        values = pd.unique(s)
+        if self.positive is not None or ptypes.is_bool_dtype(s):
+            self.task = "binary"
+        elif ptypes.is_numeric_dtype(s):
+            self.task = "binary" if set(values.tolist()) <= {0, 1} else "regression"
+        elif len(values) <= 2:
+            self.task = "binary"
+            self.positive = sorted(map(str, values))[-1] if len(values) else None
+        else:
+            raise ValueError(
+                f"Целевая колонка '{self.target}' должна быть бинарной или числовой "
+                f"(для многоклассовой задайте положительный класс)"
+            )
+        features = [c for c in chunk.columns if c != self.target]
+        self.numeric = [c for c in features if ptypes.is_numeric_dtype(chunk[c]) or ptypes.is_bool_dtype(chunk[c])]
+        self.categorical = [c for c in features if c not in self.numeric and not ptypes.is_datetime64_any_dtype(chunk[c])]
+        self._sums = {key: np.zeros(len(self.numeric)) for key in ("n", "sx", "sy", "sxx", "syy", "sxy")}
+        if self.task == "binary":
+            self._sketches = {c: [KLLSketch(self.sketch_k), KLLSketch(self.sketch_k)] for c in self.numeric}
+
+    def _encode(self, s: pd.Series) -> np.ndarray:
+        if self.positive is not None:
+            if ptypes.is_numeric_dtype(s) and not ptypes.is_bool_dtype(s):
+                y = (s == float(self.positive)).astype(float).to_numpy()
+            else:
+                y = (s.astype(str) == str(self.positive)).astype(float).to_numpy()
+            return np.where(s.isna().to_numpy(), np.nan, y)
+        y = pd.to_numeric(s, errors="coerce").astype(float).to_numpy()
+        if self.task == "binary" and not np.isin(y[~np.isnan(y)], (0.0, 1.0)).all():
+            raise ValueError(f"Целевая колонка '{self.target}' перестала быть бинарной (0/1)")
+        return y
+
+    # --- проход по чанкам
+
+    def update(self, chunk: pd.DataFrame) -> "TargetProfiler":
+        if self.task is None:
+            self._setup(chunk)
+        y_all = self._encode(chunk[self.target])
+        keep = ~np.isnan(y_all)
+        y = y_all[keep]
+        if y.size == 0:
+            return self
+        self.n_rows += int(y.size)
+        self._y["n"] += int(y.size)
+        self._y["sum"] += float(y.sum())
+        self._y["sumsq"] += float((y**2).sum())
+
+        if self.numeric:
+            X = chunk[self.numeric].to_numpy(dtype=float, na_value=np.nan)[keep]
+            mask = ~np.isnan(X)
+            if self._shift is None:
+                # сдвиг на среднее первого чанка — против потери точности в Σx²
+                with np.errstate(all="ignore"):
+                    self._shift = np.nan_to_num(np.nanmean(X, axis=0)) if X.size else np.zeros(X.shape[1])
+            X0 = np.where(mask, X - self._shift, 0.0)
+            Y = mask * y[:, None]
+            sums = self._sums
+            sums["n"] += mask.sum(axis=0)
+            sums["sx"] += X0.sum(axis=0)
+            sums["sy"] += Y.sum(axis=0)
+            sums["sxx"] += (X0**2).sum(axis=0)
+            sums["syy"] += (Y**2).sum(axis=0)
+            sums["sxy"] += (X0 * Y).sum(axis=0)
+            if self.task == "binary":
+                pos = y == 1.0
+                for j, name in enumerate(self.numeric):
+                    col = X[:, j]
+                    neg_sketch, pos_sketch = self._sketches[name]
+                    pos_sketch.update(col[pos & mask[:, j]])
+                    neg_sketch.update(col[~pos & mask[:, j]])
+
+        y_series = pd.Series(y)
+        for name in self.categorical:
+            stats = y_series.groupby(chunk[name].to_numpy()[keep], dropna=True).agg(["sum", "count"])
+            # ключи приводятся к строкам уже после группировки — по одному на категорию
+            stats.index = stats.index.astype(str)
+            if not stats.index.is_unique:
+                stats = stats.groupby(level=0).sum()
+            state = self._groups.get(name)
+            state = stats if state is None else state.add(stats, fill_value=0)
+            if len(state) > 2 * self.max_categories:
+                state = state.nlargest(self.max_categories, "count")
+                self._truncated[name] = True
+            self._groups[name] = state
+        return self
+
+    def update_many(self, chunks: Iterable[pd.DataFrame]) -> "TargetProfiler":
+        for chunk in chunks:
+            self.update(chunk)
+        return self
+
+    # --- итог
+
+    def _numeric_features(self) -> List[Dict[str, Any]]:
+        if not self.numeric:
+            return []
+        s = self._sums
+        n = s["n"]
+        with np.errstate(all="ignore"):
+            cov = n * s["sxy"] - s["sx"] * s["sy"]
+            var = (n * s["sxx"] - s["sx"] ** 2) * (n * s["syy"] - s["sy"] ** 2)
+            corr = np.where(var > 0, cov / np.sqrt(np.where(var > 0, var, 1.0)), np.nan)
+        features = []
+        for j, name in enumerate(self.numeric):
+            r = None if np.isnan(corr[j]) else float(np.clip(corr[j], -1.0, 1.0))
+            item: Dict[str, Any] = {"name": name, "kind": "numeric", "n": int(n[j]), "corr": r, "auc": None}
+            if self.task == "binary":
+                neg_sketch, pos_sketch = self._sketches[name]
+                item["auc"] = _auc(pos_sketch, neg_sketch)
+                strength = None if item["auc"] is None else abs(item["auc"] - 0.5) * 2.0
+                item["leakage"] = item["auc"] is not None and max(item["auc"], 1.0 - item["auc"]) >= LEAKAGE_AUC
+            else:
+                strength = None if r is None else abs(r)
+                item["leakage"] = r is not None and abs(r) >= LEAKAGE_CORR
+            item["leakage"] = item["leakage"] and item["n"] >= MIN_LEAKAGE_ROWS
+            item["strength"] = strength
+            features.append(item)
+        return features
+
+    def _categorical_features(self) -> List[Dict[str, Any]]:
+        n, total = self._y["n"], self._y["sum"]
+        mean = total / n if n else 0.0
+        total_var = self._y["sumsq"] - n * mean**2
+        features = []
+        for name in self.categorical:
+            stats = self._groups.get(name)
+            if stats is None or stats.empty:
+                continue
+            counts = stats["count"].to_numpy()
+            means = stats["sum"].to_numpy() / counts
+            covered = int(counts.sum())
+            truncated = self._truncated.get(name, False)
+            # eta² по отслеживаемым категориям: межгрупповая дисперсия / общая
+            eta2 = float(np.sum(counts * (means - mean) ** 2) / total_var) if total_var > 0 else None
+            id_like = len(stats) > ID_LIKE_SHARE * covered or truncated
+            supported = counts >= MIN_CATEGORY_SUPPORT
+            spread = float(means[supported].max() - means[supported].min()) if supported.sum() >= 2 else None
+            top = stats.assign(target_mean=means).nlargest(self.top_k, "count")
+            features.append(
+                {
+                    "name": name,
+                    "kind": "categorical",
+                    "n": covered,
+                    "n_categories": int(len(stats)),
+                    "truncated": truncated,
+                    "eta2": None if eta2 is None else min(eta2, 1.0),
+                    "target_mean_spread": spread,
+                    "categories": [
+                        {"value": value, "count": int(row["count"]), "target_mean": float(row["target_mean"])}
+                        for value, row in top.iterrows()
+                    ],
+                    "strength": None if eta2 is None or id_like else min(eta2, 1.0),
+                    "leakage": eta2 is not None and not id_like and eta2 >= LEAKAGE_ETA2 and covered >= MIN_LEAKAGE_ROWS,
+                }
+            )
+        return features
+
+    def result(self) -> Dict[str, Any]:
+        n = self._y["n"]
+        features = self._numeric_features() + self._categorical_features()
+        features.sort(key=lambda f: -1.0 if f["strength"] is None else f["strength"], reverse=True)
+        return {
+            "target": self.target,
+            "task": self.task,
+            "positive": self.positive if self.positive is not None else (1 if self.task == "binary" else None),
+            "n_rows": self.n_rows,
+            "target_mean": self._y["sum"] / n if n else None,
+            "features": features,
+            "leakage_suspects": [f["name"] for f in features if f["leakage"]],
+        }
+
+
+def profile_target(data: Any, target: Any, positive: Any = None, top_k: int = DEFAULT_TOP_K) -> Dict[str, Any]:
+    """Статистики признаков относительно target по DataFrame или итерируемому набору чанков."""
+    profiler = TargetProfiler(target, positive=positive, top_k=top_k)
+    if isinstance(data, pd.DataFrame):
+        profiler.update(data)
+    else:
+        profiler.update_many(data)
+    return profiler.result()
+
+
+def target_frame(result: Dict[str, Any]) -> pd.DataFrame:
+    """Таблица по признакам (без списков категорий), отсортированная по силе связи."""
+    columns = ["name", "kind", "n", "strength", "corr", "auc", "eta2", "n_categories", "target_mean_spread", "leakage"]
+    return pd.DataFrame([{c: f.get(c) for c in columns} for f in result["features"]], columns=columns)
+
+
+def target_categories_frame(result: Dict[str, Any]) -> pd.DataFrame:
+    """Длинная таблица: признак, категория, число строк, среднее целевой."""
+    rows = [
+        {"feature": f["name"], **category}
+        for f in result["features"]
+        if f["kind"] == "categorical"
+        for category in f["categories"]
+    ]
+    return pd.DataFrame(rows, columns=["feature", "value", "count", "target_mean"])
@@ -0,0 +1,235 @@
+"""
+Профиль строковых колонок: длины, пустые строки, классы символов и форматы.
+
+Статистики считаются векторно строковыми ядрами Arrow (pyarrow.compute:
+utf8_length, utf8_is_digit, match_substring_regex, ...), без цикла по значениям
+в Python. Без pyarrow используются строковые методы pandas (.str) — медленнее,
+но с тем же результатом. TextProfiler работает по чанкам и сливается через merge;
+распределение длин хранится в KLL-скетче.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+from pandas.api import types as ptypes
+
+from .sketch import KLLSketch
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:  # pragma: no cover - зависит от окружения
+    pa = None
+    pc = None
+
+# распознаваемые форматы (регулярные выражения RE2/re, совпадение со всей строкой)
+FORMAT_PATTERNS = {
+    "email": r"^[^@\s]+@[^@\s]+\.[^@\s]+$",
+    "date": r"^(\d{4}-\d{2}-\d{2}([ T]\d{2}:\d{2}(:\d{2}(\.\d+)?)?)?|\d{2}[./]\d{2}[./]\d{4})$",
+    "numeric": r"^\s*[+-]?(\d+([.,]\d*)?|[.,]\d+)([eE][+-]?\d+)?\s*$",
+}
+PATTERN_CLASSES = ("digits", "letters", "alnum", "other")
+# формат считается распознанным, если ему соответствует не меньше этой доли непустых значений
+FORMAT_THRESHOLD = 0.9
+LENGTH_QUANTILES = {"p50": 0.5, "p95": 0.95}
+
+
+def is_text_column(s: pd.Series) -> bool:
+    """Строковая колонка: object или string dtype (но не category/bool/числа/даты)."""
+    return ptypes.is_object_dtype(s) or (ptypes.is_string_dtype(s) and not ptypes.is_numeric_dtype(s))
+
+
+def arrow_strings(s: pd.Series) -> "pa.Array":
+    """Непустые значения колонки как arrow-массив строк (нестроковые значения приводятся к str)."""
+    values = s.dropna()
+    try:
+        arr = pa.array(values, from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        arr = pa.array(values.astype(str), from_pandas=True)
+    if not pa.types.is_string(arr.type) and not pa.types.is_large_string(arr.type):
+        arr = pc.cast(arr, pa.string()) if len(arr) else pa.array([], pa.string())
+    return arr
+
+
+def _counts_arrow(s: pd.Series) -> Dict[str, Any]:
+    arr = arrow_strings(s)
+    lengths = pc.utf8_length(arr).to_numpy(zero_copy_only=False)
+    stripped_len = pc.utf8_length(pc.utf8_trim_whitespace(arr))
+
+    def count(mask) -> int:
+        return int(pc.sum(pc.cast(mask, pa.int64())).as_py() or 0)
+
+    non_empty = pc.greater(stripped_len, 0)
+    digits = pc.and_(pc.utf8_is_digit(arr), non_empty)
+    letters = pc.and_(pc.utf8_is_alpha(arr), non_empty)
+    alnum = pc.and_(pc.utf8_is_alnum(arr), non_empty)
+    return {
+        "non_null": len(arr),
+        "lengths": lengths,
+        "empty": int((lengths == 0).sum()),
+        "whitespace": count(pc.and_(pc.equal(stripped_len, 0), pc.greater(pc.utf8_length(arr), 0))),
+        "digits": count(digits),
+        "letters": count(letters),
+        "alnum": count(alnum) - count(digits) - count(letters),
+        "formats": {
+            name: count(pc.match_substring_regex(arr, pattern)) for name, pattern in FORMAT_PATTERNS.items()
+        },
+    }
+
+
+def _counts_pandas(s: pd.Series) -> Dict[str, Any]:
+    values = s.dropna().astype(str)
+    lengths = values.str.len().to_numpy(dtype=np.int64)
+    stripped_len = values.str.strip().str.len().to_numpy(dtype=np.int64)
+    non_empty = stripped_len > 0
+    digits = values.str.isdigit().to_numpy(dtype=bool) & non_empty
+    letters = values.str.isalpha().to_numpy(dtype=bool) & non_empty
+    alnum = values.str.isalnum().to_numpy(dtype=bool) & non_empty
+    return {
+        "non_null": int(values.size),
+        "lengths": lengths,
+        "empty": int((lengths == 0).sum()),
+        "whitespace": int(((stripped_len == 0) & (lengths > 0)).sum()),
+        "digits": int(digits.sum()),
+        "letters": int(letters.sum()),
+        "alnum": int(alnum.sum() - digits.sum() - letters.sum()),
+        "formats": {name: int(values.str.match(pattern).sum()) for name, pattern in FORMAT_PATTERNS.items()},
+    }
+
+
+class TextColumnProfile:
+    """Сливаемые счётчики одной строковой колонки."""
+
+    def __init__(self, sketch_k: int = 200) -> None:
+        self.non_null = 0
+        self.empty = 0
+        self.whitespace = 0
+        self.classes = dict.fromkeys(PATTERN_CLASSES, 0)
+        self.formats = dict.fromkeys(FORMAT_PATTERNS, 0)
+        self.min_length: Optional[int] = None
+        self.max_length: Optional[int] = None
+        self.total_length = 0
+        self.lengths = KLLSketch(k=sketch_k)
+
+    def update(self, s: pd.Series, use_arrow: bool = True) -> None:
+        counts = _counts_arrow(s) if use_arrow and pa is not None else _counts_pandas(s)
+        n = counts["non_null"]
+        if n == 0:
+            return
+        lengths = counts["lengths"]
+        self.non_null += n
+        self.empty += counts["empty"]
+        self.whitespace += counts["whitespace"]
+        for cls in ("digits", "letters", "alnum"):
+            self.classes[cls] += counts[cls]
+        # «прочее» — всё, что не попало в классы (включая пустые и пробельные строки)
+        self.classes["other"] += n - counts["digits"] - counts["letters"] - counts["alnum"]
+        for name, value in counts["formats"].items():
+            self.formats[name] += value
+        self.min_length = int(lengths.min()) if self.min_length is None else min(self.min_length, int(lengths.min()))
+        self.max_length = int(lengths.max()) if self.max_length is None else max(self.max_length, int(lengths.max()))
+        self.total_length += int(lengths.sum())
+        self.lengths.update(lengths)
+
+    def merge(self, other: "TextColumnProfile") -> None:
+        self.non_null += other.non_null
+        self.empty += other.empty
+        self.whitespace += other.whitespace
+        for cls in PATTERN_CLASSES:
+            self.classes[cls] += other.classes[cls]
+        for name in FORMAT_PATTERNS:
+            self.formats[name] += other.formats[name]
+        for attr, fn in (("min_length", min), ("max_length", max)):
+            mine, theirs = getattr(self, attr), getattr(other, attr)
+            setattr(self, attr, theirs if mine is None else mine if theirs is None else fn(mine, theirs))
+        self.total_length += other.total_length
+        self.lengths.merge(other.lengths)
+
+    def to_dict(self, name: Any) -> Dict[str, Any]:
+        n = self.non_null
+        share = (lambda v: v / n) if n else (lambda v: 0.0)
+        format_shares = {f: share(v) for f, v in self.formats.items()}
+        best = max(format_shares, key=format_shares.get) if format_shares else None
+        quantiles = self.lengths.quantiles(list(LENGTH_QUANTILES.values())) if n else [None] * len(LENGTH_QUANTILES)
+        return {
+            "name": name,
+            "non_null": n,
+            "empty": self.empty,
+            "empty_share": share(self.empty),
+            "whitespace": self.whitespace,
+            "whitespace_share": share(self.whitespace),
+            "min_length": self.min_length,
+            "max_length": self.max_length,
+            "mean_length": self.total_length / n if n else None,
+            **{f"{q}_length": None if v is None else float(v) for q, v in zip(LENGTH_QUANTILES, quantiles)},
+            "patterns": {cls: share(v) for cls, v in self.classes.items()},
+            "formats": format_shares,
+            "inferred_format": best if best is not None and format_shares[best] >= FORMAT_THRESHOLD else None,
+        }
+
+
+class TextProfiler:
+    """
+    Профиль строковых колонок по потоку чанков.
+
+    profiler = TextProfiler()
+    for chunk in pd.read_csv(path, chunksize=100_000):
+        profiler.update(chunk)
+    profiles = profiler.result()
+
+    Набор строковых колонок определяется по первому чанку (можно задать columns).
+    """
+
+    def __init__(self, columns: Optional[List[Any]] = None, sketch_k: int = 200, use_arrow: bool = True) -> None:
+        self.columns = columns
+        self.sketch_k = sketch_k
+        self.use_arrow = use_arrow
+        self.profiles: Dict[Any, TextColumnProfile] = {}
+
+    def update(self, chunk: pd.DataFrame) -> "TextProfiler":
+        if self.columns is None:
+            self.columns = [name for name in chunk.columns if is_text_column(chunk[name])]
+        for name in self.columns:
+            if name not in self.profiles:
+                self.profiles[name] = TextColumnProfile(self.sketch_k)
+            self.profiles[name].update(chunk[name], use_arrow=self.use_arrow)
+        return self
+
+    def update_many(self, chunks: Iterable[pd.DataFrame]) -> "TextProfiler":
+        for chunk in chunks:
+            self.update(chunk)
+        return self
+
+    def merge(self, other: "TextProfiler") -> "TextProfiler":
+        if self.columns is None:
+            self.columns = other.columns
+        for name, profile in other.profiles.items():
+            self.profiles.setdefault(name, TextColumnProfile(self.sketch_k)).merge(profile)
+        return self
+
+    def result(self) -> List[Dict[str, Any]]:
+        return [self.profiles[name].to_dict(name) for name in self.columns or [] if name in self.profiles]
+
+
+def profile_text(data: Any, use_arrow: bool = True) -> List[Dict[str, Any]]:
+    """Профиль строковых колонок по DataFrame или итерируемому набору чанков."""
+    profiler = TextProfiler(use_arrow=use_arrow)
+    if isinstance(data, pd.DataFrame):
+        profiler.update(data)
+    else:
+        profiler.update_many(data)
+    return profiler.result()
+
+
+def text_profile_frame(profiles: List[Dict[str, Any]]) -> pd.DataFrame:
+    """Плоская таблица профиля (для CSV и печати)."""
+    rows = []
+    for p in profiles:
+        row = {k: v for k, v in p.items() if k not in ("patterns", "formats")}
+        row.update({f"{cls}_share": v for cls, v in p["patterns"].items()})
+        row.update({f"{fmt}_share": v for fmt, v in p["formats"].items()})
+        rows.append(row)
+    return pd.DataFrame(rows)
@@ -0,0 +1,243 @@
+"""
+Профиль временных (datetime) колонок: диапазон, шаг, разрывы и дубликаты меток.
+
+Всё считается векторно по разностям соседних меток (np.diff над int64-наносекундами):
+- шаг ряда (inferred_freq) — самая частая положительная разность, regularity — её доля;
+- разрыв — разность больше GAP_FACTOR шагов, missing_periods — сколько шагов пропущено;
+- дубликат — нулевая разность (для отсортированного ряда это ровно повторы меток).
+Число строк по периодам копится по часовым корзинам и в result() укрупняется
+до периода, подходящего к длине ряда (час/день/неделя/месяц).
+
+DatetimeProfiler работает по чанкам за один проход: последняя метка чанка
+стыкуется с первой меткой следующего. Для чанков файл должен быть отсортирован
+по времени (иначе sorted=False и разрывы/дубликаты недостоверны);
+DataFrame целиком профилируется с предварительной сортировкой.
+"""
+
+from __future__ import annotations
+
+import copy
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+from pandas.api import types as ptypes
+
+# разность больше стольких шагов ряда считается разрывом
+GAP_FACTOR = 1.5
+MAX_GAPS = 10
+_BUCKET = np.int64(3600 * 10**9)  # базовая корзина счётчиков по периодам — 1 час
+# (максимальная длина ряда, период) — период выбирается по длине ряда
+_PERIODS = (
+    (pd.Timedelta(days=3), "h"),
+    (pd.Timedelta(days=120), "D"),
+    (pd.Timedelta(days=3 * 365), "W"),
+    (None, "MS"),
+)
+
+
+def is_datetime_column(s: pd.Series) -> bool:
+    return ptypes.is_datetime64_any_dtype(s)
+
+
+def _as_int64(s: pd.Series) -> np.ndarray:
+    """Непустые метки как int64-наносекунды (с таймзоной — в UTC)."""
+    values = s.dropna()
+    if isinstance(values.dtype, pd.DatetimeTZDtype):
+        values = values.dt.tz_convert("UTC").dt.tz_localize(None)
+    return values.to_numpy(dtype="datetime64[ns]").view(np.int64)
+
+
+def _timestamp(ns: Optional[int]) -> Optional[str]:
+    return None if ns is None else pd.Timestamp(int(ns)).isoformat()
+
+
+def _freq_string(ns: int) -> str:
+    try:
+        return pd.tseries.frequencies.to_offset(pd.Timedelta(int(ns))).freqstr
+    except ValueError:
+        return str(pd.Timedelta(int(ns)))
+
+
+class DatetimeColumnProfile:
+    """Сливаемое состояние одной временной колонки (по отсортированному потоку чанков)."""
+
+    def __init__(self) -> None:
+        self.non_null = 0
+        self.min: Optional[int] = None
+        self.max: Optional[int] = None
+        self.first: Optional[int] = None
+        self.last: Optional[int] = None
+        self.sorted = True
+        self.diff_counts: Dict[int, int] = {}
+        self.buckets: Dict[int, int] = {}
+        # кандидаты в крупнейшие разрывы: (длительность, начало)
+        self.largest: List[tuple] = []
+
+    def _add_diffs(self, diffs: np.ndarray, starts: np.ndarray) -> None:
+        if diffs.size == 0:
+            return
+        if (diffs < 0).any():
+            self.sorted = False
+        values, counts = np.unique(diffs, return_counts=True)
+        for value, count in zip(values.tolist(), counts.tolist()):
+            self.diff_counts[value] = self.diff_counts.get(value, 0) + count
+        k = min(MAX_GAPS, diffs.size)
+        top = np.argpartition(diffs, diffs.size - k)[diffs.size - k :]
+        self.largest = sorted(
+            self.largest + list(zip(diffs[top].tolist(), starts[top].tolist())), reverse=True
+        )[:MAX_GAPS]
+
+    def update(self, s: pd.Series) -> None:
+        arr = _as_int64(s)
+        if arr.size == 0:
+            return
+        self.non_null += int(arr.size)
+        lo, hi = int(arr.min()), int(arr.max())
+        self.min = lo if self.min is None else min(self.min, lo)
+        self.max = hi if self.max is None else max(self.max, hi)
+        if self.first is None:
+            self.first = int(arr[0])
+        # стык с предыдущим чанком — одна лишняя разность
+        joined = arr if self.last is None else np.concatenate([[self.last], arr])
+        self._add_diffs(np.diff(joined), joined[:-1])
+        self.last = int(arr[-1])
+        keys, counts = np.unique(arr // _BUCKET, return_counts=True)
+        for key, count in zip(keys.tolist(), counts.tolist()):
+            self.buckets[key] = self.buckets.get(key, 0) + count
+
+    def merge(self, other: "DatetimeColumnProfile") -> None:
+        """Слияние с профилем следующего (по времени) куска ряда."""
+        if other.non_null == 0:
+            return
+        if self.non_null == 0:
+            self.__dict__.update(copy.deepcopy(other.__dict__))
+            return
+        self._add_diffs(np.array([other.first - self.last]), np.array([self.last]))
+        for value, count in other.diff_counts.items():
+            self.diff_counts[value] = self.diff_counts.get(value, 0) + count
+        self.largest = sorted(self.largest + other.largest, reverse=True)[:MAX_GAPS]
+        for key, count in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + count
+        self.non_null += other.non_null
+        self.min, self.max = min(self.min, other.min), max(self.max, other.max)
+        self.sorted = self.sorted and other.sorted
+        self.last = other.last
+
+    def period_counts(self, period: Optional[str] = None) -> pd.Series:
+        """Число строк по периодам (period — алиас pandas; по умолчанию по длине ряда)."""
+        if not self.buckets:
+            return pd.Series(dtype="int64")
+        if period is None:
+            span = pd.Timedelta(int(self.max - self.min))
+            period = next(p for limit, p in _PERIODS if limit is None or span <= limit)
+        keys = np.fromiter(self.buckets.keys(), dtype=np.int64, count=len(self.buckets))
+        counts = np.fromiter(self.buckets.values(), dtype=np.int64, count=len(self.buckets))
+        hourly = pd.Series(counts, index=pd.to_datetime(keys * _BUCKET)).sort_index()
+        return hourly.resample(period).sum()
+
+    def to_dict(self, name: Any, period: Optional[str] = None) -> Dict[str, Any]:
+        positive = {d: c for d, c in self.diff_counts.items() if d > 0}
+        step = max(positive, key=positive.get) if positive else None
+        n_diffs = sum(self.diff_counts.values())
+        gaps = missing_periods = 0
+        largest_gaps: List[Dict[str, Any]] = []
+        if step is not None and self.sorted:
+            limit = GAP_FACTOR * step
+            for d, c in positive.items():
+                if d > limit:
+                    gaps += c
+                    missing_periods += c * (int(round(d / step)) - 1)
+            largest_gaps = [
+                {"start": _timestamp(start), "end": _timestamp(start + d), "duration": str(pd.Timedelta(int(d)))}
+                for d, start in self.largest
+                if d > limit
+            ]
+        counts = self.period_counts(period)
+        return {
+            "name": name,
+            "non_null": self.non_null,
+            "min": _timestamp(self.min),
+            "max": _timestamp(self.max),
+            "span": str(pd.Timedelta(int(self.max - self.min))) if self.non_null else None,
+            "sorted": self.sorted,
+            "inferred_freq": _freq_string(step) if step is not None else None,
+            "regularity": positive[step] / n_diffs if step is not None and n_diffs else None,
+            "duplicates": self.diff_counts.get(0, 0) if self.sorted else None,
+            "gaps": gaps if self.sorted else None,
+            "missing_periods": missing_periods if self.sorted else None,
+            "largest_gaps": largest_gaps,
+            "period": counts.index.freqstr if len(counts) else None,
+            "period_counts": {ts.isoformat(): int(c) for ts, c in counts.items()},
+        }
+
+
+class DatetimeProfiler:
+    """
+    Профиль временных колонок по потоку чанков (файл отсортирован по времени).
+
+    profiler = DatetimeProfiler(columns=["ts"])
+    for chunk in pd.read_csv(path, parse_dates=["ts"], chunksize=100_000):
+        profiler.update(chunk)
+    profiles = profiler.result()
+
+    Набор колонок по умолчанию — datetime-колонки первого чанка.
+    """
+
+    def __init__(self, columns: Optional[List[Any]] = None, period: Optional[str] = None) -> None:
+        self.columns = columns
+        self.period = period
+        self.profiles: Dict[Any, DatetimeColumnProfile] = {}
+
+    def update(self, chunk: pd.DataFrame) -> "DatetimeProfiler":
+        if self.columns is None:
+            self.columns = [name for name in chunk.columns if is_datetime_column(chunk[name])]
+        for name in self.columns:
+            s = chunk[name]
+            if not is_datetime_column(s):
+                s = pd.to_datetime(s, errors="coerce")
+            self.profiles.setdefault(name, DatetimeColumnProfile()).update(s)
+        return self
+
+    def update_many(self, chunks: Iterable[pd.DataFrame]) -> "DatetimeProfiler":
+        for chunk in chunks:
+            self.update(chunk)
+        return self
+
+    def merge(self, other: "DatetimeProfiler") -> "DatetimeProfiler":
+        """Слияние с профилем следующего по времени куска данных."""
+        if self.columns is None:
+            self.columns = other.columns
+        for name, profile in other.profiles.items():
+            self.profiles.setdefault(name, DatetimeColumnProfile()).merge(profile)
+        return self
+
+    def result(self) -> List[Dict[str, Any]]:
+        return [
+            self.profiles[name].to_dict(name, period=self.period)
+            for name in self.columns or []
+            if name in self.profiles
+        ]
+
+
+def profile_datetimes(
+    data: Any, columns: Optional[List[Any]] = None, period: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Профиль временных колонок по DataFrame (каждая колонка сортируется)
+    или по итерируемому набору чанков отсортированного файла.
+    """
+    profiler = DatetimeProfiler(columns=columns, period=period)
+    if not isinstance(data, pd.DataFrame):
+        return profiler.update_many(data).result()
+    names = columns if columns is not None else [c for c in data.columns if is_datetime_column(data[c])]
+    profiler.columns = list(names)
+    for name in names:
+        s = data[name] if is_datetime_column(data[name]) else pd.to_datetime(data[name], errors="coerce")
+        profiler.update(pd.DataFrame({name: s.sort_values(ignore_index=True)}))
+    return profiler.result()
+
+
+def timeseries_frame(profiles: List[Dict[str, Any]]) -> pd.DataFrame:
+    """Плоская таблица профиля (без счётчиков по периодам и списка разрывов)."""
+    return pd.DataFrame([{k: v for k, v in p.items() if k not in ("period_counts", "largest_gaps")} for p in profiles])
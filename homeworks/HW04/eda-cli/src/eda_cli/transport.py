@@ -0,0 +1,39 @@
+"""
+Кадры сообщений поверх потокового сокета (TCP или Unix): 8 байт длины (big-endian) + JSON.
+
+Используется воркерами распределённого профилирования (distributed.py) и демоном
+(daemon.py). Модуль зависит только от стандартной библиотеки, поэтому его
+импорт не тянет pandas — это важно для лёгкого клиента демона (client.py).
+"""
+
+from __future__ import annotations
+
+import json
+import socket
+import struct
+from typing import Any
+
+_HEADER = struct.Struct(">Q")
+_MAX_MESSAGE = 4 * 1024**3
+
+
+def send_message(sock: socket.socket, obj: Any) -> None:
+    payload = json.dumps(obj).encode("utf-8")
+    sock.sendall(_HEADER.pack(len(payload)) + payload)
+
+
+def _recv_exact(sock: socket.socket, n: int) -> bytes:
+    buf = bytearray()
+    while len(buf) < n:
+        chunk = sock.recv(min(n - len(buf), 1 << 20))
+        if not chunk:
+            raise ConnectionError("Соединение закрыто до получения всего сообщения")
+        buf.extend(chunk)
+    return bytes(buf)
+
+
+def recv_message(sock: socket.socket) -> Any:
+    (length,) = _HEADER.unpack(_recv_exact(sock, _HEADER.size))
+    if length > _MAX_MESSAGE:
+        raise ConnectionError(f"Слишком большое сообщение: {length} байт")
+    return json.loads(_recv_exact(sock, length))
@@ -1,15 +1,24 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Dict, Iterable, List, Union
+from typing import Dict, Iterable, List, Optional, Union
 
-import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
+from matplotlib.figure import Figure
 
 PathLike = Union[str, Path]
 
 
+def _subplots(**fig_kw):
+    """
+    Фигура и оси без pyplot: Figure() не регистрируется в глобальном состоянии pyplot,
+    поэтому отчёты можно строить из нескольких потоков (фоновые задачи API).
+    """
+    fig = Figure(**fig_kw)
+    return fig, fig.subplots()
+
+
 def _ensure_dir(path: PathLike) -> Path:
     p = Path(path)
     p.mkdir(parents=True, exist_ok=True)
@@ -21,13 +30,16 @@ def plot_histograms_per_column(
     out_dir: PathLike,
     max_columns: int = 6,
     bins: int = 20,
+    numeric_df: Optional[pd.DataFrame] = None,
 ) -> List[Path]:
     """
-    Для числовых колонок строит по отдельной гистограмме.
+    Для числовых колонок строит по отдельной гистограмме
+    (numeric_df — уже выбранные числовые колонки df).
     Возвращает список путей к PNG.
     """
     out_dir = _ensure_dir(out_dir)
-    numeric_df = df.select_dtypes(include="number")
+    if numeric_df is None:
+        numeric_df = df.select_dtypes(include="number")
 
     paths: List[Path] = []
     for i, name in enumerate(numeric_df.columns[:max_columns]):
@@ -35,7 +47,7 @@ def plot_histograms_per_column(
         if s.empty:
             continue
 
-        fig, ax = plt.subplots()
+        fig, ax = _subplots()
         ax.hist(s.values, bins=bins)
         ax.set_title(f"Histogram of {name}")
         ax.set_xlabel(name)
@@ -44,28 +56,29 @@ def plot_histograms_per_column(
 
         out_path = out_dir / f"hist_{i+1}_{name}.png"
         fig.savefig(out_path)
-        plt.close(fig)
 
         paths.append(out_path)
 
     return paths
 
 
-def plot_missing_matrix(df: pd.DataFrame, out_path: PathLike) -> Path:
+def plot_missing_matrix(df: pd.DataFrame, out_path: PathLike, mask: Optional[np.ndarray] = None) -> Path:
     """
-    Простая визуализация пропусков: где True=пропуск, False=значение.
+    Простая визуализация пропусков: где True=пропуск, False=значение
+    (mask — уже посчитанная матрица df.isna()).
     """
     out_path = Path(out_path)
     out_path.parent.mkdir(parents=True, exist_ok=True)
 
     if df.empty:
         # Рисуем пустой график
-        fig, ax = plt.subplots()
+        fig, ax = _subplots()
         ax.text(0.5, 0.5, "Empty dataset", ha="center", va="center")
         ax.axis("off")
     else:
-        mask = df.isna().values
-        fig, ax = plt.subplots(figsize=(min(12, df.shape[1] * 0.4), 4))
+        if mask is None:
+            mask = df.isna().values
+        fig, ax = _subplots(figsize=(min(12, df.shape[1] * 0.4), 4))
         ax.imshow(mask, aspect="auto", interpolation="none")
         ax.set_xlabel("Columns")
         ax.set_ylabel("Rows")
@@ -76,25 +89,25 @@ def plot_missing_matrix(df: pd.DataFrame, out_path: PathLike) -> Path:
 
     fig.tight_layout()
     fig.savefig(out_path)
-    plt.close(fig)
     return out_path
 
 
-def plot_correlation_heatmap(df: pd.DataFrame, out_path: PathLike) -> Path:
+def plot_correlation_heatmap(df: pd.DataFrame, out_path: PathLike, corr: Optional[pd.DataFrame] = None) -> Path:
     """
-    Тепловая карта корреляции числовых признаков.
+    Тепловая карта корреляции числовых признаков (corr — уже посчитанная матрица корреляции).
     """
     out_path = Path(out_path)
     out_path.parent.mkdir(parents=True, exist_ok=True)
 
-    numeric_df = df.select_dtypes(include="number")
-    if numeric_df.shape[1] < 2:
-        fig, ax = plt.subplots()
+    if corr is None:
+        numeric_df = df.select_dtypes(include="number")
+        corr = numeric_df.corr(numeric_only=True) if numeric_df.shape[1] >= 2 else pd.DataFrame()
+    if corr.shape[1] < 2:
+        fig, ax = _subplots()
         ax.text(0.5, 0.5, "Not enough numeric columns for correlation", ha="center", va="center")
         ax.axis("off")
     else:
-        corr = numeric_df.corr(numeric_only=True)
-        fig, ax = plt.subplots(figsize=(min(10, corr.shape[1]), min(8, corr.shape[0])))
+        fig, ax = _subplots(figsize=(min(10, corr.shape[1]), min(8, corr.shape[0])))
         im = ax.imshow(corr.values, vmin=-1, vmax=1, cmap="coolwarm", aspect="auto")
         ax.set_xticks(range(corr.shape[1]))
         ax.set_xticklabels(corr.columns, rotation=90, fontsize=8)
@@ -105,10 +118,9 @@ def plot_correlation_heatmap(df: pd.DataFrame, out_path: PathLike) -> Path:
 
     fig.tight_layout()
     fig.savefig(out_path)
-    plt.close(fig)
     return out_path
 
-def plot_categorical_distribution(df, column, output_path, top_k=10):
+def plot_categorical_distribution(df, column, output_path, top_k=10, value_counts=None):
     """
     Создает столбчатую диаграмму распределения категорий для заданной колонки.
     
@@ -117,6 +129,7 @@ def plot_categorical_distribution(df, column, output_path, top_k=10):
         column: Имя категориальной колонки
         output_path: Путь для сохранения графика
         top_k: Количество топ-категорий для отображения
+        value_counts: Уже посчитанные частоты колонки (иначе считаются по df)
     
     Returns:
         Path к сохраненному изображению или None, если колонка не существует
@@ -130,27 +143,29 @@ def plot_categorical_distribution(df, column, output_path, top_k=10):
         return None
         
     # Получаем топ-k категорий
-    value_counts = s.value_counts().nlargest(top_k)
+    if value_counts is None:
+        value_counts = s.value_counts()
+    value_counts = value_counts.nlargest(top_k)
     
-    plt.figure(figsize=(10, 6))
-    bars = plt.bar(value_counts.index.astype(str), value_counts.values)
-    plt.title(f'Распределение значений в колонке "{column}"')
-    plt.xlabel(column)
-    plt.ylabel('Количество')
-    plt.xticks(rotation=45, ha='right')
+    fig, ax = _subplots(figsize=(10, 6))
+    bars = ax.bar(value_counts.index.astype(str), value_counts.values)
+    ax.set_title(f'Распределение значений в колонке "{column}"')
+    ax.set_xlabel(column)
+    ax.set_ylabel('Количество')
+    for label in ax.get_xticklabels():
+        label.set(rotation=45, horizontalalignment='right')
     
     # Добавляем значения над столбцами
     for bar in bars:
         height = bar.get_height()
-        plt.annotate(f'{int(height)}',
+        ax.annotate(f'{int(height)}',
                     xy=(bar.get_x() + bar.get_width() / 2, height),
                     xytext=(0, 3),
                     textcoords="offset points",
                     ha='center', va='bottom')
     
-    plt.tight_layout()
-    plt.savefig(output_path)
-    plt.close()
+    fig.tight_layout()
+    fig.savefig(output_path)
     return output_path
 
 def save_top_categories_tables(
@@ -167,3 +182,31 @@ def save_top_categories_tables(
         table.to_csv(out_path, index=False)
         paths.append(out_path)
     return paths
+
+
+def plot_timeline(
+    period_counts: Dict[str, int],
+    out_path: PathLike,
+    title: str = "Timeline",
+    gaps: Iterable[Dict[str, str]] = (),
+) -> Path:
+    """
+    Число строк по периодам для временной колонки; разрывы ряда закрашены.
+    period_counts — {ISO-метка начала периода: число строк} из профиля timeseries.
+    """
+    out_path = Path(out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+
+    counts = pd.Series(list(period_counts.values()), index=pd.to_datetime(list(period_counts.keys())))
+    fig, ax = _subplots(figsize=(10, 4))
+    if not counts.empty:
+        ax.plot(counts.index, counts.values, marker="." if len(counts) <= 100 else None)
+    for gap in gaps:
+        ax.axvspan(pd.Timestamp(gap["start"]), pd.Timestamp(gap["end"]), color="red", alpha=0.2)
+    ax.set_title(title)
+    ax.set_xlabel("Period")
+    ax.set_ylabel("Rows")
+    fig.autofmt_xdate()
+    fig.tight_layout()
+    fig.savefig(out_path)
+    return out_path
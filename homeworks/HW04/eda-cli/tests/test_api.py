@@ -34,3 +34,476 @@ def test_quality_flags_from_csv_returns_flags():
     assert "has_many_zero_values" in flags
     assert "quality_score" in json_resp
     assert "ok_for_model" in json_resp
+
+
+def _wait_for_job(job_id, timeout=30.0):
+    import time
+
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = client.get(f"/jobs/{job_id}").json()
+        if job["status"] in ("done", "failed"):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"job {job_id} не завершилась за {timeout} с")
+
+
+def test_quality_job_roundtrip_and_dedup():
+    df = pd.DataFrame({"user_id": range(200), "val": [0, 1] * 100})
+    payload = make_csv_bytes(df).getvalue()
+
+    resp = client.post("/jobs", files={"file": ("big.csv", payload, "text/csv")})
+    assert resp.status_code == 202, resp.text
+    job_id = resp.json()["job_id"]
+
+    # тот же контент и параметры -> та же задача
+    again = client.post("/jobs", files={"file": ("copy.csv", payload, "text/csv")})
+    assert again.json()["job_id"] == job_id
+
+    job = _wait_for_job(job_id)
+    assert job["status"] == "done", job
+    assert job["rows_processed"] == 200
+
+    result = client.get(f"/jobs/{job_id}/result").json()
+    assert result["n_rows"] == 200
+    assert "quality_score" in result and "flags" in result
+
+
+def test_job_with_compressed_bomb_fails(monkeypatch):
+    import gzip
+
+    from eda_cli import api
+
+    monkeypatch.setattr(api.job_manager, "max_decompressed", 1 << 20)
+    bomb = gzip.compress(b"a\n" + b"1\n" * (4 << 20))
+    resp = client.post("/jobs", files={"file": ("bomb.csv.gz", bomb, "application/gzip")})
+    assert resp.status_code == 202, resp.text
+    job = _wait_for_job(resp.json()["job_id"])
+    assert job["status"] == "failed" and "DecompressionLimitError" in job["error"]
+
+
+def test_report_job_from_local_path(tmp_path, monkeypatch):
+    csv_path = tmp_path / "data.csv"
+    pd.DataFrame({"x": [1, 2, 3], "city": ["A", "B", "A"]}).to_csv(csv_path, index=False)
+
+    # без EDA_CLI_DATA_ROOT локальные пути запрещены, вне каталога — тоже
+    monkeypatch.delenv("EDA_CLI_DATA_ROOT", raising=False)
+    assert client.post("/jobs?kind=report", data={"path": str(csv_path)}).status_code == 403
+    monkeypatch.setenv("EDA_CLI_DATA_ROOT", str(tmp_path))
+    assert client.post("/jobs?kind=report", data={"path": "/etc/passwd"}).status_code == 403
+
+    resp = client.post("/jobs?kind=report", data={"path": str(csv_path)})
+    assert resp.status_code == 202, resp.text
+    job = _wait_for_job(resp.json()["job_id"])
+    assert job["status"] == "done", job
+
+    result = client.get(f"/jobs/{job['job_id']}/result").json()
+    assert "report.md" in result["artifacts"]
+    md = client.get(f"/jobs/{job['job_id']}/artifacts/report.md")
+    assert md.status_code == 200
+    assert "data.csv" in md.text
+
+
+def test_quality_flags_batch_multipart_and_zip():
+    import json
+    import zipfile
+
+    small = make_csv_bytes(pd.DataFrame({"a": [1, 2, 3], "b": ["x", None, "y"]})).getvalue()
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("inner1.csv", small)
+        zf.writestr("inner2.csv", small)
+    files = [
+        ("files", ("one.csv", small, "text/csv")),
+        ("files", ("bundle.zip", archive.getvalue(), "application/zip")),
+        ("files", ("broken.csv", b"", "text/csv")),
+    ]
+    resp = client.post("/quality-flags-batch", files=files)
+    assert resp.status_code == 200, resp.text
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+
+    results = [json.loads(line) for line in resp.text.splitlines()]
+    by_name = {r["name"]: r for r in results}
+    assert set(by_name) == {"one.csv", "inner1.csv", "inner2.csv", "broken.csv"}
+    assert by_name["one.csv"]["n_rows"] == 3
+    assert "quality_score" in by_name["inner2.csv"]
+    assert "error" in by_name["broken.csv"]
+
+
+def test_quality_flags_batch_archive_limits(monkeypatch):
+    import tarfile
+    import zipfile
+
+    from eda_cli import api
+
+    monkeypatch.setattr(api, "BATCH_MAX_MEMBER_BYTES", 1 << 20)
+    bomb = io.BytesIO()
+    with zipfile.ZipFile(bomb, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("big.csv", b"a\n" + b"0\n" * (4 << 20))
+    resp = client.post("/quality-flags-batch", files=[("files", ("bomb.zip", bomb.getvalue(), "application/zip"))])
+    assert resp.status_code == 413
+
+    monkeypatch.setattr(api, "BATCH_MAX_FILES", 3)
+    many = io.BytesIO()
+    with tarfile.open(fileobj=many, mode="w:gz") as tf:
+        for i in range(5):
+            info = tarfile.TarInfo(f"part{i}.csv")
+            info.size = 6
+            tf.addfile(info, io.BytesIO(b"a\n1\n2\n"))
+    resp = client.post("/quality-flags-batch", files=[("files", ("many.tgz", many.getvalue(), "application/gzip"))])
+    assert resp.status_code == 413
+
+    # сжатый CSV — отдельно и внутри zip — считается в лимитах распакованным объёмом
+    import gzip
+
+    gz_bomb = gzip.compress(b"a\n" + b"0\n" * (4 << 20))
+    resp = client.post("/quality-flags-batch", files=[("files", ("big.csv.gz", gz_bomb, "application/gzip"))])
+    assert resp.status_code == 413
+    nested = io.BytesIO()
+    with zipfile.ZipFile(nested, "w") as zf:
+        zf.writestr("big.csv", gz_bomb)
+    resp = client.post("/quality-flags-batch", files=[("files", ("nested.zip", nested.getvalue(), "application/zip"))])
+    assert resp.status_code == 413
+    small = gzip.compress(b"a\n1\n0\n")
+    resp = client.post("/quality-flags-batch", files=[("files", ("small.csv.gz", small, "application/gzip"))])
+    assert resp.status_code == 200 and '"n_rows":2' in resp.text.replace(" ", "")
+
+    monkeypatch.setattr(api, "MAX_DECOMPRESSED", 1 << 20)
+    files = {"reference": ("ref.csv.gz", gz_bomb, "application/gzip"), "current": ("cur.csv", b"a\n1\n", "text/csv")}
+    assert client.post("/compare", files=files).status_code == 413
+
+
+def test_quality_flags_batch_ndjson():
+    import json
+
+    lines = [
+        {"name": "csv-item", "csv": "x,y\n1,a\n2,b\n"},
+        {"name": "records-item", "records": [{"x": 1}, {"x": 0}, {"x": 0}]},
+    ]
+    body = "\n".join(json.dumps(line) for line in lines)
+    resp = client.post(
+        "/quality-flags-batch",
+        content=body,
+        headers={"content-type": "application/x-ndjson"},
+    )
+    assert resp.status_code == 200, resp.text
+    results = sorted((json.loads(line) for line in resp.text.splitlines()), key=lambda r: r["index"])
+    assert [r["name"] for r in results] == ["csv-item", "records-item"]
+    assert results[1]["flags"]["has_many_zero_values"] is True
+
+    for bad in (b"[1]", b'"x"', b"42"):
+        resp = client.post("/quality-flags-batch", content=bad, headers={"content-type": "application/x-ndjson"})
+        assert resp.status_code == 400, bad
+
+
+def _wide_csv(n_cols=40):
+    df = pd.DataFrame({f"col_{i}": [i, i + 1, None, i * 2] for i in range(n_cols)})
+    df["city"] = ["A", "B", "A", None]
+    return make_csv_bytes(df).getvalue()
+
+
+def test_summary_from_csv_records_and_columnar():
+    payload = _wide_csv()
+    records = client.post("/summary-from-csv", files={"file": ("w.csv", payload, "text/csv")}).json()
+    assert records["n_cols"] == 41
+    assert isinstance(records["columns"], list)
+    assert records["columns"][0]["name"] == "col_0"
+
+    columnar = client.post(
+        "/summary-from-csv?layout=columnar", files={"file": ("w.csv", payload, "text/csv")}
+    ).json()
+    assert columnar["columns"]["name"][:2] == ["col_0", "col_1"]
+    assert columnar["columns"]["missing"] == [c["missing"] for c in records["columns"]]
+
+
+def test_json_fallback_matches_orjson(monkeypatch):
+    import json
+
+    import numpy as np
+    import pytest
+
+    from eda_cli import responses
+
+    content = {"x": float("nan"), "arr": np.array([1.0, np.inf]), "n": np.int64(3), "t": (-np.inf, "a")}
+    monkeypatch.setattr(responses, "orjson", None)
+    body = responses.dumps(content)
+    # NaN/±inf — null, как у orjson: это валидный JSON даже для строгих парсеров
+    assert json.loads(body, parse_constant=lambda name: pytest.fail(name)) == {
+        "x": None,
+        "arr": [1.0, None],
+        "n": 3,
+        "t": [None, "a"],
+    }
+
+
+def test_responses_are_compressed_on_request():
+    payload = _wide_csv()
+    resp = client.post(
+        "/summary-from-csv",
+        files={"file": ("w.csv", payload, "text/csv")},
+        headers={"Accept-Encoding": "gzip"},
+    )
+    assert resp.status_code == 200
+    assert resp.headers["content-encoding"] == "gzip"
+    # httpx сам распаковывает тело
+    assert resp.json()["n_cols"] == 41
+
+    small = client.get("/health", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+
+
+def test_responses_zstd_when_available():
+    import pytest
+
+    pytest.importorskip("zstandard")
+    resp = client.post(
+        "/summary-from-csv",
+        files={"file": ("w.csv", _wide_csv(), "text/csv")},
+        headers={"Accept-Encoding": "zstd, gzip"},
+    )
+    assert resp.headers["content-encoding"] == "zstd"
+
+
+def test_compressed_request_bodies_and_uploads():
+    import gzip
+
+    import pytest
+
+    df = pd.DataFrame({"user_id": [1, 2, 3, 4], "val": [0, 1, None, 3]})
+    raw = make_csv_bytes(df).getvalue()
+
+    # сжатый файл внутри обычного multipart
+    resp = client.post("/quality-from-csv", files={"file": ("data.csv.gz", gzip.compress(raw), "application/gzip")})
+    assert resp.status_code == 200, resp.text
+    assert (resp.json()["n_rows"], resp.json()["n_cols"]) == (4, 2)
+
+    # сжато всё тело запроса (Content-Encoding)
+    request = client.build_request("POST", "/quality-from-csv", files={"file": ("data.csv", raw, "text/csv")})
+    body, content_type = request.read(), request.headers["content-type"]
+    resp = client.post(
+        "/quality-from-csv",
+        content=gzip.compress(body),
+        headers={"Content-Type": content_type, "Content-Encoding": "gzip"},
+    )
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["n_rows"] == 4
+
+    bad = client.post(
+        "/quality-from-csv", content=body, headers={"Content-Type": content_type, "Content-Encoding": "br"}
+    )
+    assert bad.status_code == 415
+    broken = client.post(
+        "/quality-from-csv",
+        content=gzip.compress(body)[:-20],
+        headers={"Content-Type": content_type, "Content-Encoding": "gzip"},
+    )
+    assert broken.status_code == 400
+
+    zstandard = pytest.importorskip("zstandard")
+    resp = client.post(
+        "/quality-from-csv",
+        content=zstandard.ZstdCompressor().compress(body),
+        headers={"Content-Type": content_type, "Content-Encoding": "zstd"},
+    )
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["n_cols"] == 2
+
+
+def test_decompression_bomb_is_rejected_with_413():
+    import gzip
+
+    from fastapi import FastAPI, Request
+
+    from eda_cli.responses import DecompressionMiddleware
+
+    mini = FastAPI()
+    mini.add_middleware(DecompressionMiddleware, max_size=1 << 20)
+
+    @mini.post("/length")
+    async def length(request: Request):
+        return {"n": len(await request.body())}
+
+    mini_client = TestClient(mini)
+    headers = {"Content-Encoding": "gzip"}
+    ok = mini_client.post("/length", content=gzip.compress(b"x" * 1000), headers=headers)
+    assert ok.status_code == 200 and ok.json() == {"n": 1000}
+
+    bomb = gzip.compress(b"\0" * (64 << 20))  # 64 МБ нулей — около 65 КБ в gzip
+    resp = mini_client.post("/length", content=bomb, headers=headers)
+    assert resp.status_code == 413
+    assert "больше" in resp.json()["detail"]
+
+
+def test_missing_and_top_categories_json():
+    payload = _wide_csv(3)
+    missing = client.post("/missing-from-csv", files={"file": ("w.csv", payload, "text/csv")}).json()
+    assert "col_0" in missing["columns"]["column"]
+
+    top = client.post("/top-categories-from-csv?top_k=2", files={"file": ("w.csv", payload, "text/csv")}).json()
+    assert top["top_categories"]["city"]["value"][0] == "A"
+
+
+def test_arrow_and_parquet_content_negotiation():
+    import pytest
+
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+
+    payload = _wide_csv(3)
+    resp = client.post(
+        "/summary-from-csv",
+        files={"file": ("w.csv", payload, "text/csv")},
+        headers={"Accept": "application/vnd.apache.arrow.stream"},
+    )
+    assert resp.status_code == 200, resp.text
+    assert resp.headers["content-type"] == "application/vnd.apache.arrow.stream"
+    table = pa.ipc.open_stream(resp.content).read_all()
+    assert table.column("name").to_pylist() == ["col_0", "col_1", "col_2", "city"]
+    assert table.schema.metadata[b"n_rows"] == b"4"
+
+    resp = client.post(
+        "/top-categories-from-csv",
+        files={"file": ("w.csv", payload, "text/csv")},
+        headers={"Accept": "application/vnd.apache.parquet"},
+    )
+    assert resp.status_code == 200, resp.text
+    table = pq.read_table(io.BytesIO(resp.content))
+    assert set(table.column_names) == {"column", "value", "count", "share"}
+    assert table.column("column").to_pylist()[0] == "city"
+
+    resp = client.post(
+        "/missing-from-csv",
+        files={"file": ("w.csv", payload, "text/csv")},
+        headers={"Accept": "text/html"},
+    )
+    assert resp.status_code == 406
+
+
+def test_quality_flags_with_composite_key():
+    df = pd.DataFrame({"country": ["RU", "RU", "KZ"], "city": ["Moscow", "Moscow", "Almaty"], "v": [1, 2, 3]})
+    files = {"file": ("k.csv", make_csv_bytes(df), "text/csv")}
+    resp = client.post("/quality-flags-from-csv?key=country,city", files=files)
+    assert resp.status_code == 200, resp.text
+    violations = resp.json()["flags"]["key_violations"]
+    assert violations[0]["columns"] == ["country", "city"]
+    assert violations[0]["duplicate_rows"] == 1
+
+    files = {"file": ("k.csv", make_csv_bytes(df), "text/csv")}
+    assert client.post("/quality-flags-from-csv?key=nope", files=files).status_code == 400
+
+
+def test_quality_flags_with_rules_file():
+    df = pd.DataFrame({"age": [10, 200, 30], "plan": ["Free", "Pro", "Gold"]})
+    rules = b'{"rules": [{"type": "range", "column": "age", "min": 0, "max": 120}, {"type": "allowed", "column": "plan", "values": ["Free", "Pro"]}]}'
+    files = {"file": ("r.csv", make_csv_bytes(df), "text/csv"), "rules": ("rules.json", rules, "application/json")}
+    resp = client.post("/quality-flags-from-csv", files=files)
+    assert resp.status_code == 200, resp.text
+    flags = resp.json()["flags"]
+    assert flags["failed_rules"] == 2
+    assert [item["failed"] for item in flags["rules"]] == [1, 1]
+
+    files = {"file": ("r.csv", make_csv_bytes(df), "text/csv"), "rules": ("rules.json", b'{"rules": [{"type": "nope"}]}', "application/json")}
+    assert client.post("/quality-flags-from-csv", files=files).status_code == 400
+
+    # выражения правил не исполняют код: @переменные, атрибуты и вызовы отклоняются при разборе
+    for expr in ["@chunk.to_csv('pwn.csv')", "age.to_csv('pwn.csv')", "__import__('os')"]:
+        rules = ('{"rules": [{"type": "expression", "expr": "%s"}]}' % expr.replace("'", "\\u0027")).encode()
+        files = {"file": ("r.csv", make_csv_bytes(df), "text/csv"), "rules": ("rules.json", rules, "application/json")}
+        resp = client.post("/quality-flags-from-csv", files=files)
+        assert resp.status_code == 400, expr
+    rules = b'{"rules": [{"type": "expression", "expr": "age < 100 & plan in [\'Free\', \'Pro\']"}]}'
+    files = {"file": ("r.csv", make_csv_bytes(df), "text/csv"), "rules": ("rules.json", rules, "application/json")}
+    resp = client.post("/quality-flags-from-csv", files=files)
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["flags"]["rules"][0]["failed"] == 2
+
+
+def test_compare_saved_summary_with_csv():
+    ref = pd.DataFrame({"x": list(range(100)), "plan": ["Free"] * 80 + ["Pro"] * 20})
+    cur = pd.DataFrame({"x": list(range(50, 150)), "plan": ["Free"] * 20 + ["Pro"] * 80, "extra": [1] * 100})
+
+    resp = client.post(
+        "/summary-from-csv?layout=snapshot", files={"file": ("ref.csv", make_csv_bytes(ref), "text/csv")}
+    )
+    assert resp.status_code == 200, resp.text
+    files = {
+        "reference": ("ref.json", resp.content, "application/json"),
+        "current": ("cur.csv", make_csv_bytes(cur), "text/csv"),
+    }
+    resp = client.post("/compare", files=files)
+    assert resp.status_code == 200, resp.text
+    data = resp.json()
+    assert data["added_columns"] == ["extra"]
+    assert set(data["drifted_columns"]) == {"x", "plan"}
+
+    files = {"reference": ("bad.json", b"{}", "application/json"), "current": ("cur.csv", make_csv_bytes(cur), "text/csv")}
+    assert client.post("/compare", files=files).status_code == 400
+
+
+def test_infer_types_endpoint_and_quality_flags():
+    df = pd.DataFrame({"amount": ["oops"] + [str(i) for i in range(1, 40)], "name": ["a", "b", "c", "d"] * 10})
+    files = {"file": ("data.csv", make_csv_bytes(df), "text/csv")}
+
+    resp = client.post("/infer-types-from-csv", files=files)
+    assert resp.status_code == 200, resp.text
+    columns = {c["column"]: c for c in resp.json()["columns"]}
+    assert columns["amount"]["inferred"] == "numeric"
+    assert columns["amount"]["offending_examples"] == ["oops"]
+    assert columns["name"]["inferred"] is None
+
+    resp = client.post("/quality-flags-from-csv?infer_types=true", files=files)
+    assert resp.status_code == 200, resp.text
+    data = resp.json()
+    assert [c["column"] for c in data["inferred_types"] if c["inferred"]] == ["amount"]
+    assert data["flags"]["max_missing_share"] > 0  # "oops" стал пропуском
+
+
+def test_timeseries_from_csv_infers_datetime_column():
+    ts = pd.date_range("2024-01-01", periods=48, freq="h").delete([10, 11])
+    df = pd.DataFrame({"ts": ts.strftime("%Y-%m-%d %H:%M"), "v": range(len(ts))})
+    resp = client.post("/timeseries-from-csv", files={"file": ("ts.csv", make_csv_bytes(df), "text/csv")})
+    assert resp.status_code == 200, resp.text
+    (profile,) = resp.json()["columns"]
+    assert profile["name"] == "ts" and profile["inferred_freq"] == "h"
+    assert (profile["gaps"], profile["missing_periods"]) == (1, 2)
+
+
+def test_target_from_csv():
+    df = pd.DataFrame({"visits": list(range(40)), "plan": ["Free", "Pro"] * 20, "churned": [1] * 10 + [0] * 30})
+    resp = client.post(
+        "/target-from-csv?target=churned", files={"file": ("data.csv", make_csv_bytes(df), "text/csv")}
+    )
+    assert resp.status_code == 200, resp.text
+    data = resp.json()
+    assert data["task"] == "binary" and data["target_mean"] == 0.25
+    visits = next(f for f in data["features"] if f["name"] == "visits")
+    assert visits["auc"] == 0.0
+
+    resp = client.post("/target-from-csv?target=nope", files={"file": ("data.csv", make_csv_bytes(df), "text/csv")})
+    assert resp.status_code == 400
+
+
+def test_outliers_from_csv():
+    df = pd.DataFrame({"amount": [10, 11, 12, 13, 14] * 8 + [500], "name": ["a"] * 41})
+    files = {"file": ("data.csv", make_csv_bytes(df), "text/csv")}
+    resp = client.post("/outliers-from-csv?isolation=true", files=files)
+    assert resp.status_code == 200, resp.text
+    data = resp.json()
+    (amount,) = data["columns"]
+    assert amount["name"] == "amount" and amount["high"] == 1 and amount["examples"] == [500]
+    assert data["isolation"]["top"][0]["index"] == 40
+
+    resp = client.post("/outliers-from-csv?method=zscore", files=files)
+    assert resp.status_code == 400
+
+
+def test_missingness_from_csv():
+    df = pd.DataFrame({"a": [1, None, None, 4], "b": [None, None, None, 1], "c": [1, 2, 3, 4]})
+    files = {"file": ("data.csv", make_csv_bytes(df), "text/csv")}
+    resp = client.post("/missingness-from-csv?top=5", files=files)
+    assert resp.status_code == 200, resp.text
+    data = resp.json()
+    assert data["complete_rows"] == 1 and data["missing_counts"] == {"a": 2, "b": 3}
+    assert data["patterns"][0] == {"missing": ["a", "b"], "n_missing": 2, "count": 2, "share": 0.5}
+    (pair,) = data["pairs"]
+    assert pair["both"] == 2 and pair["p_b_given_a"] == 1.0
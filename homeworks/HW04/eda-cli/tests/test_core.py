@@ -155,4 +155,917 @@ def test_compute_quality_flags_new_heuristics():
     zero_cols = [x["column"] for x in flags.get("zero_value_columns", [])]
     assert "val" in zero_cols
     assert "quality_score" in flags
-    assert 0.0 <= flags["quality_score"] <= 1.0
\ No newline at end of file
+    assert 0.0 <= flags["quality_score"] <= 1.0
+
+
+def test_dataset_summary_columnar_views():
+    df = _sample_df()
+    summary = summarize_dataset(df)
+
+    # массивы по полям
+    assert summary.names.tolist() == ["age", "height", "city"]
+    assert summary.missing.tolist() == [1, 0, 1]
+
+    # ленивые представления колонок с атрибутами ColumnSummary
+    age = summary.column("age")
+    assert age.non_null == 3 and age.min == 10.0 and age.max == 30.0
+    city = summary.columns[-1]
+    assert city.name == "city" and city.is_numeric is False and city.mean is None
+    assert len(summary.columns) == 3
+
+    frame = summary.to_frame()
+    assert frame["name"].tolist() == ["age", "height", "city"]
+    assert frame.loc[frame["name"] == "height", "mean"].item() == 155.0
+
+
+def test_dataset_summary_from_column_summaries():
+    from eda_cli.core import ColumnSummary, DatasetSummary
+
+    cols = [
+        ColumnSummary("x", "int64", 2, 0, 0.0, 2, ["1", "2"], True, 1.0, 2.0, 1.5, 0.7),
+        ColumnSummary("y", "object", 1, 1, 0.5, 1, ["a"], False),
+    ]
+    summary = DatasetSummary(n_rows=2, n_cols=2, columns=cols)
+    assert [c.to_dict() for c in summary.columns] == [c.to_dict() for c in cols]
+    assert summary.to_dict()["columns"][1]["min"] is None
+    assert summary.columns[0].materialize() == cols[0]
+
+
+def test_summary_quantiles_exact_for_small_columns():
+    df = pd.DataFrame({"x": list(range(1, 101)), "s": ["a"] * 100})
+    summary = summarize_dataset(df)
+    x = summary.column("x")
+    assert x.p50 == pytest.approx(df["x"].quantile(0.5))
+    assert x.p99 == pytest.approx(df["x"].quantile(0.99))
+    assert summary.column("s").p50 is None
+    assert "p95" in flatten_summary_for_print(summary).columns
+
+
+def test_kll_sketch_merge_accuracy():
+    import numpy as np
+
+    from eda_cli.sketch import KLLSketch
+
+    rng = np.random.default_rng(0)
+    values = rng.normal(size=200_000)
+    # без явного seed у каждого шарда свои случайные прореживания
+    parts = [KLLSketch(k=200).update(chunk) for chunk in np.array_split(values, 8)]
+    merged = parts[0]
+    for part in parts[1:]:
+        merged.merge(part)
+    assert merged.n == values.size
+
+    qs = [0.01, 0.5, 0.99]
+    ranks = np.searchsorted(np.sort(values), merged.quantiles(qs)) / values.size
+    assert np.abs(ranks - qs).max() < 0.02
+    same = [KLLSketch(k=200).update(values[:10_000]).retained() for _ in range(2)]
+    assert not np.array_equal(same[0], same[1])
+
+    restored = KLLSketch.from_dict(merged.to_dict())
+    assert restored.quantiles(qs).tolist() == merged.quantiles(qs).tolist()
+
+
+def test_summary_accumulator_matches_full_summary():
+    from eda_cli.accumulate import SummaryAccumulator
+
+    df = pd.DataFrame(
+        {
+            "age": [10, 20, None, 40, 50, 60, None, 80],
+            "city": ["A", "B", "A", None, "C", "A", "B", "D"],
+        }
+    )
+    full = summarize_dataset(df)
+
+    first = SummaryAccumulator().update(df.iloc[:3])
+    second = SummaryAccumulator().update(df.iloc[3:6]).update(df.iloc[6:])
+    merged = first.merge(second).finalize()
+
+    assert merged.n_rows == full.n_rows
+    assert merged.missing.tolist() == full.missing.tolist()
+    assert merged.unique.tolist() == full.unique.tolist()
+    assert merged.column("age").mean == pytest.approx(full.column("age").mean)
+    assert merged.column("age").std == pytest.approx(full.column("age").std)
+    assert merged.column("age").p50 == pytest.approx(full.column("age").p50)
+    assert merged.column("city").example_values == full.column("city").example_values
+
+
+def test_summary_accumulator_distinct_count_is_bounded(monkeypatch):
+    import numpy as np
+
+    from eda_cli import accumulate
+    from eda_cli.accumulate import SummaryAccumulator
+
+    monkeypatch.setattr(accumulate, "DISTINCT_CAPACITY", 4096)
+    df = pd.DataFrame({"x": np.arange(200_000) * 0.5, "s": [f"id-{i % 3000}" for i in range(200_000)]})
+    acc = SummaryAccumulator().update_many([df.iloc[i : i + 20_000] for i in range(0, len(df), 20_000)])
+    summary = acc.finalize()
+    assert acc.columns[0]._hashes.size == 4096  # хранится не больше DISTINCT_CAPACITY хэшей
+    assert summary.column("x").unique == pytest.approx(200_000, rel=0.1)
+    assert summary.column("s").unique == 3000  # меньше ёмкости — точно
+
+
+def test_duplicate_rows_and_key_violations_with_spill(tmp_path):
+    from eda_cli.duplicates import DuplicateDetector
+
+    df = pd.DataFrame(
+        {
+            "user_id": [1, 2, 3, 3, 4, 1, 5, None],
+            "country": ["RU", "RU", "KZ", "KZ", "BY", "RU", "RU", "RU"],
+            "amount": [10.0, 20.0, 30.0, 30.0, 40.0, 11.0, 50.0, 60.0],
+        }
+    )
+    expected_rows = int(df.duplicated().sum())
+
+    # маленький лимит памяти -> хэши партиций сбрасываются на диск
+    detector = DuplicateDetector(keys=[["user_id"], ["user_id", "country"]], memory_limit=2, spill_dir=tmp_path)
+    for start in range(0, len(df), 3):
+        detector.update(df.iloc[start : start + 3])
+    result = detector.result()
+    detector.close()
+
+    assert result["duplicate_rows"] == expected_rows == 1
+    by_key = {tuple(v["columns"]): v for v in result["key_violations"]}
+    assert by_key[("user_id",)]["duplicate_rows"] == 2
+    assert by_key[("user_id",)]["null_key_rows"] == 1
+    assert by_key[("user_id", "country")]["duplicate_rows"] == 2
+
+
+def test_quality_flags_duplicates_lower_score():
+    df = pd.DataFrame({"a": [1, 2, 3, 4] * 30, "b": ["x", "y", "z", "w"] * 30})
+    unique_df = pd.DataFrame({"a": range(120), "b": ["x", "y", "z", "w"] * 30})
+
+    flags = compute_quality_flags(summarize_dataset(df), missing_table(df), df=df, key_columns=[["a"]])
+    clean = compute_quality_flags(summarize_dataset(unique_df), missing_table(unique_df), df=unique_df)
+
+    assert flags["has_duplicate_rows"] is True
+    assert flags["duplicate_rows"] == 116
+    assert flags["has_key_violations"] is True
+    assert clean["has_duplicate_rows"] is False
+    assert flags["quality_score"] < clean["quality_score"]
+
+
+def test_rules_engine_counts_violations_per_rule():
+    from eda_cli.rules import compile_rules, parse_rules_text
+
+    df = pd.DataFrame(
+        {
+            "age": [25, 40, 150, None, -1, 33],
+            "plan": ["Free", "Pro", "Gold", "Pro", None, "Free"],
+            "email": ["a@b.ru", "bad", "c@d.ru", None, "e@f.ru", "g@h.ru"],
+            "user_id": [1, 2, 3, 3, 4, 5],
+            "sessions": [5, 3, 2, 1, 0, 4],
+            "purchases": [1, 4, 0, 1, None, 2],
+        }
+    )
+    rules = parse_rules_text(
+        """
+rules:
+  - {name: age_range, type: range, column: age, min: 0, max: 120, weight: 0.1}
+  - {type: not_null, columns: [age, plan]}
+  - {type: allowed, column: plan, values: [Free, Basic, Pro]}
+  - {type: regex, column: email, pattern: '[^@]+@[^@]+'}
+  - {type: unique, column: user_id}
+  - {type: expression, expr: purchases <= sessions, max_fail_share: 0.5}
+"""
+    )
+    compiled = compile_rules(rules)
+    for start in range(0, len(df), 4):
+        compiled.update(df.iloc[start : start + 4])
+    result = compiled.result()
+    compiled.close()
+
+    by_name = {item["name"]: item for item in result["rules"]}
+    assert by_name["age_range"]["failed"] == 2
+    assert by_name["age_range"]["checked"] == 5
+    assert sorted(by_name["age_range"]["examples"]) == [-1.0, 150.0]
+    assert by_name["not_null:age,plan"]["failed"] == 2
+    assert by_name["allowed:plan"]["examples"] == ["Gold"]
+    assert by_name["regex:email"]["failed"] == 1
+    assert by_name["unique:user_id"]["failed"] == 1
+    # строка с пропуском в purchases не проверяется, 1 нарушение из 5 — в пределах допуска
+    expr = by_name["expression:purchases <= sessions"]
+    assert (expr["failed"], expr["checked"], expr["passed"]) == (1, 5, True)
+    assert result["failed_rules"] == 5
+    assert result["penalty"] == pytest.approx(0.1 + 4 * 0.05)
+
+    base = compute_quality_flags(summarize_dataset(df), missing_table(df), df=df)
+    flags = compute_quality_flags(summarize_dataset(df), missing_table(df), df=df, rules_result=result)
+    assert flags["failed_rules"] == 5
+    assert flags["quality_score"] == pytest.approx(max(0.0, base["quality_score"] - result["penalty"]))
+
+    # арифметика над литералами, растущая без предела, отклоняется при разборе, а не при вычислении
+    from eda_cli.expressions import ExpressionError, compile_expression
+
+    for expr_text in ("age < 10**10**10", "plan == 'x' * 10**10", "age < 99999999999999999999", "age ** age > 1"):
+        with pytest.raises(ExpressionError):
+            compile_expression(expr_text)
+    assert compile_expression("age ** 2 > 1000").evaluate(df).tolist() == [False, True, True, False, False, True]
+
+
+def test_snapshot_roundtrip_and_drift(tmp_path):
+    import numpy as np
+
+    from eda_cli.drift import SummarySnapshot, compare_snapshots, snapshot_chunks, snapshot_dataframe
+
+    rng = np.random.default_rng(0)
+    n = 5000
+    ref_df = pd.DataFrame(
+        {
+            "stable": rng.normal(0, 1, n),
+            "shifted": rng.normal(0, 1, n),
+            "plan": rng.choice(["Free", "Pro"], n, p=[0.7, 0.3]),
+        }
+    )
+    cur_df = pd.DataFrame(
+        {
+            "stable": rng.normal(0, 1, n),
+            "shifted": rng.normal(1, 1, n),
+            "plan": rng.choice(["Free", "Pro", "Team"], n, p=[0.3, 0.3, 0.4]),
+        }
+    )
+    cur_df.loc[: n // 5, "stable"] = None
+
+    path = snapshot_dataframe(ref_df, source="ref.csv").save(tmp_path / "ref.json")
+    reference = SummarySnapshot.load(path)
+    assert reference.summary.column("shifted").p50 == pytest.approx(ref_df["shifted"].median(), abs=0.05)
+    current = snapshot_chunks((cur_df.iloc[i : i + 1000] for i in range(0, n, 1000)), source="cur.csv")
+
+    result = compare_snapshots(reference, current)
+    by_name = {c["name"]: c for c in result["columns"]}
+    assert by_name["shifted"]["psi"] > 0.2 and by_name["shifted"]["ks"] > 0.3
+    assert by_name["stable"]["ks"] < 0.1
+    assert by_name["stable"]["missing_share_delta"] == pytest.approx(0.2, abs=0.01)
+    assert by_name["plan"]["top_entered"] == ["Team"]
+    assert by_name["plan"]["psi"] > 0.2
+    assert result["drifted_columns"] == ["stable", "shifted", "plan"]
+
+    same = compare_snapshots(reference, reference)
+    assert same["drifted_columns"] == []
+
+
+def test_sharded_profiling_with_tcp_workers_and_retries(tmp_path):
+    import socket
+    import threading
+
+    from eda_cli.distributed import Shard, ShardCoordinator, ShardError, ShardOptions, WorkerServer, plan_shards
+
+    df = pd.DataFrame(
+        {
+            "user_id": range(200),
+            "amount": [float(i % 17) for i in range(200)],
+            "city": ["Moscow", "Kazan", None, "Omsk"] * 50,
+        }
+    )
+    path = tmp_path / "data.csv"
+    df.to_csv(path, index=False)
+    shards = plan_shards([path, path], shard_bytes=500)
+    assert len(shards) > 4
+
+    # адрес, на котором никто не слушает: его шарды должны уйти живому воркеру
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        dead = f"127.0.0.1:{s.getsockname()[1]}"
+    with WorkerServer(("127.0.0.1", 0), token="s3cret", data_root=tmp_path) as server:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        coordinator = ShardCoordinator([dead, server.endpoint], max_retries=2, timeout=10, token="s3cret")
+        acc = coordinator.run(shards, ShardOptions())
+
+        # без токена и вне data_root воркер файлы не читает
+        for token, shard in (("wrong", shards[0]), ("s3cret", Shard(0, "/etc/hostname", 0, 10))):
+            with pytest.raises(ShardError, match="PermissionError"):
+                ShardCoordinator([server.endpoint], max_retries=0, timeout=10, token=token).run([shard])
+        server.shutdown()
+
+    assert coordinator.failures and all(f["worker"] == dead for f in coordinator.failures)
+    # упавший шард не возвращается воркеру, на котором он уже падал
+    assert len({f["shard"] for f in coordinator.failures}) == len(coordinator.failures)
+    summary = acc.finalize()
+    full = summarize_dataset(pd.concat([df, df], ignore_index=True))
+    assert summary.n_rows == 400
+    assert summary.non_null.tolist() == full.non_null.tolist()
+    assert summary.unique.tolist() == full.unique.tolist()
+    assert summary.column("amount").mean == pytest.approx(full.column("amount").mean)
+    assert acc.zero_counts()["amount"] == int((df["amount"] == 0).sum()) * 2
+
+
+def test_parallel_parse_splits_outside_quoted_newlines(tmp_path):
+    from eda_cli.distributed import ShardOptions, plan_shards, profile_sharded, read_shard
+    from eda_cli.infer import infer_types
+
+    df = pd.DataFrame(
+        {
+            "id": range(600),
+            "note": ['строка\n"в кавычках"\nещё' if i % 3 == 0 else f"note {i}" for i in range(600)],
+            "amount": [f"{i % 13},5" for i in range(600)],
+        }
+    )
+    path = tmp_path / "quoted.csv"
+    df.to_csv(path, index=False)
+    whole = pd.read_csv(path)
+
+    # маленькие шарды: отметки попадают внутрь полей с переводами строк
+    shards = plan_shards([path], shard_bytes=300)
+    assert len(shards) > 10
+    parts = [chunk for shard in shards for chunk in read_shard(shard, ShardOptions())]
+    assert pd.concat(parts, ignore_index=True).equals(whole)
+
+    types = [info.to_dict() for info in infer_types(whole.head(100))]
+    acc = profile_sharded([path], processes=2, shard_bytes=300, options=ShardOptions(types=types))
+    summary = acc.finalize()
+    assert summary.n_rows == 600
+    assert summary.column("note").unique == whole["note"].nunique()
+    assert summary.column("amount").mean == pytest.approx(whole["amount"].str.replace(",", ".").astype(float).mean())
+
+
+def test_compressed_inputs_stream_and_shard_whole(tmp_path):
+    import bz2
+    import gzip
+
+    from eda_cli.compression import detect_compression, open_decompressed
+    from eda_cli.distributed import ShardOptions, plan_shards, profile_sharded
+
+    df = pd.DataFrame({"id": range(300), "city": ["Moscow", "Kazan", None] * 100})
+    plain = tmp_path / "data.csv"
+    df.to_csv(plain, index=False)
+    raw = plain.read_bytes()
+    gz = tmp_path / "data.csv.gz"
+    gz.write_bytes(gzip.compress(raw))
+    # сжатие определяется по сигнатуре, а не по расширению
+    disguised = tmp_path / "upload.part"
+    disguised.write_bytes(bz2.compress(raw))
+    assert (detect_compression(plain), detect_compression(gz), detect_compression(disguised)) == (None, "gzip", "bz2")
+    with disguised.open("rb") as f:
+        assert pd.read_csv(open_decompressed(f)).equals(df)
+
+    # сжатый файл не делится по байтам: один шард на файл
+    shards = plan_shards([plain, gz, disguised], shard_bytes=500)
+    assert [s.path for s in shards].count(str(gz)) == 1
+    summary = profile_sharded([plain, gz, disguised], processes=1, shard_bytes=500, options=ShardOptions()).finalize()
+    assert summary.n_rows == 900
+    assert summary.column("city").missing == 300
+
+    # «бомба»: распаковка идёт кусками не больше OUTPUT_BLOCK и обрывается на лимите
+    from eda_cli.compression import OUTPUT_BLOCK, DecompressionLimitError, incremental_decompressor
+
+    bomb = gzip.compress(b"0" * (8 * OUTPUT_BLOCK))
+    pieces = incremental_decompressor("gzip", max_output=16 * OUTPUT_BLOCK)(bomb, True)
+    assert max(map(len, pieces)) <= OUTPUT_BLOCK
+    with pytest.raises(DecompressionLimitError):
+        list(incremental_decompressor("gzip", max_output=3 * OUTPUT_BLOCK)(bomb, True))
+    with pytest.raises(DecompressionLimitError), gz.open("rb") as f:
+        pd.read_csv(open_decompressed(f, max_output=len(raw) // 2))
+    with gz.open("rb") as f:
+        assert pd.read_csv(open_decompressed(f, max_output=len(raw))).equals(df)
+
+
+def test_selection_pushes_columns_and_filter_into_reader(tmp_path):
+    from eda_cli.distributed import ShardOptions, plan_shards, read_shard
+    from eda_cli.selection import Selection, SelectionError, read_csv
+
+    df = pd.DataFrame(
+        {
+            "country": ["RU", "US", None, "RU"] * 50,
+            "amount": [1.0, 5.0, 2.0, -3.0] * 50,
+            "note": ["a", "b", "c", "d"] * 50,
+            "id": range(200),
+        }
+    )
+    path = tmp_path / "data.csv"
+    df.to_csv(path, index=False)
+    selection = Selection(columns=["amount", "note"], where="country == 'RU' and amount > 0")
+    # country нужна только условию: её разбирают, но в результат она не попадает
+    plan = selection.plan(df.columns)
+    assert plan.usecols == ["country", "amount", "note"] and plan.keep == ["amount", "note"]
+
+    expected = df.loc[(df["country"] == "RU") & (df["amount"] > 0), ["amount", "note"]]
+    assert read_csv(path, selection=selection).equals(expected)
+    chunked = pd.concat(read_csv(path, selection=selection, chunksize=30))
+    assert chunked.equals(expected)
+    options = ShardOptions(selection=selection.to_dict())
+    sharded = pd.concat(chunk for shard in plan_shards([path], 400) for chunk in read_shard(shard, options))
+    assert sharded.reset_index(drop=True).equals(expected.reset_index(drop=True))
+
+    assert list(read_csv(path, selection=Selection(exclude=["note", "id"])).columns) == ["country", "amount"]
+    with pytest.raises(SelectionError):
+        Selection(columns=["missing"]).plan(df.columns)
+    with pytest.raises(SelectionError):
+        Selection(where="cuntry == 'RU'").plan(df.columns)
+    # то же безопасное подмножество выражений, что и в правилах: без @, атрибутов и вызовов
+    for where in ("@pd.read_csv('x')", "amount.to_csv('/tmp/x')", "__import__('os')"):
+        with pytest.raises(SelectionError):
+            Selection(where=where).plan(df.columns)
+    rows = read_csv(path, selection=Selection(where="amount > 0 & country in ['RU', 'US']"))
+    assert len(rows) == 100
+
+
+def test_segments_single_pass_matches_per_subset_profiles():
+    from eda_cli.segments import OTHER_SEGMENT, SegmentProfiler, segments_frame
+
+    df = pd.DataFrame(
+        {
+            "country": ["RU", "KZ", "RU", "BY", None, "UA"] * 40,
+            "amount": [float(i % 11) for i in range(240)],
+            "city": ["Moscow", None, "Kazan", "Minsk", "Omsk", "Kyiv"] * 40,
+        }
+    )
+    profiler = SegmentProfiler(["country"], max_groups=3)
+    for start in range(0, len(df), 50):
+        profiler.update(df.iloc[start : start + 50])
+    result = profiler.result()
+
+    by_label = {item["segment"]: item for item in result["segments"]}
+    # первые три значения ключа получают свои сегменты, остальные (NA, UA) — общий
+    assert set(by_label) == {"country=RU", "country=KZ", "country=BY", OTHER_SEGMENT}
+    assert by_label[OTHER_SEGMENT]["n_rows"] == 80
+    assert result["truncated"] and result["n_segments"] == 3
+    assert sum(item["n_rows"] for item in result["segments"]) == len(df)
+
+    ru = df[df["country"] == "RU"].drop(columns=["country"])
+    expected = summarize_dataset(ru)
+    summary = by_label["country=RU"]["summary"]
+    assert list(summary.names) == ["amount", "city"]
+    assert summary.n_rows == len(ru)
+    assert summary.column("amount").mean == pytest.approx(expected.column("amount").mean)
+    assert summary.unique.tolist() == expected.unique.tolist()
+    assert by_label["country=KZ"]["flags"]["max_missing_share"] == 1.0
+    assert by_label["country=KZ"]["quality_score"] < by_label["country=RU"]["quality_score"]
+    assert len(segments_frame(result)) == 4
+
+
+def test_missingness_patterns_and_co_missing_match_brute_force():
+    from collections import Counter
+
+    import numpy as np
+
+    from eda_cli.missingness import MissingnessProfiler, co_missing_frame
+
+    rng = np.random.default_rng(0)
+    # 70 колонок — упакованная строка длиннее одного 64-битного слова
+    mask = rng.random((3000, 70)) < 0.02
+    mask[:, 5] = mask[:, 3]  # колонки 3 и 5 всегда пропадают вместе
+    df = pd.DataFrame(np.where(mask, np.nan, 1.0), columns=[f"c{i}" for i in range(70)])
+
+    profiler = MissingnessProfiler()
+    for start in range(0, len(df), 700):
+        profiler.update(df.iloc[start : start + 700])
+    result = profiler.result(top_patterns=5, top_pairs=3)
+
+    expected = Counter(tuple(np.flatnonzero(row)) for row in mask)
+    assert result["complete_rows"] == expected[()]
+    assert result["distinct_patterns"] == len(expected) and not result["patterns_truncated"]
+    top = sorted((count for key, count in expected.items() if key), reverse=True)[:5]
+    assert [p["count"] for p in result["patterns"]] == top
+    for p in result["patterns"]:
+        assert expected[tuple(int(c[1:]) for c in p["missing"])] == p["count"]
+
+    co = co_missing_frame(result)
+    brute = mask.T.astype(np.int64) @ mask.astype(np.int64)
+    cols = [int(c[1:]) for c in co.columns]
+    assert (co.to_numpy() == brute[np.ix_(cols, cols)]).all()
+    first = result["pairs"][0]
+    assert {first["a"], first["b"]} == {"c3", "c5"} and first["jaccard"] == 1.0 and first["p_b_given_a"] == 1.0
+
+    # ограничение числа шаблонов: частые шаблоны сохраняются с точными счётчиками
+    truncated = MissingnessProfiler(max_patterns=4).update(df).result(top_patterns=2)
+    assert truncated["patterns_truncated"] and truncated["distinct_patterns"] == 4
+    assert [p["count"] for p in truncated["patterns"]] == top[:2]
+
+
+def test_reservoir_sample_is_chunk_invariant_stratified_and_mergeable():
+    import numpy as np
+
+    from eda_cli.sampling import ReservoirSampler, allocate
+
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame({"country": rng.choice(["RU", "KZ", "BY"], 5000, p=[0.7, 0.25, 0.05]), "x": np.arange(5000)})
+
+    def run(step, **kwargs):
+        sampler = ReservoirSampler(300, seed=7, **kwargs)
+        return sampler.update_many(df.iloc[i : i + step] for i in range(0, len(df), step))
+
+    # ключи идут из одного потока генератора — разбиение на чанки выборку не меняет
+    plain = run(1000).sample()
+    assert len(plain) == 300 and plain["x"].is_monotonic_increasing
+    assert plain["x"].tolist() == run(37).sample()["x"].tolist()
+    other_seed = ReservoirSampler(300, seed=8).update(df).sample()
+    assert other_seed["x"].tolist() != plain["x"].tolist()
+
+    stratified = run(500, by=["country"])
+    sample = stratified.sample()
+    populations = df["country"].value_counts()
+    expected = dict(zip(populations.index, allocate(populations.tolist(), 300)))
+    assert sample["country"].value_counts().to_dict() == expected and sum(expected.values()) == 300
+    assert {row["stratum"]: row["population"] for row in stratified.strata()} == {
+        f"country={k}": v for k, v in populations.items()
+    }
+    equal = run(500, by=["country"], allocation="equal").sample()["country"].value_counts()
+    assert (equal == 100).all()
+    assert allocate([10, 1000, 1000], 300, "equal") == [10, 145, 145]
+
+    # слияние выборок шардов = bottom-k по ключам всех строк
+    first = ReservoirSampler(200, seed=7, stream=1).update(df.iloc[:2000])
+    second = ReservoirSampler(200, seed=7, stream=2).update(df.iloc[2000:])
+    keys = np.concatenate([np.random.default_rng([7, 1]).random(2000), np.random.default_rng([7, 2]).random(3000)])
+    merged = ReservoirSampler(200, seed=7).merge(first).merge(second)
+    assert merged.n_rows == 5000
+    assert merged.sample()["x"].tolist() == sorted(np.argsort(keys)[:200].tolist())
+
+
+def test_backends_match_pandas_summary_flags_and_top_values():
+    import numpy as np
+
+    from eda_cli.backends import BackendError, get_backend
+    from eda_cli.benchmark import benchmark_backends
+    from eda_cli.session import Profile
+
+    rng = np.random.default_rng(0)
+    n = 600
+    df = pd.DataFrame(
+        {
+            "amount": np.where(rng.random(n) < 0.1, np.nan, rng.normal(size=n)),
+            "zeros": np.where(rng.random(n) < 0.7, 0, rng.integers(1, 5, n)),
+            "city": rng.choice(["Moscow", "Kazan", "Omsk", None], n),
+            # числа вперемешку со строками бэкенды отдают pandas
+            "mixed": np.array([1, "1", None] * (n // 3), dtype=object),
+            "flag": rng.random(n) < 0.5,
+            "count": pd.array(np.where(rng.random(n) < 0.2, None, rng.integers(0, 9, n)), dtype="Int64"),
+            "user_id": rng.integers(0, n // 2, n),
+            "empty": np.full(n, np.nan),
+            # ±inf: std пуст во всех бэкендах; timedelta не участвует в корреляции, как в corr(numeric_only=True)
+            "spike": np.where(np.arange(n) % 100 == 0, np.inf, rng.normal(size=n)),
+            "wait": pd.to_timedelta(rng.integers(0, 3, n), unit="s"),
+        }
+    )
+    reference = Profile(df)
+    for name in ("polars", "duckdb"):
+        pytest.importorskip(name)
+        profile = Profile(df, backend=name)
+        summary = profile.summary
+        for field in ("non_null", "missing", "unique", "has_stats"):
+            assert np.array_equal(getattr(summary, field), getattr(reference.summary, field)), (name, field)
+        assert np.allclose(summary.std, reference.summary.std, rtol=1e-12, equal_nan=True)
+        assert summary.column("mixed").unique == 2
+        assert profile.quality_flags() == reference.quality_flags()
+        assert profile.value_counts("city").index.tolist() == reference.value_counts("city").index.tolist()
+        pd.testing.assert_frame_equal(profile.correlation, reference.correlation, rtol=1e-12)
+        assert summary.column("spike").std is None and "wait" not in profile.correlation.columns
+
+    rows = benchmark_backends(df, repeat=1)
+    assert rows[0]["backend"] == "pandas" and all(not row["mismatched"] for row in rows)
+    with pytest.raises(BackendError):
+        get_backend("spark")
+
+
+def test_sql_pushdown_profile_matches_dataframe_summary(tmp_path):
+    import importlib.util
+    import sqlite3
+
+    import numpy as np
+
+    from eda_cli.core import summarize_dataset
+    from eda_cli.duplicates import find_duplicates
+    from eda_cli.sqlsource import SQLSourceError, profile_sql
+
+    rng = np.random.default_rng(0)
+    n = 3000
+    df = pd.DataFrame(
+        {
+            "id": np.arange(n),
+            "x": rng.normal(size=n),
+            "k": rng.integers(0, 5, n).astype(float),
+            "city": rng.choice(["msk", "spb", "kzn"], n),
+        }
+    )
+    df.loc[::7, "k"] = np.nan
+    df.loc[::11, "city"] = None
+    df = pd.concat([df, df.iloc[:40]], ignore_index=True)  # 40 полных дубликатов
+
+    db = tmp_path / "data.sqlite"
+    with sqlite3.connect(db) as conn:
+        df.to_sql("events", conn, index=False)
+    databases = [db]
+    if importlib.util.find_spec("duckdb") is not None:  # DuckDB — опционально
+        import duckdb
+
+        with duckdb.connect(str(tmp_path / "data.duckdb")) as conn:
+            conn.execute("CREATE TABLE events AS SELECT * FROM df")
+        databases.append(tmp_path / "data.duckdb")
+
+    ref = summarize_dataset(df)
+    exact = df.select_dtypes("number").quantile([0.01, 0.05, 0.5, 0.95, 0.99])
+    for path in databases:
+        profile = profile_sql(path, "events", top_k=2, batch_size=2)
+        s = profile.summary
+        assert s.dtypes.tolist() == ref.dtypes.tolist()
+        for field in ("non_null", "missing", "unique", "is_numeric", "has_stats"):
+            assert (getattr(s, field) == getattr(ref, field)).all(), (path, field)
+        for field in ("min", "max", "mean", "std"):
+            assert np.allclose(getattr(s, field), getattr(ref, field), rtol=1e-9, equal_nan=True)
+        for j, field in enumerate(("p1", "p5", "p50", "p95", "p99")):
+            for name in exact.columns:
+                assert getattr(s, field)[s.position(name)] == pytest.approx(exact[name].iloc[j], rel=1e-12)
+        assert s.example_values.tolist() == ref.example_values.tolist()
+        counts = df["city"].value_counts()
+        assert profile.top_values["city"] == {str(v): int(c) for v, c in counts.head(2).items()}
+        assert profile.zero_counts["k"] == int((df["k"] == 0).sum())
+        assert profile.duplicates["duplicate_rows"] == find_duplicates(df)["duplicate_rows"] == 40
+        assert profile.source == f"{path.name}:events"
+
+    # в SQLite тип колонки не обязателен: строка среди чисел делает колонку строковой
+    with sqlite3.connect(db) as conn:
+        conn.execute("CREATE TABLE loose (amount REAL)")
+        conn.executemany("INSERT INTO loose VALUES (?)", [(1.5,), (0,), ("n/a",), (None,)])
+    loose = profile_sql(db, "loose").summary
+    assert loose.dtypes.tolist() == ["object"] and not loose.has_stats[0] and loose.unique.tolist() == [3]
+
+    # ±inf в REAL-колонке: среднее не подставляется в SQL, std — NaN, как в pandas
+    special = pd.DataFrame({"v": [1.0, 2.0, np.inf, None], "w": [1.0, -np.inf, np.inf, 2.0], "z": [1.0, 2.0, 3.0, 5.0]})
+    with np.errstate(invalid="ignore"):
+        special_ref = summarize_dataset(special)
+    with sqlite3.connect(db) as conn:
+        special.to_sql("special", conn, index=False)
+    for path in databases[1:]:
+        with duckdb.connect(str(path)) as conn:
+            conn.execute("CREATE TABLE special AS SELECT * FROM special")
+    for path in databases:
+        s = profile_sql(path, "special").summary
+        for field in ("min", "max", "mean", "std"):
+            assert np.allclose(getattr(s, field), getattr(special_ref, field), equal_nan=True), (path, field)
+
+    only = profile_sql(db, "events", columns=["x", "city"], exclude=["city"])
+    assert only.summary.names.tolist() == ["x"]
+    with pytest.raises(SQLSourceError, match="не найдена"):
+        profile_sql(db, "nope")
+    with pytest.raises(SQLSourceError, match="не похож"):
+        profile_sql(__file__, "events")
+
+
+def test_text_profile_arrow_matches_pandas_and_chunks():
+    from eda_cli.text import TextProfiler, profile_text
+
+    df = pd.DataFrame(
+        {
+            "email": ["a@b.ru", "c@d.com", None, "e@f.org", "  ", ""],
+            "code": ["001", "17", "x9", "42", "7", "3.5"],
+            "amount": [1.0, 2.0, 3.0, 4.0, 5.0, 6.0],
+        }
+    )
+    pandas_profiles = profile_text(df, use_arrow=False)
+    assert [p["name"] for p in pandas_profiles] == ["email", "code"]
+    pytest.importorskip("pyarrow")
+    assert profile_text(df) == pandas_profiles
+
+    email = pandas_profiles[0]
+    assert (email["non_null"], email["empty"], email["whitespace"]) == (5, 1, 1)
+    assert email["formats"]["email"] == pytest.approx(0.6)
+    assert (email["min_length"], email["max_length"]) == (0, 7)
+    code = pandas_profiles[1]
+    assert code["patterns"]["digits"] == pytest.approx(4 / 6)
+    assert code["patterns"]["alnum"] == pytest.approx(1 / 6)
+    assert code["formats"]["numeric"] == pytest.approx(5 / 6)
+    assert code["inferred_format"] is None  # ниже порога FORMAT_THRESHOLD из-за "x9"
+
+    chunked = TextProfiler().update_many([df.iloc[:3], df.iloc[3:]]).result()
+    assert chunked == profile_text(df)
+
+
+def test_infer_types_converts_mistyped_columns():
+    from eda_cli.infer import apply_inferred_types, convert_chunks, convert_types
+
+    n = 100
+    df = pd.DataFrame(
+        {
+            "price": ["n/a?"] + [str(i + 0.5) for i in range(n - 1)],
+            "rub": ["1,5", "2,25"] * (n // 2),
+            "zip": ["01234", "12345"] * (n // 2),
+            "when": ["bad"] + [f"2024-01-{i % 28 + 1:02d}" for i in range(n - 1)],
+            "city": ["Moscow", "Kazan"] * (n // 2),
+        }
+    )
+    out, inferences = convert_types(df)
+    by_name = {info.column: info for info in inferences}
+
+    assert by_name["price"].inferred == "numeric"
+    assert by_name["price"].numeric_rate == pytest.approx(0.99)
+    assert by_name["price"].offending_examples == ["n/a?"]
+    assert by_name["price"].coerced_to_null == 1
+    assert by_name["rub"].decimal_comma and out["rub"].tolist()[:2] == [1.5, 2.25]
+    assert by_name["zip"].inferred is None  # ведущие нули — это код
+    assert by_name["when"].inferred == "datetime" and by_name["when"].offending_examples == ["bad"]
+    assert by_name["city"].inferred is None
+    assert str(out["price"].dtype) == "float64"
+    assert str(out["when"].dtype).startswith("datetime64")
+    assert df["price"].dtype == object  # исходный DataFrame не меняется
+
+    chunks, chunk_inferences = convert_chunks([df.iloc[:50], df.iloc[50:]])
+    converted = pd.concat(list(chunks))
+    assert converted.dtypes.tolist() == out.dtypes.tolist()
+    cities = df[["city"]]
+    assert apply_inferred_types(cities, chunk_inferences) is cities  # без приводимых колонок — без копии
+
+
+def test_datetime_profile_gaps_duplicates_and_chunks():
+    from eda_cli.timeseries import DatetimeProfiler, profile_datetimes
+
+    ts = pd.date_range("2024-01-01", periods=500, freq="h")
+    ts = ts.delete(range(100, 110)).append(pd.DatetimeIndex([ts[200]])).sort_values()
+    df = pd.DataFrame({"ts": ts, "value": range(len(ts))})
+
+    profile = profile_datetimes(df)[0]
+    assert profile["name"] == "ts" and profile["non_null"] == 491
+    assert (profile["min"], profile["max"]) == ("2024-01-01T00:00:00", "2024-01-21T19:00:00")
+    assert profile["inferred_freq"] == "h"
+    assert (profile["duplicates"], profile["gaps"], profile["missing_periods"]) == (1, 1, 10)
+    assert profile["largest_gaps"][0]["start"] == "2024-01-05T03:00:00"
+    assert profile["period"] == "D" and sum(profile["period_counts"].values()) == 491
+
+    # чанки отсортированного файла и слияние частей дают тот же профиль
+    chunked = DatetimeProfiler().update_many([df.iloc[i : i + 37] for i in range(0, len(df), 37)]).result()
+    assert chunked == [profile]
+    merged = DatetimeProfiler().update(df.iloc[:200]).merge(DatetimeProfiler().update(df.iloc[200:]))
+    assert merged.result() == [profile]
+
+    shuffled = df.sample(frac=1, random_state=1)
+    assert profile_datetimes(shuffled) == [profile]
+    assert DatetimeProfiler().update(shuffled).result()[0]["sorted"] is False
+
+
+def test_target_profile_auc_rates_and_leakage(tmp_path):
+    import numpy as np
+
+    from eda_cli.target import TargetProfiler, profile_target
+
+    rng = np.random.default_rng(0)
+    n = 2000
+    signal = rng.normal(size=n)
+    y = (signal + rng.normal(size=n) > 0).astype(int)
+    df = pd.DataFrame(
+        {
+            "signal": signal,
+            "noise": rng.normal(size=n),
+            "leak": y * 10 + rng.normal(size=n) * 0.1,
+            "plan": np.where(y == 1, "Free", rng.choice(["Free", "Pro"], size=n)),
+            "user": [f"u{i}" for i in range(n)],
+            "churned": np.where(y == 1, "yes", "no"),
+        }
+    )
+    result = profile_target(df, "churned")
+    features = {f["name"]: f for f in result["features"]}
+
+    assert result["task"] == "binary" and result["positive"] == "yes"
+    assert result["target_mean"] == pytest.approx(y.mean())
+    ranks = df["signal"].rank()
+    n_pos = y.sum()
+    exact_auc = (ranks[y == 1].sum() - n_pos * (n_pos + 1) / 2) / (n_pos * (n - n_pos))
+    assert features["signal"]["auc"] == pytest.approx(exact_auc, abs=0.02)
+    assert features["noise"]["auc"] == pytest.approx(0.5, abs=0.05)
+    assert features["signal"]["corr"] == pytest.approx(np.corrcoef(df["signal"], y)[0, 1])
+    plan_rates = {c["value"]: c["target_mean"] for c in features["plan"]["categories"]}
+    assert plan_rates["Pro"] == 0.0 and plan_rates["Free"] > result["target_mean"]
+    assert result["leakage_suspects"] == ["leak"]
+    assert features["user"]["strength"] is None  # идентификатор не считается утечкой
+
+    chunked = TargetProfiler("churned", max_categories=100).update_many(
+        [df.iloc[i : i + 300] for i in range(0, n, 300)]
+    ).result()
+    chunked_features = {f["name"]: f for f in chunked["features"]}
+    assert chunked_features["signal"]["corr"] == pytest.approx(features["signal"]["corr"])
+    assert chunked_features["user"]["truncated"] and chunked_features["user"]["n_categories"] <= 200
+    assert chunked["leakage_suspects"] == ["leak"]
+
+    # report --target: неизвестная колонка и --positive не того типа — ошибка параметра, а не трассировка
+    from typer.testing import CliRunner
+
+    from eda_cli.cli import app
+
+    path = tmp_path / "churn.csv"
+    df.head(200).assign(score=rng.normal(size=200)).to_csv(path, index=False)
+    runner = CliRunner()
+    for extra in (["--target", "nope"], ["--target", "score", "--positive", "yes"]):
+        res = runner.invoke(app, ["report", str(path), "--out-dir", str(tmp_path / "rep"), *extra])
+        assert res.exit_code == 2 and res.exception is not None and "Invalid value" in res.output, res.output
+
+
+def test_outliers_exact_sketch_and_isolation():
+    import numpy as np
+
+    from eda_cli.accumulate import SummaryAccumulator
+    from eda_cli.outliers import detect_outliers, isolation_scores, outliers_from_summary
+
+    rng = np.random.default_rng(0)
+    n = 2000
+    df = pd.DataFrame(
+        {
+            "x": rng.uniform(-1, 1, size=n),
+            "y": rng.uniform(-1, 1, size=n),
+            "revenue": np.r_[rng.uniform(90, 110, size=n - 30), [-500] * 5, rng.uniform(900, 1500, size=25)],
+            "flag": rng.random(n) > 0.5,
+        }
+    )
+    df.loc[7, ["x", "y"]] = [8.0, -8.0]
+
+    exact = {r["name"]: r for r in detect_outliers(df)}
+    assert set(exact) == {"x", "y", "revenue"}  # булева колонка не проверяется
+    assert (exact["revenue"]["low"], exact["revenue"]["high"]) == (5, 25)
+    assert exact["x"]["outliers"] == 1  # только подставленная точка
+    mad = {r["name"]: r for r in detect_outliers(df, method="mad")}
+    assert mad["revenue"]["outliers"] == 30 and mad["revenue"]["lower"] > 0
+
+    small = df.iloc[:150]  # меньше k скетча — квантили точные
+    assert outliers_from_summary(summarize_dataset(small)) == detect_outliers(small)
+    acc = SummaryAccumulator().update_many([df.iloc[i : i + 300] for i in range(0, n, 300)])
+    sketch = {r["name"]: r for r in outliers_from_summary(acc.finalize())}
+    assert sketch["revenue"]["estimated"]
+    assert sketch["revenue"]["upper"] == pytest.approx(exact["revenue"]["upper"], rel=0.05)
+    assert sketch["revenue"]["outliers"] == pytest.approx(30, abs=5)
+
+    with pytest.raises(ValueError):
+        detect_outliers(df, method="zscore")
+
+    iso = isolation_scores(df[["x", "y"]])
+    assert iso["top"][0]["index"] == 7
+
+    flags = compute_quality_flags(summarize_dataset(df), missing_table(df), df=df)
+    assert flags["has_outliers"]
+    assert [c["column"] for c in flags["outlier_columns"]] == ["revenue"]  # у x одна точка — ниже порога доли
+
+
+def test_profile_session_matches_standalone_functions(monkeypatch):
+    from eda_cli.session import Profile
+
+    df = _sample_df()
+    profile = Profile(df)
+    flags = profile.quality_flags(0.1)
+
+    assert profile.summary.to_dict() == summarize_dataset(df).to_dict()
+    pd.testing.assert_frame_equal(profile.missing, missing_table(df))
+    pd.testing.assert_frame_equal(profile.correlation, correlation_matrix(df))
+    assert profile.top_categories(top_k=2).keys() == top_categories(df, top_k=2).keys()
+    assert flags == compute_quality_flags(summarize_dataset(df), missing_table(df), 0.1, df=df)
+
+    # повторные обращения не считают примитивы заново
+    calls = []
+    original_isna = pd.DataFrame.isna
+    monkeypatch.setattr(pd.DataFrame, "isna", lambda self: calls.append(1) or original_isna(self))
+    profile = Profile(df)
+    profile.summary, profile.missing, profile.quality_flags(0.2)
+    assert profile.missing_mask is profile.missing_mask
+    assert profile.value_counts("city") is profile.value_counts("city")
+    assert len(calls) == 1
+
+
+def test_daemon_cache_and_socket_roundtrip(tmp_path):
+    import os
+    import threading
+
+    from eda_cli.cli import app
+    from eda_cli.client import DaemonUnavailable, call_daemon
+    from eda_cli.daemon import DaemonServer, DatasetCache
+
+    first, second = tmp_path / "a.csv", tmp_path / "b.csv"
+    _sample_df().to_csv(first, index=False)
+    _sample_df().to_csv(second, index=False)
+
+    cache = DatasetCache(max_datasets=1)
+    profile = cache.get(first)
+    assert cache.get(first) is profile and cache.hits == 1
+    pd.concat([_sample_df()] * 2).to_csv(first, index=False)
+    os.utime(first, ns=(0, 10**18))  # файл изменился — датасет перечитывается
+    assert len(cache.get(first).df) == 8
+    cache.get(second)
+    assert [key[0] for key in cache.entries] == [str(second.resolve())] and cache.evictions == 1
+
+    socket_path = str(tmp_path / "d.sock")
+    with pytest.raises(DaemonUnavailable):
+        call_daemon({"op": "ping"}, socket_path)
+    with DaemonServer(socket_path, app=app, cache=DatasetCache()) as server:
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        for _ in range(2):
+            response = call_daemon({"op": "run", "argv": ["overview", "a.csv"], "cwd": str(tmp_path)}, socket_path)
+            assert response["exit_code"] == 0 and "Строк: 8" in response["stdout"]
+        stats = call_daemon({"op": "stats"}, socket_path)["result"]
+        assert (stats["hits"], stats["misses"]) == (1, 1)
+        response = call_daemon({"op": "run", "argv": ["overview", "missing.csv"], "cwd": str(tmp_path)}, socket_path)
+        assert response["exit_code"] != 0 and "не найден" in response["stderr"]
+        # кадр не с объектом — ответ с ошибкой, а не оборванное соединение
+        with pytest.raises(RuntimeError, match="JSON-объектом"):
+            call_daemon([1], socket_path)
+        call_daemon({"op": "shutdown"}, socket_path)
+        thread.join(timeout=5)
+    assert not os.path.exists(socket_path)
+
+    # «зависший» демон: соединение принимается, ответа нет — откат на выполнение в своём процессе
+    import socket
+    import time
+
+    from eda_cli.client import run_remote
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as hung:
+        hung.bind(socket_path)
+        hung.listen()
+        with pytest.raises(DaemonUnavailable):
+            call_daemon({"op": "ping"}, socket_path, timeout=0.2)
+        start = time.monotonic()
+        assert run_remote(["overview", "a.csv"], socket_path) is None
+        assert time.monotonic() - start < 10